@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Vectorized alarm replay engine for aws-cloudwatch skill.
+Category: cloud
+
+Replays exported metric history against thousands of alarm definitions at
+once and reports when each alarm would have fired, how often it flaps and
+how long detection takes. Alarms sharing a period and statistic are
+evaluated together as one (alarms x datapoints) NumPy array, including
+M-of-N "datapoints to alarm" windows and all treat-missing-data modes.
+
+Metric history (CSV, optionally .gz), one row per series at base resolution:
+
+    series,<ISO timestamp>,<ISO timestamp>,...
+    AWS/EC2:CPUUtilization:i-0abc123,12.5,nan,14.0,...
+
+Alarm definitions (YAML) use the keys of assets/alarm-config.yaml, as a
+mapping under `alarms:` or a list; `series` may be a glob that expands
+one definition over every matching series:
+
+    alarms:
+      cpu_high:
+        series: "AWS/EC2:CPUUtilization:*"
+        threshold: 80
+        period: 300
+        evaluation_periods: 3
+        datapoints_to_alarm: 2
+        comparison: GreaterThanThreshold
+        statistic: Average
+        treat_missing_data: missing
+
+Usage:
+    python alarm_replay.py METRICS.csv ALARMS.yaml [--incidents INCIDENTS.yaml]
+                           [--sweep 0.9,1.0,1.1] [--format table|json]
+"""
+
+import argparse
+import fnmatch
+import gzip
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+
+OK, ALARM, INSUFFICIENT = 0, 1, 2
+STATE_NAMES = {OK: 'OK', ALARM: 'ALARM', INSUFFICIENT: 'INSUFFICIENT_DATA'}
+
+COMPARISONS = {
+    'GreaterThanThreshold': 0,
+    'GreaterThanOrEqualToThreshold': 1,
+    'LessThanThreshold': 2,
+    'LessThanOrEqualToThreshold': 3,
+}
+COMPARISON_ALIASES = {'GreaterThan': 'GreaterThanThreshold', 'LessThan': 'LessThanThreshold',
+                      'GreaterThanOrEqualTo': 'GreaterThanOrEqualToThreshold',
+                      'LessThanOrEqualTo': 'LessThanOrEqualToThreshold'}
+MISSING_MODES = ('missing', 'notBreaching', 'breaching', 'ignore')
+STATISTICS = ('Average', 'Sum', 'Minimum', 'Maximum', 'SampleCount')
+
+# Alarms evaluated per batch; bounds temporary arrays for long histories
+BATCH = 2048
+
+
+class MetricHistory:
+    """Raw metric series on a shared time grid."""
+
+    def __init__(self, names: list, start: datetime, resolution: int, values: np.ndarray):
+        self.names = names
+        self.start = start
+        self.resolution = resolution
+        self.values = values
+        self.index = {name: i for i, name in enumerate(names)}
+
+
+def parse_row(text: str) -> np.ndarray:
+    """Comma-separated values; empty cells become NaN (missing data)."""
+    cells = text.split(',')
+    try:
+        return np.array(cells, dtype=np.float32)
+    except ValueError:
+        return np.array([float(c) if c.strip() else np.nan for c in cells], dtype=np.float32)
+
+
+def load_history(path: str) -> MetricHistory:
+    """
+    Load a wide metric export.
+
+    Args:
+        path: CSV or CSV.gz file (series,timestamps...)
+
+    Returns:
+        MetricHistory: Series names, grid start/resolution and values
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    names, rows = [], []
+    with opener(path, 'rt') as f:
+        header = f.readline().rstrip('\n').split(',')
+        stamps = [parse_time(value) for value in header[1:3]]
+        width = len(header) - 1
+        for line in f:
+            name, _, rest = line.partition(',')
+            row = parse_row(rest) if rest.strip() else np.empty(0, dtype=np.float32)
+            if len(row) != width:
+                padded = np.full(width, np.nan, dtype=np.float32)
+                padded[:min(width, len(row))] = row[:width]
+                row = padded
+            names.append(name)
+            rows.append(row)
+    resolution = int((stamps[1] - stamps[0]).total_seconds()) if len(stamps) > 1 else 60
+    # float32 halves memory for long exports; alarm thresholds rarely need more precision
+    values = np.empty((len(rows), width), dtype=np.float32)
+    for i in range(len(rows)):
+        values[i] = rows[i]
+        rows[i] = None
+    return MetricHistory(names, stamps[0], resolution, values)
+
+
+def parse_time(value: str) -> datetime:
+    stamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+
+
+def load_alarms(path: str, history: MetricHistory) -> list:
+    """
+    Load alarm definitions and expand series globs.
+
+    Args:
+        path: YAML file with alarm definitions
+        history: Loaded metric history (for series matching)
+
+    Returns:
+        list: Normalised alarm dicts, one per (definition, series)
+    """
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    entries = config.get('alarms', config) if isinstance(config, dict) else config
+    if isinstance(entries, dict):
+        entries = [dict(definition, name=definition.get('name', name)) for name, definition in entries.items()]
+
+    alarms = []
+    for entry in entries:
+        comparison = entry.get('comparison', 'GreaterThanThreshold')
+        comparison = COMPARISON_ALIASES.get(comparison, comparison)
+        if comparison not in COMPARISONS:
+            raise ValueError(f"{entry.get('name')}: unsupported comparison {comparison}")
+        missing = entry.get('treat_missing_data', 'missing')
+        if missing not in MISSING_MODES:
+            raise ValueError(f"{entry.get('name')}: unsupported treat_missing_data {missing}")
+        statistic = str(entry.get('statistic', 'Average'))
+        if statistic not in STATISTICS and not statistic.startswith('p'):
+            raise ValueError(f"{entry.get('name')}: unsupported statistic {statistic}")
+        period = int(entry.get('period', 300))
+        if period % history.resolution:
+            raise ValueError(f"{entry.get('name')}: period {period}s is not a multiple of "
+                             f"the {history.resolution}s export resolution")
+        evaluation_periods = int(entry.get('evaluation_periods', 1))
+        base = {
+            'name': entry.get('name', entry.get('metric')),
+            'threshold': float(entry['threshold']),
+            'period': period,
+            'evaluation_periods': evaluation_periods,
+            'datapoints_to_alarm': int(entry.get('datapoints_to_alarm', evaluation_periods)),
+            'comparison': comparison,
+            'statistic': statistic,
+            'treat_missing_data': missing,
+        }
+        pattern = entry.get('series', entry.get('metric'))
+        if any(ch in pattern for ch in '*?['):
+            matches = fnmatch.filter(history.names, pattern)
+        else:
+            matches = [pattern] if pattern in history.index else []
+        for series in matches:
+            alarm = dict(base, series=series)
+            if len(matches) > 1:
+                alarm['name'] = f"{base['name']}:{series}"
+            alarms.append(alarm)
+    return alarms
+
+
+def window_percentile(windows: np.ndarray, q: float) -> np.ndarray:
+    """Percentile over the last axis, NaN-aware, from one sort."""
+    ordered = np.sort(windows, axis=-1)
+    valid = np.count_nonzero(~np.isnan(windows), axis=-1)
+    position = np.maximum(valid - 1, 0) * (q / 100)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, np.maximum(valid - 1, 0))
+    lower = np.take_along_axis(ordered, low[..., None], axis=-1)[..., 0]
+    upper = np.take_along_axis(ordered, high[..., None], axis=-1)[..., 0]
+    result = lower + (upper - lower) * (position - low)
+    return np.where(valid > 0, result, np.nan)
+
+
+def aggregate(values: np.ndarray, factor: int, statistic: str) -> np.ndarray:
+    """
+    Roll raw datapoints up to alarm periods.
+
+    Args:
+        values: (series, samples) raw values, NaN for missing
+        factor: Raw samples per alarm period
+        statistic: CloudWatch statistic name
+
+    Returns:
+        np.ndarray: (series, periods) datapoints, NaN where a period had no samples
+    """
+    periods = values.shape[1] // factor
+    windows = values[:, :periods * factor].reshape(values.shape[0], periods, factor)
+    present = np.count_nonzero(~np.isnan(windows), axis=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if statistic == 'Average':
+            result = np.nansum(windows, axis=2) / present
+        elif statistic == 'Sum':
+            result = np.nansum(windows, axis=2)
+        elif statistic == 'Minimum':
+            result = np.min(np.where(np.isnan(windows), np.inf, windows), axis=2)
+        elif statistic == 'Maximum':
+            result = np.max(np.where(np.isnan(windows), -np.inf, windows), axis=2)
+        elif statistic == 'SampleCount':
+            result = present.astype(np.float64)
+        else:
+            result = window_percentile(windows, float(statistic[1:]))
+    return np.where(present > 0, result, np.nan)
+
+
+def rolling_sum(flags: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """Trailing window sum with a per-row window length."""
+    cumulative = np.zeros((flags.shape[0], flags.shape[1] + 1))
+    cumulative[:, 1:] = np.cumsum(flags, axis=1)
+    ends = np.arange(1, flags.shape[1] + 1)[None, :]
+    starts = np.maximum(ends - window[:, None], 0)
+    return cumulative[:, 1:] - np.take_along_axis(cumulative, starts, axis=1)
+
+
+def forward_fill(states: np.ndarray, keep: np.ndarray, initial: int = INSUFFICIENT) -> np.ndarray:
+    """Replace entries flagged by `keep` with the previous state (vectorized)."""
+    columns = np.arange(states.shape[1])[None, :]
+    last = np.where(keep, -1, columns)
+    np.maximum.accumulate(last, axis=1, out=last)
+    filled = np.take_along_axis(states, np.maximum(last, 0), axis=1)
+    return np.where(last < 0, initial, filled)
+
+
+def evaluate(datapoints: np.ndarray, alarms: list):
+    """
+    Evaluate alarm state at every period for a batch of alarms.
+
+    Args:
+        datapoints: (alarms, periods) aggregated values per alarm
+        alarms: Alarm dicts aligned with the rows
+
+    Returns:
+        tuple: (alarms, periods) states (OK, ALARM, INSUFFICIENT) and the
+            per-datapoint breach flags after missing-data handling
+    """
+    threshold = np.array([a['threshold'] for a in alarms])[:, None]
+    op = np.array([COMPARISONS[a['comparison']] for a in alarms])[:, None]
+    n_window = np.array([a['evaluation_periods'] for a in alarms])
+    m_required = np.array([a['datapoints_to_alarm'] for a in alarms])[:, None]
+    mode = np.array([MISSING_MODES.index(a['treat_missing_data']) for a in alarms])[:, None]
+
+    missing = np.isnan(datapoints)
+    with np.errstate(invalid='ignore'):
+        breach = np.select(
+            [op == 0, op == 1, op == 2, op == 3],
+            [datapoints > threshold, datapoints >= threshold,
+             datapoints < threshold, datapoints <= threshold],
+        )
+    # notBreaching -> missing counts as good, breaching -> missing counts as bad
+    breach = np.where(missing, mode == MISSING_MODES.index('breaching'), breach).astype(bool)
+    counts_present = (~missing) | (mode == MISSING_MODES.index('notBreaching')) | \
+        (mode == MISSING_MODES.index('breaching'))
+
+    breaches = rolling_sum(breach.astype(np.float64), n_window)
+    present = rolling_sum(counts_present.astype(np.float64), n_window)
+
+    states = np.where(breaches >= m_required, ALARM, OK)
+    all_missing = present == 0
+    states = np.where(all_missing, INSUFFICIENT, states)
+
+    ignore = (mode == MISSING_MODES.index('ignore'))[:, 0]
+    if ignore.any():
+        states[ignore] = forward_fill(states[ignore], all_missing[ignore])
+    return states, breach
+
+
+def intervals(flags: np.ndarray):
+    """Start/end column indices of runs of True per row."""
+    padded = np.zeros((flags.shape[0], flags.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = flags
+    edges = np.diff(padded, axis=1)
+    starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)
+    return starts, ends
+
+
+def replay(history: MetricHistory, alarms: list) -> list:
+    """
+    Replay history against all alarms, batching by period and statistic.
+
+    Returns:
+        list: Per alarm, a dict with states, breach flags and timing metadata
+    """
+    groups = {}
+    for i, alarm in enumerate(alarms):
+        groups.setdefault((alarm['period'], alarm['statistic']), []).append(i)
+
+    results = [None] * len(alarms)
+    for (period, statistic), group in groups.items():
+        factor = period // history.resolution
+        group.sort(key=lambda i: history.index[alarms[i]['series']])
+        for start in range(0, len(group), BATCH):
+            members = group[start:start + BATCH]
+            rows = sorted({history.index[alarms[i]['series']] for i in members})
+            position = {row: j for j, row in enumerate(rows)}
+            aggregated = aggregate(history.values[rows].astype(np.float64), factor, statistic)
+            batch = [alarms[i] for i in members]
+            datapoints = aggregated[[position[history.index[a['series']]] for a in batch]]
+            states, breach = evaluate(datapoints, batch)
+            for k, i in enumerate(members):
+                results[i] = {'states': states[k].astype(np.int8), 'breach': breach[k], 'period': period}
+    return results
+
+
+def summarize(history: MetricHistory, alarms: list, results: list, incidents: list = None) -> list:
+    """
+    Firing intervals, flap counts and time-to-detect per alarm.
+
+    Detection delay is measured from the first breaching datapoint of the
+    run that led to ALARM; incident time-to-detect (when incidents are
+    given) from the incident start to the first ALARM inside it.
+    """
+    span_days = history.values.shape[1] * history.resolution / 86400
+    by_series = {}
+    for incident in incidents or []:
+        by_series.setdefault(incident['series'], []).append(incident)
+
+    summaries = []
+    for alarm, result in zip(alarms, results):
+        states, breach, period = result['states'], result['breach'], result['period']
+        in_alarm = (states == ALARM)[None, :]
+        (_, starts), (_, ends) = intervals(in_alarm)
+
+        # Index of the first breaching datapoint in the run ending at each period
+        not_breach = np.where(~breach, np.arange(len(breach)), -1)
+        run_start = np.maximum.accumulate(not_breach) + 1
+        delays = (starts - run_start[starts] + 1) * period
+
+        def stamp(index):
+            return (history.start + timedelta(seconds=int(index) * period)).isoformat()
+
+        firing = [{'start': stamp(s), 'end': stamp(e)} for s, e in zip(starts, ends)]
+        summary = {
+            'alarm': alarm['name'],
+            'series': alarm['series'],
+            'threshold': alarm['threshold'],
+            'firings': len(firing),
+            'alarm_minutes': round(float(in_alarm.sum()) * period / 60, 1),
+            'insufficient_pct': round(100 * float((states == INSUFFICIENT).mean()), 1) if len(states) else 0.0,
+            'flaps_per_day': round(len(firing) / span_days, 2) if span_days else 0.0,
+            'mean_detection_seconds': round(float(delays.mean()), 1) if len(delays) else None,
+            'max_detection_seconds': int(delays.max()) if len(delays) else None,
+            'intervals': firing,
+        }
+
+        if alarm['series'] in by_series:
+            detections = []
+            for incident in by_series[alarm['series']]:
+                begin = int((parse_time(incident['start']) - history.start).total_seconds() // period)
+                finish = int((parse_time(incident['end']) - history.start).total_seconds() // period)
+                fired = starts[(starts >= begin) & (starts <= finish)]
+                detections.append(None if not len(fired) else int((fired[0] - begin + 1) * period))
+            detected = [d for d in detections if d is not None]
+            summary['incidents'] = len(detections)
+            summary['incidents_missed'] = len(detections) - len(detected)
+            summary['mean_time_to_detect_seconds'] = round(sum(detected) / len(detected), 1) if detected else None
+        summaries.append(summary)
+    return summaries
+
+
+def sweep_alarms(alarms: list, factors: list) -> list:
+    """Copies of every alarm with the threshold scaled by each factor."""
+    variants = []
+    for factor in factors:
+        for alarm in alarms:
+            variants.append(dict(alarm, threshold=alarm['threshold'] * factor, sweep=factor))
+    return variants
+
+
+def format_table(report: dict, top: int) -> str:
+    lines = [
+        f"Alarms replayed: {report['alarms']} over {report['days']} days",
+        f"Total firings: {report['total_firings']} | Noisiest alarms first",
+        '',
+        f"{'Alarm':<48}{'Firings':>8}{'Flaps/d':>9}{'Alarm min':>11}{'Detect s':>10}",
+    ]
+    ranked = sorted(report['results'], key=lambda s: s['firings'], reverse=True)
+    for s in ranked[:top]:
+        detect = '-' if s['mean_detection_seconds'] is None else f"{s['mean_detection_seconds']:.0f}"
+        lines.append(f"{s['alarm'][:47]:<48}{s['firings']:>8}{s['flaps_per_day']:>9}"
+                     f"{s['alarm_minutes']:>11}{detect:>10}")
+    if 'sweep' in report:
+        lines += ['', f"{'Threshold x':<12}{'Firings':>10}{'Alarm min':>12}{'Missed':>8}"]
+        for row in report['sweep']:
+            lines.append(f"{row['factor']:<12}{row['firings']:>10}{row['alarm_minutes']:>12}"
+                         f"{row['incidents_missed']:>8}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main replay entry point."""
+    parser = argparse.ArgumentParser(description='Replay metric history against alarm definitions')
+    parser.add_argument('metrics', help='Metric history CSV (series,timestamps...)')
+    parser.add_argument('alarms', help='Alarm definitions YAML')
+    parser.add_argument('--incidents', help='YAML/JSON list of {series, start, end} incidents')
+    parser.add_argument('--sweep', help='Comma-separated threshold multipliers, e.g. 0.9,1.0,1.1')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    for path in (args.metrics, args.alarms):
+        if not Path(path).exists():
+            print(f"File not found: {path}", file=sys.stderr)
+            return 1
+
+    history = load_history(args.metrics)
+    try:
+        alarms = load_alarms(args.alarms, history)
+    except (ValueError, KeyError) as e:
+        print(f"Invalid alarm definition: {e}", file=sys.stderr)
+        return 1
+    if not alarms:
+        print("No alarms matched any metric series", file=sys.stderr)
+        return 1
+
+    incidents = []
+    if args.incidents:
+        with open(args.incidents, 'r') as f:
+            incidents = yaml.safe_load(f) or []
+
+    factors = [float(v) for v in args.sweep.split(',')] if args.sweep else [1.0]
+    batch = sweep_alarms(alarms, factors)
+    summaries = summarize(history, batch, replay(history, batch), incidents)
+
+    days = round(history.values.shape[1] * history.resolution / 86400, 2)
+    baseline = 1.0 if 1.0 in factors else factors[0]
+    base = [s for s, a in zip(summaries, batch) if a['sweep'] == baseline]
+    report = {
+        'alarms': len(alarms),
+        'days': days,
+        'total_firings': sum(s['firings'] for s in base),
+        'results': base,
+    }
+    if args.sweep:
+        report['sweep'] = []
+        for factor in factors:
+            selected = [s for s, a in zip(summaries, batch) if a['sweep'] == factor]
+            report['sweep'].append({
+                'factor': factor,
+                'firings': sum(s['firings'] for s in selected),
+                'alarm_minutes': round(sum(s['alarm_minutes'] for s in selected), 1),
+                'incidents_missed': sum(s.get('incidents_missed', 0) for s in selected),
+            })
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Time-aligned correlation engine for aws-cloudwatch skill.
+Category: cloud
+
+Implements the "Correlate Data" stage of /aws-debug over local snapshot
+files. Every source becomes a time-sorted stream and the streams are
+k-way merged by timestamp, so memory stays bounded by the look-back
+window and the number of series rather than the size of the inputs: the
+error-signature table is an LRU of MAX_SIGNATURES entries (an evicted
+signature seen again counts as new) and --timeline keeps the last
+MAX_TIMELINE entries. Metric series (and per-minute
+log error counts) are watched for change points; each change point is
+reported with the discrete events that preceded it (deployments and API
+changes, ECS service events, RDS events, first occurrences of new log
+error signatures), ranked by kind, proximity and repetition.
+
+Snapshot files (format detected from content):
+
+    aws ecs describe-services ...            > ecs.json
+    aws rds describe-events ...              > rds.json
+    aws cloudtrail lookup-events ...         > trail.json
+    aws cloudwatch get-metric-data ...       > metrics.json
+    metrics.csv        timestamp,metric,value (time-sorted)
+    *.log[.gz], *.jsonl, filter-log-events output: log events
+
+Usage:
+    python correlate.py SNAPSHOT [SNAPSHOT ...] [--window 30] [--sensitivity 4]
+                        [--top 5] [--timeline] [--format table|json]
+"""
+
+import argparse
+import csv
+import gzip
+import heapq
+import json
+import math
+import re
+import sys
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+from log_index import LogStoreError, parse_time, read_events
+
+
+REORDER_BUFFER = 1000
+MAX_SIGNATURES = 10000
+MAX_TIMELINE = 5000
+BASELINE_POINTS = 30
+MIN_BASELINE = 10
+CONFIRM_POINTS = 3
+PROXIMITY_MINUTES = 10.0
+# A change is confirmed CONFIRM_POINTS periods after it starts (periods up to 1h)
+DETECTION_LAG = CONFIRM_POINTS * 3600000
+
+ERROR_RE = re.compile(r'\b(ERROR|FATAL|CRITICAL|Exception|Traceback|Task timed out|timed out)\b', re.IGNORECASE)
+SIGNATURE_RE = re.compile(r'\b(?:[0-9a-f]{8}-[0-9a-f-]{27}|0x[0-9a-f]+|[0-9a-f]{12,}|\d+(?:\.\d+)?)\b', re.IGNORECASE)
+
+# (source, pattern, weight, label): first match wins; weight 0 hides the event
+EVENT_RULES = [
+    ('cloudtrail', re.compile(r'^(Describe|List|Get|Lookup|Head|Search|Batch(Get|Describe))'), 0.0, 'read'),
+    ('cloudtrail', re.compile(r'(Update|Modify|Put|Create|Delete|Register|Deregister|Attach|Detach|'
+                              r'Reboot|Stop|Start|Terminate|Publish|Deploy|Revoke|Authorize)'), 3.0, 'change'),
+    ('ecs', re.compile(r'unable to place|failed|unhealthy|stopped|insufficient|error', re.IGNORECASE), 2.5, 'failure'),
+    ('ecs', re.compile(r'has started \d+ tasks|registered \d+ targets|deployment', re.IGNORECASE), 2.0, 'deployment'),
+    ('ecs', re.compile(r'steady state', re.IGNORECASE), 0.2, 'steady'),
+    ('rds', re.compile(r'failover|failure|reboot|restart|recovery|shutdown', re.IGNORECASE), 3.0, 'failure'),
+    ('rds', re.compile(r'configuration change|parameter|modif|maintenance|upgrade|scaling|storage', re.IGNORECASE),
+     2.5, 'change'),
+    ('rds', re.compile(r'backup|snapshot', re.IGNORECASE), 0.5, 'backup'),
+    ('log', re.compile(r''), 2.0, 'new-error'),
+]
+DEFAULT_WEIGHT = 1.0
+
+
+def iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def classify(source: str, text: str):
+    """(weight, label) for a discrete event."""
+    for rule_source, pattern, weight, label in EVENT_RULES:
+        if rule_source == source and pattern.search(text):
+            return weight, label
+    return DEFAULT_WEIGHT, 'event'
+
+
+def error_signature(message: str) -> str:
+    """Normalise ids, numbers and addresses so repeats of one error collapse."""
+    first = message.strip().split('\n', 1)[0]
+    return SIGNATURE_RE.sub('#', first)[:200]
+
+
+def reorder(items, buffer: int = REORDER_BUFFER):
+    """
+    Re-sort a nearly sorted stream with a bounded heap.
+
+    Exported logs are sorted per stream but may interleave slightly;
+    anything more out of order than the buffer is emitted late rather
+    than buffering the whole file.
+    """
+    heap = []
+    seq = 0
+    for item in items:
+        heapq.heappush(heap, (item[0], seq, item))
+        seq += 1
+        if len(heap) > buffer:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def json_document(path: Path):
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        head = f.read(1)
+        if head not in '{[':
+            return None
+        f.seek(0)
+        try:
+            return json.load(f)
+        except ValueError:
+            return None
+
+
+def document_stream(doc) -> list:
+    """Records (ts, kind, name, value) from one API response snapshot (bounded size)."""
+    records = []
+    if isinstance(doc, dict) and 'services' in doc:
+        for service in doc['services']:
+            for event in service.get('events', []):
+                records.append((parse_time(event['createdAt']), 'event', 'ecs',
+                                f"{service.get('serviceName', '')}: {event['message']}"))
+    elif isinstance(doc, dict) and 'MetricDataResults' in doc:
+        for result in doc['MetricDataResults']:
+            name = result.get('Label') or result['Id']
+            for t, v in zip(result.get('Timestamps', []), result.get('Values', [])):
+                records.append((parse_time(t), 'metric', name, float(v)))
+    elif isinstance(doc, dict) and 'Events' in doc:
+        for event in doc['Events']:
+            if 'EventName' in event:
+                who = event.get('Username', '')
+                resources = ','.join(r.get('ResourceName', '') for r in event.get('Resources', []))
+                records.append((parse_time(event['EventTime']), 'event', 'cloudtrail',
+                                f"{event['EventName']} {resources} by {who}".strip()))
+            else:
+                records.append((parse_time(event['Date']), 'event', 'rds',
+                                f"{event.get('SourceIdentifier', '')}: {event['Message']}"))
+    else:
+        return None
+    records.sort(key=lambda r: r[0])
+    return records
+
+
+def csv_stream(path: Path):
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield parse_time(row['timestamp']), 'metric', row['metric'], float(row['value'])
+
+
+def log_stream(path: Path):
+    for ts, stream, message in read_events(str(path)):
+        if ERROR_RE.search(message):
+            yield ts, 'log', stream, message
+
+
+def open_source(path: str):
+    """Time-sorted iterator of (ts, kind, name, value) records for one snapshot."""
+    path = Path(path)
+    if path.name.endswith(('.csv', '.csv.gz')):
+        return reorder(csv_stream(path))
+    if not path.name.endswith(('.log', '.log.gz', '.jsonl', '.jsonl.gz', '.txt', '.txt.gz')):
+        doc = json_document(path)
+        records = document_stream(doc) if doc is not None else None
+        if records is not None:
+            return iter(records)
+    return reorder(log_stream(path))
+
+
+class ChangeDetector:
+    """
+    Streaming mean-shift detector for one series.
+
+    Keeps a rolling baseline of the last BASELINE_POINTS values; a change
+    point is the first of CONFIRM_POINTS consecutive values deviating from
+    the baseline mean by more than `sensitivity` standard deviations
+    in the same direction. After a change the baseline restarts from the
+    new level. min_spread keeps count series (errors per minute) from
+    firing on a handful of events over an all-zero baseline.
+    """
+
+    def __init__(self, name: str, sensitivity: float, min_spread: float = 0.0):
+        self.name = name
+        self.sensitivity = sensitivity
+        self.min_spread = min_spread
+        self.baseline = deque(maxlen=BASELINE_POINTS)
+        self.pending = []
+
+    def update(self, ts: int, value: float):
+        if math.isnan(value):
+            return None
+        if len(self.baseline) < MIN_BASELINE:
+            self.baseline.append(value)
+            return None
+        mean = sum(self.baseline) / len(self.baseline)
+        spread = math.sqrt(sum((v - mean) ** 2 for v in self.baseline) / (len(self.baseline) - 1))
+        # Floor the spread so flat series still need a meaningful jump
+        spread = max(spread, 0.05 * abs(mean), self.min_spread, 1e-9)
+        z = (value - mean) / spread
+        direction = 1 if z > 0 else -1
+        if abs(z) > self.sensitivity and (not self.pending or self.pending[0][2] == direction):
+            self.pending.append((ts, value, direction))
+            if len(self.pending) >= CONFIRM_POINTS:
+                start = self.pending[0][0]
+                after = sum(p[1] for p in self.pending) / len(self.pending)
+                change = {
+                    'series': self.name,
+                    'ts': start,
+                    'direction': 'up' if direction > 0 else 'down',
+                    'before': round(mean, 3),
+                    'after': round(after, 3),
+                    'score': round(abs(after - mean) / spread, 1),
+                }
+                self.baseline.clear()
+                self.baseline.extend(p[1] for p in self.pending)
+                self.pending = []
+                return change
+            return None
+        for p in self.pending:
+            self.baseline.append(p[1])
+        self.pending = []
+        self.baseline.append(value)
+        return None
+
+
+class Correlator:
+    """
+    Consume the merged stream and emit change points with ranked causes.
+
+    Args:
+        window_minutes: how far before a change point events are considered
+        sensitivity: change-point threshold in standard deviations
+        top: candidate events reported per change point
+    """
+
+    def __init__(self, window_minutes: float = 30.0, sensitivity: float = 4.0, top: int = 5,
+                 keep_timeline: bool = False):
+        self.window = int(window_minutes * 60000)
+        self.sensitivity = sensitivity
+        self.top = top
+        self.detectors = {}
+        self.recent = deque()
+        self.signatures = OrderedDict()
+        self.error_buckets = {}
+        self.clock = 0
+        self.anomalies = []
+        self.timeline = deque(maxlen=MAX_TIMELINE) if keep_timeline else None
+        self.counts = {'metric': 0, 'event': 0, 'log': 0, 'signatures': 0, 'timeline': 0}
+
+    def _remember(self, ts: int, source: str, text: str, weight: float, label: str) -> None:
+        self.recent.append({'ts': ts, 'source': source, 'label': label, 'text': text[:200], 'weight': weight})
+        if self.timeline is not None and weight >= 1.0:
+            self._timeline(iso(ts), source, label, text[:200])
+
+    def _timeline(self, time: str, source: str, label: str, text: str) -> None:
+        self.counts['timeline'] += 1
+        self.timeline.append({'time': time, 'source': source, 'label': label, 'text': text})
+
+    def _observe(self, name: str, ts: int, value: float, min_spread: float = 0.0) -> None:
+        detector = self.detectors.get(name)
+        if detector is None:
+            detector = self.detectors[name] = ChangeDetector(name, self.sensitivity, min_spread)
+        change = detector.update(ts, value)
+        if change:
+            change['causes'] = self.rank(change['ts'])
+            change['time'] = iso(change['ts'])
+            self.anomalies.append(change)
+            if self.timeline is not None:
+                self._timeline(change['time'], 'metric', 'change-point',
+                               f"{name} {change['direction']} {change['before']} -> {change['after']}")
+
+    def _flush_error_buckets(self, before: int) -> None:
+        """Emit per-minute error counts for minutes that are complete."""
+        for stream, (minute, count) in list(self.error_buckets.items()):
+            if minute + 60000 > before:
+                continue
+            name = f"log-errors:{stream}"
+            self._observe(name, minute, float(count), min_spread=1.0)
+            # Quiet minutes count as zero errors, up to one baseline's worth
+            end = min(before, minute + 60000 * (BASELINE_POINTS + 1))
+            for quiet in range(minute + 60000, end, 60000):
+                self._observe(name, quiet, 0.0, min_spread=1.0)
+            self.error_buckets[stream] = [before, 0]
+
+    def feed(self, record: tuple) -> None:
+        ts, kind, name, value = record
+        # Drop events that can no longer precede a future change point
+        horizon = ts - self.window - DETECTION_LAG
+        while self.recent and self.recent[0]['ts'] < horizon:
+            self.recent.popleft()
+        minute = ts // 60000 * 60000
+        if minute > self.clock:
+            self._flush_error_buckets(minute)
+            self.clock = minute
+
+        if kind == 'metric':
+            self.counts['metric'] += 1
+            self._observe(name, ts, value)
+        elif kind == 'event':
+            self.counts['event'] += 1
+            weight, label = classify(name, value)
+            if weight > 0:
+                self._remember(ts, name, value, weight, label)
+        else:
+            self.counts['log'] += 1
+            minute = ts // 60000 * 60000
+            bucket = self.error_buckets.setdefault(name, [minute, 0])
+            bucket[1] += 1
+            signature = error_signature(value)
+            seen = self.signatures.get(signature)
+            if seen is None:
+                self.signatures[signature] = 1
+                self.counts['signatures'] += 1
+                if len(self.signatures) > MAX_SIGNATURES:
+                    self.signatures.popitem(last=False)
+                weight, label = classify('log', value)
+                self._remember(ts, f"log:{name}", value.split('\n', 1)[0], weight, label)
+            else:
+                self.signatures[signature] = seen + 1
+                self.signatures.move_to_end(signature)
+
+    def rank(self, change_ts: int) -> list:
+        """
+        Candidate causes in [change - window, change], scored by
+        kind weight x proximity decay x (1 + log of repeats of the same text).
+        """
+        scored = {}
+        for event in self.recent:
+            if not change_ts - self.window <= event['ts'] <= change_ts:
+                continue
+            minutes = (change_ts - event['ts']) / 60000
+            proximity = math.exp(-minutes / PROXIMITY_MINUTES)
+            key = (event['source'], error_signature(event['text']))
+            entry = scored.get(key)
+            if entry is None:
+                entry = scored[key] = dict(event, repeats=0, best=0.0)
+            entry['repeats'] += 1
+            if event['weight'] * proximity > entry['best']:
+                entry['best'] = event['weight'] * proximity
+                entry['ts'] = event['ts']
+        ranked = []
+        for entry in scored.values():
+            score = entry['best'] * (1 + math.log(entry['repeats']))
+            ranked.append({
+                'time': iso(entry['ts']),
+                'lead_minutes': round((change_ts - entry['ts']) / 60000, 1),
+                'source': entry['source'],
+                'label': entry['label'],
+                'text': entry['text'],
+                'repeats': entry['repeats'],
+                'score': round(score, 3),
+            })
+        ranked.sort(key=lambda r: -r['score'])
+        return ranked[:self.top]
+
+    def finish(self) -> None:
+        for stream, (minute, count) in self.error_buckets.items():
+            if count:
+                self._observe(f"log-errors:{stream}", minute, float(count), min_spread=1.0)
+
+
+def correlate(paths: list, window_minutes: float = 30.0, sensitivity: float = 4.0,
+              top: int = 5, timeline: bool = False) -> dict:
+    """Merge all snapshots by time and return change points with ranked causes."""
+    correlator = Correlator(window_minutes, sensitivity, top, timeline)
+    for record in heapq.merge(*(open_source(p) for p in paths), key=lambda r: r[0]):
+        correlator.feed(record)
+    correlator.finish()
+    anomalies = sorted(correlator.anomalies, key=lambda a: a['ts'])
+    for a in anomalies:
+        del a['ts']
+    report = {
+        'summary': {
+            'sources': len(paths),
+            'metric_points': correlator.counts['metric'],
+            'events': correlator.counts['event'],
+            'log_errors': correlator.counts['log'],
+            'error_signatures': correlator.counts['signatures'],
+            'change_points': len(anomalies),
+        },
+        'anomalies': anomalies,
+    }
+    if timeline:
+        # Change points are appended when confirmed; order them by start time
+        report['timeline'] = sorted(correlator.timeline, key=lambda t: t['time'])
+        report['summary']['timeline_dropped'] = correlator.counts['timeline'] - len(correlator.timeline)
+    return report
+
+
+def format_table(report: dict) -> str:
+    s = report['summary']
+    lines = [
+        f"Sources: {s['sources']} | metric points: {s['metric_points']:,} | events: {s['events']:,} | "
+        f"log errors: {s['log_errors']:,} ({s['error_signatures']} signatures)",
+        f"Change points: {s['change_points']}",
+    ]
+    for a in report['anomalies']:
+        lines.append("")
+        lines.append(f"{a['time']}  {a['series']} {a['direction']} "
+                     f"{a['before']} -> {a['after']} (score {a['score']})")
+        if not a['causes']:
+            lines.append("    no preceding events in window")
+        for c in a['causes']:
+            repeats = f" x{c['repeats']}" if c['repeats'] > 1 else ''
+            lines.append(f"    {c['score']:>6.2f}  -{c['lead_minutes']:>5}m  {c['source']:<14} "
+                         f"{c['label']:<10} {c['text'][:90]}{repeats}")
+    if report.get('timeline'):
+        lines.append("")
+        dropped = report['summary'].get('timeline_dropped')
+        lines.append(f"Timeline (earliest {dropped:,} entries dropped)" if dropped else "Timeline")
+        for t in report['timeline']:
+            lines.append(f"  {t['time']}  {t['source']:<14} {t['label']:<12} {t['text'][:100]}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main correlation engine entry point."""
+    parser = argparse.ArgumentParser(description='Correlate metrics, events and logs from local snapshots')
+    parser.add_argument('snapshots', nargs='+', help='Snapshot files')
+    parser.add_argument('--window', type=float, default=30.0, help='Minutes before a change point to search')
+    parser.add_argument('--sensitivity', type=float, default=4.0, help='Change-point threshold (std devs)')
+    parser.add_argument('--top', type=int, default=5, help='Candidate causes per change point')
+    parser.add_argument('--timeline', action='store_true', help='Include the merged event timeline')
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
+    args = parser.parse_args()
+
+    try:
+        report = correlate(args.snapshots, args.window, args.sensitivity, args.top, args.timeline)
+    except (OSError, ValueError, KeyError, LogStoreError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+    # /aws-debug exit codes: 1 = issue found, 2 = no issue found
+    return 1 if report['anomalies'] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
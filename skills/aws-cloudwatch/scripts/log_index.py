@@ -0,0 +1,905 @@
+#!/usr/bin/env python3
+"""
+Indexed local log query engine for aws-cloudwatch skill.
+Category: cloud
+
+Ingests exported log streams (JSON lines, `aws logs filter-log-events`
+output or plain text with leading ISO timestamps; optionally gzipped) into
+segment files that hold the events sorted by time, a time index and a
+token inverted index. Queries use a Logs Insights-like subset and run in
+parallel across segments, touching only segments and rows whose time
+range and tokens can match, so iterating on a root cause across GBs of
+Lambda and ECS logs does not rescan everything per query. Tokens longer
+than MAX_TOKEN_LENGTH (hex ids, base64, URLs) are not indexed; rows that
+contain one are kept as candidates for every indexed lookup instead, so
+pruning never drops a match.
+
+Supported query commands (separated by `|`):
+
+    fields @timestamp, @message, level
+    filter @message like /ERROR|Timeout/ and @duration > 1000
+    filter level = "error" and @logStream not like "canary"
+    stats count(*), avg(@duration), pct(@duration, 99) by bin(5m), level
+    sort @timestamp desc
+    limit 20
+
+Fields: @timestamp, @message, @logStream, Lambda REPORT fields (@duration,
+@billedDuration, @maxMemoryUsed, @memorySize, @initDuration, @requestId)
+and keys of JSON messages (dotted paths allowed).
+
+Usage:
+    python log_index.py ingest STORE FILE [FILE ...] [--workers N]
+    python log_index.py query STORE 'QUERY' [--start ISO] [--end ISO]
+                              [--format table|json|csv] [--workers N]
+    python log_index.py info STORE
+"""
+
+import argparse
+import csv
+import gzip
+import heapq
+import io
+import json
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+
+STORE_VERSION = 2
+SEGMENT_ROWS = 100000
+DEFAULT_LIMIT = 1000
+MAX_TOKEN_LENGTH = 64
+MIN_PIECE_LENGTH = 3
+
+TOKEN_RE = re.compile(r'[a-z0-9_]+')
+ISO_PREFIX_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)\s?')
+TIME_KEYS = ('timestamp', '@timestamp', 'time', 'ts')
+MESSAGE_KEYS = ('message', '@message')
+STREAM_KEYS = ('logStreamName', '@logStream')
+
+# Fields Logs Insights discovers in Lambda REPORT lines
+REPORT_FIELDS = {
+    '@duration': re.compile(r'(?<!Billed )Duration: ([\d.]+) ms'),
+    '@billedDuration': re.compile(r'Billed Duration: ([\d.]+) ms'),
+    '@memorySize': re.compile(r'Memory Size: (\d+) MB'),
+    '@maxMemoryUsed': re.compile(r'Max Memory Used: (\d+) MB'),
+    '@initDuration': re.compile(r'Init Duration: ([\d.]+) ms'),
+    '@requestId': re.compile(r'RequestId: ([0-9a-f-]{36})'),
+}
+# Whole tokens every message carrying a REPORT field contains
+REPORT_TOKENS = {
+    '@duration': ('duration',),
+    '@billedDuration': ('billed', 'duration'),
+    '@memorySize': ('memory', 'size'),
+    '@maxMemoryUsed': ('max', 'memory', 'used'),
+    '@initDuration': ('init', 'duration'),
+    '@requestId': ('requestid',),
+}
+BIN_UNITS = {'ms': 1, 's': 1000, 'm': 60000, 'h': 3600000, 'd': 86400000}
+COMPARATORS = {
+    '=': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+AGGREGATES = ('count', 'sum', 'avg', 'min', 'max', 'pct', 'count_distinct')
+
+
+class LogStoreError(Exception):
+    """Raised for unreadable stores, inputs and queries."""
+
+
+def parse_time(value) -> int:
+    """Epoch milliseconds from epoch seconds/milliseconds or an ISO 8601 string."""
+    if isinstance(value, (int, float)):
+        return int(value if value > 1e11 else value * 1000)
+    text = str(value).strip().replace(',', '.').replace(' ', 'T', 1)
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        raise LogStoreError(f"Unrecognised timestamp: {value}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def format_time(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def tokens(text: str) -> tuple:
+    """(indexable tokens, whether text also has tokens too long to index)"""
+    found = set(TOKEN_RE.findall(text.lower()))
+    short = {t for t in found if len(t) <= MAX_TOKEN_LENGTH}
+    return short, len(short) < len(found)
+
+
+def stream_name(path: Path) -> str:
+    name = path.name
+    for suffix in ('.gz', '.jsonl', '.json', '.log', '.txt'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+def json_event(obj: dict, line: str, default_stream: str):
+    """(ts, stream, message) for one JSON event, or None without a timestamp."""
+    ts = next((obj[k] for k in TIME_KEYS if k in obj), None)
+    if ts is None:
+        return None
+    message = next((obj[k] for k in MESSAGE_KEYS if k in obj), None)
+    if message is None:
+        message = line
+    elif not isinstance(message, str):
+        message = json.dumps(message)
+    stream = next((obj[k] for k in STREAM_KEYS if k in obj), default_stream)
+    return parse_time(ts), stream, message.rstrip('\n')
+
+
+def read_events(path: str):
+    """Yield (epoch ms, stream, message) from one exported log file."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == '.gz' else open
+    default_stream = stream_name(path)
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        first = f.readline()
+        f.seek(0)
+        if first.lstrip().startswith('{'):
+            try:
+                json.loads(first)
+            except ValueError:
+                # One JSON document, e.g. filter-log-events output
+                document = json.load(f)
+                for event in document.get('events', []):
+                    parsed = json_event(event, json.dumps(event), default_stream)
+                    if parsed:
+                        yield parsed
+                return
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    parsed = json_event(json.loads(line), line, default_stream)
+                except ValueError:
+                    parsed = None
+                if parsed:
+                    yield parsed
+            return
+
+        current = None
+        for line in f:
+            line = line.rstrip('\n')
+            m = ISO_PREFIX_RE.match(line)
+            if m:
+                if current:
+                    yield current
+                current = (parse_time(m.group(1)), default_stream, line[m.end():])
+            elif current and line:
+                # Continuation line (stack trace): part of the previous event
+                current = (current[0], current[1], current[2] + '\n' + line)
+        if current:
+            yield current
+
+
+def write_segment(directory: str, ts: list, streams: list, messages: list) -> dict:
+    """
+    Write one segment and return its manifest entry.
+
+    Layout of STORE/seg-XXXXX/:
+        ts.npy                   int64 epoch ms, ascending
+        stream.npy               int32 index into the segment's stream list
+        offsets.npy, data.bin    UTF-8 messages and their byte offsets
+        terms.txt                sorted index terms, one per line
+        term_offsets.npy,        posting list of term i is
+        postings.npy             postings[term_offsets[i]:term_offsets[i + 1]]
+        long_rows.npy            rows with a token over MAX_TOKEN_LENGTH (not in terms)
+    """
+    seg_dir = Path(directory)
+    seg_dir.mkdir(parents=True, exist_ok=True)
+    order = np.argsort(np.asarray(ts, dtype=np.int64), kind='stable')
+    ts_sorted = np.asarray(ts, dtype=np.int64)[order]
+
+    stream_names = sorted(set(streams))
+    stream_codes = {s: i for i, s in enumerate(stream_names)}
+    codes = np.fromiter((stream_codes[streams[i]] for i in order), dtype=np.int32, count=len(order))
+
+    postings, long_rows = {}, []
+    offsets = np.zeros(len(order) + 1, dtype=np.int64)
+    with open(seg_dir / 'data.bin', 'wb') as data:
+        for row, i in enumerate(order):
+            message = messages[i]
+            encoded = message.encode('utf-8')
+            data.write(encoded)
+            offsets[row + 1] = offsets[row] + len(encoded)
+            terms, has_long = tokens(message)
+            for term in terms:
+                postings.setdefault(term, []).append(row)
+            if has_long:
+                long_rows.append(row)
+
+    terms = sorted(postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    term_offsets[1:] = np.cumsum([len(postings[t]) for t in terms])
+    flat = np.fromiter((row for t in terms for row in postings[t]), dtype=np.uint32,
+                       count=int(term_offsets[-1]))
+
+    np.save(seg_dir / 'ts.npy', ts_sorted)
+    np.save(seg_dir / 'stream.npy', codes)
+    np.save(seg_dir / 'offsets.npy', offsets)
+    np.save(seg_dir / 'term_offsets.npy', term_offsets)
+    np.save(seg_dir / 'postings.npy', flat)
+    np.save(seg_dir / 'long_rows.npy', np.asarray(long_rows, dtype=np.uint32))
+    with open(seg_dir / 'terms.txt', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(terms))
+    return {
+        'name': seg_dir.name,
+        'rows': len(order),
+        'min_ts': int(ts_sorted[0]),
+        'max_ts': int(ts_sorted[-1]),
+        'streams': stream_names,
+        'terms': len(terms),
+    }
+
+
+class Segment:
+    """Memory-mapped reader for one segment."""
+
+    def __init__(self, store_path: str, meta: dict):
+        self.meta = meta
+        self._terms = None
+        self.path = Path(store_path) / meta['name']
+        self.ts = np.load(self.path / 'ts.npy', mmap_mode='r')
+        self.stream = np.load(self.path / 'stream.npy', mmap_mode='r')
+        self.offsets = np.load(self.path / 'offsets.npy').tolist()
+        with open(self.path / 'data.bin', 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b''
+        # Several conditions and aggregates usually read the same row in turn
+        self._row = None
+        self._message = None
+        self._parsed = None
+
+    def _load_terms(self) -> None:
+        """Load the term list as one newline-delimited blob plus term start offsets."""
+        with open(self.path / 'terms.txt', 'r', encoding='utf-8') as f:
+            self._terms = '\n' + f.read() + '\n'
+        newlines = [i for i, ch in enumerate(self._terms) if ch == '\n'] if not self._terms.isascii() else \
+            np.flatnonzero(np.frombuffer(self._terms.encode('ascii'), dtype=np.uint8) == 10)
+        self.term_starts = np.asarray(newlines[:-1], dtype=np.int64)
+        self.term_offsets = np.load(self.path / 'term_offsets.npy', mmap_mode='r')
+        self.postings = np.load(self.path / 'postings.npy', mmap_mode='r')
+        self.long_rows = np.load(self.path / 'long_rows.npy')
+
+    def message(self, row: int) -> str:
+        if row != self._row:
+            self._row = row
+            self._message = self.data[self.offsets[row]:self.offsets[row + 1]].decode('utf-8', errors='replace')
+            self._parsed = False
+        return self._message
+
+    def rows_for_term(self, index: int) -> np.ndarray:
+        return self.postings[self.term_offsets[index]:self.term_offsets[index + 1]]
+
+    def rows_for_piece(self, piece: str, exact: bool) -> np.ndarray:
+        """
+        Rows containing a token equal to (exact) or containing piece.
+
+        Terms are searched with str.find over one blob, so substring
+        lookups do not loop over the vocabulary in Python. Rows with
+        unindexed long tokens are always included.
+        """
+        if self._terms is None:
+            self._load_terms()
+        blob = self._terms
+        needle = f"\n{piece}\n" if exact else piece
+        positions = []
+        pos = blob.find(needle)
+        while pos != -1:
+            positions.append(pos + 1 if exact else pos)
+            pos = blob.find(needle, pos + 1)
+        if not positions:
+            return self.long_rows
+        indices = np.unique(np.searchsorted(self.term_starts, positions, side='right') - 1)
+        if len(indices) == 1 and not len(self.long_rows):
+            return np.asarray(self.rows_for_term(int(indices[0])))
+        return np.unique(np.concatenate([self.long_rows] + [self.rows_for_term(int(i)) for i in indices]))
+
+    def field(self, row: int, name: str):
+        if name == '@timestamp':
+            return int(self.ts[row])
+        if name == '@logStream':
+            return self.meta['streams'][self.stream[row]]
+        message = self.message(row)
+        if name == '@message':
+            return message
+        if name in REPORT_FIELDS:
+            m = REPORT_FIELDS[name].search(message)
+            if not m:
+                return None
+            return m.group(1) if name == '@requestId' else float(m.group(1))
+        if self._parsed is False:
+            self._parsed = None
+            if message.startswith('{'):
+                try:
+                    self._parsed = json.loads(message)
+                except ValueError:
+                    pass
+        value = self._parsed
+        for part in name.split('.'):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+
+def split_top_level(text: str, separator: str) -> list:
+    """Split on separator outside quotes and /regex/ literals."""
+    parts, current, quote, depth, i = [], [], None, 0, 0
+    sep_re = re.compile(separator, re.IGNORECASE)
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            current.append(ch)
+            if ch == '\\' and i + 1 < len(text):
+                current.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        prefix = ''.join(current).rstrip()
+        if ch in '"\'' or (ch == '/' and (prefix.endswith('like') or prefix.endswith('=~'))):
+            quote = ch
+            current.append(ch)
+            i += 1
+            continue
+        depth += (ch == '(') - (ch == ')')
+        m = sep_re.match(text, i) if depth == 0 else None
+        if m:
+            parts.append(''.join(current).strip())
+            current = []
+            i = m.end()
+            continue
+        current.append(ch)
+        i += 1
+    parts.append(''.join(current).strip())
+    return [p for p in parts if p]
+
+
+def parse_literal(text: str):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'':
+        return text[1:-1]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def regex_pieces(pattern: str) -> list:
+    """
+    Literal alphanumeric runs every match of pattern must contain.
+
+    Conservative: patterns with alternation or groups yield nothing, runs
+    followed by an optional quantifier are dropped, and escapes and
+    character classes break runs.
+    """
+    if '|' in pattern or '(' in pattern:
+        return []
+    pieces, run, i, in_class = [], [], 0, False
+    while i < len(pattern):
+        ch = pattern[i]
+        if in_class:
+            in_class = ch != ']'
+        elif ch == '\\':
+            pieces.append(''.join(run))
+            run = []
+            i += 2
+            continue
+        elif ch == '[':
+            in_class = True
+            pieces.append(''.join(run))
+            run = []
+        elif ch.isalnum() or ch == '_':
+            run.append(ch)
+        else:
+            if ch in '?*{' and run:
+                run.pop()
+            pieces.append(''.join(run))
+            run = []
+        i += 1
+    pieces.append(''.join(run))
+    return [p.lower() for p in pieces if len(p) >= MIN_PIECE_LENGTH]
+
+
+def string_pieces(literal: str) -> list:
+    """(piece, exact) pairs for a substring literal: interior tokens are whole terms."""
+    out = []
+    for m in TOKEN_RE.finditer(literal.lower()):
+        interior = m.start() > 0 and m.end() < len(literal)
+        if interior or len(m.group()) >= MIN_PIECE_LENGTH:
+            out.append((m.group(), interior))
+    return out
+
+
+def parse_condition(text: str) -> dict:
+    m = re.match(r'^([@\w.]+)\s+(not\s+)?(like|=~)\s+(.+)$', text, re.IGNORECASE | re.DOTALL)
+    if m:
+        field, negate, _, pattern = m.groups()
+        pattern = pattern.strip()
+        rm = re.match(r'^/(.*)/([a-z]*)$', pattern, re.DOTALL)
+        if rm:
+            flags = re.IGNORECASE if 'i' in rm.group(2) else 0
+            try:
+                regex = re.compile(rm.group(1), flags)
+            except re.error as e:
+                raise LogStoreError(f"Bad regex {pattern}: {e}")
+            pieces = [(p, False) for p in regex_pieces(rm.group(1))]
+        else:
+            literal = str(parse_literal(pattern))
+            regex = re.compile(re.escape(literal))
+            pieces = string_pieces(literal)
+        return {'field': field, 'op': 'like', 'negate': bool(negate), 'regex': regex, 'pieces': pieces}
+    m = re.match(r'^([@\w.]+)\s*(!=|<=|>=|=|<|>)\s*(.+)$', text)
+    if m:
+        return {'field': m.group(1), 'op': m.group(2), 'value': parse_literal(m.group(3)), 'negate': False}
+    raise LogStoreError(f"Unsupported filter: {text}")
+
+
+def parse_bin(text: str):
+    m = re.match(r'^bin\(\s*(\d+)\s*(ms|s|m|h|d)\s*\)$', text.strip())
+    return int(m.group(1)) * BIN_UNITS[m.group(2)] if m else None
+
+
+def parse_stats(text: str) -> dict:
+    by = []
+    m = re.search(r'\s+by\s+(.+)$', text, re.IGNORECASE)
+    if m:
+        by = [b.strip() for b in split_top_level(m.group(1), r',')]
+        text = text[:m.start()]
+    aggs = []
+    for part in split_top_level(text, r','):
+        am = re.match(r'^(\w+)\(\s*([^,)]*?)\s*(?:,\s*([\d.]+)\s*)?\)(?:\s+as\s+(\w+))?$', part, re.IGNORECASE)
+        if not am or am.group(1).lower() not in AGGREGATES:
+            raise LogStoreError(f"Unsupported stats function: {part}")
+        func, field, arg, alias = am.groups()
+        func = func.lower()
+        if func == 'pct' and arg is None:
+            raise LogStoreError(f"pct needs a percentile: {part}")
+        name = alias or (f"{func}({field}, {arg})" if func == 'pct' else f"{func}({field})")
+        aggs.append({'func': func, 'field': field, 'arg': float(arg) if arg else None, 'name': name})
+    groups = [{'name': b, 'bin': parse_bin(b)} for b in by]
+    return {'aggs': aggs, 'by': groups}
+
+
+def parse_query(text: str) -> dict:
+    """Parse the supported Logs Insights subset into a query dict."""
+    query = {'fields': None, 'filters': [], 'stats': None, 'sort': None, 'limit': None}
+    for command in split_top_level(text, r'\|'):
+        m = re.match(r'^(\w+)\s*(.*)$', command, re.DOTALL)
+        verb, rest = m.group(1).lower(), m.group(2).strip()
+        if verb in ('fields', 'display'):
+            query['fields'] = [f.strip() for f in rest.split(',') if f.strip()]
+        elif verb == 'filter':
+            query['filters'].extend(parse_condition(c) for c in split_top_level(rest, r'\s+and\s+'))
+        elif verb == 'stats':
+            query['stats'] = parse_stats(rest)
+        elif verb == 'sort':
+            sm = re.match(r'^([@\w.()*, ]+?)\s*(asc|desc)?$', rest, re.IGNORECASE)
+            if not sm:
+                raise LogStoreError(f"Unsupported sort: {rest}")
+            query['sort'] = (sm.group(1).strip(), (sm.group(2) or 'asc').lower() == 'desc')
+        elif verb == 'limit':
+            query['limit'] = int(rest)
+        else:
+            raise LogStoreError(f"Unsupported command: {verb}")
+    if query['stats'] is None and query['sort'] is None:
+        query['sort'] = ('@timestamp', True)
+    if query['stats'] is None and query['limit'] is None:
+        query['limit'] = DEFAULT_LIMIT
+    return query
+
+
+def matches_value(value, condition: dict) -> bool:
+    if condition['op'] == 'like':
+        hit = value is not None and condition['regex'].search(str(value)) is not None
+    elif value is None:
+        hit = False
+    else:
+        expected = condition['value']
+        if isinstance(expected, float):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False
+        elif not isinstance(value, str):
+            value = str(value)
+        hit = COMPARATORS[condition['op']](value, expected)
+    return hit != condition['negate']
+
+
+def matches(segment: Segment, row: int, condition: dict) -> bool:
+    return matches_value(segment.field(row, condition['field']), condition)
+
+
+def index_pieces(condition: dict) -> list:
+    """(piece, exact) pairs every matching message must contain as tokens."""
+    field = condition['field']
+    if condition['negate'] or field in ('@logStream', '@timestamp'):
+        return []
+    # A non-negated condition only matches rows that have the field
+    if field in REPORT_TOKENS:
+        pieces = [(t, True) for t in REPORT_TOKENS[field]]
+    elif field.startswith('@'):
+        pieces = []
+    else:
+        pieces = [(t, True) for t in TOKEN_RE.findall(field.rsplit('.', 1)[-1].lower())]
+    if condition['op'] == 'like':
+        return pieces + (condition['pieces'] if field == '@message' else [])
+    value = condition['value']
+    if condition['op'] == '=' and isinstance(value, str) and value.isascii():
+        # A string equal to the whole field value: each of its tokens is a
+        # whole term (JSON values are quoted, @message is the entire event)
+        pieces += [(t, True) for t in TOKEN_RE.findall(value.lower())]
+    return pieces
+
+
+def candidate_rows(segment: Segment, query: dict, lo: int, hi: int) -> np.ndarray:
+    """Rows in [lo, hi) that can match, narrowed by the token index and stream list."""
+    rows = None
+    for condition in query['filters']:
+        for piece, exact in index_pieces(condition):
+            hits = segment.rows_for_piece(piece, exact)
+            rows = hits if rows is None else np.intersect1d(rows, hits, assume_unique=True)
+            if not len(rows):
+                return rows.astype(np.int64)
+    if rows is None:
+        rows = np.arange(lo, hi, dtype=np.int64)
+    else:
+        rows = rows.astype(np.int64)
+        rows = rows[(rows >= lo) & (rows < hi)]
+
+    stream_filters = [c for c in query['filters'] if c['field'] == '@logStream']
+    if stream_filters:
+        allowed = [i for i, name in enumerate(segment.meta['streams'])
+                   if all(matches_value(name, c) for c in stream_filters)]
+        rows = rows[np.isin(segment.stream[rows], allowed)]
+    return rows
+
+
+def sort_value(value):
+    """Total order across mixed types: None < numbers < strings."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def run_segment(store_path: str, meta: dict, query: dict, start: int, end: int):
+    """
+    Evaluate a query on one segment.
+
+    Returns ('stats', {group: states}) with mergeable aggregate states, or
+    ('rows', [...]) already sorted and cut to the limit.
+    """
+    segment = Segment(store_path, meta)
+    lo = int(np.searchsorted(segment.ts, start, side='left')) if start is not None else 0
+    hi = int(np.searchsorted(segment.ts, end, side='left')) if end is not None else meta['rows']
+    rows = candidate_rows(segment, query, lo, hi)
+    filters = query['filters']
+    matched = [int(r) for r in rows if all(matches(segment, int(r), c) for c in filters)]
+
+    stats = query['stats']
+    if stats:
+        groups = {}
+        for row in matched:
+            key = []
+            for g in stats['by']:
+                if g['bin']:
+                    key.append(int(segment.ts[row]) // g['bin'] * g['bin'])
+                else:
+                    key.append(segment.field(row, g['name']))
+            states = groups.get(tuple(key))
+            if states is None:
+                states = groups[tuple(key)] = [new_state(a) for a in stats['aggs']]
+            for agg, state in zip(stats['aggs'], states):
+                update_state(agg, state, row, segment)
+        return 'stats', groups
+
+    fields = query['fields'] or ['@timestamp', '@message']
+    sort_field, descending = query['sort']
+    records = []
+    for row in matched:
+        record = {f: segment.field(row, f) for f in fields}
+        record['__sort'] = sort_value(record[sort_field] if sort_field in record
+                                      else segment.field(row, sort_field))
+        records.append(record)
+    limit = query['limit']
+    picker = heapq.nlargest if descending else heapq.nsmallest
+    records = picker(limit, records, key=lambda r: r['__sort']) if limit else \
+        sorted(records, key=lambda r: r['__sort'], reverse=descending)
+    return 'rows', records
+
+
+def new_state(agg: dict):
+    func = agg['func']
+    if func in ('pct', 'count_distinct'):
+        return {'values': [] if func == 'pct' else set()}
+    return {'n': 0, 'sum': 0.0, 'min': None, 'max': None}
+
+
+def update_state(agg: dict, state: dict, row: int, segment: Segment) -> None:
+    func, field = agg['func'], agg['field']
+    if func == 'count' and field in ('*', ''):
+        state['n'] += 1
+        return
+    value = segment.field(row, field)
+    if value is None:
+        return
+    if func == 'count_distinct':
+        state['values'].add(value if not isinstance(value, (dict, list)) else json.dumps(value))
+        return
+    if func == 'count':
+        state['n'] += 1
+        return
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return
+    if func == 'pct':
+        state['values'].append(value)
+        return
+    state['n'] += 1
+    state['sum'] += value
+    state['min'] = value if state['min'] is None else min(state['min'], value)
+    state['max'] = value if state['max'] is None else max(state['max'], value)
+
+
+def merge_state(agg: dict, into: dict, other: dict) -> None:
+    if agg['func'] == 'pct':
+        into['values'].extend(other['values'])
+    elif agg['func'] == 'count_distinct':
+        into['values'] |= other['values']
+    else:
+        into['n'] += other['n']
+        into['sum'] += other['sum']
+        for k, pick in (('min', min), ('max', max)):
+            if other[k] is not None:
+                into[k] = other[k] if into[k] is None else pick(into[k], other[k])
+
+
+def final_value(agg: dict, state: dict):
+    func = agg['func']
+    if func == 'pct':
+        return float(np.percentile(state['values'], agg['arg'])) if state['values'] else None
+    if func == 'count_distinct':
+        return len(state['values'])
+    if func == 'count':
+        return state['n']
+    if func == 'sum':
+        return state['sum']
+    if func == 'avg':
+        return state['sum'] / state['n'] if state['n'] else None
+    return state[func]
+
+
+class LogStore:
+    """
+    Local segment store with a manifest.
+
+    Layout:
+        STORE/manifest.json      segment list with row counts and time ranges
+        STORE/seg-XXXXX/         one segment (see write_segment)
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.manifest_path = self.path / 'manifest.json'
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+            if self.manifest.get('version') != STORE_VERSION:
+                raise LogStoreError(f"Unsupported store version: {self.manifest.get('version')}")
+        else:
+            self.manifest = {'version': STORE_VERSION, 'rows': 0, 'segments': []}
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def ingest(self, paths: list, workers: int = None, segment_rows: int = SEGMENT_ROWS) -> int:
+        """Read log files and write segments of up to segment_rows events in parallel."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        next_id = len(self.manifest['segments'])
+        futures = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batch = ([], [], [])
+            for path in paths:
+                for ts, stream, message in read_events(path):
+                    batch[0].append(ts)
+                    batch[1].append(stream)
+                    batch[2].append(message)
+                    if len(batch[0]) >= segment_rows:
+                        futures.append(pool.submit(write_segment, str(self.path / f"seg-{next_id:05d}"), *batch))
+                        next_id += 1
+                        batch = ([], [], [])
+            if batch[0]:
+                futures.append(pool.submit(write_segment, str(self.path / f"seg-{next_id:05d}"), *batch))
+            added = 0
+            for future in futures:
+                meta = future.result()
+                self.manifest['segments'].append(meta)
+                added += meta['rows']
+        self.manifest['rows'] += added
+        self.save()
+        return added
+
+    def query(self, text: str, start=None, end=None, workers: int = None) -> list:
+        """Run a query over segments overlapping [start, end); returns result rows."""
+        query = parse_query(text)
+        start = parse_time(start) if start is not None else None
+        end = parse_time(end) if end is not None else None
+        segments = [s for s in self.manifest['segments']
+                    if (start is None or s['max_ts'] >= start) and (end is None or s['min_ts'] < end)]
+        args = [(str(self.path), s, query, start, end) for s in segments]
+        if len(segments) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers or min(len(segments), os.cpu_count() or 1)) as pool:
+                partials = list(pool.map(run_segment, *zip(*args)))
+        else:
+            partials = [run_segment(*a) for a in args]
+        return combine(query, partials)
+
+
+def combine(query: dict, partials: list) -> list:
+    """Merge per-segment partial results into final rows."""
+    stats = query['stats']
+    if stats:
+        merged = {}
+        for _, groups in partials:
+            for key, states in groups.items():
+                if key not in merged:
+                    merged[key] = states
+                else:
+                    for agg, into, other in zip(stats['aggs'], merged[key], states):
+                        merge_state(agg, into, other)
+        rows = []
+        for key, states in merged.items():
+            row = {}
+            for g, value in zip(stats['by'], key):
+                row[g['name']] = format_time(value) if g['bin'] else value
+            for agg, state in zip(stats['aggs'], states):
+                row[agg['name']] = final_value(agg, state)
+            rows.append(row)
+        if query['sort']:
+            field, descending = query['sort']
+            rows.sort(key=lambda r: sort_value(r.get(field)), reverse=descending)
+        elif any(g['bin'] for g in stats['by']):
+            first_bin = next(g['name'] for g in stats['by'] if g['bin'])
+            rows.sort(key=lambda r: r[first_bin])
+        return rows[:query['limit']] if query['limit'] else rows
+
+    records = [r for _, part in partials for r in part]
+    _, descending = query['sort']
+    records.sort(key=lambda r: r['__sort'], reverse=descending)
+    if query['limit']:
+        records = records[:query['limit']]
+    for r in records:
+        del r['__sort']
+        if '@timestamp' in r and r['@timestamp'] is not None:
+            r['@timestamp'] = format_time(r['@timestamp'])
+    return records
+
+
+def format_cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value).replace('\n', ' ')
+
+
+def format_table(rows: list, max_width: int = 120) -> str:
+    if not rows:
+        return "No matching events"
+    columns = list(rows[0].keys())
+    widths = {c: min(max(len(c), *(len(format_cell(r.get(c))) for r in rows)), max_width) for c in columns}
+    lines = ['  '.join(c.ljust(widths[c]) for c in columns)]
+    lines.append('  '.join('-' * widths[c] for c in columns))
+    for r in rows:
+        lines.append('  '.join(format_cell(r.get(c))[:widths[c]].ljust(widths[c]) for c in columns))
+    lines.append(f"\n{len(rows)} rows")
+    return '\n'.join(lines)
+
+
+def format_csv(rows: list) -> str:
+    out = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({k: format_cell(v) for k, v in r.items()})
+    return out.getvalue()
+
+
+def main():
+    """Main log index entry point."""
+    parser = argparse.ArgumentParser(description='Indexed local log query engine')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help='Ingest exported log files into a local store')
+    ingest.add_argument('store')
+    ingest.add_argument('files', nargs='+')
+    ingest.add_argument('--workers', type=int, default=None, help='Parallel segment writers')
+    ingest.add_argument('--segment-rows', type=int, default=SEGMENT_ROWS, help='Events per segment')
+
+    query = sub.add_parser('query', help='Run a Logs Insights-style query')
+    query.add_argument('store')
+    query.add_argument('query')
+    query.add_argument('--start', default=None, help='Inclusive start (ISO 8601 or epoch)')
+    query.add_argument('--end', default=None, help='Exclusive end (ISO 8601 or epoch)')
+    query.add_argument('--workers', type=int, default=None, help='Parallel segment readers')
+    query.add_argument('--format', default='table', choices=['table', 'json', 'csv'])
+
+    info = sub.add_parser('info', help='Describe a local store')
+    info.add_argument('store')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'ingest':
+            store = LogStore(args.store)
+            rows = store.ingest(args.files, args.workers, args.segment_rows)
+            print(f"Ingested {rows} events; store has {store.manifest['rows']} events "
+                  f"in {len(store.manifest['segments'])} segments")
+            return 0
+
+        if not Path(args.store, 'manifest.json').exists():
+            print(f"Store not found: {args.store}", file=sys.stderr)
+            return 4
+        store = LogStore(args.store)
+
+        if args.command == 'info':
+            segments = store.manifest['segments']
+            print(f"Events: {store.manifest['rows']} in {len(segments)} segments")
+            if segments:
+                print(f"Time range: {format_time(min(s['min_ts'] for s in segments))} - "
+                      f"{format_time(max(s['max_ts'] for s in segments))}")
+                streams = sorted({st for s in segments for st in s['streams']})
+                print(f"Streams: {len(streams)}")
+            return 0
+
+        start = int(args.start) if args.start and args.start.isdigit() else args.start
+        end = int(args.end) if args.end and args.end.isdigit() else args.end
+        rows = store.query(args.query, start, end, args.workers)
+    except (LogStoreError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if args.format == 'json':
+        print(json.dumps(rows, indent=2, default=str))
+    elif args.format == 'csv':
+        print(format_csv(rows), end='')
+    else:
+        print(format_table(rows))
+    return 0 if rows else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+GetMetricData batch planner for aws-cloudwatch skill.
+Category: cloud
+
+Collects every metric a diagnostic flow (/aws-debug) needs and fetches
+them with as few GetMetricData calls as possible instead of one
+get-metric-statistics call per metric and resource. Identical requests
+are de-duplicated and their overlapping time ranges merged, requests
+whose windows overlap share one call window, each call carries up to
+500 queries, and calls run concurrently. A call whose datapoints would
+not fit in one response page is split into time slices that each fit, so
+its pages are fetched in parallel instead of by following NextToken in
+order (NextToken is still followed if a slice comes back paged). Results
+come back as NumPy series aligned on the
+period grid, NaN where CloudWatch returned no datapoint.
+
+StubCloudWatch answers GetMetricData locally with deterministic data and
+records the calls it received, so plans can be checked offline.
+
+Usage:
+    python metric_planner.py ec2 i-0abc123 i-0def456 [--minutes 60] [--period 300]
+    python metric_planner.py ecs my-cluster/my-service[/TASK_ID ...]
+    python metric_planner.py lambda my-function --stub [--format json]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+try:
+    import boto3
+    HAS_BOTO3 = True
+except ImportError:
+    HAS_BOTO3 = False
+
+
+MAX_QUERIES_PER_CALL = 500
+MAX_DATAPOINTS_PER_PAGE = 100800
+THROTTLE_CODES = ('Throttling', 'ThrottlingException', 'RequestLimitExceeded')
+
+# Metrics gathered per resource type: (namespace, metric, dimension names, statistics)
+DIAGNOSTIC_METRICS = {
+    'ec2': [
+        ('AWS/EC2', 'CPUUtilization', ('InstanceId',), ('Average', 'Maximum')),
+        ('AWS/EC2', 'StatusCheckFailed', ('InstanceId',), ('Maximum',)),
+        ('AWS/EC2', 'NetworkIn', ('InstanceId',), ('Sum',)),
+        ('AWS/EC2', 'NetworkOut', ('InstanceId',), ('Sum',)),
+        ('AWS/EC2', 'EBSReadOps', ('InstanceId',), ('Sum',)),
+        ('AWS/EC2', 'EBSWriteOps', ('InstanceId',), ('Sum',)),
+    ],
+    'lambda': [
+        ('AWS/Lambda', 'Invocations', ('FunctionName',), ('Sum',)),
+        ('AWS/Lambda', 'Errors', ('FunctionName',), ('Sum',)),
+        ('AWS/Lambda', 'Throttles', ('FunctionName',), ('Sum',)),
+        ('AWS/Lambda', 'Duration', ('FunctionName',), ('Average', 'p99')),
+        ('AWS/Lambda', 'ConcurrentExecutions', ('FunctionName',), ('Maximum',)),
+    ],
+    'ecs': [
+        ('AWS/ECS', 'CPUUtilization', ('ClusterName', 'ServiceName'), ('Average', 'Maximum')),
+        ('AWS/ECS', 'MemoryUtilization', ('ClusterName', 'ServiceName'), ('Average', 'Maximum')),
+        ('ECS/ContainerInsights', 'RunningTaskCount', ('ClusterName', 'ServiceName'), ('Average',)),
+    ],
+    'ecs-task': [
+        ('ECS/ContainerInsights', 'CpuUtilized', ('ClusterName', 'TaskId'), ('Average', 'Maximum')),
+        ('ECS/ContainerInsights', 'MemoryUtilized', ('ClusterName', 'TaskId'), ('Average', 'Maximum')),
+        ('ECS/ContainerInsights', 'NetworkRxBytes', ('ClusterName', 'TaskId'), ('Sum',)),
+    ],
+    'rds': [
+        ('AWS/RDS', 'CPUUtilization', ('DBInstanceIdentifier',), ('Average', 'Maximum')),
+        ('AWS/RDS', 'DatabaseConnections', ('DBInstanceIdentifier',), ('Maximum',)),
+        ('AWS/RDS', 'FreeStorageSpace', ('DBInstanceIdentifier',), ('Minimum',)),
+        ('AWS/RDS', 'ReadLatency', ('DBInstanceIdentifier',), ('Average',)),
+        ('AWS/RDS', 'WriteLatency', ('DBInstanceIdentifier',), ('Average',)),
+    ],
+}
+
+
+def to_epoch(value) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def merge_ranges(ranges: list) -> list:
+    """Union of [start, end) ranges, sorted and with overlaps/adjacency merged."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+class MetricQueryPlanner:
+    """
+    Collect metric requests, then fetch them in packed GetMetricData calls.
+
+    Args:
+        client: CloudWatch client (boto3 or StubCloudWatch)
+        max_workers: concurrent GetMetricData calls
+        max_queries: queries per call (service limit 500)
+        max_datapoints: datapoints per response page; larger calls are
+                        split into time slices fetched concurrently
+    """
+
+    def __init__(self, client, max_workers: int = 8, max_queries: int = MAX_QUERIES_PER_CALL,
+                 max_datapoints: int = MAX_DATAPOINTS_PER_PAGE):
+        self.client = client
+        self.max_workers = max_workers
+        self.max_queries = min(max_queries, MAX_QUERIES_PER_CALL)
+        self.max_datapoints = max_datapoints
+        self.requests = {}
+        self.calls = []
+        self.results = {}
+
+    def add(self, namespace: str, metric: str, dimensions: dict, stat: str = 'Average',
+            period: int = 300, start=None, end=None) -> tuple:
+        """
+        Register a metric request and return its key for series().
+
+        start/end are datetimes or epoch seconds (default: the last hour),
+        aligned outward to the period. Repeated requests for the same
+        metric, dimensions, statistic and period share one query.
+        """
+        end = to_epoch(end) if end is not None else int(time.time())
+        start = to_epoch(start) if start is not None else end - 3600
+        start = start // period * period
+        end = -(-end // period) * period
+        key = (namespace, metric, tuple(sorted(dimensions.items())), stat, period)
+        self.requests.setdefault(key, []).append((start, end))
+        self.calls = []
+        return key
+
+    def add_resource(self, resource_type: str, resource_id: str, period: int = 300,
+                     start=None, end=None) -> list:
+        """Register the DIAGNOSTIC_METRICS set for one resource; returns their keys."""
+        if resource_type == 'ecs':
+            parts = resource_id.split('/')
+            values = {'ClusterName': parts[0], 'ServiceName': parts[1] if len(parts) > 1 else ''}
+            if len(parts) > 2:
+                resource_type, values = 'ecs-task', {'ClusterName': parts[0], 'TaskId': parts[2]}
+        else:
+            values = None
+        keys = []
+        for namespace, metric, dim_names, stats in DIAGNOSTIC_METRICS[resource_type]:
+            dims = {name: values[name] for name in dim_names} if values else {dim_names[0]: resource_id}
+            for stat in stats:
+                keys.append(self.add(namespace, metric, dims, stat, period, start, end))
+        return keys
+
+    def plan(self) -> list:
+        """
+        Pack registered requests into calls.
+
+        Each unique query fetches the union of its requested ranges. Queries
+        whose ranges overlap are grouped into one call window (CloudWatch
+        bills per metric queried, not per datapoint, so a wider shared window
+        is cheaper than an extra call), and each window is split into calls
+        of at most max_queries queries. Calls that would return more than
+        max_datapoints are then cut into time slices on a boundary common
+        to their periods, one page each.
+        """
+        spans = []
+        for key, ranges in self.requests.items():
+            for start, end in merge_ranges(ranges):
+                spans.append((start, end, key))
+        spans.sort(key=lambda s: (s[0], s[1]))
+
+        windows = []
+        for start, end, key in spans:
+            if windows and start < windows[-1]['end']:
+                window = windows[-1]
+                window['end'] = max(window['end'], end)
+            else:
+                window = {'start': start, 'end': end, 'queries': []}
+                windows.append(window)
+            window['queries'].append(key)
+
+        calls = []
+        for window in windows:
+            for i in range(0, len(window['queries']), self.max_queries):
+                keys = window['queries'][i:i + self.max_queries]
+                calls.extend(self._slice(window['start'], window['end'], keys))
+        self.calls = calls
+        return calls
+
+    def _slice(self, start: int, end: int, keys: list) -> list:
+        """Split one call's window into slices that each fit in a page."""
+        step = math.lcm(*{key[4] for key in keys})
+        per_step = sum(step // key[4] for key in keys)
+        steps = -(-(end - start) // step)
+        chunk = max(self.max_datapoints // per_step, 1) * step
+        if steps * per_step <= self.max_datapoints or chunk >= end - start:
+            return [{'start': start, 'end': end, 'keys': keys}]
+        # Boundaries on multiples of chunk are multiples of every period, so no bucket is cut in two
+        bounds = [start] + list(range(start // chunk * chunk + chunk, end, chunk)) + [end]
+        return [{'start': a, 'end': b, 'keys': keys} for a, b in zip(bounds, bounds[1:])]
+
+    def _query(self, qid: str, key: tuple) -> dict:
+        namespace, metric, dims, stat, period = key
+        return {
+            'Id': qid,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': namespace,
+                    'MetricName': metric,
+                    'Dimensions': [{'Name': k, 'Value': v} for k, v in dims],
+                },
+                'Period': period,
+                'Stat': stat,
+            },
+            'ReturnData': True,
+        }
+
+    def _get_metric_data(self, params: dict) -> dict:
+        for attempt in range(6):
+            try:
+                return self.client.get_metric_data(**params)
+            except Exception as e:
+                code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+                if code not in THROTTLE_CODES or attempt == 5:
+                    raise
+                time.sleep(min(0.2 * 2 ** attempt, 5.0) * (0.5 + random.random()))
+
+    def _execute(self, call: dict) -> dict:
+        """Run one call, following NextToken pages; returns {key: (timestamps, values)}."""
+        ids = {f"q{i}": key for i, key in enumerate(call['keys'])}
+        params = {
+            'MetricDataQueries': [self._query(qid, key) for qid, key in ids.items()],
+            'StartTime': datetime.fromtimestamp(call['start'], tz=timezone.utc),
+            'EndTime': datetime.fromtimestamp(call['end'], tz=timezone.utc),
+            'ScanBy': 'TimestampAscending',
+        }
+        points = {qid: ([], []) for qid in ids}
+        pages = 0
+        while True:
+            response = self._get_metric_data(params)
+            pages += 1
+            for result in response.get('MetricDataResults', []):
+                ts, vals = points[result['Id']]
+                ts.extend(to_epoch(t) for t in result.get('Timestamps', []))
+                vals.extend(result.get('Values', []))
+            token = response.get('NextToken')
+            if not token:
+                break
+            params['NextToken'] = token
+        call['pages'] = pages
+        return {ids[qid]: p for qid, p in points.items()}
+
+    def fetch(self) -> dict:
+        """Plan (if needed) and run all calls concurrently."""
+        if not self.calls:
+            self.plan()
+        self.results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for fetched in pool.map(self._execute, self.calls):
+                for key, (ts, vals) in fetched.items():
+                    prev_ts, prev_vals = self.results.get(key, ([], []))
+                    self.results[key] = (prev_ts + ts, prev_vals + vals)
+        return self.results
+
+    def series(self, key: tuple, start=None, end=None) -> tuple:
+        """
+        Aligned series for a key: (timestamps int64, values float64).
+
+        The grid runs from start to end (default: the full fetched range)
+        in steps of the key's period; missing datapoints are NaN.
+        """
+        period = key[4]
+        ranges = merge_ranges(self.requests[key])
+        start = to_epoch(start) // period * period if start is not None else ranges[0][0]
+        end = -(-to_epoch(end) // period) * period if end is not None else ranges[-1][1]
+        grid = np.arange(start, end, period, dtype=np.int64)
+        values = np.full(len(grid), np.nan)
+        ts, vals = self.results.get(key, ([], []))
+        if ts:
+            ts = np.asarray(ts, dtype=np.int64)
+            idx = (ts - start) // period
+            ok = (idx >= 0) & (idx < len(grid))
+            values[idx[ok]] = np.asarray(vals, dtype=np.float64)[ok]
+        return grid, values
+
+    def frame(self, keys: list, start=None, end=None) -> tuple:
+        """Stack series sharing a period into one (len(keys) x T) array on a common grid."""
+        periods = {key[4] for key in keys}
+        if len(periods) != 1:
+            raise ValueError('frame() needs keys with a single period')
+        if start is None:
+            start = min(merge_ranges(self.requests[k])[0][0] for k in keys)
+        if end is None:
+            end = max(merge_ranges(self.requests[k])[-1][1] for k in keys)
+        grid = None
+        rows = []
+        for key in keys:
+            grid, values = self.series(key, start, end)
+            rows.append(values)
+        return grid, np.vstack(rows)
+
+
+class StubCloudWatch:
+    """
+    Local stand-in for the CloudWatch client's get_metric_data.
+
+    Values are a deterministic function of the query and timestamp, pages
+    are cut at page_size datapoints, and every request is recorded in
+    self.calls so tests can assert how a plan was executed.
+    """
+
+    def __init__(self, page_size: int = MAX_DATAPOINTS_PER_PAGE, missing: float = 0.0, seed: int = 0):
+        self.page_size = page_size
+        self.missing = missing
+        self.seed = seed
+        self.calls = []
+
+    def get_metric_data(self, MetricDataQueries, StartTime, EndTime, NextToken=None, **kwargs):
+        if len(MetricDataQueries) > MAX_QUERIES_PER_CALL:
+            raise ValueError(f"at most {MAX_QUERIES_PER_CALL} queries per call")
+        self.calls.append({'queries': len(MetricDataQueries), 'start': StartTime,
+                           'end': EndTime, 'token': NextToken})
+        start, end = to_epoch(StartTime), to_epoch(EndTime)
+        series = []
+        for q in MetricDataQueries:
+            stat = q['MetricStat']
+            period = stat['Period']
+            ident = json.dumps(stat, sort_keys=True)
+            h = int(hashlib.md5(f"{self.seed}:{ident}".encode()).hexdigest()[:8], 16)
+            ts = np.arange(-(-start // period) * period, end, period)
+            noise = (ts * 2654435761 + h) % 2 ** 32 / 2 ** 32
+            vals = 50 + 20 * np.sin(ts / 3600 + h % 7) + 10 * (noise - 0.5)
+            keep = (ts * 40503 + h) % 2 ** 16 / 2 ** 16 >= self.missing
+            for t, v in zip(ts[keep], vals[keep]):
+                series.append((q['Id'], int(t), float(v)))
+
+        offset = int(NextToken or 0)
+        page = series[offset:offset + self.page_size]
+        results = {}
+        for qid, t, v in page:
+            r = results.setdefault(qid, {'Id': qid, 'Timestamps': [], 'Values': [], 'StatusCode': 'Complete'})
+            r['Timestamps'].append(datetime.fromtimestamp(t, tz=timezone.utc))
+            r['Values'].append(v)
+        response = {'MetricDataResults': list(results.values())}
+        if offset + self.page_size < len(series):
+            response['NextToken'] = str(offset + self.page_size)
+        return response
+
+
+def label(key: tuple) -> str:
+    namespace, metric, dims, stat, period = key
+    return f"{namespace}:{metric}:{','.join(v for _, v in dims)}:{stat}"
+
+
+def summarize(planner: MetricQueryPlanner, keys: list) -> list:
+    rows = []
+    for key in keys:
+        _, values = planner.series(key)
+        present = values[~np.isnan(values)]
+        rows.append({
+            'series': label(key),
+            'points': int(len(present)),
+            'min': round(float(present.min()), 2) if len(present) else None,
+            'avg': round(float(present.mean()), 2) if len(present) else None,
+            'max': round(float(present.max()), 2) if len(present) else None,
+            'last': round(float(present[-1]), 2) if len(present) else None,
+        })
+    return rows
+
+
+def format_table(rows: list, planner: MetricQueryPlanner, requested: int) -> str:
+    pages = sum(c.get('pages', 1) for c in planner.calls)
+    lines = [
+        f"Requested series: {requested} | unique queries: {len(planner.requests)} | "
+        f"GetMetricData calls: {len(planner.calls)} ({pages} pages)",
+        "",
+        f"{'Series':<64} {'Points':>6} {'Min':>10} {'Avg':>10} {'Max':>10} {'Last':>10}",
+    ]
+    fmt = lambda v: '-' if v is None else f"{v:.2f}"
+    for r in rows:
+        lines.append(f"{r['series'][:64]:<64} {r['points']:>6} {fmt(r['min']):>10} "
+                     f"{fmt(r['avg']):>10} {fmt(r['max']):>10} {fmt(r['last']):>10}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main metric planner entry point."""
+    parser = argparse.ArgumentParser(description='Fetch diagnostic metrics with packed GetMetricData calls')
+    parser.add_argument('resource_type', choices=['ec2', 'lambda', 'ecs', 'rds'], help='Resource type')
+    parser.add_argument('resource_ids', nargs='+', help='Resource IDs (ecs: cluster/service[/task-id])')
+    parser.add_argument('--minutes', type=int, default=60, help='Look-back window in minutes')
+    parser.add_argument('--period', type=int, default=300, help='Period in seconds')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent GetMetricData calls')
+    parser.add_argument('--region', help='AWS region')
+    parser.add_argument('--stub', action='store_true', help='Use the local stub instead of CloudWatch')
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
+    args = parser.parse_args()
+
+    if args.stub:
+        client = StubCloudWatch()
+    elif HAS_BOTO3:
+        client = boto3.client('cloudwatch', region_name=args.region)
+    else:
+        print("Error: boto3 not installed (use --stub for offline runs)", file=sys.stderr)
+        return 3
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(minutes=args.minutes)
+    planner = MetricQueryPlanner(client, max_workers=args.workers)
+    keys = []
+    for resource_id in args.resource_ids:
+        keys.extend(planner.add_resource(args.resource_type, resource_id, args.period, start, end))
+
+    try:
+        planner.fetch()
+    except Exception as e:
+        code = getattr(e, 'response', {}).get('Error', {}).get('Code', '')
+        print(f"Error: {e}", file=sys.stderr)
+        return 3 if code == 'AccessDenied' else 1
+
+    rows = summarize(planner, list(dict.fromkeys(keys)))
+    if args.format == 'json':
+        print(json.dumps({'calls': len(planner.calls), 'series': rows}, indent=2))
+    else:
+        print(format_table(rows, planner, len(keys)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
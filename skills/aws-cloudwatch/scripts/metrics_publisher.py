@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Buffered, aggregating custom-metric publisher for aws-cloudwatch skill.
+Category: cloud
+
+Replaces one put_metric_data call per data point with an in-process
+buffer. Points are pre-aggregated per (namespace, metric, dimensions,
+unit, timestamp bucket) into a StatisticSet (SampleCount/Sum/Min/Max) or
+into Values/Counts arrays, and flushed in maximum-size PutMetricData
+batches from a background thread or asyncio task. The buffer is bounded:
+when it is full, put() either blocks until the next flush, drops the point
+or flushes inline (backpressure policy); on the event loop thread of
+start_async() it never blocks, and `await put_async()` waits for a flush
+instead. Buffered data is flushed on close() and at interpreter exit.
+
+Library use:
+
+    from metrics_publisher import MetricPublisher
+
+    metrics = MetricPublisher('MyApp', dimensions={'Service': 'API'})
+    metrics.start()
+    metrics.put('RequestLatency', 150.5, unit='Milliseconds')
+
+Offline (tests, dry runs): pass sink=MemorySink() or JsonlSink(path).
+
+Usage:
+    python metrics_publisher.py [--input POINTS.jsonl | --synthetic 100000]
+                                [--namespace MyApp] [--mode statistics|values]
+                                [--offline OUT.jsonl | --dry-run]
+"""
+
+import argparse
+import asyncio
+import atexit
+import json
+import math
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+    HAS_BOTO3 = True
+except ImportError:
+    HAS_BOTO3 = False
+
+
+# PutMetricData service limits
+MAX_DATUMS_PER_CALL = 1000
+MAX_PAYLOAD_BYTES = 1024 * 1024
+MAX_VALUES_PER_DATUM = 150
+MAX_DIMENSIONS = 30
+
+MODES = ('statistics', 'values')
+BACKPRESSURE = ('block', 'drop', 'flush')
+THROTTLE_CODES = ('Throttling', 'ThrottlingException', 'RequestLimitExceeded')
+
+
+class CloudWatchSink:
+    """Send batches with put_metric_data, retrying throttled calls with backoff."""
+
+    def __init__(self, client=None, max_attempts: int = 5):
+        if client is None:
+            if not HAS_BOTO3:
+                raise RuntimeError('boto3 is required for CloudWatchSink; use MemorySink or JsonlSink offline')
+            client = boto3.client('cloudwatch')
+        self.client = client
+        self.max_attempts = max_attempts
+
+    def __call__(self, namespace: str, metric_data: list) -> None:
+        for attempt in range(self.max_attempts):
+            try:
+                self.client.put_metric_data(Namespace=namespace, MetricData=metric_data)
+                return
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code not in THROTTLE_CODES or attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(min(0.1 * 2 ** attempt, 5.0) * (0.5 + random.random()))
+
+
+class MemorySink:
+    """Keep every request in memory; for tests and dry runs."""
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, namespace: str, metric_data: list) -> None:
+        with self.lock:
+            self.requests.append({'Namespace': namespace, 'MetricData': metric_data})
+
+    def datums(self) -> list:
+        with self.lock:
+            return [d for r in self.requests for d in r['MetricData']]
+
+
+class JsonlSink:
+    """Append each request as one JSON line; for offline capture."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, namespace: str, metric_data: list) -> None:
+        line = json.dumps({'Namespace': namespace, 'MetricData': metric_data}, default=str)
+        with self.lock, open(self.path, 'a') as f:
+            f.write(line + '\n')
+
+
+def quantize(value: float, gamma: float) -> float:
+    """Representative of the log bucket holding value (relative error (gamma - 1) / (gamma + 1))."""
+    if value == 0:
+        return 0.0
+    index = math.ceil(math.log(abs(value)) / math.log(gamma))
+    return math.copysign(2 * gamma ** index / (gamma + 1), value)
+
+
+class Aggregate:
+    """
+    Running aggregate for one metric, dimension set and time bucket.
+
+    Values mode keeps at most max_values distinct values: past that they are
+    merged into log buckets (1% relative error, widened until they fit), so
+    SampleCount/Sum/Min/Max stay exact and percentiles become approximate.
+    """
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'values', 'gamma')
+
+    def __init__(self):
+        self.count = 0.0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.values = None
+        self.gamma = None
+
+    def add(self, value: float, count: float, max_values: int = 0) -> None:
+        self.count += count
+        self.total += value * count
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if max_values:
+            if self.values is None:
+                self.values = {}
+            key = value if self.gamma is None else quantize(value, self.gamma)
+            self.values[key] = self.values.get(key, 0.0) + count
+            if len(self.values) > max_values:
+                self._compact(max_values)
+
+    def _compact(self, max_values: int) -> None:
+        while len(self.values) > max_values:
+            self.gamma = 1.02 if self.gamma is None else self.gamma ** 2
+            merged = {}
+            for value, count in self.values.items():
+                key = quantize(value, self.gamma)
+                merged[key] = merged.get(key, 0.0) + count
+            self.values = merged
+
+    def datums(self, base: dict) -> list:
+        """Render as MetricData entries (Values arrays are split at the service limit)."""
+        if self.values is None:
+            datum = dict(base)
+            datum['StatisticValues'] = {
+                'SampleCount': self.count,
+                'Sum': self.total,
+                'Minimum': self.minimum,
+                'Maximum': self.maximum,
+            }
+            return [datum]
+        items = list(self.values.items())
+        out = []
+        for i in range(0, len(items), MAX_VALUES_PER_DATUM):
+            chunk = items[i:i + MAX_VALUES_PER_DATUM]
+            datum = dict(base)
+            datum['Values'] = [v for v, _ in chunk]
+            datum['Counts'] = [c for _, c in chunk]
+            out.append(datum)
+        return out
+
+
+def datum_size(datum: dict) -> int:
+    """Approximate serialized size of a datum, for the request payload limit."""
+    return len(json.dumps(datum, default=str)) + 64
+
+
+def batches(metric_data: list, max_datums: int = MAX_DATUMS_PER_CALL,
+            max_bytes: int = MAX_PAYLOAD_BYTES) -> list:
+    """Split MetricData into requests within the datum-count and payload limits."""
+    out, current, size = [], [], 0
+    for datum in metric_data:
+        n = datum_size(datum)
+        if current and (len(current) >= max_datums or size + n > max_bytes):
+            out.append(current)
+            current, size = [], 0
+        current.append(datum)
+        size += n
+    if current:
+        out.append(current)
+    return out
+
+
+class MetricPublisher:
+    """
+    Buffer, aggregate and batch custom metrics for one namespace.
+
+    Args:
+        namespace: CloudWatch namespace
+        dimensions: default dimensions merged into every point
+        sink: callable(namespace, metric_data); defaults to CloudWatchSink()
+        mode: 'statistics' (StatisticSet) or 'values' (Values/Counts, keeps
+              distinct values so percentiles stay available)
+        flush_interval: seconds between background flushes
+        max_keys: bound on distinct aggregates held in memory
+        max_values: bound on distinct values per aggregate in values mode
+        backpressure: what put() does when the buffer is full:
+              'block' until the flusher drains it, 'drop' the point, or
+              'flush' inline on the calling thread. On the event loop
+              thread of start_async() 'block' drops instead (waiting there
+              would stall the flusher); use put_async() to wait
+        storage_resolution: 60 (standard) or 1 (high resolution)
+    """
+
+    def __init__(self, namespace: str, dimensions: dict = None, sink=None,
+                 mode: str = 'statistics', flush_interval: float = 10.0,
+                 max_keys: int = 10000, backpressure: str = 'block',
+                 storage_resolution: int = 60, block_timeout: float = 5.0,
+                 max_values: int = 1000):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if backpressure not in BACKPRESSURE:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE}")
+        if storage_resolution not in (1, 60):
+            raise ValueError('storage_resolution must be 1 or 60')
+        self.namespace = namespace
+        self.dimensions = dict(dimensions or {})
+        self.sink = sink if sink is not None else CloudWatchSink()
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self.max_values = max_values if mode == 'values' else 0
+        self.backpressure = backpressure
+        self.storage_resolution = storage_resolution
+        self.block_timeout = block_timeout
+
+        self._buffer = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._task = None
+        self._loop = None
+        self._loop_thread = None
+        self._wake = None
+        self._closed = False
+        self.stats = {'points': 0, 'dropped': 0, 'datums': 0, 'requests': 0, 'errors': 0}
+        atexit.register(self.close)
+
+    def _key(self, name: str, dimensions: dict, unit: str, timestamp: float) -> tuple:
+        dims = dict(self.dimensions)
+        if dimensions:
+            dims.update(dimensions)
+        if len(dims) > MAX_DIMENSIONS:
+            raise ValueError(f"{name}: at most {MAX_DIMENSIONS} dimensions per metric")
+        bucket = int(timestamp // self.storage_resolution) * self.storage_resolution
+        return (name, tuple(sorted((str(k), str(v)) for k, v in dims.items())), unit, bucket)
+
+    def put(self, name: str, value: float, unit: str = 'None', dimensions: dict = None,
+            timestamp: float = None, count: float = 1.0) -> bool:
+        """
+        Record a data point. Returns False if it was dropped by backpressure.
+
+        count lets callers record a value observed several times at once.
+        """
+        if self._closed:
+            raise RuntimeError('publisher is closed')
+        key = self._key(name, dimensions, unit, time.time() if timestamp is None else timestamp)
+        value = float(value)
+        with self._cond:
+            agg = self._buffer.get(key)
+            if agg is None:
+                while len(self._buffer) >= self.max_keys:
+                    on_loop = self._loop_thread == threading.get_ident()
+                    if self.backpressure == 'drop' or on_loop and self.backpressure == 'block':
+                        self._wake_flusher()
+                        self.stats['dropped'] += 1
+                        return False
+                    if self.backpressure == 'flush' or self._thread is None and self._task is None:
+                        self._cond.release()
+                        try:
+                            self.flush()
+                        finally:
+                            self._cond.acquire()
+                        continue
+                    self._cond.notify_all()
+                    self._wake_flusher()
+                    if not self._cond.wait(self.block_timeout):
+                        self.stats['dropped'] += 1
+                        return False
+                agg = self._buffer[key] = Aggregate()
+            agg.add(value, count, self.max_values)
+            self.stats['points'] += 1
+            if len(self._buffer) >= self.max_keys:
+                self._cond.notify_all()
+                self._wake_flusher()
+        return True
+
+    async def put_async(self, name: str, value: float, unit: str = 'None', dimensions: dict = None,
+                        timestamp: float = None, count: float = 1.0) -> bool:
+        """put() for coroutines: a full buffer awaits a flush instead of blocking the loop."""
+        key = self._key(name, dimensions, unit, time.time() if timestamp is None else timestamp)
+        if key not in self._buffer and len(self._buffer) >= self.max_keys:
+            await asyncio.get_running_loop().run_in_executor(None, self.flush)
+        return self.put(name, value, unit, dimensions, timestamp, count)
+
+    def _wake_flusher(self) -> None:
+        """Make the asyncio flusher run now rather than at the next interval."""
+        if self._wake is None:
+            return
+        if self._loop_thread == threading.get_ident():
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _drain(self) -> list:
+        """Swap the buffer out under the lock and render it as MetricData."""
+        with self._cond:
+            buffer, self._buffer = self._buffer, {}
+            self._cond.notify_all()
+        metric_data = []
+        for (name, dims, unit, bucket), agg in buffer.items():
+            base = {
+                'MetricName': name,
+                'Timestamp': datetime.fromtimestamp(bucket, tz=timezone.utc),
+                'Unit': unit,
+                'StorageResolution': self.storage_resolution,
+            }
+            if dims:
+                base['Dimensions'] = [{'Name': k, 'Value': v} for k, v in dims]
+            metric_data.extend(agg.datums(base))
+        return metric_data
+
+    def flush(self) -> int:
+        """Send everything buffered so far. Returns the number of requests made."""
+        with self._flush_lock:
+            metric_data = self._drain()
+            requests = 0
+            for batch in batches(metric_data):
+                try:
+                    self.sink(self.namespace, batch)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"metrics_publisher: dropped {len(batch)} datums: {e}", file=sys.stderr)
+                    continue
+                requests += 1
+                self.stats['datums'] += len(batch)
+            self.stats['requests'] += requests
+            return requests
+
+    def start(self) -> 'MetricPublisher':
+        """Flush from a daemon thread every flush_interval (or sooner when full)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='metrics-publisher', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._closed:
+            with self._cond:
+                if len(self._buffer) < self.max_keys:
+                    self._cond.wait(self.flush_interval)
+            self.flush()
+
+    def start_async(self) -> 'asyncio.Task':
+        """Flush from an asyncio task on the running loop; sink calls run in the executor."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+            self._wake = asyncio.Event()
+            self._task = self._loop.create_task(self._run_async())
+        return self._task
+
+    async def _run_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._closed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                await loop.run_in_executor(None, self.flush)
+        except asyncio.CancelledError:
+            await loop.run_in_executor(None, self.flush)
+            raise
+
+    def close(self) -> None:
+        """Stop background flushing and send what is left. Safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        if self._task is not None:
+            self._task.cancel()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> 'MetricPublisher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_points(path: str):
+    """Yield points from JSON lines: {"name", "value", "unit"?, "dimensions"?, "timestamp"?}."""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def synthetic_points(n: int, seed: int = 0):
+    """Latency and request-count points for a handful of routes."""
+    rng = random.Random(seed)
+    routes = ['/orders', '/users', '/search', '/health']
+    now = time.time()
+    for i in range(n):
+        route = rng.choice(routes)
+        ts = now - 300 + 300 * i / n
+        yield {'name': 'RequestLatency', 'value': round(rng.lognormvariate(4, 0.5)),
+               'unit': 'Milliseconds', 'dimensions': {'Route': route}, 'timestamp': ts}
+        yield {'name': 'RequestCount', 'value': 1, 'unit': 'Count',
+               'dimensions': {'Route': route}, 'timestamp': ts}
+
+
+def main():
+    """Main metrics publisher entry point."""
+    parser = argparse.ArgumentParser(description='Publish custom metrics through the aggregating buffer')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help='JSON lines file of points')
+    source.add_argument('--synthetic', type=int, help='Generate N synthetic request points')
+    parser.add_argument('--namespace', default='MyApp', help='CloudWatch namespace')
+    parser.add_argument('--mode', choices=MODES, default='statistics', help='Aggregation mode')
+    parser.add_argument('--high-resolution', action='store_true', help='Use 1-second storage resolution')
+    sink = parser.add_mutually_exclusive_group()
+    sink.add_argument('--offline', metavar='OUT.jsonl', help='Write requests to a file instead of CloudWatch')
+    sink.add_argument('--dry-run', action='store_true', help='Aggregate and report without sending')
+    args = parser.parse_args()
+
+    if args.offline:
+        target = JsonlSink(args.offline)
+    elif args.dry_run:
+        target = MemorySink()
+    else:
+        try:
+            target = CloudWatchSink()
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 3
+
+    points = read_points(args.input) if args.input else synthetic_points(args.synthetic)
+    start = time.perf_counter()
+    with MetricPublisher(args.namespace, sink=target, mode=args.mode, backpressure='flush',
+                         storage_resolution=1 if args.high_resolution else 60) as publisher:
+        for p in points:
+            publisher.put(p['name'], p['value'], unit=p.get('unit', 'None'),
+                          dimensions=p.get('dimensions'), timestamp=p.get('timestamp'))
+    elapsed = time.perf_counter() - start
+
+    stats = publisher.stats
+    print(f"Points: {stats['points']:,} -> datums: {stats['datums']:,} -> "
+          f"PutMetricData calls: {stats['requests']:,} ({elapsed:.2f}s)")
+    if stats['dropped'] or stats['errors']:
+        print(f"Dropped points: {stats['dropped']:,}, failed requests: {stats['errors']:,}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
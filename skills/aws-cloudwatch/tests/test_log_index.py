@@ -0,0 +1,39 @@
+"""Tests for scripts/log_index.py index pruning."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from log_index import MAX_TOKEN_LENGTH, LogStore  # noqa: E402
+
+
+def make_store(tmp_path, messages):
+    log = tmp_path / 'app.jsonl'
+    with open(log, 'w') as f:
+        for i, message in enumerate(messages):
+            f.write(json.dumps({'timestamp': 1_700_000_000_000 + i, 'message': message}) + '\n')
+    store = LogStore(str(tmp_path / 'store'))
+    store.ingest([str(log)], workers=1)
+    return store
+
+
+def messages_of(rows):
+    return sorted(r['@message'] for r in rows)
+
+
+def test_substring_inside_long_token_is_found(tmp_path):
+    long_token = 'a' * (MAX_TOKEN_LENGTH + 6) + 'deadbeef'
+    store = make_store(tmp_path, [f"id {long_token} done", 'deadbeef short', 'nothing here'])
+    rows = store.query('fields @message | filter @message like /deadbeef/', workers=1)
+    assert messages_of(rows) == sorted([f"id {long_token} done", 'deadbeef short'])
+
+
+def test_long_token_row_still_checked_against_the_full_filter(tmp_path):
+    long_token = 'f' * (MAX_TOKEN_LENGTH + 1)
+    store = make_store(tmp_path, [f"error {long_token}", f"info {long_token}", 'error short'])
+    rows = store.query('fields @message | filter @message like /error/', workers=1)
+    assert messages_of(rows) == sorted([f"error {long_token}", 'error short'])
+    rows = store.query(f'fields @message | filter @message like "{long_token}"', workers=1)
+    assert len(rows) == 2
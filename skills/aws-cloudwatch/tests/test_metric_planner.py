@@ -0,0 +1,118 @@
+"""Tests for scripts/metric_planner.py against the local StubCloudWatch."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from metric_planner import MAX_QUERIES_PER_CALL, MetricQueryPlanner, StubCloudWatch, merge_ranges  # noqa: E402
+
+END = 1_700_000_000 // 3600 * 3600
+
+
+def test_merge_ranges_joins_overlapping_and_adjacent():
+    assert merge_ranges([(10, 20), (0, 5), (5, 8), (15, 30), (40, 50)]) == [(0, 8), (10, 30), (40, 50)]
+
+
+def test_duplicate_requests_share_one_query():
+    planner = MetricQueryPlanner(StubCloudWatch())
+    first = planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-1'}, start=END - 3600, end=END)
+    second = planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-1'}, start=END - 1800, end=END)
+    assert first == second
+    assert len(planner.requests) == 1
+    calls = planner.plan()
+    assert len(calls) == 1
+    assert (calls[0]['start'], calls[0]['end']) == (END - 3600, END)
+
+
+def test_queries_are_packed_up_to_the_call_limit():
+    client = StubCloudWatch()
+    planner = MetricQueryPlanner(client)
+    for i in range(200):
+        planner.add_resource('ecs', f'cluster/service/task-{i}', start=END - 3600, end=END)
+    # 5 task metric/stat pairs per task
+    assert len(planner.requests) == 1000
+    planner.fetch()
+    assert len(client.calls) == 2
+    assert all(c['queries'] <= MAX_QUERIES_PER_CALL for c in client.calls)
+
+
+def test_disjoint_ranges_use_separate_windows():
+    planner = MetricQueryPlanner(StubCloudWatch())
+    planner.add('AWS/Lambda', 'Errors', {'FunctionName': 'f'}, 'Sum', start=END - 7200, end=END - 3600)
+    planner.add('AWS/Lambda', 'Errors', {'FunctionName': 'f'}, 'Sum', start=END - 600, end=END)
+    calls = planner.plan()
+    assert [(c['start'], c['end']) for c in calls] == [(END - 7200, END - 3600), (END - 600, END)]
+
+
+def test_large_call_is_sliced_into_concurrent_pages():
+    client = StubCloudWatch(page_size=100)
+    planner = MetricQueryPlanner(client, max_datapoints=100)
+    keys = [planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': f'i-{i}'}, period=60,
+                        start=END - 86400, end=END) for i in range(4)]
+    calls = planner.plan()
+    assert len(calls) > 1
+    assert all(sum(-(-(c['end'] - c['start']) // 60) for _ in c['keys']) <= 100 for c in calls)
+    assert all(c['start'] % 60 == 0 and c['end'] % 60 == 0 for c in calls)
+    planner.fetch()
+    # Every slice fits one page, so no NextToken was followed
+    assert all(c['token'] is None for c in client.calls)
+    grid, values = planner.frame(keys)
+    assert values.shape == (4, 1440)
+    assert not np.isnan(values).any()
+
+
+def test_sliced_fetch_matches_unsliced_fetch():
+    def fetch(max_datapoints):
+        planner = MetricQueryPlanner(StubCloudWatch(page_size=50), max_datapoints=max_datapoints)
+        key = planner.add('AWS/RDS', 'CPUUtilization', {'DBInstanceIdentifier': 'db'}, period=300,
+                          start=END - 86400, end=END)
+        planner.fetch()
+        return planner.series(key)
+
+    grid_a, values_a = fetch(40)
+    grid_b, values_b = fetch(10 ** 6)
+    assert np.array_equal(grid_a, grid_b)
+    np.testing.assert_allclose(values_a, values_b)
+
+
+def test_paged_responses_are_followed():
+    client = StubCloudWatch(page_size=7)
+    planner = MetricQueryPlanner(client)
+    key = planner.add('AWS/EC2', 'NetworkIn', {'InstanceId': 'i-1'}, 'Sum', start=END - 3600, end=END)
+    planner.fetch()
+    assert len(client.calls) == 2
+    _, values = planner.series(key)
+    assert len(values) == 12 and not np.isnan(values).any()
+
+
+def test_missing_datapoints_are_nan_on_the_grid():
+    planner = MetricQueryPlanner(StubCloudWatch(missing=0.5, seed=3))
+    key = planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-1'}, start=END - 86400, end=END)
+    planner.fetch()
+    grid, values = planner.series(key)
+    assert len(grid) == 288
+    assert np.all(np.diff(grid) == 300)
+    assert 0 < np.isnan(values).sum() < len(values)
+
+
+def test_frame_requires_a_single_period():
+    planner = MetricQueryPlanner(StubCloudWatch())
+    a = planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-1'}, period=60, end=END)
+    b = planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-1'}, period=300, end=END)
+    planner.fetch()
+    with pytest.raises(ValueError):
+        planner.frame([a, b])
+
+
+def test_adding_after_plan_replans():
+    client = StubCloudWatch()
+    planner = MetricQueryPlanner(client)
+    planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-1'}, end=END)
+    planner.plan()
+    key = planner.add('AWS/EC2', 'CPUUtilization', {'InstanceId': 'i-2'}, end=END)
+    planner.fetch()
+    assert key in planner.results
@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+"""
+Local buildspec runner for aws-codepipeline skill.
+Category: cloud
+
+Runs the install, pre_build, build and post_build phases of a CodeBuild
+buildspec (version 0.2) on the local machine and skips work whose inputs
+have not changed:
+
+- Every phase gets a content-addressed key: the hash of its commands, the
+  buildspec environment, the key of the previous phase and its inputs.
+  install hashes only the lockfiles it finds (package-lock.json,
+  requirements.txt, go.sum, ...), later phases hash the source tree:
+  the files git would track (.gitignore honoured; without git the top
+  .gitignore is read), minus cache paths, artifact and report directories.
+- A phase whose key already succeeded is skipped; its outputs (install:
+  cache paths, build: artifacts) and exported variables are restored from
+  the local store instead.
+- `cache.key` / `cache.fallback-keys` are honoured like the CodeBuild S3
+  cache, including `$(codebuild-hash-files GLOB ...)`.
+- The store is a directory of tar objects with LRU eviction by size.
+
+Per-phase timings are reported, with the recorded duration of each skipped
+phase as the time saved.
+
+Usage:
+    python buildspec_runner.py [--buildspec ../assets/buildspec.yml] [--src .]
+                               [--cache-dir ~/.cache/buildspec-runner] [--max-cache-size 5]
+                               [--inputs build=src/**,package.json] [--env KEY=VALUE]
+                               [--no-skip] [--dry-run] [--format table|json]
+"""
+
+import argparse
+import fcntl
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+
+PHASES = ('install', 'pre_build', 'build', 'post_build')
+# Phases whose result may be reused; post_build usually pushes or deploys
+CACHEABLE = ('install', 'pre_build', 'build')
+LOCKFILES = (
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml', '.nvmrc',
+    'requirements.txt', 'requirements-dev.txt', 'poetry.lock', 'Pipfile.lock', 'uv.lock',
+    'go.sum', 'Cargo.lock', 'Gemfile.lock', 'composer.lock', 'pom.xml', 'gradle.lockfile',
+)
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'buildspec-runner'
+HASH_FILES_RE = re.compile(r'\$\(codebuild-hash-files\s+([^)]*)\)')
+# Shell bookkeeping that should not leak between phases
+SHELL_VARS = {'_', 'SHLVL', 'PWD', 'OLDPWD', 'PS1', 'PS2', 'PS4', 'BASH_EXECUTION_STRING'}
+
+
+class BuildspecError(ValueError):
+    """Invalid or unsupported buildspec."""
+
+
+def sha256(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def load_buildspec(path: str) -> dict:
+    with open(path, 'r') as f:
+        spec = yaml.safe_load(f) or {}
+    if str(spec.get('version')) not in ('0.2', '0.1'):
+        raise BuildspecError(f"Unsupported buildspec version: {spec.get('version')}")
+    phases = spec.get('phases') or {}
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        raise BuildspecError(f"Unknown phase(s): {', '.join(sorted(unknown))}")
+    for name, phase in phases.items():
+        if not isinstance(phase.get('commands', []), list):
+            raise BuildspecError(f"phases.{name}.commands must be a list")
+    return spec
+
+
+class FileHasher:
+    """SHA-256 of files, memoized on (size, mtime, inode) so unchanged trees are not re-read."""
+
+    def __init__(self, memo_path: Path = None):
+        self.memo_path = memo_path
+        self.memo = {}
+        if memo_path and memo_path.exists():
+            try:
+                self.memo = json.loads(memo_path.read_text())
+            except (OSError, ValueError):
+                self.memo = {}
+        self.dirty = False
+
+    def file(self, path: str) -> str:
+        st = os.lstat(path)
+        if os.path.islink(path):
+            return sha256('link', os.readlink(path))
+        stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+        cached = self.memo.get(path)
+        if cached and cached[:3] == stamp:
+            return cached[3]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self.memo[path] = stamp + [digest]
+        self.dirty = True
+        return digest
+
+    def files(self, root: str, relpaths: list) -> str:
+        """Digest over (relative path, content hash) of the given files."""
+        return sha256(*(f"{rel}:{self.file(os.path.join(root, rel))}" for rel in sorted(relpaths)))
+
+    def save(self):
+        if self.memo_path and self.dirty:
+            tmp = self.memo_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self.memo))
+            os.replace(tmp, self.memo_path)
+
+
+def match_files(root: str, patterns: list) -> list:
+    """Relative paths of regular files and symlinks matching buildspec-style globs."""
+    found = set()
+    for pattern in patterns:
+        base = pattern_root(pattern)
+        if pattern in (f"{base}/**/*", f"{base}/**") and base:
+            # Whole directory, including dotfiles that glob would skip
+            full = os.path.join(root, base)
+            if os.path.isdir(full):
+                found.update(os.path.join(base, f) for f in tree_files(full, set()))
+            continue
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            if os.path.isfile(path) or os.path.islink(path):
+                found.add(os.path.relpath(path, root))
+    return sorted(found)
+
+
+def pattern_root(pattern: str) -> str:
+    """Static directory prefix of a glob: 'node_modules/**/*' -> 'node_modules'."""
+    parts = []
+    for part in Path(pattern).parts:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.path.join(*parts) if parts else ''
+
+
+def tree_files(root: str, exclude: set) -> list:
+    """All files below root, skipping excluded top-level paths and .git."""
+    out = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_dir = '' if rel_dir == '.' else rel_dir
+        dirnames[:] = sorted(d for d in dirnames
+                             if d != '.git' and os.path.join(rel_dir, d) not in exclude)
+        out.extend(os.path.join(rel_dir, f) for f in filenames if os.path.join(rel_dir, f) not in exclude)
+    return out
+
+
+def gitignore_matcher(root: str):
+    """Predicate for paths ignored by the top-level .gitignore (no negations, no nested files)."""
+    path = os.path.join(root, '.gitignore')
+    patterns = []
+    if os.path.isfile(path):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith(('#', '!')):
+                    continue
+                dir_only = line.endswith('/')
+                line = line.strip('/')
+                patterns.append((line, '/' in line, dir_only))
+
+    def ignored(rel: str) -> bool:
+        parts = rel.split(os.sep)
+        for pattern, anchored, dir_only in patterns:
+            # A directory pattern can only match a parent component
+            last = len(parts) - 1 if dir_only else len(parts)
+            if anchored:
+                if any(fnmatch.fnmatchcase('/'.join(parts[:i + 1]), pattern) for i in range(last)):
+                    return True
+            elif any(fnmatch.fnmatchcase(part, pattern) for part in parts[:last]):
+                return True
+        return False
+
+    return ignored
+
+
+def source_files(root: str, exclude: set) -> list:
+    """
+    Files that make up the source tree: tracked and untracked-but-not-ignored
+    files from git, or every file minus the top .gitignore when git is unavailable.
+    """
+    try:
+        out = subprocess.run(['git', 'ls-files', '--cached', '--others', '--exclude-standard', '-z'],
+                             cwd=root, capture_output=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        ignored = gitignore_matcher(root)
+        return [f for f in tree_files(root, exclude) if not ignored(f)]
+    files = []
+    for rel in sorted(set(os.fsdecode(p) for p in out.split(b'\0') if p)):
+        rel = os.path.normpath(rel)
+        parts = rel.split(os.sep)
+        # Skip excluded roots; tracked files deleted from the work tree are gone
+        if any(os.path.join(*parts[:i + 1]) in exclude for i in range(len(parts))):
+            continue
+        if os.path.isfile(os.path.join(root, rel)) or os.path.islink(os.path.join(root, rel)):
+            files.append(rel)
+    return files
+
+
+def stat_signature(root: str, roots: list) -> str:
+    """Cheap signature of materialized output directories (paths, sizes, mtimes)."""
+    entries = []
+    for r in roots:
+        full = os.path.join(root, r)
+        if os.path.isfile(full):
+            st = os.lstat(full)
+            entries.append(f"{r}:{st.st_size}:{st.st_mtime_ns}")
+            continue
+        if not os.path.isdir(full):
+            return ''
+        for dirpath, _, filenames in os.walk(full):
+            for f in filenames:
+                st = os.lstat(os.path.join(dirpath, f))
+                entries.append(f"{os.path.relpath(os.path.join(dirpath, f), root)}:{st.st_size}:{st.st_mtime_ns}")
+    return sha256(*sorted(entries))
+
+
+class CacheStore:
+    """
+    Content-addressed object store for cache paths and phase results.
+
+    Objects are uncompressed tar files named by key; the index keeps size
+    and last use for LRU eviction, phase records (status, duration,
+    exported variables) and, per workspace, which object was last
+    materialized so unchanged outputs are not extracted again.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.index_path = self.root / 'index.json'
+        self._lock = open(self.root / '.lock', 'w')
+        fcntl.flock(self._lock, fcntl.LOCK_EX)
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text())
+        else:
+            self.index = {'objects': {}, 'phases': {}, 'keys': {}, 'workspaces': {}}
+
+    def close(self):
+        self.evict()
+        self.save()
+        fcntl.flock(self._lock, fcntl.LOCK_UN)
+        self._lock.close()
+
+    def save(self):
+        tmp = self.index_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.index, indent=1))
+        os.replace(tmp, self.index_path)
+
+    def object_path(self, key: str) -> Path:
+        return self.objects / f"{key}.tar"
+
+    def has(self, key: str) -> bool:
+        return key in self.index['objects'] and self.object_path(key).exists()
+
+    def put(self, key: str, src: str, relpaths: list) -> int:
+        """Tar the given files into object `key`; returns its size."""
+        path = self.object_path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.objects, suffix='.part')
+        os.close(fd)
+        with tarfile.open(tmp, 'w') as tar:
+            for rel in relpaths:
+                tar.add(os.path.join(src, rel), arcname=rel, recursive=False)
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        self.index['objects'][key] = {'size': size, 'created': time.time(), 'last_used': time.time()}
+        self.evict(keep=key)
+        return size
+
+    def restore(self, key: str, src: str, roots: list) -> int:
+        """Replace `roots` in the workspace with the contents of object `key`; returns its size."""
+        for r in roots:
+            full = os.path.join(src, r)
+            if os.path.isdir(full) and not os.path.islink(full):
+                shutil.rmtree(full)
+            elif os.path.lexists(full):
+                os.remove(full)
+        with tarfile.open(self.object_path(key), 'r') as tar:
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(src, filter='tar')
+            else:
+                tar.extractall(src)
+        self.touch(key)
+        return self.index['objects'][key]['size']
+
+    def touch(self, key: str):
+        self.index['objects'][key]['last_used'] = time.time()
+
+    def evict(self, keep: str = None):
+        """Remove least recently used objects until the store fits max_bytes."""
+        objects = self.index['objects']
+        total = sum(o['size'] for o in objects.values())
+        for key, meta in sorted(objects.items(), key=lambda kv: kv[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.object_path(key).unlink(missing_ok=True)
+            total -= meta['size']
+            del objects[key]
+        live = set(objects)
+        for table in (self.index['keys'], self.index['phases']):
+            for key in [k for k, v in table.items() if v.get('object') not in (None, *live)]:
+                del table[key]
+
+    def lookup_cache_key(self, key: str, fallbacks: list):
+        """Object for an exact cache key, else the newest key starting with a fallback prefix."""
+        keys = self.index['keys']
+        if key in keys:
+            return keys[key]['object']
+        for prefix in fallbacks:
+            candidates = [v for k, v in keys.items() if k.startswith(prefix)]
+            if candidates:
+                return max(candidates, key=lambda v: v['saved'])['object']
+        return None
+
+    def workspace(self, src: str) -> dict:
+        return self.index['workspaces'].setdefault(os.path.abspath(src), {})
+
+
+class BuildRunner:
+    """Execute buildspec phases with phase-level skipping and cache restore/save."""
+
+    def __init__(self, spec: dict, src: str, store: CacheStore, hasher: FileHasher,
+                 inputs: dict = None, env_overrides: dict = None, skip: bool = True,
+                 dry_run: bool = False, shell: str = None):
+        self.spec = spec
+        self.src = os.path.abspath(src)
+        self.store = store
+        self.hasher = hasher
+        self.inputs = inputs or {}
+        self.skip = skip
+        self.dry_run = dry_run
+        self.phases = spec.get('phases') or {}
+        cache = spec.get('cache') or {}
+        self.cache_patterns = list(cache.get('paths') or [])
+        self.cache_roots = sorted({pattern_root(p) for p in self.cache_patterns} - {''})
+        self.env, self.declared_env = self._initial_env(env_overrides or {})
+        env_spec = spec.get('env') or {}
+        self.shell = shell or (env_spec.get('shell') if isinstance(env_spec.get('shell'), str) else None) \
+            or shutil.which('bash') or '/bin/sh'
+        self.warnings = []
+
+    def _initial_env(self, overrides: dict):
+        env = dict(os.environ)
+        env_spec = self.spec.get('env') or {}
+        declared = {k: str(v) for k, v in (env_spec.get('variables') or {}).items()}
+        for section in ('parameter-store', 'secrets-manager'):
+            # Not resolved locally: taken from the caller's environment when set
+            for name in (env_spec.get(section) or {}):
+                if name in os.environ:
+                    declared[name] = sha256(os.environ[name])[:12]
+        declared.update(overrides)
+        env.update({k: v for k, v in (env_spec.get('variables') or {}).items()})
+        env = {k: str(v) for k, v in env.items()}
+        env.update(overrides)
+        env['CODEBUILD_SRC_DIR'] = self.src
+        env['CODEBUILD_BUILD_SUCCEEDING'] = '1'
+        try:
+            rev = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=self.src, capture_output=True,
+                                 text=True, timeout=10)
+            if rev.returncode == 0:
+                env.setdefault('CODEBUILD_RESOLVED_SOURCE_VERSION', rev.stdout.strip())
+        except (OSError, subprocess.SubprocessError):
+            pass
+        return env, declared
+
+    # --- keys -----------------------------------------------------------------
+
+    def output_patterns(self, phase: str):
+        """Globs of the files a phase produces, or None if its outputs cannot be captured."""
+        if phase == 'install':
+            return self.cache_patterns
+        if phase == 'build':
+            artifacts = self.spec.get('artifacts') or {}
+            base = (artifacts.get('base-directory') or '').rstrip('/')
+            if base:
+                return [f"{base}/**/*"]
+            files = artifacts.get('files') or []
+            # '**/*' without a base directory is the whole workspace
+            return None if not files or any(f in ('**/*', '**') for f in files) else list(files)
+        return []
+
+    def output_roots(self, phase: str):
+        """Workspace paths replaced when a phase's outputs are restored."""
+        patterns = self.output_patterns(phase)
+        if patterns is None:
+            return None
+        return sorted({pattern_root(p) or p for p in patterns})
+
+    def generated_roots(self) -> set:
+        """Base directories of secondary artifacts and reports: outputs, not sources."""
+        sections = list(((self.spec.get('artifacts') or {}).get('secondary-artifacts') or {}).values())
+        sections += list((self.spec.get('reports') or {}).values())
+        return {os.path.normpath(str(s['base-directory']).rstrip('/')) for s in sections
+                if isinstance(s, dict) and s.get('base-directory')}
+
+    def source_digest(self) -> str:
+        exclude = set(self.cache_roots) | self.generated_roots()
+        build_out = self.output_roots('build')
+        if build_out:
+            exclude |= set(build_out)
+        store_rel = os.path.relpath(self.store.root, self.src)
+        if not store_rel.startswith('..'):
+            exclude.add(store_rel)
+        return self.hasher.files(self.src, source_files(self.src, exclude))
+
+    def input_digest(self, phase: str, source: str) -> str:
+        if phase in self.inputs:
+            return self.hasher.files(self.src, match_files(self.src, self.inputs[phase]))
+        if phase == 'install':
+            locks = match_files(self.src, [f"**/{name}" for name in LOCKFILES])
+            locks = [p for p in locks if not any(p.startswith(r + os.sep) for r in self.cache_roots)]
+            if locks:
+                return self.hasher.files(self.src, locks)
+        return source
+
+    def phase_key(self, phase: str, previous: str, source: str) -> str:
+        spec = json.dumps(self.phases.get(phase) or {}, sort_keys=True, default=str)
+        env = json.dumps(self.declared_env, sort_keys=True)
+        return sha256('phase', phase, spec, env, previous, self.input_digest(phase, source))
+
+    def cache_key(self):
+        """Expanded (key, fallback-keys) of the buildspec cache section, or (None, [])."""
+        cache = self.spec.get('cache') or {}
+        if not cache.get('key'):
+            return None, []
+
+        def expand(text):
+            text = HASH_FILES_RE.sub(lambda m: self.hasher.files(self.src, match_files(self.src, m.group(1).split())), text)
+            return re.sub(r'\$\{?([A-Za-z_][A-Za-z0-9_]*)\}?', lambda m: self.env.get(m.group(1), ''), text)
+        return expand(str(cache['key'])), [expand(str(k)) for k in cache.get('fallback-keys') or []]
+
+    # --- execution ------------------------------------------------------------
+
+    def run_commands(self, commands: list, cwd: str):
+        """Run commands in one shell; returns (exit code, exported env, final cwd)."""
+        with tempfile.TemporaryDirectory() as tmp:
+            env_out, pwd_out = os.path.join(tmp, 'env'), os.path.join(tmp, 'pwd')
+            script = [
+                f"trap '__rc=$?; env -0 > \"{env_out}\"; pwd > \"{pwd_out}\"; exit $__rc' EXIT",
+                'set -e',
+                *[str(c) for c in commands],
+            ]
+            # Build output goes to stderr so the report on stdout stays parseable
+            proc = subprocess.run([self.shell, '-c', '\n'.join(script)], cwd=cwd, env=self.env, stdout=sys.stderr)
+            env, new_cwd = dict(self.env), cwd
+            if os.path.exists(env_out):
+                with open(env_out, 'rb') as f:
+                    pairs = [item.split(b'=', 1) for item in f.read().split(b'\0') if b'=' in item]
+                env = {k.decode(): v.decode('utf-8', 'replace') for k, v in pairs
+                       if k.decode() not in SHELL_VARS}
+            if os.path.exists(pwd_out):
+                with open(pwd_out) as f:
+                    new_cwd = f.read().strip() or cwd
+            return proc.returncode, env, new_cwd
+
+    def execute(self) -> dict:
+        """
+        Run all phases and return the report.
+
+        Returns:
+            dict: {'succeeded', 'phases': [{phase, status, seconds, key, ...}], 'cache', 'warnings'}
+        """
+        started = time.monotonic()
+        source = self.source_digest()
+        cwd = self.src
+        results = []
+        previous = sha256('buildspec', os.path.basename(self.src))
+        succeeded, aborted, ran_upstream = True, False, False
+        cache_report = {}
+
+        key, fallbacks = self.cache_key()
+        if key is not None:
+            found = self.store.lookup_cache_key(key, fallbacks)
+            cache_report = {'key': key, 'restored': found is not None, 'exact': key in self.store.index['keys']}
+
+        for phase in PHASES:
+            if phase not in self.phases:
+                continue
+            spec = self.phases[phase] or {}
+            pkey = self.phase_key(phase, previous, source)
+            previous = pkey
+            entry = {'phase': phase, 'key': pkey[:12], 'status': None, 'seconds': 0.0}
+            results.append(entry)
+            if aborted:
+                entry['status'] = 'NOT_RUN'
+                continue
+
+            record = self.store.index['phases'].get(pkey)
+            roots = self.output_roots(phase)
+            reusable = (self.skip and phase in CACHEABLE and not ran_upstream and roots is not None
+                        and record is not None and record['status'] == 'SUCCEEDED'
+                        and (record.get('object') is None or self.store.has(record['object'])))
+            if reusable:
+                t0 = time.monotonic()
+                if not self.dry_run:
+                    entry['restored_bytes'] = self._materialize(phase, record, roots)
+                self.env.update(record.get('env') or {})
+                cwd = record.get('cwd') or cwd
+                entry.update(status='CACHED', seconds=round(time.monotonic() - t0, 3),
+                             saved_seconds=record['seconds'])
+                continue
+
+            if self.dry_run:
+                entry['status'] = 'WOULD_RUN'
+                ran_upstream = True
+                continue
+
+            if phase == 'install' and key is not None and cache_report.get('restored'):
+                found = self.store.lookup_cache_key(key, fallbacks)
+                t0 = time.monotonic()
+                self.store.restore(found, self.src, self.cache_roots)
+                entry['cache_restore_seconds'] = round(time.monotonic() - t0, 3)
+
+            print(f"[buildspec] Entering phase {phase.upper()}", file=sys.stderr)
+            before = dict(self.env)
+            t0 = time.monotonic()
+            rc, env, cwd = self.run_commands(spec.get('commands') or [], cwd)
+            self.env = env
+            if spec.get('finally'):
+                frc, self.env, cwd = self.run_commands(spec['finally'], cwd)
+                rc = rc or frc
+            entry['seconds'] = round(time.monotonic() - t0, 3)
+            ran_upstream = True
+            if rc != 0:
+                entry['status'] = 'FAILED'
+                entry['exit_code'] = rc
+                succeeded = False
+                self.env['CODEBUILD_BUILD_SUCCEEDING'] = '0'
+                if spec.get('on-failure', 'ABORT') != 'CONTINUE':
+                    # CodeBuild still runs post_build after a failed build
+                    aborted = phase != 'build'
+                continue
+
+            entry['status'] = 'SUCCEEDED'
+            print(f"[buildspec] Phase complete: {phase.upper()} State: SUCCEEDED ({entry['seconds']:.1f}s)",
+                  file=sys.stderr)
+            if phase in CACHEABLE and roots is not None:
+                delta = {k: v for k, v in self.env.items()
+                         if before.get(k) != v and k != 'CODEBUILD_BUILD_SUCCEEDING'}
+                entry['saved_bytes'] = self._record(phase, pkey, entry['seconds'], roots, delta, cwd)
+
+        if succeeded and key is not None and not self.dry_run and self.cache_roots:
+            cache_report['saved_bytes'] = self._save_cache_key(key)
+
+        return {
+            'succeeded': succeeded,
+            'dry_run': self.dry_run,
+            'total_seconds': round(time.monotonic() - started, 3),
+            'saved_seconds': round(sum(r.get('saved_seconds', 0) for r in results), 3),
+            'phases': results,
+            'cache': cache_report,
+            'warnings': self.warnings,
+        }
+
+    def _record(self, phase, pkey, seconds, roots, env_delta, cwd) -> int:
+        size = 0
+        obj = None
+        if roots:
+            files = match_files(self.src, self.output_patterns(phase))
+            if not files:
+                self.warnings.append(f"{phase}: no outputs found under {', '.join(roots)}; not cached")
+                return 0
+            obj = pkey
+            size = self.store.put(obj, self.src, files)
+            self.store.workspace(self.src)[phase] = {'object': obj, 'signature': stat_signature(self.src, roots)}
+        self.store.index['phases'][pkey] = {'phase': phase, 'status': 'SUCCEEDED', 'seconds': seconds,
+                                            'object': obj, 'env': env_delta,
+                                            'cwd': cwd if cwd != self.src else None, 'finished': time.time()}
+        return size
+
+    def _materialize(self, phase, record, roots) -> int:
+        """Restore a skipped phase's outputs unless the workspace already holds them."""
+        obj = record.get('object')
+        if not obj:
+            return 0
+        ws = self.store.workspace(self.src).get(phase)
+        if ws and ws['object'] == obj and ws['signature'] == stat_signature(self.src, roots):
+            self.store.touch(obj)
+            return 0
+        size = self.store.restore(obj, self.src, roots)
+        self.store.workspace(self.src)[phase] = {'object': obj, 'signature': stat_signature(self.src, roots)}
+        return size
+
+    def _save_cache_key(self, key: str) -> int:
+        keys = self.store.index['keys']
+        if key in keys and self.store.has(keys[key]['object']):
+            self.store.touch(keys[key]['object'])
+            return 0
+        files = match_files(self.src, self.cache_patterns)
+        if not files:
+            return 0
+        obj = sha256('cache', key)
+        size = self.store.put(obj, self.src, files)
+        keys[key] = {'object': obj, 'saved': time.time()}
+        return size
+
+
+def parse_size(text: str) -> int:
+    """'5' or '5G' -> bytes (GiB by default), also accepts M/K suffixes."""
+    m = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?)i?B?\s*', text, re.I)
+    if not m:
+        raise argparse.ArgumentTypeError(f"Invalid size: {text}")
+    scale = {'': 1 << 30, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}[m.group(2).upper()]
+    return int(float(m.group(1)) * scale)
+
+
+def format_table(report: dict) -> str:
+    lines = [f"{'Phase':<12}{'Status':<11}{'Seconds':>9}{'Saved s':>9}{'Restored':>11}{'Stored':>11}  Key"]
+    for p in report['phases']:
+        saved = f"{p['saved_seconds']:>9.1f}" if 'saved_seconds' in p else f"{'-':>9}"
+        restored = f"{p['restored_bytes'] / 1e6:>9.1f}MB" if p.get('restored_bytes') else f"{'-':>11}"
+        stored = f"{p['saved_bytes'] / 1e6:>9.1f}MB" if p.get('saved_bytes') else f"{'-':>11}"
+        lines.append(f"{p['phase']:<12}{p['status']:<11}{p['seconds']:>9.1f}{saved}{restored}{stored}  {p['key']}")
+    if report['cache']:
+        c = report['cache']
+        state = 'hit' if c.get('exact') else 'fallback' if c.get('restored') else 'miss'
+        lines.append(f"\nCache key: {c['key']} ({state})")
+    for w in report['warnings']:
+        lines.append(f"WARNING: {w}")
+    status = 'DRY RUN' if report['dry_run'] else 'SUCCEEDED' if report['succeeded'] else 'FAILED'
+    lines.append(f"\nBuild {status} in {report['total_seconds']:.1f}s | Skipped phases saved ~{report['saved_seconds']:.1f}s")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main runner entry point."""
+    parser = argparse.ArgumentParser(description='Run a CodeBuild buildspec locally with phase caching')
+    parser.add_argument('--buildspec', default='buildspec.yml', help='Buildspec file')
+    parser.add_argument('--src', default='.', help='Source directory (CODEBUILD_SRC_DIR)')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR), help='Local cache store')
+    parser.add_argument('--max-cache-size', type=parse_size, default=parse_size('5'), help='Store size (GiB)')
+    parser.add_argument('--inputs', action='append', default=[], metavar='PHASE=GLOB[,GLOB]',
+                        help='Override the files hashed for a phase')
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help='Extra variables')
+    parser.add_argument('--no-skip', action='store_true', help='Run every phase (still refreshes the cache)')
+    parser.add_argument('--dry-run', action='store_true', help='Show which phases would run or be skipped')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    try:
+        spec = load_buildspec(args.buildspec)
+        inputs = {}
+        for item in args.inputs:
+            phase, _, globs = item.partition('=')
+            if phase not in PHASES or not globs:
+                raise BuildspecError(f"Invalid --inputs {item!r}")
+            inputs[phase] = globs.split(',')
+        env = dict(item.split('=', 1) for item in args.env if '=' in item)
+    except (OSError, yaml.YAMLError, BuildspecError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    if not os.path.isdir(args.src):
+        print(f"Source directory not found: {args.src}", file=sys.stderr)
+        return 4
+
+    store = CacheStore(Path(args.cache_dir), args.max_cache_size)
+    hasher = FileHasher(Path(args.cache_dir) / 'filehash.json')
+    try:
+        runner = BuildRunner(spec, args.src, store, hasher, inputs, env, skip=not args.no_skip,
+                             dry_run=args.dry_run)
+        report = runner.execute()
+    finally:
+        hasher.save()
+        store.close()
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+    return 0 if report['succeeded'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Pipeline execution analytics for aws-codepipeline skill.
+Category: cloud
+
+Reads exported CodePipeline execution history and shows where lead time
+goes. Every action run becomes a row in a set of NumPy columns (run,
+stage, action, runOrder, start, end, status), so thousands of executions
+are processed with sorts and segment reductions instead of per-run loops.
+
+Per run the stage/action DAG is rebuilt (stages in order, actions with
+the same runOrder in parallel, each runOrder group waiting for the
+previous one); from it come:
+
+- queue time (ready -> started) and run time (started -> finished) per action
+- the critical path: in each group the action that finished last
+- flaky actions: failed then succeeded on retry in the same execution, or
+  both failed and succeeded for the same source revision
+- recommendations: runOrder groups or stages without artifact dependencies
+  that could run in parallel, slow build/test actions on the critical
+  path that are rebuilt for revisions already built (cache candidates),
+  long queues and flaky actions
+
+Inputs (any mix of JSON files; JSON lines also accepted):
+    aws codepipeline list-pipeline-executions --pipeline-name P > executions.json
+    aws codepipeline list-action-executions --pipeline-name P > actions.json
+    aws codepipeline get-pipeline --name P > pipeline.json     # optional: runOrder, artifacts
+
+Usage:
+    python pipeline_analytics.py executions.json actions.json [pipeline.json]
+                                 [--since 2024-05-01] [--top 15] [--format table|json]
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+STATUSES = ('Succeeded', 'Failed', 'InProgress', 'Abandoned', 'Stopped', 'Stopping', 'Superseded')
+SUCCEEDED, FAILED = 0, 1
+# Tolerance when inferring runOrder groups from timestamps (seconds)
+OVERLAP_TOLERANCE = 1.0
+# Offset separating (run, stage) segments in cumulative maxima (seconds)
+SEGMENT_SPAN = 1e9
+CACHE_CATEGORIES = ('Build', 'Test')
+PARALLEL_CATEGORIES = ('Build', 'Test', 'Invoke')
+MIN_RUNS = 3
+
+
+def to_epoch(value):
+    """Epoch seconds from an ISO timestamp or an epoch number (seconds or ms)."""
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def load_exports(paths: list):
+    """
+    Collect executions, action executions and the pipeline definition.
+
+    Returns:
+        tuple: (executions by id, list of action execution dicts, pipeline dict or None)
+    """
+    executions, actions, pipeline = {}, {}, None
+
+    def take(obj):
+        nonlocal pipeline
+        if isinstance(obj, list):
+            for item in obj:
+                take(item)
+        elif isinstance(obj, dict):
+            if 'pipeline' in obj and isinstance(obj['pipeline'], dict):
+                pipeline = obj['pipeline']
+            for key in ('pipelineExecutionSummaries', 'actionExecutionDetails'):
+                if key in obj:
+                    take(obj[key])
+            if 'pipelineExecution' in obj:
+                take(obj['pipelineExecution'])
+            if 'actionExecutionId' in obj:
+                actions[obj['actionExecutionId']] = obj
+            elif 'pipelineExecutionId' in obj and 'status' in obj:
+                executions.setdefault(obj['pipelineExecutionId'], {}).update(obj)
+
+    for path in paths:
+        with open(path, 'r') as f:
+            text = f.read()
+        try:
+            take(json.loads(text))
+        except json.JSONDecodeError:
+            for line in text.splitlines():
+                if line.strip():
+                    take(json.loads(line))
+    return executions, list(actions.values()), pipeline
+
+
+def segment_starts(*keys) -> np.ndarray:
+    """Boolean mask of rows where any of the (sorted) key columns changes."""
+    n = len(keys[0])
+    mask = np.zeros(n, dtype=bool)
+    if n:
+        mask[0] = True
+    for k in keys:
+        mask[1:] |= k[1:] != k[:-1]
+    return mask
+
+
+class ExecutionTable:
+    """
+    Action runs of one pipeline as parallel NumPy columns.
+
+    Rows are sorted by (run, stage, runOrder, start). Only the last attempt
+    of each action in a run is kept in the DAG columns; earlier attempts
+    feed the retry/flaky statistics.
+    """
+
+    def __init__(self, executions: dict, actions: list, pipeline: dict = None, since: float = None):
+        self.pipeline = pipeline
+        definition = self._definition(pipeline)
+
+        run_ids = sorted(executions, key=lambda e: to_epoch(executions[e].get('startTime')))
+        run_start = np.array([to_epoch(executions[r].get('startTime')) for r in run_ids])
+        run_end = np.array([to_epoch(executions[r].get('lastUpdateTime')) for r in run_ids])
+        run_status = np.array([executions[r].get('status', '') for r in run_ids])
+        keep = np.isin(run_status, ('Succeeded', 'Failed', 'Stopped', 'Superseded')) & np.isfinite(run_end)
+        if since is not None:
+            keep &= run_start >= since
+        self.run_ids = [r for r, k in zip(run_ids, keep) if k]
+        self.run_start, self.run_end, self.run_status = run_start[keep], run_end[keep], run_status[keep]
+        self.run_revision = np.array([self._revision(executions[r]) for r in self.run_ids], dtype=object)
+        run_index = {r: i for i, r in enumerate(self.run_ids)}
+
+        rows = [a for a in actions if a.get('pipelineExecutionId') in run_index
+                and a.get('startTime') is not None and a.get('lastUpdateTime') is not None]
+        stage_names = sorted({a['stageName'] for a in rows})
+        action_keys = sorted({(a['stageName'], a['actionName']) for a in rows})
+        self.stage_names = stage_names
+        self.action_keys = action_keys
+        stage_code = {s: i for i, s in enumerate(stage_names)}
+        action_code = {k: i for i, k in enumerate(action_keys)}
+
+        run = np.array([run_index[a['pipelineExecutionId']] for a in rows], dtype=np.int64)
+        stage = np.array([stage_code[a['stageName']] for a in rows], dtype=np.int64)
+        action = np.array([action_code[(a['stageName'], a['actionName'])] for a in rows], dtype=np.int64)
+        start = np.array([to_epoch(a['startTime']) for a in rows])
+        end = np.array([to_epoch(a['lastUpdateTime']) for a in rows])
+        status_code = {s: i for i, s in enumerate(STATUSES)}
+        status = np.array([status_code.get(a.get('status'), len(STATUSES)) for a in rows], dtype=np.int64)
+
+        # Per-action metadata (category, artifacts), from the definition when available
+        self.category = ['' for _ in action_keys]
+        self.inputs = [set() for _ in action_keys]
+        self.outputs = [set() for _ in action_keys]
+        self.defined_order = np.zeros(len(action_keys), dtype=np.int64)
+        for a in rows:
+            i = action_code[(a['stageName'], a['actionName'])]
+            inp, out = a.get('input') or {}, a.get('output') or {}
+            self.category[i] = self.category[i] or (inp.get('actionTypeId') or {}).get('category', '')
+            self.inputs[i].update(x['name'] for x in inp.get('inputArtifacts') or [] if 'name' in x)
+            self.outputs[i].update(x['name'] for x in out.get('outputArtifacts') or [] if 'name' in x)
+        for (s, name), meta in definition.items():
+            i = action_code.get((s, name))
+            if i is not None:
+                self.category[i] = meta['category'] or self.category[i]
+                self.inputs[i] |= meta['inputs']
+                self.outputs[i] |= meta['outputs']
+                self.defined_order[i] = meta['runOrder']
+        self.stage_rank = self._stage_ranks(pipeline, run, stage, start)
+
+        # Attempts: sort by (run, action, start); the last attempt of each pair is the DAG node
+        order = np.lexsort((start, action, run))
+        run, stage, action, start, end, status = (c[order] for c in (run, stage, action, start, end, status))
+        last = np.ones(len(run), dtype=bool)
+        if len(run):
+            last[:-1] = (run[1:] != run[:-1]) | (action[1:] != action[:-1])
+        attempts = np.diff(np.flatnonzero(np.r_[True, last])) if len(run) else np.zeros(0, dtype=np.int64)
+        first_of_pair = np.flatnonzero(np.r_[True, last[:-1]]) if len(run) else np.zeros(0, dtype=np.int64)
+        any_failed = np.add.reduceat(status == FAILED, first_of_pair) > 0 if len(run) else np.zeros(0, bool)
+
+        self.retry_run, self.retry_action = run[last], action[last]
+        self.retry_flaky = (attempts > 1) & any_failed & (status[last] == SUCCEEDED)
+        self.attempts = attempts
+
+        # DAG columns
+        self.run, self.stage, self.action = run[last], stage[last], action[last]
+        self.start, self.end, self.status = start[last], end[last], status[last]
+        self.retried = attempts > 1
+        self.run_order = self._run_order()
+        self._schedule()
+
+    @staticmethod
+    def _definition(pipeline):
+        meta = {}
+        for stage in (pipeline or {}).get('stages', []):
+            for a in stage.get('actions', []):
+                meta[(stage['name'], a['name'])] = {
+                    'category': (a.get('actionTypeId') or {}).get('category', ''),
+                    'runOrder': int(a.get('runOrder', 1)),
+                    'inputs': {x['name'] for x in a.get('inputArtifacts') or []},
+                    'outputs': {x['name'] for x in a.get('outputArtifacts') or []},
+                }
+        return meta
+
+    @staticmethod
+    def _revision(execution):
+        revisions = execution.get('sourceRevisions') or []
+        return '|'.join(sorted(r.get('revisionId', '') for r in revisions)) or None
+
+    def _stage_ranks(self, pipeline, run, stage, start) -> np.ndarray:
+        """Stage order: from the definition, else by median start offset within runs."""
+        ranks = np.arange(len(self.stage_names))
+        if pipeline:
+            position = {s['name']: i for i, s in enumerate(pipeline.get('stages', []))}
+            return np.array([position.get(s, len(position) + i) for i, s in enumerate(self.stage_names)])
+        if len(start):
+            offset = start - self.run_start[run]
+            medians = np.array([np.median(offset[stage == s]) if np.any(stage == s) else np.inf
+                                for s in range(len(self.stage_names))])
+            ranks = np.argsort(np.argsort(medians, kind='stable'), kind='stable')
+        return ranks
+
+    def _run_order(self) -> np.ndarray:
+        """runOrder per row: defined, or inferred from which actions overlap in time."""
+        if np.all(self.defined_order[self.action] > 0) and len(self.action):
+            return self.defined_order[self.action]
+        rank = self.stage_rank[self.stage]
+        order = np.lexsort((self.start, rank, self.run))
+        run, rank, start, end = self.run[order], rank[order], self.start[order], self.end[order]
+        seg = segment_starts(run, rank)
+        seg_id = np.cumsum(seg) - 1
+        seg_first = start[seg][seg_id]
+        # Running max of end times within each (run, stage), made monotone across segments by an offset
+        shifted = (end - seg_first) + seg_id * SEGMENT_SPAN
+        running = np.maximum.accumulate(shifted)
+        prev_max = np.r_[-np.inf, running[:-1]] - seg_id * SEGMENT_SPAN + seg_first
+        new_group = seg | (start >= prev_max - OVERLAP_TOLERANCE)
+        group = np.cumsum(new_group)
+        inferred = group - group[np.flatnonzero(seg)][seg_id] + 1
+        out = np.empty_like(inferred)
+        out[order] = inferred
+        return out
+
+    def _schedule(self):
+        """Ready time, queue time, run time and critical-path membership for every row."""
+        rank = self.stage_rank[self.stage]
+        order = np.lexsort((self.start, self.run_order, rank, self.run))
+        for name in ('run', 'stage', 'action', 'start', 'end', 'status', 'retried', 'run_order',
+                     'attempts', 'retry_flaky', 'retry_run', 'retry_action'):
+            setattr(self, name, getattr(self, name)[order])
+        rank = rank[order]
+        n = len(self.run)
+        self.group_first = np.flatnonzero(segment_starts(self.run, rank, self.run_order)) if n else np.zeros(0, np.int64)
+        group_of = np.cumsum(segment_starts(self.run, rank, self.run_order)) - 1 if n else np.zeros(0, np.int64)
+        group_end = np.maximum.reduceat(self.end, self.group_first) if n else np.zeros(0)
+        group_run = self.run[self.group_first] if n else np.zeros(0, np.int64)
+        first_in_run = segment_starts(group_run) if n else np.zeros(0, bool)
+        prev_end = np.r_[np.nan, group_end[:-1]]
+        group_ready = np.where(first_in_run, self.run_start[group_run], prev_end)
+        self.ready = group_ready[group_of] if n else np.zeros(0)
+        self.queue = np.maximum(self.start - self.ready, 0.0)
+        self.duration = np.maximum(self.end - self.start, 0.0)
+        # Critical row per group: the one that finished last
+        critical = np.zeros(n, dtype=bool)
+        if n:
+            by_end = np.lexsort((self.end, group_of))
+            last_of_group = np.r_[group_of[by_end][1:] != group_of[by_end][:-1], True]
+            critical[by_end[last_of_group]] = True
+        self.critical = critical
+        self.critical_seconds = np.where(critical, np.maximum(self.end - self.ready, 0.0), 0.0)
+        self.group_of = group_of
+        self.group_ready, self.group_end, self.group_run = group_ready, group_end, group_run
+
+    # --- aggregation ----------------------------------------------------------
+
+    def lead_times(self) -> np.ndarray:
+        ok = self.run_status == 'Succeeded'
+        return (self.run_end - self.run_start)[ok]
+
+    def stage_durations(self) -> np.ndarray:
+        """runs x stages matrix of stage wall time (ready of first group to end of last), NaN if absent."""
+        matrix = np.full((len(self.run_ids), len(self.stage_names)), np.nan)
+        if not len(self.run):
+            return matrix
+        stage_of_group = self.stage[self.group_first]
+        key = self.group_run * len(self.stage_names) + stage_of_group
+        first = np.flatnonzero(segment_starts(key))
+        ready = self.group_ready[first]
+        end = np.maximum.reduceat(self.group_end, first)
+        matrix[self.group_run[first], stage_of_group[first]] = end - ready
+        return matrix
+
+    def revision_flags(self):
+        """
+        Per DAG row: (failed run of a revision that also succeeded for the same
+        action, successful run of a revision that had already succeeded).
+        """
+        n = len(self.run)
+        flaky, rebuilt = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        if not n:
+            return flaky, rebuilt
+        names, run_code = np.unique(np.array([r or '' for r in self.run_revision], dtype=str),
+                                    return_inverse=True)
+        code = run_code[self.run]
+        known = (names != '')[code]
+        # Segments of (action, revision), each in start order
+        order = np.lexsort((self.start, code, self.action))
+        starts = segment_starts(self.action[order], code[order])
+        first = np.flatnonzero(starts)
+        segment = np.cumsum(starts) - 1
+        failed = self.status[order] == FAILED
+        succeeded = self.status[order] == SUCCEEDED
+        mixed = np.logical_or.reduceat(failed, first) & np.logical_or.reduceat(succeeded, first)
+        flaky[order] = mixed[segment] & failed & known[order]
+        # Successes before each row within its segment
+        done = np.cumsum(succeeded) - succeeded
+        earlier = done - done[first][segment]
+        rebuilt[order] = succeeded & (earlier > 0) & known[order]
+        return flaky, rebuilt
+
+    def per_action(self) -> list:
+        """Statistics per action across runs."""
+        stats = []
+        order = np.argsort(self.action, kind='stable')
+        bounds = np.flatnonzero(segment_starts(self.action[order])) if len(order) else []
+        splits = np.split(order, bounds[1:]) if len(order) else []
+        # A run is flaky when it failed and then succeeded on retry, or failed
+        # for a revision that succeeded in another run
+        rev_flaky, rebuilt = self.revision_flags()
+        flaky = self.retry_flaky | rev_flaky
+        for idx in splits:
+            a = int(self.action[idx[0]])
+            stage, name = self.action_keys[a]
+            runs = len(idx)
+            dur, queue = self.duration[idx], self.queue[idx]
+            status = self.status[idx]
+            # Successful runs of a revision that had already succeeded earlier: rebuilt work
+            rebuilt_seconds = float(np.sum(dur[rebuilt[idx]]))
+            stats.append({
+                'stage': stage,
+                'action': name,
+                'category': self.category[a],
+                'runs': runs,
+                'run_p50_s': round(float(np.median(dur)), 1),
+                'run_p90_s': round(float(np.percentile(dur, 90)), 1),
+                'queue_p50_s': round(float(np.median(queue)), 1),
+                'queue_p90_s': round(float(np.percentile(queue, 90)), 1),
+                'failure_rate': round(float(np.mean(status == FAILED)), 4),
+                'retries': int(np.sum(self.attempts[idx] - 1)),
+                'flaky_rate': round(float(np.mean(flaky[idx])), 4),
+                'critical_share': round(float(np.mean(self.critical[idx])), 4),
+                'critical_seconds': round(float(np.sum(self.critical_seconds[idx])), 1),
+                'rebuilt_seconds': round(rebuilt_seconds, 1),
+                'run_order': int(np.bincount(self.run_order[idx]).argmax()),
+            })
+        return stats
+
+    def recommendations(self, actions: list, stage_matrix: np.ndarray,
+                        cache_min: float = 120, queue_min: float = 60, flaky_min: float = 0.05) -> list:
+        """Parallelize / cache / queue / flaky findings, largest estimated saving first."""
+        recs = []
+        ordered_stages = [self.stage_names[i] for i in np.argsort(self.stage_rank)]
+        by_stage = {}
+        for a in actions:
+            by_stage.setdefault(a['stage'], []).append(a)
+        has_artifacts = any(self.inputs) or any(self.outputs)
+        index = {k: i for i, k in enumerate(self.action_keys)}
+
+        def produced(items):
+            out = set()
+            for a in items:
+                out |= self.outputs[index[(a['stage'], a['action'])]]
+            return out
+
+        def consumed(items):
+            out = set()
+            for a in items:
+                out |= self.inputs[index[(a['stage'], a['action'])]]
+            return out
+
+        if has_artifacts:
+            # runOrder groups inside a stage that do not consume each other's artifacts
+            for stage_name, items in by_stage.items():
+                groups = {}
+                for a in items:
+                    groups.setdefault(a['run_order'], []).append(a)
+                orders = sorted(groups)
+                for prev, nxt in zip(orders, orders[1:]):
+                    earlier = [a for o in orders if o <= prev for a in groups[o]]
+                    if any(a['category'] not in PARALLEL_CATEGORIES for a in groups[prev] + groups[nxt]):
+                        continue
+                    if consumed(groups[nxt]) & produced(earlier):
+                        continue
+                    saving = min(max(a['run_p50_s'] for a in groups[prev]), max(a['run_p50_s'] for a in groups[nxt]))
+                    recs.append({'type': 'parallelize', 'stage': stage_name, 'saving_s': round(saving, 1),
+                                 'detail': f"runOrder {nxt} ({', '.join(a['action'] for a in groups[nxt])}) uses no "
+                                           f"artifact of runOrder {prev}; give it runOrder {prev}"})
+            # Adjacent stages of build/test actions without artifact dependencies
+            for prev, nxt in zip(ordered_stages, ordered_stages[1:]):
+                a_prev, a_next = by_stage.get(prev, []), by_stage.get(nxt, [])
+                if not a_prev or not a_next:
+                    continue
+                if any(a['category'] not in PARALLEL_CATEGORIES for a in a_prev + a_next):
+                    continue
+                if consumed(a_next) & produced(a_prev):
+                    continue
+                col_p, col_n = self.stage_names.index(prev), self.stage_names.index(nxt)
+                both = np.isfinite(stage_matrix[:, col_p]) & np.isfinite(stage_matrix[:, col_n])
+                if not np.any(both):
+                    continue
+                saving = float(np.median(np.minimum(stage_matrix[both, col_p], stage_matrix[both, col_n])))
+                recs.append({'type': 'parallelize', 'stage': nxt, 'saving_s': round(saving, 1),
+                             'detail': f"stage {nxt} uses no artifact of {prev}; merge them and run the actions "
+                                       f"in parallel"})
+
+        for a in actions:
+            if a['runs'] < MIN_RUNS:
+                continue
+            label = f"{a['stage']}/{a['action']}"
+            if (a['category'] in CACHE_CATEGORIES and a['critical_share'] >= 0.5
+                    and a['run_p50_s'] >= cache_min):
+                recs.append({'type': 'cache', 'stage': a['stage'], 'saving_s': round(a['rebuilt_seconds'] / a['runs'], 1),
+                             'detail': f"{label} is on the critical path in {a['critical_share']:.0%} of runs "
+                                       f"(p50 {a['run_p50_s']:.0f}s, {a['rebuilt_seconds']:.0f}s re-running revisions "
+                                       f"already built); add a keyed dependency cache or skip unchanged inputs"})
+            if a['category'] != 'Approval' and a['queue_p50_s'] >= queue_min:
+                recs.append({'type': 'queue', 'stage': a['stage'], 'saving_s': a['queue_p50_s'],
+                             'detail': f"{label} waits {a['queue_p50_s']:.0f}s (p50) before starting; check "
+                                       f"CodeBuild concurrency, disabled transitions or stage locks"})
+            if a['flaky_rate'] >= flaky_min:
+                recs.append({'type': 'flaky', 'stage': a['stage'],
+                             'saving_s': round(a['flaky_rate'] * a['run_p50_s'], 1),
+                             'detail': f"{label} is flaky in {a['flaky_rate']:.0%} of runs "
+                                       f"({a['retries']} retries); fix or quarantine the unstable step"})
+        if not has_artifacts:
+            recs.append({'type': 'note', 'stage': None, 'saving_s': 0.0,
+                         'detail': 'No artifact information; pass get-pipeline output to find parallelizable work'})
+        recs.sort(key=lambda r: r['saving_s'], reverse=True)
+        return recs
+
+
+def percentile(values: np.ndarray, q: float):
+    return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+
+def build_report(table: ExecutionTable, top: int = 15, **thresholds) -> dict:
+    lead = table.lead_times()
+    matrix = table.stage_durations()
+    actions = table.per_action()
+    lead_median = float(np.median(lead)) if len(lead) else None
+    stages = []
+    for col in np.argsort(table.stage_rank):
+        values = matrix[:, col]
+        values = values[np.isfinite(values)]
+        if not len(values):
+            continue
+        critical = float(np.sum(table.critical_seconds[table.stage == col]))
+        stages.append({
+            'stage': table.stage_names[col],
+            'runs': int(len(values)),
+            'p50_s': percentile(values, 50),
+            'p90_s': percentile(values, 90),
+            'lead_time_share': round(float(np.median(values)) / lead_median, 4) if lead_median else None,
+            'critical_seconds': round(critical, 1),
+        })
+    actions.sort(key=lambda a: a['critical_seconds'], reverse=True)
+    # Critical rows are already in (run, stage, runOrder) order: split them per run
+    rows = np.flatnonzero(table.critical)
+    names = np.array([name for _, name in table.action_keys], dtype=object)[table.action[rows]]
+    path_counts = {}
+    for path in np.split(names, np.flatnonzero(segment_starts(table.run[rows]))[1:]) if len(rows) else []:
+        key = ' > '.join(path)
+        path_counts[key] = path_counts.get(key, 0) + 1
+    paths = sorted(path_counts.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    return {
+        'pipeline': (table.pipeline or {}).get('name'),
+        'runs': len(table.run_ids),
+        'succeeded': int(np.sum(table.run_status == 'Succeeded')),
+        'lead_time_p50_s': percentile(lead, 50),
+        'lead_time_p90_s': percentile(lead, 90),
+        'stages': stages,
+        'actions': actions[:top],
+        'critical_paths': [{'path': p, 'runs': c} for p, c in paths],
+        'recommendations': table.recommendations(actions, matrix, **thresholds),
+    }
+
+
+def format_table(report: dict) -> str:
+    def cell(v, width=9):
+        return f"{v:>{width}.1f}" if v is not None else f"{'-':>{width}}"
+
+    lines = [f"Pipeline: {report['pipeline'] or '-'} | Runs: {report['runs']} ({report['succeeded']} succeeded) | "
+             f"Lead time p50 {report['lead_time_p50_s'] or 0:.0f}s, p90 {report['lead_time_p90_s'] or 0:.0f}s",
+             '', f"{'Stage':<24}{'Runs':>6}{'p50 s':>9}{'p90 s':>9}{'Share':>8}{'Crit s':>11}"]
+    for s in report['stages']:
+        share = f"{s['lead_time_share']:>8.0%}" if s['lead_time_share'] is not None else f"{'-':>8}"
+        lines.append(f"{s['stage']:<24}{s['runs']:>6}{cell(s['p50_s'])}{cell(s['p90_s'])}{share}{s['critical_seconds']:>11.0f}")
+    lines += ['', f"{'Action':<36}{'Runs':>6}{'Run p50':>9}{'Queue p50':>10}{'Crit':>7}{'Fail':>7}{'Flaky':>7}"]
+    for a in report['actions']:
+        label = f"{a['stage']}/{a['action']}"[:35]
+        lines.append(f"{label:<36}{a['runs']:>6}{a['run_p50_s']:>9.1f}{a['queue_p50_s']:>10.1f}"
+                     f"{a['critical_share']:>7.0%}{a['failure_rate']:>7.0%}{a['flaky_rate']:>7.0%}")
+    if report['critical_paths']:
+        lines += ['', 'Most common critical paths']
+        lines += [f"  {p['runs']:>5} runs  {p['path']}" for p in report['critical_paths']]
+    if report['recommendations']:
+        lines += ['', 'Recommendations']
+        lines += [f"  [{r['type']}] ~{r['saving_s']:.0f}s  {r['detail']}" for r in report['recommendations']]
+    return '\n'.join(lines)
+
+
+def main():
+    """Main analytics entry point."""
+    parser = argparse.ArgumentParser(description='Critical path and bottleneck report for CodePipeline executions')
+    parser.add_argument('paths', nargs='+', help='Execution / action execution / get-pipeline JSON exports')
+    parser.add_argument('--since', help='Only runs started at or after this ISO date')
+    parser.add_argument('--top', type=int, default=15, help='Actions to list')
+    parser.add_argument('--cache-min', type=float, default=120, help='Minimum p50 seconds for cache findings')
+    parser.add_argument('--queue-min', type=float, default=60, help='Minimum p50 queue seconds for queue findings')
+    parser.add_argument('--flaky-min', type=float, default=0.05, help='Minimum flaky rate for flaky findings')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    try:
+        executions, actions, pipeline = load_exports(args.paths)
+        since = to_epoch(args.since) if args.since else None
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    if not executions or not actions:
+        print("Need both pipeline executions and action executions", file=sys.stderr)
+        return 3
+
+    table = ExecutionTable(executions, actions, pipeline, since)
+    if not len(table.run_ids):
+        print("No finished executions in range", file=sys.stderr)
+        return 3
+    report = build_report(table, args.top, cache_min=args.cache_min, queue_min=args.queue_min,
+                          flaky_min=args.flaky_min)
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Tests for scripts/pipeline_analytics.py per-action statistics."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from pipeline_analytics import ExecutionTable, build_report  # noqa: E402
+
+# Stage order differs from the alphabetical order of (stage, action)
+PIPELINE = {'name': 'app', 'stages': [
+    {'name': 'Source', 'actions': [{'name': 'Checkout', 'runOrder': 1}]},
+    {'name': 'Build', 'actions': [{'name': 'Compile', 'runOrder': 1}]},
+]}
+
+
+def make_table(runs: int = 3):
+    executions, actions = {}, []
+
+    def action(run_id, stage, name, start, end, status):
+        actions.append({'actionExecutionId': f"{run_id}-{len(actions)}", 'pipelineExecutionId': run_id,
+                        'stageName': stage, 'actionName': name, 'startTime': start, 'lastUpdateTime': end,
+                        'status': status})
+
+    for r in range(runs):
+        run_id, t = f"run-{r}", 1_700_000_000 + r * 10_000
+        executions[run_id] = {'pipelineExecutionId': run_id, 'status': 'Succeeded',
+                              'startTime': t, 'lastUpdateTime': t + 400}
+        if r == 0:
+            # Only Checkout fails, and succeeds on retry in the same execution
+            action(run_id, 'Source', 'Checkout', t, t + 20, 'Failed')
+            action(run_id, 'Source', 'Checkout', t + 30, t + 50, 'Succeeded')
+        else:
+            action(run_id, 'Source', 'Checkout', t, t + 20, 'Succeeded')
+        action(run_id, 'Build', 'Compile', t + 60, t + 300, 'Succeeded')
+    return ExecutionTable(executions, actions, PIPELINE)
+
+
+def test_retries_are_credited_to_the_failing_action():
+    stats = {a['action']: a for a in make_table().per_action()}
+    assert stats['Checkout']['retries'] == 1
+    assert stats['Checkout']['flaky_rate'] == round(1 / 3, 4)
+    assert stats['Compile']['retries'] == 0
+    assert stats['Compile']['flaky_rate'] == 0.0
+
+
+def test_critical_paths_are_counted_per_run():
+    report = build_report(make_table(4))
+    assert report['critical_paths'] == [{'path': 'Checkout > Compile', 'runs': 4}]
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Cost Explorer response cache for aws-cost-optimization skill.
+Category: cloud
+
+Wraps the Cost Explorer client used by /aws-costs with a local SQLite
+cache. Queries are normalised so equivalent flag combinations share
+entries, DAILY results are stored one day at a time so any sub-range is
+answered from cache (MONTHLY views are rolled up from the same days),
+and only the missing days are fetched. Days in closed billing months are
+kept forever; days in the current month, estimated days and forecasts
+expire after a short TTL. Concurrent identical requests in one process
+share a single API call, and a per-query file lock does the same across
+processes.
+
+Usage:
+    python ce_cache.py [--days 30] [--granularity DAILY|MONTHLY]
+                       [--group-by SERVICE] [--metric UnblendedCost]
+                       [--forecast] [--stats] [--clear]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('AWS_COSTS_CACHE_DIR', '~/.cache/aws-costs')).expanduser()
+CURRENT_PERIOD_TTL = 3600
+FORECAST_TTL = 6 * 3600
+RECOMMENDATION_TTL = 24 * 3600
+
+# Request keys that do not change the meaning of a query
+VOLATILE_KEYS = ('NextPageToken',)
+
+
+def normalize(value):
+    """
+    Canonicalise a request so equivalent queries hash identically.
+
+    Lists of plain strings (Metrics, Values) are order-insensitive and
+    sorted; other lists keep their order because GroupBy order decides the
+    order of group Keys in the response. Dicts are serialised with sorted
+    keys by the caller.
+    """
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        items = [normalize(v) for v in value]
+        if all(isinstance(v, str) for v in items):
+            return sorted(set(items))
+        return items
+    return value
+
+
+def query_key(operation: str, params: dict) -> str:
+    """Stable hash for an operation and its normalised parameters."""
+    payload = json.dumps({'op': operation, 'params': normalize(params)}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def parse_date(value: str) -> date:
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def day_ranges(days: list) -> list:
+    """Collapse sorted dates into contiguous [start, end) ranges."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [(start, end) for start, end in ranges]
+
+
+def add_amounts(target: dict, source: dict):
+    """Sum CE metric dicts ({'Metric': {'Amount': '1.2', 'Unit': 'USD'}})."""
+    for metric, value in source.items():
+        current = target.setdefault(metric, {'Amount': '0', 'Unit': value.get('Unit', '')})
+        current['Amount'] = repr(float(current['Amount']) + float(value['Amount']))
+
+
+class CostExplorerCache:
+    """
+    Caching, coalescing front-end for Cost Explorer calls.
+
+    Args:
+        client: boto3 'ce' client (created lazily when omitted)
+        cache_dir: Directory holding the SQLite cache and lock files
+        current_ttl: Seconds to keep current-month and estimated days
+        today: Callable returning today's date (injectable for tests)
+    """
+
+    def __init__(self, client=None, cache_dir=DEFAULT_CACHE_DIR,
+                 current_ttl: int = CURRENT_PERIOD_TTL, today=date.today):
+        self._client = client
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.current_ttl = current_ttl
+        self.today = today
+        self.stats = {'hits': 0, 'misses': 0, 'api_calls': 0, 'coalesced': 0}
+        self._local = threading.local()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        with self._db() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)'
+            )
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('ce')
+        return self._client
+
+    # Storage
+
+    @contextmanager
+    def _db(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_dir / 'ce-cache.sqlite3', timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    def _get_many(self, keys: list) -> dict:
+        found = {}
+        now = time.time()
+        with self._db() as db:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = db.execute(
+                    f"SELECT key, value, expires FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, value, expires in rows:
+                    if expires is None or expires > now:
+                        found[key] = json.loads(value)
+        return found
+
+    def _put_many(self, items: list):
+        with self._db() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)',
+                [(key, json.dumps(value), expires) for key, value, expires in items],
+            )
+
+    def clear(self):
+        with self._db() as db:
+            db.execute('DELETE FROM entries')
+
+    def purge_expired(self) -> int:
+        with self._db() as db:
+            return db.execute('DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?',
+                              (time.time(),)).rowcount
+
+    def day_expiry(self, day: date, estimated: bool):
+        """Closed, final billing days never expire; everything else gets a short TTL."""
+        today = self.today()
+        month_start = today.replace(day=1)
+        if day < month_start and not estimated:
+            return None
+        return time.time() + self.current_ttl
+
+    # Coalescing
+
+    def _single_flight(self, key: str, fn):
+        """Run fn once per key among concurrent callers in this process and across processes."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            with self._file_lock(key):
+                result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    @contextmanager
+    def _file_lock(self, key: str):
+        if not HAS_FCNTL:
+            yield
+            return
+        lock_dir = self.cache_dir / 'locks'
+        lock_dir.mkdir(exist_ok=True)
+        with open(lock_dir / f"{key[:32]}.lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # Cost and usage
+
+    def get_cost_and_usage(self, **params) -> dict:
+        """
+        Drop-in replacement for ce.get_cost_and_usage.
+
+        DAILY and MONTHLY requests are served from per-day cache entries;
+        only days that are missing or expired are requested from CE, as
+        the smallest set of contiguous DAILY ranges. HOURLY requests are
+        cached as whole responses.
+
+        Args:
+            **params: Same keyword arguments as the boto3 call
+
+        Returns:
+            dict: Response with ResultsByTime, GroupDefinitions, ...
+        """
+        granularity = params.get('Granularity', 'MONTHLY')
+        if granularity == 'HOURLY':
+            return self.cached_call('get_cost_and_usage', self.current_ttl, **params)
+
+        start = parse_date(params['TimePeriod']['Start'])
+        end = parse_date(params['TimePeriod']['End'])
+        base = {k: v for k, v in params.items() if k not in ('TimePeriod', 'Granularity', 'NextPageToken')}
+        base_key = query_key('get_cost_and_usage:DAILY', base)
+        days = [start + timedelta(days=i) for i in range((end - start).days)]
+
+        def day_key(day):
+            return f"{base_key}:{day.isoformat()}"
+
+        definitions_key = f"{base_key}:definitions"
+        cached = self._get_many([day_key(d) for d in days] + [definitions_key])
+        missing = [d for d in days if day_key(d) not in cached]
+        self.stats['hits'] += len(days) - len(missing)
+
+        if missing:
+            fetched = self._single_flight(
+                f"{base_key}:{missing[0]}:{missing[-1]}:{len(missing)}",
+                lambda: self._fetch_days(base, base_key, missing),
+            )
+            cached.update(fetched)
+
+        daily = [cached[day_key(d)] for d in days if day_key(d) in cached]
+        definitions = cached.get(definitions_key, [])
+        if granularity == 'MONTHLY':
+            results = self._roll_up_months(daily, end)
+        else:
+            results = daily
+        return {
+            'GroupDefinitions': definitions,
+            'ResultsByTime': results,
+            'DimensionValueAttributes': [],
+        }
+
+    def _fetch_days(self, base: dict, base_key: str, missing: list) -> dict:
+        # Another process may have filled the gap while we waited on the lock
+        keys = [f"{base_key}:{d.isoformat()}" for d in missing]
+        found = self._get_many(keys)
+        still_missing = [d for d in missing if f"{base_key}:{d.isoformat()}" not in found]
+        self.stats['misses'] += len(still_missing)
+
+        items = []
+        definitions = None
+        for start, end in day_ranges(still_missing):
+            request = dict(base, TimePeriod={'Start': start.isoformat(), 'End': end.isoformat()},
+                           Granularity='DAILY')
+            by_day = {}
+            for page in self._paginate('get_cost_and_usage', request):
+                definitions = page.get('GroupDefinitions', definitions)
+                for result in page.get('ResultsByTime', []):
+                    day = result['TimePeriod']['Start']
+                    entry = by_day.get(day)
+                    if entry is None:
+                        by_day[day] = result
+                    else:
+                        entry.setdefault('Groups', []).extend(result.get('Groups', []))
+            for day, result in by_day.items():
+                key = f"{base_key}:{day}"
+                expires = self.day_expiry(parse_date(day), result.get('Estimated', False))
+                items.append((key, result, expires))
+                found[key] = result
+        if definitions is not None:
+            items.append((f"{base_key}:definitions", definitions, None))
+            found[f"{base_key}:definitions"] = definitions
+        if items:
+            self._put_many(items)
+        return found
+
+    def _paginate(self, operation: str, request: dict):
+        method = getattr(self.client, operation)
+        token = None
+        while True:
+            kwargs = dict(request, NextPageToken=token) if token else request
+            self.stats['api_calls'] += 1
+            page = method(**kwargs)
+            yield page
+            token = page.get('NextPageToken')
+            if not token:
+                return
+
+    @staticmethod
+    def _roll_up_months(daily: list, end: date) -> list:
+        months = {}
+        for result in daily:
+            day = parse_date(result['TimePeriod']['Start'])
+            month = day.replace(day=1)
+            bucket = months.get(month)
+            if bucket is None:
+                bucket = months[month] = {
+                    'TimePeriod': {'Start': day.isoformat(), 'End': day.isoformat()},
+                    'Total': {}, 'Groups': {}, 'Estimated': False,
+                }
+            bucket['TimePeriod']['End'] = (day + timedelta(days=1)).isoformat()
+            bucket['Estimated'] = bucket['Estimated'] or result.get('Estimated', False)
+            add_amounts(bucket['Total'], result.get('Total', {}))
+            for group in result.get('Groups', []):
+                keys = tuple(group['Keys'])
+                target = bucket['Groups'].setdefault(keys, {'Keys': list(keys), 'Metrics': {}})
+                add_amounts(target['Metrics'], group.get('Metrics', {}))
+        results = []
+        for month in sorted(months):
+            bucket = months[month]
+            bucket['Groups'] = list(bucket['Groups'].values())
+            results.append(bucket)
+        return results
+
+    # Other Cost Explorer calls
+
+    def cached_call(self, operation: str, ttl: int, **params) -> dict:
+        """
+        Cache a whole CE response for `ttl` seconds, coalescing concurrent callers.
+
+        Args:
+            operation: boto3 method name (e.g. get_cost_forecast)
+            ttl: Seconds before the entry expires
+            **params: Keyword arguments for the call
+
+        Returns:
+            dict: Fresh or cached response
+        """
+        key = query_key(operation, params)
+        found = self._get_many([key])
+        if key in found:
+            self.stats['hits'] += 1
+            return found[key]
+
+        def fetch():
+            again = self._get_many([key])
+            if key in again:
+                return again[key]
+            self.stats['misses'] += 1
+            self.stats['api_calls'] += 1
+            response = getattr(self.client, operation)(**params)
+            response.pop('ResponseMetadata', None)
+            self._put_many([(key, response, time.time() + ttl)])
+            return response
+
+        return self._single_flight(key, fetch)
+
+    def get_cost_forecast(self, **params) -> dict:
+        return self.cached_call('get_cost_forecast', FORECAST_TTL, **params)
+
+    def get_rightsizing_recommendation(self, **params) -> dict:
+        return self.cached_call('get_rightsizing_recommendation', RECOMMENDATION_TTL, **params)
+
+    def get_savings_plans_purchase_recommendation(self, **params) -> dict:
+        return self.cached_call('get_savings_plans_purchase_recommendation', RECOMMENDATION_TTL, **params)
+
+
+def main():
+    """Cached /aws-costs query entry point."""
+    parser = argparse.ArgumentParser(description='Cached Cost Explorer queries')
+    parser.add_argument('--days', type=int, default=30, help='Days to analyze (1-365)')
+    parser.add_argument('--granularity', default='DAILY', choices=['DAILY', 'MONTHLY'])
+    parser.add_argument('--group-by', default='SERVICE', help='Dimension to group by')
+    parser.add_argument('--metric', action='append', default=None, help='Cost metric(s)')
+    parser.add_argument('--forecast', action='store_true', help='Include 30-day forecast')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR))
+    parser.add_argument('--ttl', type=int, default=CURRENT_PERIOD_TTL, help='Current-month TTL (seconds)')
+    parser.add_argument('--stats', action='store_true', help='Print cache statistics to stderr')
+    parser.add_argument('--clear', action='store_true', help='Empty the cache and exit')
+    args = parser.parse_args()
+
+    if not 1 <= args.days <= 365:
+        print("--days must be between 1 and 365", file=sys.stderr)
+        return 4
+
+    cache = CostExplorerCache(cache_dir=args.cache_dir, current_ttl=args.ttl)
+    if args.clear:
+        cache.clear()
+        print("Cache cleared")
+        return 0
+
+    end = date.today()
+    start = end - timedelta(days=args.days)
+    try:
+        result = {
+            'cost_and_usage': cache.get_cost_and_usage(
+                TimePeriod={'Start': start.isoformat(), 'End': end.isoformat()},
+                Granularity=args.granularity,
+                Metrics=args.metric or ['UnblendedCost'],
+                GroupBy=[{'Type': 'DIMENSION', 'Key': args.group_by}],
+            ),
+        }
+        if args.forecast:
+            result['forecast'] = cache.get_cost_forecast(
+                TimePeriod={'Start': end.isoformat(), 'End': (end + timedelta(days=30)).isoformat()},
+                Metric='UNBLENDED_COST',
+                Granularity='MONTHLY',
+            )
+    except Exception as e:
+        print(f"API error: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2, default=str))
+    if args.stats:
+        print(json.dumps(cache.stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
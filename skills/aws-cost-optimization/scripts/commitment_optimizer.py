@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Savings Plan / Reserved Instance commitment optimizer for aws-cost-optimization skill.
+Category: cloud
+
+Finds the hourly commitment that maximizes savings for every usage series
+(instance family + region) from hourly on-demand usage. Each series is
+sorted once; the cumulative coverage curve then gives the covered spend
+for every candidate commitment level, so the optimum over all levels and
+all series is a single vectorized argmax instead of a per-hour loop.
+
+For a commitment c (on-demand dollars per hour) with discount d over T hours:
+
+    covered(c) = sum(min(u_t, c))
+    savings(c) = covered(c) - T * c * (1 - d)
+
+Usage input (CSV, optionally .gz), one row per series:
+
+    family,region,<hour>,<hour>,...
+    m5,us-east-1,12.48,12.10,...
+
+Usage:
+    python commitment_optimizer.py USAGE.csv [--plan ec2_instance_sp|compute_sp|standard_ri]
+                                   [--term 1yr|3yr] [--payment no_upfront|partial_upfront|all_upfront]
+                                   [--format table|json]
+    python commitment_optimizer.py --cur STORE --start 2025-01-01 --end 2026-01-01 [...]
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+# Typical discounts vs on-demand; override with --discount for negotiated rates
+DISCOUNTS = {
+    'compute_sp': {
+        '1yr': {'no_upfront': 0.28, 'partial_upfront': 0.31, 'all_upfront': 0.33},
+        '3yr': {'no_upfront': 0.46, 'partial_upfront': 0.50, 'all_upfront': 0.52},
+    },
+    'ec2_instance_sp': {
+        '1yr': {'no_upfront': 0.37, 'partial_upfront': 0.40, 'all_upfront': 0.42},
+        '3yr': {'no_upfront': 0.57, 'partial_upfront': 0.60, 'all_upfront': 0.62},
+    },
+    'standard_ri': {
+        '1yr': {'no_upfront': 0.36, 'partial_upfront': 0.39, 'all_upfront': 0.41},
+        '3yr': {'no_upfront': 0.56, 'partial_upfront': 0.60, 'all_upfront': 0.62},
+    },
+}
+
+UPFRONT_SHARE = {'no_upfront': 0.0, 'partial_upfront': 0.5, 'all_upfront': 1.0}
+TERM_HOURS = {'1yr': 8760, '3yr': 26280}
+CURVE_POINTS = (0.25, 0.5, 0.75, 1.0, 1.25)
+CHUNK = 1024
+
+# CUR usage types look like USE1-BoxUsage:m5.large, EU-BoxUsage:m5.large or BoxUsage:c6g.xlarge
+BOX_USAGE_RE = re.compile(r'^(?:(?P<region>[A-Z0-9]+)-)?BoxUsage:(?P<family>[a-z0-9-]+)\.')
+
+
+def parse_row(text: str) -> np.ndarray:
+    """Comma-separated values; empty cells become NaN."""
+    cells = text.split(',')
+    try:
+        return np.array(cells, dtype=np.float64)
+    except ValueError:
+        return np.array([float(c) if c.strip() else np.nan for c in cells])
+
+
+def load_usage_csv(path: str):
+    """
+    Load hourly usage series from a wide CSV export.
+
+    Args:
+        path: CSV or CSV.gz file (family,region,hour values...)
+
+    Returns:
+        tuple: (labels list of (family, region), usage array series x hours)
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    labels, rows = [], []
+    with opener(path, 'rt') as f:
+        header = f.readline().rstrip('\n').split(',')
+        width = len(header) - 2
+        for line in f:
+            family, _, rest = line.partition(',')
+            region, _, rest = rest.partition(',')
+            row = parse_row(rest) if rest.strip() else np.empty(0)
+            if len(row) != width:
+                padded = np.zeros(width)
+                padded[:min(width, len(row))] = row[:width]
+                row = padded
+            labels.append((family, region))
+            rows.append(row)
+    usage = np.vstack(rows) if rows else np.empty((0, width))
+    return labels, np.nan_to_num(usage)
+
+
+def load_usage_cur(store_path: str, start: str, end: str):
+    """
+    Build hourly on-demand usage series from a cur_engine store.
+
+    Only BoxUsage (on-demand instance hours) line items count; series are
+    keyed by instance family and the region code in the usage type. Usage
+    types are mapped to their series first, so the hourly matrix has one
+    row per family/region rather than one per usage type.
+
+    Returns:
+        tuple: (labels, usage matrix, BoxUsage usage types that were not recognised)
+    """
+    sys.path.insert(0, str(Path(__file__).parent))
+    from cur_engine import CurStore, date_to_hour
+
+    store = CurStore(store_path)
+    start_hour, end_hour = date_to_hour(start), date_to_hour(end)
+    hours = end_hour - start_hour
+
+    # usage_type dictionary code -> series row, -1 for other usage
+    index = {}
+    usage_types = store.dictionary('usage_type')
+    series_of = np.full(len(usage_types), -1, dtype=np.int64)
+    unknown = np.zeros(len(usage_types), dtype=bool)
+    for code, usage_type in enumerate(usage_types):
+        match = BOX_USAGE_RE.match(usage_type)
+        if match:
+            key = (match.group('family'), match.group('region') or 'USE1')
+            series_of[code] = index.setdefault(key, len(index))
+        elif 'BoxUsage' in usage_type:
+            unknown[code] = True
+    seen = np.zeros(len(usage_types), dtype=bool)
+
+    usage = np.zeros(len(index) * hours)
+    usage_codes = store.codes_for('line_item_type', ['Usage'])
+    for part in store.manifest['parts']:
+        hour = store.load(part, 'usage_start')
+        types = store.load(part, 'usage_type')
+        amounts = store.load(part, 'unblended_cost')
+        if types is None or amounts is None:
+            continue
+        mask = (hour >= start_hour) & (hour < end_hour)
+        item_types = store.load(part, 'line_item_type')
+        mask &= np.isin(item_types, usage_codes) if item_types is not None else bool(0 in usage_codes)
+        series = series_of[types[mask]]
+        keep = series >= 0
+        seen[types[mask][~keep]] = True
+        usage += np.bincount(series[keep] * hours + (hour[mask][keep] - start_hour),
+                             weights=amounts[mask][keep], minlength=len(usage))
+    labels = sorted(index, key=index.get)
+    unmatched = [usage_types[code] for code in np.flatnonzero(unknown & seen)]
+    return labels, usage.reshape(len(index), hours), unmatched
+
+
+def optimize(usage: np.ndarray, discounts) -> list:
+    """
+    Optimal hourly commitment per series from cumulative coverage curves.
+
+    Each chunk of series is sorted once and reused for every discount, so
+    comparing all plan/term/payment options costs one sort.
+
+    Args:
+        usage: Hourly on-demand spend, shape (series, hours)
+        discounts: Fractional discounts of the commitment vs on-demand
+
+    Returns:
+        list: Per discount, a dict of arrays keyed by commitment, savings,
+            coverage, utilization, on_demand and curve
+    """
+    n, hours = usage.shape
+    results = []
+    for _ in discounts:
+        out = {key: np.zeros(n) for key in ('commitment', 'savings', 'coverage', 'utilization', 'on_demand')}
+        out['curve'] = np.zeros((n, len(CURVE_POINTS)))
+        results.append(out)
+    ranks = np.arange(hours)
+
+    for start in range(0, n, CHUNK):
+        rows = slice(start, min(start + CHUNK, n))
+        ordered = np.sort(usage[rows], axis=1)
+        cumulative = np.cumsum(ordered, axis=1)
+        # covered spend if the commitment equals each sorted hourly value
+        covered = cumulative - ordered + ordered * (hours - ranks)
+        total = cumulative[:, -1] if hours else np.zeros(ordered.shape[0])
+        pick = np.arange(ordered.shape[0])
+
+        for discount, out in zip(discounts, results):
+            savings = covered - hours * ordered * (1 - discount)
+            best = np.argmax(savings, axis=1)
+            best_savings = np.maximum(savings[pick, best], 0)
+            commitment = np.where(best_savings > 0, ordered[pick, best], 0)
+            best_covered = np.where(best_savings > 0, covered[pick, best], 0)
+
+            out['commitment'][rows] = commitment
+            out['savings'][rows] = best_savings
+            out['on_demand'][rows] = total
+            out['coverage'][rows] = np.divide(best_covered, total, out=np.zeros_like(total),
+                                              where=total > 0)
+            capacity = commitment * hours
+            out['utilization'][rows] = np.divide(best_covered, capacity, out=np.zeros_like(total),
+                                                 where=capacity > 0)
+
+            # Savings at fractions of the optimum, to show how flat the curve is
+            for j, fraction in enumerate(CURVE_POINTS):
+                level = commitment * fraction
+                position = np.count_nonzero(ordered < level[:, None], axis=1)
+                below = np.take_along_axis(cumulative, np.maximum(position - 1, 0)[:, None], axis=1)[:, 0]
+                below = np.where(position > 0, below, 0)
+                covered_level = below + level * (hours - position)
+                out['curve'][rows, j] = covered_level - hours * level * (1 - discount)
+    return results
+
+
+def build_report(labels: list, result: dict, hours: int, plan: str, term: str, payment: str,
+                 rate: float) -> dict:
+    """Turn one optimize() result into the JSON-serialisable recommendation."""
+    annualize = 8760 / hours if hours else 0
+    series = []
+    for i, (family, region) in enumerate(labels):
+        if result['on_demand'][i] == 0:
+            continue
+        commitment = float(result['commitment'][i])
+        series.append({
+            'family': family,
+            'region': region,
+            'hourly_commitment_on_demand': round(commitment, 4),
+            'hourly_commitment_cost': round(commitment * (1 - rate), 4),
+            'coverage_pct': round(100 * float(result['coverage'][i]), 1),
+            'utilization_pct': round(100 * float(result['utilization'][i]), 1),
+            'annual_savings': round(float(result['savings'][i]) * annualize, 2),
+            'savings_curve': {
+                f"{int(fraction * 100)}%": round(float(value) * annualize, 2)
+                for fraction, value in zip(CURVE_POINTS, result['curve'][i])
+            },
+        })
+    series.sort(key=lambda s: s['annual_savings'], reverse=True)
+
+    hourly_cost = sum(s['hourly_commitment_cost'] for s in series)
+    annual_on_demand = float(result['on_demand'].sum()) * annualize
+    annual_savings = sum(s['annual_savings'] for s in series)
+    return {
+        'plan': plan,
+        'term': term,
+        'payment': payment,
+        'discount': rate,
+        'hours_analyzed': hours,
+        'summary': {
+            'hourly_commitment': round(hourly_cost, 2),
+            'upfront_payment': round(hourly_cost * TERM_HOURS[term] * UPFRONT_SHARE[payment], 2),
+            'annual_on_demand': round(annual_on_demand, 2),
+            'annual_savings': round(annual_savings, 2),
+            'savings_pct': round(100 * annual_savings / annual_on_demand, 1) if annual_on_demand else 0.0,
+        },
+        'series': series,
+    }
+
+
+def plan_reports(labels: list, usage: np.ndarray, options: list) -> list:
+    """
+    Build commitment recommendations for several plan/term/payment options.
+
+    Compute Savings Plans float across families and regions, so they are
+    sized on the fleet total; EC2 Instance Savings Plans and Standard RIs
+    are sized per family and region.
+
+    Args:
+        labels: (family, region) per usage row
+        usage: Hourly on-demand spend (series x hours)
+        options: (plan, term, payment, discount) tuples
+
+    Returns:
+        list: One report dict per option, in the same order
+    """
+    hours = usage.shape[1]
+    fleet = usage.sum(axis=0, keepdims=True)
+    per_series = [o for o in options if o[0] != 'compute_sp']
+    pooled = [o for o in options if o[0] == 'compute_sp']
+
+    reports = {}
+    for group, matrix, group_labels in ((per_series, usage, labels),
+                                        (pooled, fleet, [('all', 'all')])):
+        if not group:
+            continue
+        results = optimize(matrix, [o[3] for o in group])
+        for option, result in zip(group, results):
+            plan, term, payment, rate = option
+            reports[option] = build_report(group_labels, result, hours, plan, term, payment, rate)
+    return [reports[o] for o in options]
+
+
+def all_options() -> list:
+    return [
+        (plan, term, payment, rate)
+        for plan, terms in DISCOUNTS.items()
+        for term, payments in terms.items()
+        for payment, rate in payments.items()
+    ]
+
+
+def format_table(report: dict, top: int) -> str:
+    s = report['summary']
+    lines = [
+        f"{report['plan']} | {report['term']} | {report['payment']} | discount {report['discount']:.0%}",
+        f"Hourly commitment: ${s['hourly_commitment']:,.2f}  Upfront: ${s['upfront_payment']:,.2f}",
+        f"Annual on-demand: ${s['annual_on_demand']:,.2f}  Savings: ${s['annual_savings']:,.2f} "
+        f"({s['savings_pct']}%)",
+        '',
+        f"{'Family':<12}{'Region':<14}{'Commit/h':>10}{'Coverage':>10}{'Util':>8}{'Savings/yr':>14}",
+    ]
+    for r in report['series'][:top]:
+        lines.append(
+            f"{r['family']:<12}{r['region']:<14}{r['hourly_commitment_cost']:>10.2f}"
+            f"{r['coverage_pct']:>9.1f}%{r['utilization_pct']:>7.1f}%{r['annual_savings']:>14,.2f}"
+        )
+    if 'options' in report:
+        lines += ['', f"{'Plan':<17}{'Term':<6}{'Payment':<17}{'Commit/h':>12}{'Upfront':>16}{'Savings/yr':>16}"]
+        for o in report['options']:
+            lines.append(f"{o['plan']:<17}{o['term']:<6}{o['payment']:<17}{o['hourly_commitment']:>12,.2f}"
+                         f"{o['upfront_payment']:>16,.2f}{o['annual_savings']:>16,.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main optimizer entry point."""
+    parser = argparse.ArgumentParser(description='Size Savings Plans / RIs from hourly usage')
+    parser.add_argument('usage', nargs='?', help='Hourly usage CSV (family,region,hours...)')
+    parser.add_argument('--cur', help='cur_engine store to read BoxUsage from instead of a CSV')
+    parser.add_argument('--start', help='Start date for --cur (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Exclusive end date for --cur (YYYY-MM-DD)')
+    parser.add_argument('--plan', choices=sorted(DISCOUNTS), default='ec2_instance_sp')
+    parser.add_argument('--term', choices=sorted(TERM_HOURS), default='1yr')
+    parser.add_argument('--payment', choices=sorted(UPFRONT_SHARE), default='no_upfront')
+    parser.add_argument('--discount', type=float, default=None, help='Override discount (0-1)')
+    parser.add_argument('--compare', action='store_true', help='Compare all plan/term/payment options')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    if args.discount is not None and not 0 < args.discount < 1:
+        print("--discount must be between 0 and 1", file=sys.stderr)
+        return 4
+    if args.cur:
+        if not (args.start and args.end):
+            print("--start and --end are required with --cur", file=sys.stderr)
+            return 4
+        labels, usage, unmatched = load_usage_cur(args.cur, args.start, args.end)
+        if unmatched:
+            print(f"Warning: {len(unmatched)} BoxUsage usage type(s) not recognised and left out "
+                  f"of the baseline: {', '.join(sorted(unmatched)[:5])}", file=sys.stderr)
+    elif args.usage and Path(args.usage).exists():
+        labels, usage = load_usage_csv(args.usage)
+    else:
+        print("Usage file or --cur store required", file=sys.stderr)
+        return 4
+
+    if usage.size == 0 or not usage.any():
+        print("No usage data", file=sys.stderr)
+        return 3
+
+    rate = DISCOUNTS[args.plan][args.term][args.payment] if args.discount is None else args.discount
+    selected = (args.plan, args.term, args.payment, rate)
+    if args.compare:
+        options = all_options()
+        if selected not in options:
+            options.append(selected)
+        reports = plan_reports(labels, usage, options)
+        report = reports[options.index(selected)]
+        report['options'] = sorted(
+            ({'plan': r['plan'], 'term': r['term'], 'payment': r['payment'], **r['summary']} for r in reports),
+            key=lambda r: r['annual_savings'], reverse=True,
+        )
+    else:
+        report = plan_reports(labels, usage, [selected])[0]
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Batch cost forecasting engine for aws-cost-optimization skill.
+Category: cloud
+
+Fits a trend + weekly seasonality + month-start model to the daily cost
+history of thousands of series (service, account or tag) at once. All
+series share one design matrix, so a single least-squares solve fits the
+whole batch; prediction intervals come from each series' residual spread
+and the parameter covariance. Missing days (NaN, or days before a series
+first shows up in the CUR) are left out of that series' fit rather than
+counted as zero spend. Anomalies are found by fitting the history before
+the inspected window and testing the window's days against that
+forecast band, so a recent level shift cannot hide in its own fit.
+
+Usage input (CSV, optionally .gz), one row per series:
+
+    series,<YYYY-MM-DD>,<YYYY-MM-DD>,...
+    Amazon EC2|123456789012,410.20,398.75,...
+
+Usage:
+    python cost_forecast.py HISTORY.csv [--horizon 30] [--confidence 0.95]
+                            [--anomaly-days 14] [--anomaly-sigma 3] [--format table|json|csv]
+    python cost_forecast.py --cur STORE [--group-by SERVICE|ACCOUNT|TAG] [--tag KEY]
+                            [--days 180] [...]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+
+# Two-sided normal quantiles for the supported confidence levels
+Z_SCORES = {0.80: 1.2816, 0.90: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+MIN_HISTORY_DAYS = 14
+
+# Store columns a --cur history can be grouped by (cur_engine.GROUP_BY plus TAG)
+GROUP_BY_CHOICES = ['ACCOUNT', 'LINE_ITEM_TYPE', 'REGION', 'SERVICE', 'TAG', 'USAGE_TYPE']
+
+
+def parse_row(text: str) -> np.ndarray:
+    """Comma-separated values; empty cells become NaN."""
+    cells = text.split(',')
+    try:
+        return np.array(cells, dtype=np.float64)
+    except ValueError:
+        return np.array([float(c) if c.strip() else np.nan for c in cells])
+
+
+def load_history_csv(path: str):
+    """
+    Load daily cost series from a wide CSV export.
+
+    Args:
+        path: CSV or CSV.gz file (series,date columns...)
+
+    Returns:
+        tuple: (series labels, first date, costs array series x days)
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    labels, rows = [], []
+    with opener(path, 'rt', newline='') as f:
+        header = next(csv.reader([f.readline()]))
+        width = len(header) - 1
+        first = datetime.strptime(header[1], '%Y-%m-%d').date()
+        for line in f:
+            label, _, rest = line.partition(',')
+            row = parse_row(rest) if rest.strip() else np.empty(0)
+            if len(row) != width:
+                padded = np.full(width, np.nan)
+                padded[:min(width, len(row))] = row[:width]
+                row = padded
+            labels.append(label)
+            rows.append(row)
+    history = np.vstack(rows) if rows else np.empty((0, width))
+    return labels, first, history
+
+
+def load_history_cur(store_path: str, group_by: str, tag: str, days: int, end: str = None):
+    """Daily cost series per group from a cur_engine store, clamped to the days it holds."""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from cur_engine import CurStore, GROUP_BY, date_to_hour, hour_to_date, tag_column
+
+    store = CurStore(store_path)
+    low, high = store.time_range()
+    if high is None:
+        return [], None, np.empty((0, 0))
+    end = end or hour_to_date(high + 24)
+    end_hour = date_to_hour(end)
+    # Days before the first CUR row would enter the fit as zero spend
+    start_hour = max(end_hour - days * 24, date_to_hour(hour_to_date(low)))
+    days = max((end_hour - start_hour) // 24, 0)
+    column = tag_column(tag) if group_by == 'TAG' else GROUP_BY[group_by]
+    daily = store.aggregate(start_hour, end_hour, column, None, 'DAILY')
+
+    groups = sorted({group for _, group in daily})
+    row_of = {group: i for i, group in enumerate(groups)}
+    history = np.zeros((len(groups), days))
+    for (bucket, group), amount in daily.items():
+        history[row_of[group], (bucket - start_hour) // 24] = amount
+    # A series that starts mid-window has no data before its first charge
+    started = np.argmax(history != 0, axis=1)
+    history[np.arange(days)[None, :] < started[:, None]] = np.nan
+    labels = [group or '(none)' for group in groups]
+    first = datetime.strptime(hour_to_date(start_hour), '%Y-%m-%d').date()
+    return labels, first, history
+
+
+def design_matrix(first: date, days: int, offset: int = 0) -> np.ndarray:
+    """
+    Shared regressors: intercept, linear trend, day-of-week and month-start.
+
+    Month-start captures charges billed on the 1st (support, upfront fees).
+    """
+    dates = [first + timedelta(days=offset + i) for i in range(days)]
+    t = np.arange(offset, offset + days, dtype=np.float64)
+    weekday = np.array([d.weekday() for d in dates])
+    columns = [np.ones(days), t]
+    for dow in range(1, 7):
+        columns.append((weekday == dow).astype(np.float64))
+    columns.append(np.array([d.day == 1 for d in dates], dtype=np.float64))
+    return np.column_stack(columns)
+
+
+def fit_forecast(history: np.ndarray, first: date, horizon: int = 30, confidence: float = 0.95) -> dict:
+    """
+    Fit every series in one batched least-squares solve and forecast.
+
+    Complete series share one normal matrix; series with missing days get
+    their own, built from the days they have.
+
+    Args:
+        history: Daily costs, shape (series, days); NaN days are left out of the fit
+        first: Date of the first column
+        horizon: Days to forecast
+        confidence: Prediction interval level (0.80, 0.90, 0.95, 0.99)
+
+    Returns:
+        dict: fitted, sigma, forecast, lower, upper, leverage arrays and total/interval sums
+    """
+    z = Z_SCORES[confidence]
+    observed = np.isfinite(history)
+    y = np.where(observed, history, 0.0)
+    n, days = y.shape
+    X = design_matrix(first, days)
+    X_future = design_matrix(first, horizon, offset=days)
+
+    # Drop regressors that are constant zero in the window (e.g. no month start)
+    usable = np.any(X != 0, axis=0)
+    X, X_future = X[:, usable], X_future[:, usable]
+    params = X.shape[1]
+
+    if observed.all():
+        gram_inv = np.broadcast_to(np.linalg.pinv(X.T @ X), (n, params, params))
+    else:
+        gram_inv = np.linalg.pinv(np.einsum('sd,dp,dq->spq', observed.astype(np.float64), X, X))
+    coef = np.einsum('spq,sq->sp', gram_inv, y @ X)     # (series, params)
+    fitted = coef @ X.T
+    residuals = np.where(observed, y - fitted, 0.0)
+    dof = np.maximum(observed.sum(axis=1) - params, 1)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+
+    forecast = np.maximum(coef @ X_future.T, 0)
+    # Per-day and horizon-sum variance factors
+    leverage = np.einsum('hp,spq,hq->sh', X_future, gram_inv, X_future)
+    spread = z * sigma[:, None] * np.sqrt(1 + leverage)
+    ones = X_future.sum(axis=0)
+    sum_factor = np.sqrt(horizon + np.einsum('p,spq,q->s', ones, gram_inv, ones))
+    total = forecast.sum(axis=1)
+
+    return {
+        'fitted': fitted,
+        'sigma': sigma,
+        'forecast': forecast,
+        'lower': np.maximum(forecast - spread, 0),
+        'upper': forecast + spread,
+        'leverage': leverage,
+        'total': total,
+        'total_lower': np.maximum(total - z * sigma * sum_factor, 0),
+        'total_upper': total + z * sigma * sum_factor,
+    }
+
+
+def detect_anomalies(history: np.ndarray, first: date, recent_days: int,
+                     threshold: float = 3.0) -> list:
+    """
+    Flag recent days whose actual cost lies outside the band forecast from
+    the days before them.
+
+    Args:
+        history: Daily costs (series x days)
+        first: Date of the first column
+        recent_days: How many trailing days to inspect
+        threshold: Band half-width in residual standard deviations
+
+    Returns:
+        list: (series index, date, actual, expected, deviation in sigmas);
+        empty when fewer than MIN_HISTORY_DAYS days precede the window
+    """
+    days = history.shape[1]
+    start = max(days - recent_days, 0)
+    if start < MIN_HISTORY_DAYS or start == days:
+        return []
+    baseline = fit_forecast(history[:, :start], first, days - start)
+    actual = history[:, start:]
+    expected = baseline['forecast']
+    sigma = baseline['sigma'][:, None]
+    band = threshold * sigma * np.sqrt(1 + baseline['leverage'])
+    outside = np.isfinite(actual) & (np.abs(np.nan_to_num(actual) - expected) > band)
+    outside &= sigma > 0
+    anomalies = []
+    for i, j in zip(*np.nonzero(outside)):
+        anomalies.append((
+            int(i), first + timedelta(days=start + int(j)), float(actual[i, j]),
+            float(expected[i, j]), float((actual[i, j] - expected[i, j]) / sigma[i, 0]),
+        ))
+    return anomalies
+
+
+def build_report(labels: list, first: date, history: np.ndarray, horizon: int,
+                 confidence: float, recent_days: int, threshold: float = 3.0) -> dict:
+    """
+    Forecast all series and collect anomalies into one report.
+
+    Returns:
+        dict: JSON-serialisable forecast report
+    """
+    days = history.shape[1]
+    model = fit_forecast(history, first, horizon, confidence)
+    anomalies = detect_anomalies(history, first, recent_days, threshold)
+    forecast_start = first + timedelta(days=days)
+
+    series = []
+    for i, label in enumerate(labels):
+        series.append({
+            'series': label,
+            'history_total': round(float(np.nansum(history[i])), 2),
+            'forecast': round(float(model['total'][i]), 2),
+            'lower': round(float(model['total_lower'][i]), 2),
+            'upper': round(float(model['total_upper'][i]), 2),
+            'daily': [
+                {
+                    'date': (forecast_start + timedelta(days=d)).isoformat(),
+                    'mean': round(float(model['forecast'][i, d]), 2),
+                    'lower': round(float(model['lower'][i, d]), 2),
+                    'upper': round(float(model['upper'][i, d]), 2),
+                }
+                for d in range(horizon)
+            ],
+        })
+    series.sort(key=lambda s: s['forecast'], reverse=True)
+
+    return {
+        'period': {
+            'start': forecast_start.isoformat(),
+            'end': (forecast_start + timedelta(days=horizon - 1)).isoformat(),
+        },
+        'confidence': confidence,
+        'summary': {
+            'series': len(labels),
+            'forecast_total': round(float(model['total'].sum()), 2),
+            'anomalies': len(anomalies),
+        },
+        'forecasts': series,
+        'anomalies': [
+            {
+                'series': labels[i],
+                'date': day.isoformat(),
+                'actual': round(actual, 2),
+                'expected': round(expected, 2),
+                'sigmas': round(deviation, 1),
+            }
+            for i, day, actual, expected, deviation in sorted(anomalies, key=lambda a: -abs(a[4]))
+        ],
+    }
+
+
+def format_table(report: dict, top: int) -> str:
+    summary = report['summary']
+    lines = [
+        f"Forecast {report['period']['start']} to {report['period']['end']} "
+        f"({int(report['confidence'] * 100)}% interval)",
+        f"Series: {summary['series']} | Total: ${summary['forecast_total']:,.2f} | "
+        f"Anomalies: {summary['anomalies']}",
+        '',
+        f"{'Series':<40}{'Forecast':>14}{'Lower':>14}{'Upper':>14}",
+    ]
+    for s in report['forecasts'][:top]:
+        lines.append(f"{s['series'][:39]:<40}{s['forecast']:>14,.2f}{s['lower']:>14,.2f}{s['upper']:>14,.2f}")
+    if report['anomalies']:
+        lines += ['', f"{'Anomaly':<40}{'Date':<12}{'Actual':>12}{'Expected':>12}{'Sigma':>8}"]
+        for a in report['anomalies'][:top]:
+            lines.append(f"{a['series'][:39]:<40}{a['date']:<12}{a['actual']:>12,.2f}"
+                         f"{a['expected']:>12,.2f}{a['sigmas']:>8}")
+    return '\n'.join(lines)
+
+
+def format_csv(report: dict) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['series', 'date', 'mean', 'lower', 'upper'])
+    for s in report['forecasts']:
+        for d in s['daily']:
+            writer.writerow([s['series'], d['date'], d['mean'], d['lower'], d['upper']])
+    return out.getvalue()
+
+
+def main():
+    """Main forecasting entry point."""
+    parser = argparse.ArgumentParser(description='Batch cost forecasting with anomaly flags')
+    parser.add_argument('history', nargs='?', help='Daily cost history CSV (series,dates...)')
+    parser.add_argument('--cur', help='cur_engine store to read daily costs from')
+    parser.add_argument('--group-by', default='SERVICE', choices=GROUP_BY_CHOICES)
+    parser.add_argument('--tag', help='Tag key when grouping by TAG')
+    parser.add_argument('--days', type=int, default=180, help='History days to fit (with --cur)')
+    parser.add_argument('--horizon', type=int, default=30, help='Days to forecast')
+    parser.add_argument('--confidence', type=float, default=0.95, choices=sorted(Z_SCORES))
+    parser.add_argument('--anomaly-days', type=int, default=14, help='Trailing days checked for anomalies')
+    parser.add_argument('--anomaly-sigma', type=float, default=3.0, help='Anomaly band in standard deviations')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+    args = parser.parse_args()
+
+    if not 1 <= args.horizon <= 365:
+        print("--horizon must be between 1 and 365", file=sys.stderr)
+        return 4
+    if args.cur:
+        if args.group_by == 'TAG' and not args.tag:
+            print("--tag is required with --group-by TAG", file=sys.stderr)
+            return 4
+        labels, first, history = load_history_cur(args.cur, args.group_by, args.tag, args.days)
+    elif args.history and Path(args.history).exists():
+        labels, first, history = load_history_csv(args.history)
+    else:
+        print("History file or --cur store required", file=sys.stderr)
+        return 4
+
+    if not labels:
+        print("No cost data", file=sys.stderr)
+        return 3
+    if history.shape[1] < MIN_HISTORY_DAYS:
+        print(f"Need at least {MIN_HISTORY_DAYS} days of history", file=sys.stderr)
+        return 3
+
+    report = build_report(labels, first, history, args.horizon, args.confidence, args.anomaly_days,
+                          args.anomaly_sigma)
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    elif args.format == 'csv':
+        print(format_csv(report), end='')
+    else:
+        print(format_table(report, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
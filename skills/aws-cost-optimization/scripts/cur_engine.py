@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Offline Cost and Usage Report (CUR) engine for aws-cost-optimization skill.
+Category: cloud
+
+Ingests CUR exports (CSV, CSV.gz and Parquet when pyarrow is installed)
+into a local columnar store: one memory-mapped .npy file per column,
+with string columns dictionary-encoded. Group-by, filter and time-bucket
+queries run as vectorized NumPy aggregations and render the same
+table/JSON/CSV outputs as the /aws-costs command.
+
+Usage:
+    python cur_engine.py ingest STORE FILE [FILE ...]
+    python cur_engine.py query STORE [--days 30] [--end YYYY-MM-DD]
+                         [--group-by SERVICE|REGION|ACCOUNT|USAGE_TYPE|TAG]
+                         [--tag KEY] [--service NAME] [--granularity DAILY]
+                         [--compare] [--format table|json|csv]
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+STORE_VERSION = 1
+CHUNK_ROWS = 1_000_000
+
+# CUR (legacy and 2.0) column names mapped to store columns
+COLUMN_ALIASES = {
+    'usage_start': ['lineItem/UsageStartDate', 'line_item_usage_start_date'],
+    'unblended_cost': ['lineItem/UnblendedCost', 'line_item_unblended_cost'],
+    'blended_cost': ['lineItem/BlendedCost', 'line_item_blended_cost'],
+    'usage_amount': ['lineItem/UsageAmount', 'line_item_usage_amount'],
+    'service': ['product/ProductName', 'product_product_name', 'lineItem/ProductCode',
+                'line_item_product_code'],
+    'region': ['product/region', 'product/regionCode', 'product_region_code', 'product_region'],
+    'account': ['lineItem/UsageAccountId', 'line_item_usage_account_id'],
+    'usage_type': ['lineItem/UsageType', 'line_item_usage_type'],
+    'line_item_type': ['lineItem/LineItemType', 'line_item_line_item_type'],
+}
+
+BILLING_PERIOD_COLUMNS = ('bill/BillingPeriodStartDate', 'bill_billing_period_start_date')
+
+# Delivery paths look like .../20240101-20240201/<assembly id>/report-00001.csv.gz
+PERIOD_RE = re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})-\d{8}(?!\d)')
+ASSEMBLY_RE = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+NUMERIC_COLUMNS = ('unblended_cost', 'blended_cost', 'usage_amount')
+TAG_PREFIXES = ('resourceTags/user:', 'resource_tags_user_')
+
+METRICS = {
+    'UnblendedCost': 'unblended_cost',
+    'BlendedCost': 'blended_cost',
+    'UsageQuantity': 'usage_amount',
+}
+
+GROUP_BY = {
+    'SERVICE': 'service',
+    'REGION': 'region',
+    'ACCOUNT': 'account',
+    'USAGE_TYPE': 'usage_type',
+    'LINE_ITEM_TYPE': 'line_item_type',
+}
+
+# Bucket sizes in hours; None aggregates the whole period into one bucket
+GRANULARITY = {'HOURLY': 1, 'DAILY': 24, 'MONTHLY': None, 'NONE': None}
+
+
+class CurStoreError(Exception):
+    """Raised for missing or incompatible stores and bad input files."""
+
+
+def tag_column(key: str) -> str:
+    """Store column name for a cost allocation tag key."""
+    return f"tag:{key}"
+
+
+def parse_hour(value: str, cache: dict) -> int:
+    """
+    Convert a CUR timestamp to hours since the Unix epoch.
+
+    Args:
+        value: ISO 8601 timestamp (e.g. 2025-12-01T00:00:00Z)
+        cache: Memo dict; CUR repeats the same hourly timestamps heavily
+
+    Returns:
+        int: Epoch hour
+    """
+    hour = cache.get(value)
+    if hour is None:
+        stamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        hour = int(stamp.timestamp()) // 3600
+        cache[value] = hour
+    return hour
+
+
+def parquet_cell(value) -> str:
+    """Normalise a Parquet cell to the string form found in CSV exports."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+
+def hour_to_date(hour: int) -> str:
+    return datetime.fromtimestamp(hour * 3600, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def date_to_hour(value: str) -> int:
+    stamp = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return int(stamp.timestamp()) // 3600
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def billing_period(header: list, rows: list):
+    """Billing period start (YYYY-MM-DD) from the first row, when the CUR has the column."""
+    for name in BILLING_PERIOD_COLUMNS:
+        if name in header and rows:
+            index = header.index(name)
+            value = rows[0][index] if index < len(rows[0]) else ''
+            if value:
+                return str(value)[:10]
+    return None
+
+
+class CurStore:
+    """
+    Columnar, memory-mapped CUR store.
+
+    Layout:
+        STORE/manifest.json           columns, dictionaries and part list
+        STORE/part-00000/<col>.npy    one array per column per ingested chunk
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.manifest_path = self.path / 'manifest.json'
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+            if self.manifest.get('version') != STORE_VERSION:
+                raise CurStoreError(f"Unsupported store version: {self.manifest.get('version')}")
+        else:
+            self.manifest = {'version': STORE_VERSION, 'rows': 0, 'parts': [], 'dictionaries': {}}
+        self._lookups = {
+            column: {value: code for code, value in enumerate(values)}
+            for column, values in self.manifest['dictionaries'].items()
+        }
+
+    # Ingest
+
+    def encode(self, column: str, values: list) -> np.ndarray:
+        """Dictionary-encode string values; code 0 is always the empty string."""
+        lookup = self._lookups.get(column)
+        if lookup is None:
+            lookup = self._lookups[column] = {'': 0}
+            self.manifest['dictionaries'][column] = ['']
+        dictionary = self.manifest['dictionaries'][column]
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(dictionary)
+                dictionary.append(value)
+            codes[i] = code
+        return codes
+
+    def write_part(self, columns: dict, source: dict = None):
+        """
+        Persist one chunk of decoded rows as a new part.
+
+        Args:
+            columns: Store column name -> list of raw values
+            source: Billing period, assembly id, file name and digest of the CUR file
+        """
+        rows = len(columns['usage_start'])
+        if rows == 0:
+            return
+        index = self.manifest.get('next_part', len(self.manifest['parts']))
+        self.manifest['next_part'] = index + 1
+        name = f"part-{index:05d}"
+        part_dir = self.path / name
+        part_dir.mkdir(parents=True, exist_ok=True)
+
+        np.save(part_dir / 'usage_start.npy', np.asarray(columns['usage_start'], dtype=np.int64))
+        for column, values in columns.items():
+            if column == 'usage_start':
+                continue
+            if column in NUMERIC_COLUMNS:
+                array = np.asarray(values, dtype=np.float64)
+            else:
+                array = self.encode(column, values)
+            np.save(part_dir / f"{self.file_name(column)}.npy", array)
+
+        self.manifest['parts'].append({'name': name, 'rows': rows, 'columns': sorted(columns),
+                                       'source': source or {}})
+        self.manifest['rows'] += rows
+
+    def drop_parts(self, names: set):
+        """Remove parts (superseded deliveries) from the manifest and disk."""
+        kept = []
+        for part in self.manifest['parts']:
+            if part['name'] in names:
+                self.manifest['rows'] -= part['rows']
+                shutil.rmtree(self.path / part['name'], ignore_errors=True)
+            else:
+                kept.append(part)
+        self.manifest['parts'] = kept
+
+    def superseded(self, source: dict) -> set:
+        """
+        Parts replaced by a delivery of `source`.
+
+        AWS re-publishes every file of a billing period under a new assembly
+        id, so a different assembly id replaces the whole period; the same
+        assembly id (or none) replaces the file with the same name.
+        """
+        if not source.get('period'):
+            return set()
+        names = set()
+        for part in self.manifest['parts']:
+            other = part.get('source') or {}
+            if other.get('period') != source['period']:
+                continue
+            if source.get('assembly') and other.get('assembly') and other['assembly'] != source['assembly']:
+                names.add(part['name'])
+            elif other.get('file') == source['file']:
+                names.add(part['name'])
+        return names
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def file_name(column: str) -> str:
+        return column.replace(':', '__').replace('/', '_')
+
+    def ingest(self, path: str) -> int:
+        """
+        Ingest one CUR file into the store.
+
+        A file already ingested (same content digest) is skipped; a
+        re-delivery of the billing period replaces the earlier parts.
+
+        Args:
+            path: .csv, .csv.gz or .parquet file
+
+        Returns:
+            int: Rows ingested (None when the file was already ingested)
+        """
+        digest = file_digest(path)
+        if any((part.get('source') or {}).get('digest') == digest for part in self.manifest['parts']):
+            return None
+        assembly = ASSEMBLY_RE.findall(path)
+        source = {'file': os.path.basename(path), 'digest': digest,
+                  'assembly': assembly[-1].lower() if assembly else None, 'period': None}
+        period = PERIOD_RE.search(path)
+        if period:
+            source['period'] = '-'.join(period.groups())
+
+        if path.endswith('.parquet'):
+            if not HAS_PYARROW:
+                raise CurStoreError("Parquet ingest requires pyarrow (pip install pyarrow)")
+            batches = self._parquet_batches(path)
+        else:
+            batches = self._csv_batches(path)
+
+        total = 0
+        replaced = None
+        for header, rows in batches:
+            if replaced is None:
+                source['period'] = billing_period(header, rows) or source['period']
+                replaced = self.superseded(source)
+            mapping = self._resolve_columns(header)
+            columns = {column: [] for column in mapping}
+            hour_cache = {}
+            for row in rows:
+                for column, index in mapping.items():
+                    value = row[index] if index < len(row) else ''
+                    if column == 'usage_start':
+                        value = parse_hour(value, hour_cache)
+                    elif column in NUMERIC_COLUMNS:
+                        value = float(value) if value not in ('', None) else 0.0
+                    elif value is None:
+                        value = ''
+                    columns[column].append(value)
+            self.write_part(columns, source)
+            total += len(columns['usage_start'])
+        if replaced:
+            self.drop_parts(replaced)
+        self.save()
+        return total
+
+    @staticmethod
+    def _resolve_columns(header: list) -> dict:
+        positions = {name: i for i, name in enumerate(header)}
+        mapping = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in positions:
+                    mapping[column] = positions[alias]
+                    break
+        for name, index in positions.items():
+            for prefix in TAG_PREFIXES:
+                if name.startswith(prefix):
+                    mapping[tag_column(name[len(prefix):])] = index
+        for required in ('usage_start', 'unblended_cost'):
+            if required not in mapping:
+                raise CurStoreError(f"Missing required CUR column for {required}")
+        return mapping
+
+    @staticmethod
+    def _csv_batches(path: str):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            batch = []
+            for row in reader:
+                batch.append(row)
+                if len(batch) >= CHUNK_ROWS:
+                    yield header, batch
+                    batch = []
+            if batch:
+                yield header, batch
+
+    @staticmethod
+    def _parquet_batches(path: str):
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=CHUNK_ROWS):
+            header = batch.schema.names
+            columns = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
+            yield header, [[parquet_cell(v) for v in row] for row in zip(*columns)]
+
+    # Query
+
+    def load(self, part: dict, column: str):
+        """Memory-map one column of a part (None when the part lacks it)."""
+        if column != 'usage_start' and column not in part['columns']:
+            return None
+        return np.load(self.path / part['name'] / f"{self.file_name(column)}.npy", mmap_mode='r')
+
+    def dictionary(self, column: str) -> list:
+        return self.manifest['dictionaries'].get(column, [''])
+
+    def codes_for(self, column: str, values: list) -> np.ndarray:
+        lookup = self._lookups.get(column, {'': 0})
+        return np.array([lookup[v] for v in values if v in lookup], dtype=np.int32)
+
+    def time_range(self):
+        low, high = None, None
+        for part in self.manifest['parts']:
+            hours = self.load(part, 'usage_start')
+            if len(hours):
+                low = int(hours.min()) if low is None else min(low, int(hours.min()))
+                high = int(hours.max()) if high is None else max(high, int(hours.max()))
+        return low, high
+
+    def aggregate(self, start_hour: int, end_hour: int, group_by: str = None,
+                  filters: dict = None, granularity: str = 'NONE',
+                  metric: str = 'unblended_cost') -> dict:
+        """
+        Vectorized group-by/filter/time-bucket aggregation.
+
+        Args:
+            start_hour: Inclusive epoch hour
+            end_hour: Exclusive epoch hour
+            group_by: Store column to group by (None for totals only)
+            filters: Store column -> list of accepted values
+            granularity: HOURLY, DAILY, MONTHLY or NONE
+            metric: Numeric store column to sum
+
+        Returns:
+            dict: (bucket_start_hour, group_value) -> summed metric
+        """
+        filters = filters or {}
+        group_size = len(self.dictionary(group_by)) if group_by else 1
+        step = GRANULARITY[granularity]
+        monthly = granularity == 'MONTHLY'
+        if monthly:
+            bucket_starts = month_starts(start_hour, end_hour)
+        elif step is None:
+            bucket_starts = np.array([start_hour], dtype=np.int64)
+        else:
+            bucket_starts = np.arange(start_hour, end_hour, step, dtype=np.int64)
+        n_buckets = max(len(bucket_starts), 1)
+        totals = np.zeros(n_buckets * group_size, dtype=np.float64)
+        filter_codes = {column: self.codes_for(column, values) for column, values in filters.items()}
+
+        for part in self.manifest['parts']:
+            hours = self.load(part, 'usage_start')
+            mask = (hours >= start_hour) & (hours < end_hour)
+            if not mask.any():
+                continue
+            for column, codes in filter_codes.items():
+                values = self.load(part, column)
+                if values is None:
+                    accepted = 0 in codes
+                    mask &= accepted
+                else:
+                    mask &= np.isin(values, codes)
+            if not mask.any():
+                continue
+
+            amounts = self.load(part, metric)
+            if amounts is None:
+                continue
+            selected_hours = hours[mask]
+            if monthly:
+                bucket = np.searchsorted(bucket_starts, selected_hours, side='right') - 1
+            elif step is None:
+                bucket = np.zeros(len(selected_hours), dtype=np.int64)
+            else:
+                bucket = (selected_hours - start_hour) // step
+            if group_by:
+                groups = self.load(part, group_by)
+                group = groups[mask] if groups is not None else np.zeros(len(bucket), dtype=np.int64)
+                index = bucket * group_size + group
+            else:
+                index = bucket
+            totals += np.bincount(index, weights=amounts[mask], minlength=len(totals))
+
+        dictionary = self.dictionary(group_by) if group_by else ['Total']
+        grid = totals.reshape(n_buckets, group_size)
+        result = {}
+        for b, g in zip(*np.nonzero(grid)):
+            result[(int(bucket_starts[b]), dictionary[g])] = float(grid[b, g])
+        return result
+
+
+def month_starts(start_hour: int, end_hour: int) -> np.ndarray:
+    """Epoch hours of each calendar month start overlapping [start, end)."""
+    day = datetime.fromtimestamp(start_hour * 3600, tz=timezone.utc)
+    cursor = day.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    starts = [start_hour]
+    while True:
+        cursor = (cursor + timedelta(days=32)).replace(day=1)
+        hour = int(cursor.timestamp()) // 3600
+        if hour >= end_hour:
+            break
+        starts.append(hour)
+    return np.array(starts, dtype=np.int64)
+
+
+def cost_report(store: CurStore, start: str, end: str, group_by: str = 'SERVICE',
+                tag: str = None, filters: dict = None, granularity: str = 'NONE',
+                metric: str = 'UnblendedCost', compare: bool = False) -> dict:
+    """
+    Build the /aws-costs JSON report from the local store.
+
+    Args:
+        store: Opened CurStore
+        start: Inclusive start date (YYYY-MM-DD)
+        end: Exclusive end date (YYYY-MM-DD)
+        group_by: SERVICE, REGION, ACCOUNT, USAGE_TYPE, LINE_ITEM_TYPE or TAG
+        tag: Tag key when group_by is TAG
+        filters: Store column -> accepted values
+        granularity: Time buckets for the 'by_time' section
+        metric: UnblendedCost, BlendedCost or UsageQuantity
+        compare: Add trend vs the previous period of equal length
+
+    Returns:
+        dict: Report in the /aws-costs JSON output format
+    """
+    column = tag_column(tag) if group_by == 'TAG' else GROUP_BY[group_by]
+    metric_column = METRICS[metric]
+    start_hour, end_hour = date_to_hour(start), date_to_hour(end)
+    days = (end_hour - start_hour) // 24
+
+    current = store.aggregate(start_hour, end_hour, column, filters, 'NONE', metric_column)
+    by_group = {group: amount for (_, group), amount in current.items()}
+    total = sum(by_group.values())
+
+    previous = {}
+    if compare:
+        span = end_hour - start_hour
+        prior = store.aggregate(start_hour - span, start_hour, column, filters, 'NONE', metric_column)
+        previous = {group: amount for (_, group), amount in prior.items()}
+
+    key = group_by.lower() if group_by != 'TAG' else 'tag'
+    rows = []
+    empty_label = '(untagged)' if group_by == 'TAG' else '(none)'
+    for group, amount in sorted(by_group.items(), key=lambda kv: kv[1], reverse=True):
+        row = {
+            key: group or empty_label,
+            'cost': round(amount, 2),
+            'percentage': round(100 * amount / total, 1) if total else 0.0,
+        }
+        if compare:
+            row['trend'] = format_trend(amount, previous.get(group, 0.0))
+        rows.append(row)
+
+    report = {
+        'period': {'start': start, 'end': (datetime.strptime(end, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')},
+        'summary': {
+            'total_cost': round(total, 2),
+            'currency': 'USD',
+            'daily_average': round(total / days, 2) if days else round(total, 2),
+        },
+        f"by_{key}": rows,
+    }
+    if compare:
+        report['summary']['previous_total'] = round(sum(previous.values()), 2)
+        report['summary']['trend'] = format_trend(total, sum(previous.values()))
+
+    if granularity != 'NONE':
+        series = store.aggregate(start_hour, end_hour, None, filters, granularity, metric_column)
+        report['by_time'] = [
+            {'start': hour_to_date(bucket), 'cost': round(amount, 2)}
+            for (bucket, _), amount in sorted(series.items())
+        ]
+    return report
+
+
+def format_trend(current: float, previous: float) -> str:
+    if previous == 0:
+        return 'new' if current else '0%'
+    change = 100 * (current - previous) / previous
+    return f"{change:+.0f}%" if round(change) else '0%'
+
+
+def format_table(report: dict) -> str:
+    """Render a report as the /aws-costs summary table."""
+    key = next(k for k in report if k.startswith('by_') and k != 'by_time')
+    label = key[3:].replace('_', ' ').title()
+    summary = report['summary']
+    width = 62
+    lines = [
+        '╔' + '═' * width + '╗',
+        '║' + 'AWS COST ANALYSIS REPORT'.center(width) + '║',
+        '║' + f"Period: {report['period']['start']} to {report['period']['end']}".center(width) + '║',
+        '╠' + '═' * width + '╣',
+        '║' + f" TOTAL SPEND        │ ${summary['total_cost']:,.2f}".ljust(width) + '║',
+        '║' + f" DAILY AVERAGE      │ ${summary['daily_average']:,.2f}".ljust(width) + '║',
+    ]
+    if 'trend' in summary:
+        lines.append('║' + f" VS PREVIOUS PERIOD │ {summary['trend']}".ljust(width) + '║')
+    lines += [
+        '╠' + '═' * width + '╣',
+        '║' + f" {label:<19}│ {'Cost':<11}│ {'% of Total':<10}│ Trend".ljust(width) + '║',
+        '╟' + '─' * width + '╢',
+    ]
+    for row in report[key]:
+        name = str(row[key[3:]])[:18]
+        cost = f"${row['cost']:,.2f}"
+        lines.append('║' + f" {name:<19}│ {cost:<11}│ {row['percentage']:<10}│ {row.get('trend', '-')}".ljust(width) + '║')
+    lines.append('╚' + '═' * width + '╝')
+    return '\n'.join(lines)
+
+
+def format_csv(report: dict) -> str:
+    key = next(k for k in report if k.startswith('by_') and k != 'by_time')
+    column = key[3:]
+    out = io.StringIO()
+    writer = csv.writer(out)
+    fields = [column, 'cost', 'percentage'] + (['trend'] if 'trend' in report['summary'] else [])
+    writer.writerow(fields)
+    for row in report[key]:
+        writer.writerow([row.get(field, '') for field in fields])
+    return out.getvalue()
+
+
+def main():
+    """Main CUR engine entry point."""
+    parser = argparse.ArgumentParser(description='Offline Cost and Usage Report engine')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help='Ingest CUR files into a local store')
+    ingest.add_argument('store')
+    ingest.add_argument('files', nargs='+')
+
+    query = sub.add_parser('query', help='Query a local store')
+    query.add_argument('store')
+    query.add_argument('--days', type=int, default=None, help='Days to analyze (1-365)')
+    query.add_argument('--end', default=None, help='Exclusive end date (default: last day in store + 1)')
+    query.add_argument('--group-by', default='SERVICE', choices=sorted(GROUP_BY) + ['TAG'])
+    query.add_argument('--tag', default=None, help='Tag key when grouping by TAG')
+    query.add_argument('--service', action='append', default=None, help='Filter by service')
+    query.add_argument('--region', action='append', default=None, help='Filter by region')
+    query.add_argument('--account', action='append', default=None, help='Filter by account')
+    query.add_argument('--granularity', default='NONE', choices=sorted(GRANULARITY))
+    query.add_argument('--metric', default='UnblendedCost', choices=sorted(METRICS))
+    query.add_argument('--compare', action='store_true')
+    query.add_argument('--format', default='table', choices=['table', 'json', 'csv'])
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'ingest':
+            store = CurStore(args.store)
+            for path in args.files:
+                rows = store.ingest(path)
+                if rows is None:
+                    print(f"Skipped {path}: already ingested")
+                else:
+                    print(f"Ingested {rows} rows from {path}")
+            print(f"Store rows: {store.manifest['rows']}")
+            return 0
+
+        if not Path(args.store, 'manifest.json').exists():
+            print(f"Store not found: {args.store}", file=sys.stderr)
+            return 4
+        store = CurStore(args.store)
+        low, high = store.time_range()
+        if low is None:
+            print("No cost data in store", file=sys.stderr)
+            return 3
+        if args.group_by == 'TAG' and not args.tag:
+            print("--tag is required with --group-by TAG", file=sys.stderr)
+            return 4
+        if args.days is not None and not 1 <= args.days <= 365:
+            print("--days must be between 1 and 365", file=sys.stderr)
+            return 4
+
+        end = args.end or hour_to_date(high + 24)
+        if args.days is not None:
+            start = (datetime.strptime(end, '%Y-%m-%d') - timedelta(days=args.days)).strftime('%Y-%m-%d')
+        else:
+            start = datetime.strptime(hour_to_date(high), '%Y-%m-%d').replace(day=1).strftime('%Y-%m-%d')
+
+        filters = {}
+        for column in ('service', 'region', 'account'):
+            if getattr(args, column):
+                filters[column] = getattr(args, column)
+
+        report = cost_report(store, start, end, args.group_by, args.tag, filters,
+                             args.granularity, args.metric, args.compare)
+    except (CurStoreError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if not report['summary']['total_cost'] and not any(report.get(k) for k in report if k.startswith('by_')):
+        print("No cost data for the selected period", file=sys.stderr)
+        return 3
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    elif args.format == 'csv':
+        print(format_csv(report), end='')
+    else:
+        print(format_table(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
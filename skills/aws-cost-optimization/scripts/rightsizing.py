@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Local rightsizing recommender for aws-cost-optimization skill.
+Category: cloud
+
+Loads exported CloudWatch metrics for a whole fleet into 2-D NumPy arrays
+(instances x datapoints, one array per metric), computes p50/p95/p99 and
+headroom for every instance in one vectorized pass, and maps each instance
+to the cheapest type in the local pricing table that still fits its peak
+demand. Works for EC2 instances and RDS instance classes.
+
+Metric export format (CSV, optionally .gz), one row per instance and metric:
+
+    instance_id,instance_type,metric,<timestamp>,<timestamp>,...
+    i-0abc123,m5.2xlarge,CPUUtilization,12.5,14.0,nan,...
+
+Supported metrics: CPUUtilization and MemoryUtilization (percent),
+NetworkIn and NetworkOut (bytes per period). Missing datapoints are 'nan' or empty.
+
+Usage:
+    python rightsizing.py METRICS.csv [--pricing ../assets/instance-pricing.csv]
+                          [--percentile 99] [--target-cpu 80] [--target-memory 85]
+                          [--same-family] [--format table|json|csv]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_PRICING = Path(__file__).parent.parent / 'assets' / 'instance-pricing.csv'
+HOURS_PER_MONTH = 730
+PERCENTILES = (50, 95, 99)
+METRICS = ('CPUUtilization', 'MemoryUtilization', 'NetworkIn', 'NetworkOut')
+CHUNK = 8192
+
+
+class Pricing:
+    """Instance pricing table held as parallel NumPy columns."""
+
+    def __init__(self, path: str):
+        rows = []
+        with open(path, 'r', newline='') as f:
+            reader = csv.DictReader(line for line in f if not line.startswith('#'))
+            rows = list(reader)
+        if not rows:
+            raise ValueError(f"Empty pricing table: {path}")
+        self.types = np.array([r['instance_type'] for r in rows])
+        self.family = np.array([r['family'] for r in rows])
+        self.vcpu = np.array([float(r['vcpu']) for r in rows])
+        self.memory = np.array([float(r['memory_gib']) for r in rows])
+        self.network = np.array([float(r['network_gbps']) for r in rows])
+        self.arch = np.array([r['architecture'] for r in rows])
+        self.price = np.array([float(r['hourly_usd']) for r in rows])
+        self.burstable = np.array([r['family'].removeprefix('db.').startswith('t') for r in rows])
+        self.is_db = np.array([r['service'] == 'rds' for r in rows])
+        self.index = {t: i for i, t in enumerate(self.types)}
+
+    def lookup(self, instance_types: np.ndarray) -> np.ndarray:
+        """Catalog row per instance type (-1 when unknown)."""
+        return np.array([self.index.get(t, -1) for t in instance_types], dtype=np.int64)
+
+
+class Fleet:
+    """Metric matrices for a fleet: one (instances x datapoints) array per metric."""
+
+    def __init__(self, ids: np.ndarray, types: np.ndarray, metrics: dict, period_seconds: float):
+        self.ids = ids
+        self.types = types
+        self.metrics = metrics
+        self.period_seconds = period_seconds
+
+
+def period_from_header(header: list) -> float:
+    """Infer the sample period (seconds) from the timestamp columns."""
+    stamps = []
+    for value in header[3:5]:
+        try:
+            stamps.append(datetime.fromisoformat(value.replace('Z', '+00:00')))
+        except ValueError:
+            return 300.0
+    if len(stamps) < 2:
+        return 300.0
+    return max((stamps[1] - stamps[0]).total_seconds(), 1.0)
+
+
+def load_fleet(path: str) -> Fleet:
+    """
+    Load a metric export into per-metric 2-D arrays.
+
+    Args:
+        path: CSV or CSV.gz export (see module docstring)
+
+    Returns:
+        Fleet: Instance ids/types and aligned metric matrices
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt') as f:
+        header = next(csv.reader([f.readline()]))
+        width = len(header) - 3
+        ids, types, names, values = [], [], [], []
+        for line in f:
+            head, _, rest = line.partition(',')
+            instance_type, _, rest = rest.partition(',')
+            metric, _, rest = rest.partition(',')
+            row = parse_row(rest) if rest.strip() else np.empty(0)
+            if len(row) != width:
+                padded = np.full(width, np.nan)
+                padded[:min(width, len(row))] = row[:width]
+                row = padded
+            ids.append(head)
+            types.append(instance_type)
+            names.append(metric)
+            values.append(row)
+
+    ids = np.array(ids)
+    types = np.array(types)
+    names = np.array(names)
+    data = np.vstack(values) if values else np.empty((0, width))
+
+    instance_ids, first = np.unique(ids, return_index=True)
+    row_of = np.searchsorted(instance_ids, ids)
+    metrics = {}
+    for metric in METRICS:
+        selected = names == metric
+        if not selected.any():
+            continue
+        matrix = np.full((len(instance_ids), width), np.nan)
+        matrix[row_of[selected]] = data[selected]
+        metrics[metric] = matrix
+    return Fleet(instance_ids, types[first], metrics, period_from_header(header))
+
+
+def parse_row(text: str) -> np.ndarray:
+    """Comma-separated values; empty cells become NaN."""
+    cells = text.split(',')
+    try:
+        return np.array(cells, dtype=np.float64)
+    except ValueError:
+        return np.array([float(c) if c.strip() else np.nan for c in cells])
+
+
+def percentiles(matrix: np.ndarray) -> np.ndarray:
+    """
+    p50/p95/p99 per row from a single sort; rows without data yield NaN.
+
+    np.sort places NaN last, so each row's valid samples are a prefix and
+    the percentiles are read with linear interpolation over that prefix.
+    """
+    ordered = np.sort(matrix, axis=1)
+    valid = np.count_nonzero(~np.isnan(matrix), axis=1)
+    last = np.maximum(valid - 1, 0)
+    out = np.empty((len(PERCENTILES), matrix.shape[0]))
+    for i, q in enumerate(PERCENTILES):
+        position = last * (q / 100)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, last)
+        weight = position - low
+        lower = np.take_along_axis(ordered, low[:, None], axis=1)[:, 0]
+        upper = np.take_along_axis(ordered, high[:, None], axis=1)[:, 0]
+        out[i] = lower + (upper - lower) * weight
+    out[:, valid == 0] = np.nan
+    return out
+
+
+def recommend(fleet: Fleet, pricing: Pricing, percentile: int = 99, target_cpu: float = 80.0,
+              target_memory: float = 85.0, same_family: bool = False,
+              allow_arch_change: bool = False, allow_burstable: bool = False) -> list:
+    """
+    Compute per-instance statistics and the cheapest fitting instance type.
+
+    Demand is the chosen percentile of each metric scaled to absolute units
+    (vCPUs, GiB, Gbps) and divided by the target utilisation. Instances
+    without memory data keep at least their current memory.
+
+    Args:
+        fleet: Loaded Fleet
+        pricing: Pricing table
+        percentile: Which of p50/p95/p99 sizes the demand
+        target_cpu: Maximum CPU % after resizing
+        target_memory: Maximum memory % after resizing
+        same_family: Only consider sizes of the current family
+        allow_arch_change: Allow x86_64 <-> arm64 moves (Graviton migration)
+        allow_burstable: Allow T-family targets
+
+    Returns:
+        list: One recommendation dict per instance
+    """
+    pick = PERCENTILES.index(percentile)
+    n = len(fleet.ids)
+    current = pricing.lookup(fleet.types)
+    known = current >= 0
+    cur = np.where(known, current, 0)
+
+    stats = {metric: percentiles(matrix) for metric, matrix in fleet.metrics.items()}
+    nan = np.full((len(PERCENTILES), n), np.nan)
+    cpu = stats.get('CPUUtilization', nan)
+    mem = stats.get('MemoryUtilization', nan)
+    if 'NetworkIn' in fleet.metrics or 'NetworkOut' in fleet.metrics:
+        total = np.nan_to_num(fleet.metrics.get('NetworkIn', 0.0)) + \
+            np.nan_to_num(fleet.metrics.get('NetworkOut', 0.0))
+        net_gbps = percentiles(total * 8 / fleet.period_seconds / 1e9)
+    else:
+        net_gbps = nan
+
+    need_vcpu = np.where(np.isnan(cpu[pick]), pricing.vcpu[cur],
+                         cpu[pick] / 100 * pricing.vcpu[cur] * 100 / target_cpu)
+    need_mem = np.where(np.isnan(mem[pick]), pricing.memory[cur],
+                        mem[pick] / 100 * pricing.memory[cur] * 100 / target_memory)
+    need_net = np.nan_to_num(net_gbps[pick])
+
+    fleet_db = np.char.startswith(fleet.types, 'db.')
+    best = np.full(n, -1, dtype=np.int64)
+    for start in range(0, n, CHUNK):
+        rows = slice(start, min(start + CHUNK, n))
+        fits = (pricing.vcpu[None, :] >= need_vcpu[rows, None]) & \
+            (pricing.memory[None, :] >= need_mem[rows, None]) & \
+            (pricing.network[None, :] >= need_net[rows, None])
+        fits &= pricing.is_db[None, :] == fleet_db[rows, None]
+        if not allow_arch_change:
+            fits &= pricing.arch[None, :] == pricing.arch[cur[rows], None]
+        if same_family:
+            fits &= pricing.family[None, :] == pricing.family[cur[rows], None]
+        if not allow_burstable:
+            fits &= ~pricing.burstable[None, :] | pricing.burstable[cur[rows], None]
+        cost = np.where(fits, pricing.price[None, :], np.inf)
+        choice = np.argmin(cost, axis=1)
+        index = np.arange(len(choice))
+        found = np.isfinite(cost[index, choice])
+        # On a price tie keep the current type rather than the first (often older) match
+        keep = known[rows] & (cost[index, cur[rows]] <= cost[index, choice])
+        choice = np.where(keep, cur[rows], choice)
+        best[rows] = np.where(found, choice, -1)
+
+    results = []
+    for i in range(n):
+        entry = {
+            'type': 'rightsizing',
+            'resource': str(fleet.ids[i]),
+            'current': str(fleet.types[i]),
+            'cpu': rounded(cpu[:, i]),
+            'memory': rounded(mem[:, i]),
+            'network_gbps': rounded(net_gbps[:, i], 3),
+            'cpu_headroom': round(float(100 - cpu[pick, i]), 1) if not np.isnan(cpu[pick, i]) else None,
+        }
+        if not known[i]:
+            entry['status'] = 'unknown_type'
+        elif best[i] < 0:
+            entry['status'] = 'no_fit'
+        else:
+            recommended = str(pricing.types[best[i]])
+            savings = (pricing.price[cur[i]] - pricing.price[best[i]]) * HOURS_PER_MONTH
+            entry['recommended'] = recommended
+            entry['monthly_savings'] = round(float(savings), 2)
+            if recommended == entry['current'] or savings == 0:
+                entry['status'] = 'optimal'
+            else:
+                entry['status'] = 'downsize' if savings > 0 else 'upsize'
+        results.append(entry)
+    return results
+
+
+def rounded(values: np.ndarray, digits: int = 1) -> dict:
+    return {
+        f"p{p}": (None if np.isnan(v) else round(float(v), digits))
+        for p, v in zip(PERCENTILES, values)
+    }
+
+
+def format_table(results: list, top: int) -> str:
+    ranked = sorted((r for r in results if r.get('monthly_savings', 0) > 0),
+                    key=lambda r: r['monthly_savings'], reverse=True)
+    total = sum(r['monthly_savings'] for r in ranked)
+    lines = [
+        f"Instances analyzed: {len(results)} | Downsize candidates: {len(ranked)} | "
+        f"Monthly savings: ${total:,.2f}",
+        '',
+        f"{'Resource':<22}{'Current':<16}{'Recommended':<16}{'CPU p99':>8}{'Mem p99':>8}{'Savings/mo':>12}",
+    ]
+    for r in ranked[:top]:
+        cpu = r['cpu']['p99']
+        mem = r['memory']['p99']
+        lines.append(
+            f"{r['resource']:<22}{r['current']:<16}{r['recommended']:<16}"
+            f"{'-' if cpu is None else cpu:>8}{'-' if mem is None else mem:>8}"
+            f"{'$' + format(r['monthly_savings'], ',.2f'):>12}"
+        )
+    upsize = sum(1 for r in results if r['status'] == 'upsize')
+    if upsize:
+        lines += ['', f"{upsize} instance(s) exceed the target utilization and should be upsized"]
+    return '\n'.join(lines)
+
+
+def format_csv(results: list) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['resource', 'current', 'recommended', 'status', 'cpu_p50', 'cpu_p95', 'cpu_p99',
+                     'memory_p99', 'network_gbps_p99', 'monthly_savings'])
+    for r in results:
+        writer.writerow([r['resource'], r['current'], r.get('recommended', ''), r['status'],
+                         r['cpu']['p50'], r['cpu']['p95'], r['cpu']['p99'], r['memory']['p99'],
+                         r['network_gbps']['p99'], r.get('monthly_savings', '')])
+    return out.getvalue()
+
+
+def main():
+    """Main recommender entry point."""
+    parser = argparse.ArgumentParser(description='Rightsize instances from exported CloudWatch metrics')
+    parser.add_argument('metrics', help='Metric export CSV (.gz supported)')
+    parser.add_argument('--pricing', default=str(DEFAULT_PRICING), help='Instance pricing table')
+    parser.add_argument('--percentile', type=int, default=99, choices=PERCENTILES)
+    parser.add_argument('--target-cpu', type=float, default=80.0)
+    parser.add_argument('--target-memory', type=float, default=85.0)
+    parser.add_argument('--same-family', action='store_true')
+    parser.add_argument('--allow-arch-change', action='store_true', help='Consider Graviton/x86 moves')
+    parser.add_argument('--allow-burstable', action='store_true')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+    args = parser.parse_args()
+
+    for path in (args.metrics, args.pricing):
+        if not Path(path).exists():
+            print(f"File not found: {path}", file=sys.stderr)
+            return 4
+
+    pricing = Pricing(args.pricing)
+    fleet = load_fleet(args.metrics)
+    if len(fleet.ids) == 0:
+        print("No metric data", file=sys.stderr)
+        return 3
+
+    results = recommend(fleet, pricing, args.percentile, args.target_cpu, args.target_memory,
+                        args.same_family, args.allow_arch_change, args.allow_burstable)
+
+    if args.format == 'json':
+        print(json.dumps({'recommendations': results}, indent=2))
+    elif args.format == 'csv':
+        print(format_csv(results), end='')
+    else:
+        print(format_table(results, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Offline EC2 instance-type catalog for aws-ec2-deployment skill.
+Category: cloud
+
+Holds instance specs (vCPU, memory, network, architecture, GPUs) and
+on-demand prices per region as NumPy columns. For each region the columns
+are also kept in price order, so "cheapest type matching these
+constraints" is one vectorized mask and the first hit; repeated queries
+are answered from a memo keyed by the normalized constraints.
+
+min_network is compared with the sustained baseline bandwidth, not the
+"Up to" burst peak, unless burst_network=True (--burst-network).
+
+    from instance_catalog import InstanceCatalog
+    catalog = InstanceCatalog.load()
+    catalog.cheapest('eu-west-1', arch='arm64', min_memory=16, min_network=5)
+    # {'instance_type': 'c7g.4xlarge', 'vcpu': 16, 'memory_gib': 32.0, ..., 'hourly_usd': 0.6467}
+
+The bundled catalog is refreshed from an AWS Price List EC2 offer file
+(index.csv for a region, or the all-regions file) or from a simple
+region,instance_type,hourly_usd CSV.
+
+Usage:
+    python instance_catalog.py query --region eu-west-1 --arch arm64 --min-memory 16 --min-network 5
+                                     [--min-vcpu 4] [--max-price 0.5] [--family m7g] [--no-burstable]
+                                     [--burst-network]
+                                     [--limit 5] [--format table|json]
+    python instance_catalog.py update OFFER.csv [--region eu-west-1]
+    python instance_catalog.py bench [--queries 100000]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_CATALOG = Path(__file__).parent.parent / 'assets' / 'instance-catalog.csv'
+SPEC_COLUMNS = ('instance_type', 'family', 'vcpu', 'memory_gib', 'network_gbps', 'baseline_gbps',
+                'architecture', 'gpus', 'burstable')
+ARCHITECTURES = ('x86_64', 'arm64')
+MEMO_LIMIT = 65536
+
+# Older generations report network performance in words (Gbps, approximate)
+NETWORK_WORDS = {'very low': 0.05, 'low': 0.1, 'low to moderate': 0.3, 'moderate': 0.5, 'high': 1.0}
+
+
+class RegionIndex:
+    """Columns of the types offered in one region, in ascending price order."""
+
+    def __init__(self, catalog, region: int):
+        prices = catalog.prices[:, region]
+        offered = np.flatnonzero(~np.isnan(prices))
+        self.rows = offered[np.argsort(prices[offered], kind='stable')]
+        self.price = prices[self.rows]
+        self.vcpu = catalog.vcpu[self.rows]
+        self.memory = catalog.memory[self.rows]
+        self.network = catalog.network[self.rows]
+        self.baseline = catalog.baseline[self.rows]
+        self.arch = catalog.arch[self.rows]
+        self.gpus = catalog.gpus[self.rows]
+        self.burstable = catalog.burstable[self.rows]
+        self.family = catalog.family[self.rows]
+
+
+class InstanceCatalog:
+    """Instance specs and per-region prices as parallel NumPy columns."""
+
+    def __init__(self, specs: list, regions: list, prices: np.ndarray):
+        self.types = np.array([s['instance_type'] for s in specs])
+        self.family = np.array([s['family'] for s in specs])
+        self.vcpu = np.array([int(s['vcpu']) for s in specs], dtype=np.int32)
+        self.memory = np.array([float(s['memory_gib']) for s in specs])
+        self.network = np.array([float(s['network_gbps']) for s in specs])
+        # Unknown baselines are NaN and never satisfy a min_network bound
+        self.baseline = np.array([np.nan if s.get('baseline_gbps') in (None, '') else float(s['baseline_gbps'])
+                                  for s in specs])
+        self.arch = np.array([ARCHITECTURES.index(s['architecture']) for s in specs], dtype=np.int8)
+        self.gpus = np.array([int(s['gpus'] or 0) for s in specs], dtype=np.int32)
+        self.burstable = np.array([str(s['burstable']).lower() == 'true' for s in specs])
+        self.regions = list(regions)
+        self.prices = prices
+        self.row_of = {t: i for i, t in enumerate(self.types)}
+        self.region_of = {r: i for i, r in enumerate(self.regions)}
+        self._indexes = {}
+        self._memo = {}
+
+    @classmethod
+    def load(cls, path: str = None) -> 'InstanceCatalog':
+        path = path or DEFAULT_CATALOG
+        with open(path, 'r', newline='') as f:
+            reader = csv.DictReader(line for line in f if not line.startswith('#'))
+            regions = [c for c in reader.fieldnames if c not in SPEC_COLUMNS]
+            specs, prices = [], []
+            for row in reader:
+                specs.append(row)
+                prices.append([float(row[r]) if row[r] else np.nan for r in regions])
+        if not specs:
+            raise ValueError(f"Empty instance catalog: {path}")
+        return cls(specs, regions, np.array(prices, dtype=np.float64).reshape(len(specs), len(regions)))
+
+    def save(self, path: str = None):
+        """Write the catalog CSV atomically, keeping the header comments."""
+        path = Path(path or DEFAULT_CATALOG)
+        comments = []
+        if path.exists():
+            with open(path, 'r') as f:
+                comments = [line for line in f if line.startswith('#')]
+        out = io.StringIO()
+        out.writelines(comments)
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(list(SPEC_COLUMNS) + self.regions)
+        for i in sorted(range(len(self.types)), key=lambda i: type_sort_key(self.types[i])):
+            prices = ['' if np.isnan(p) else f"{p:.4f}".rstrip('0').rstrip('.') for p in self.prices[i]]
+            network = f"{self.network[i]:g}"
+            baseline = '' if np.isnan(self.baseline[i]) else f"{self.baseline[i]:g}"
+            writer.writerow([self.types[i], self.family[i], int(self.vcpu[i]), f"{self.memory[i]:g}", network,
+                             baseline, ARCHITECTURES[self.arch[i]], int(self.gpus[i]),
+                             'true' if self.burstable[i] else 'false'] + prices)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(out.getvalue())
+        os.replace(tmp, path)
+
+    def index(self, region: str) -> RegionIndex:
+        idx = self._indexes.get(region)
+        if idx is None:
+            if region not in self.region_of:
+                raise KeyError(f"Region not in catalog: {region}")
+            idx = self._indexes[region] = RegionIndex(self, self.region_of[region])
+        return idx
+
+    def query(self, region: str, arch: str = None, min_vcpu: int = 0, min_memory: float = 0.0,
+              min_network: float = 0.0, min_gpus: int = 0, max_price: float = None, family: str = None,
+              burstable: bool = None, limit: int = 10, burst_network: bool = False) -> list:
+        """
+        Instance types in a region matching all constraints, cheapest first.
+
+        Args:
+            region: Region code (e.g. eu-west-1)
+            arch: x86_64 or arm64
+            min_vcpu / min_memory / min_network / min_gpus: Lower bounds
+                (memory in GiB, network in Gbps of baseline bandwidth)
+            max_price: Upper bound on the hourly on-demand price
+            family: Exact family (m7g) or prefix ending in '*' (m*)
+            burstable: True/False to require or exclude T-family types
+            limit: Maximum results
+            burst_network: Compare min_network with the "Up to" peak instead
+
+        Returns:
+            list: Spec and price dicts (memoized; treat as read-only)
+        """
+        key = (region, arch, min_vcpu, min_memory, min_network, min_gpus, max_price, family, burstable, limit,
+               burst_network)
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        idx = self.index(region)
+        mask = idx.memory >= min_memory
+        if min_vcpu:
+            mask &= idx.vcpu >= min_vcpu
+        if min_network:
+            mask &= (idx.network if burst_network else idx.baseline) >= min_network
+        if min_gpus:
+            mask &= idx.gpus >= min_gpus
+        if arch is not None:
+            mask &= idx.arch == ARCHITECTURES.index(arch)
+        if max_price is not None:
+            mask &= idx.price <= max_price
+        if burstable is not None:
+            mask &= idx.burstable == burstable
+        if family is not None:
+            mask &= (np.char.startswith(idx.family, family[:-1]) if family.endswith('*')
+                     else idx.family == family)
+        hits = np.flatnonzero(mask)[:limit]
+        result = [self._describe(idx.rows[h], idx.price[h]) for h in hits]
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+    def cheapest(self, region: str, **constraints):
+        """Cheapest matching type as a dict, or None."""
+        found = self.query(region, limit=1, **constraints)
+        return found[0] if found else None
+
+    def spec(self, instance_type: str, region: str = None):
+        row = self.row_of.get(instance_type)
+        if row is None:
+            return None
+        price = self.prices[row, self.region_of[region]] if region else np.nan
+        return self._describe(row, price)
+
+    def _describe(self, row: int, price: float) -> dict:
+        return {
+            'instance_type': str(self.types[row]),
+            'family': str(self.family[row]),
+            'vcpu': int(self.vcpu[row]),
+            'memory_gib': float(self.memory[row]),
+            'network_gbps': float(self.network[row]),
+            'baseline_gbps': None if np.isnan(self.baseline[row]) else float(self.baseline[row]),
+            'architecture': ARCHITECTURES[self.arch[row]],
+            'gpus': int(self.gpus[row]),
+            'burstable': bool(self.burstable[row]),
+            'hourly_usd': None if np.isnan(price) else float(price),
+        }
+
+    def merge(self, updates: dict):
+        """
+        Apply price updates {(region, type): (hourly, spec or None)}; new
+        regions and types are added, specs of new types taken from `spec`.
+        Raises ValueError (and leaves the catalog unchanged) if an update
+        has no region.
+        """
+        missing = sorted({instance_type for region, instance_type in updates if not region})
+        if missing:
+            raise ValueError(f"No region for {len(missing)} price(s) (e.g. {missing[0]}); "
+                             f"add a region column or pass --region")
+        specs = [self._describe(i, np.nan) for i in range(len(self.types))]
+        regions = list(self.regions)
+        for region, instance_type in updates:
+            if region not in regions:
+                regions.append(region)
+        row_of = dict(self.row_of)
+        for (region, instance_type), (_, spec) in updates.items():
+            if instance_type not in row_of and spec is not None:
+                row_of[instance_type] = len(specs)
+                specs.append(spec)
+        prices = np.full((len(specs), len(regions)), np.nan)
+        prices[:len(self.types), :len(self.regions)] = self.prices
+        for (region, instance_type), (hourly, _) in updates.items():
+            row = row_of.get(instance_type)
+            if row is not None:
+                prices[row, regions.index(region)] = hourly
+        self.__init__(specs, regions, prices)
+
+
+def type_sort_key(instance_type: str) -> tuple:
+    family, _, size = str(instance_type).partition('.')
+    m = re.match(r'(\d*)(\w+)', size)
+    multiple = {'nano': 0.0625, 'micro': 0.125, 'small': 0.25, 'medium': 0.5, 'large': 1}.get(size)
+    if multiple is None and m:
+        multiple = 2 * (int(m.group(1)) if m.group(1) else 1) if m.group(2) == 'xlarge' else 1e6
+    return family, multiple if multiple is not None else 1e6, size
+
+
+def parse_network(text: str) -> float:
+    text = (text or '').strip().lower()
+    m = re.search(r'([\d.]+)\s*gigabit', text)
+    if m:
+        return float(m.group(1))
+    return NETWORK_WORDS.get(text, 0.0)
+
+
+def parse_offer_file(path: str, region: str = None) -> dict:
+    """
+    Linux on-demand shared-tenancy prices from an AWS Price List EC2 offer
+    CSV, or from a plain region,instance_type,hourly_usd CSV.
+
+    Returns:
+        {(region, instance_type): (hourly_usd, spec dict or None)}
+    """
+    updates = {}
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        lines = iter(f)
+        header = None
+        for line in lines:
+            if 'instance_type' in line or '"Instance Type"' in line or 'Instance Type' in line:
+                header = next(csv.reader([line]))
+                break
+        if header is None:
+            raise ValueError(f"No instance type column in {path}")
+        reader = csv.DictReader(lines, fieldnames=header)
+        if 'instance_type' in header:
+            for row in reader:
+                spec = None
+                if all(row.get(c) for c in ('vcpu', 'memory_gib', 'architecture')):
+                    spec = {c: row.get(c) or '' for c in SPEC_COLUMNS}
+                    spec['family'] = spec['family'] or row['instance_type'].split('.')[0]
+                    spec['network_gbps'] = spec['network_gbps'] or 0
+                    spec['baseline_gbps'] = spec['baseline_gbps'] or None
+                    spec['gpus'] = spec['gpus'] or 0
+                    spec['burstable'] = spec['burstable'] or spec['family'].startswith('t')
+                code = row.get('region') or region
+                if not code:
+                    raise ValueError(f"{path}: no region for {row['instance_type']}; "
+                                     f"add a region column or pass --region")
+                updates[(code, row['instance_type'])] = (float(row['hourly_usd']), spec)
+            return updates
+        for row in reader:
+            if (row.get('TermType') != 'OnDemand' or row.get('Product Family') != 'Compute Instance'
+                    or row.get('Tenancy') != 'Shared' or row.get('Operating System') != 'Linux'
+                    or row.get('Pre Installed S/W', 'NA') != 'NA'
+                    or row.get('Capacity Status', 'Used') != 'Used'
+                    or row.get('Unit') != 'Hrs'):
+                continue
+            price = float(row['PricePerUnit'] or 0)
+            code = row.get('Region Code') or region
+            if not price or not code:
+                continue
+            instance_type = row['Instance Type']
+            processor = row.get('Physical Processor', '')
+            memory = (row.get('Memory') or '0').replace(',', '').split()[0]
+            network = row.get('Network Performance') or ''
+            peak = parse_network(network)
+            spec = {
+                'instance_type': instance_type,
+                'family': instance_type.split('.')[0],
+                'vcpu': row.get('vCPU') or 0,
+                'memory_gib': memory,
+                'network_gbps': peak,
+                # Offer files only give the "Up to" peak for burst networking
+                'baseline_gbps': None if network.lower().startswith('up to') else peak,
+                'architecture': 'arm64' if 'Graviton' in processor else 'x86_64',
+                'gpus': row.get('GPU') or 0,
+                'burstable': instance_type.startswith('t'),
+            }
+            updates[(code, instance_type)] = (price, spec)
+    return updates
+
+
+def format_table(results: list, region: str) -> str:
+    lines = [f"{'Instance':<18}{'vCPU':>6}{'Memory':>9}{'Baseline':>10}{'Network':>9}{'Arch':>8}{'GPUs':>6}"
+             f"{'$/hour':>10}{'$/month':>11}   ({region})"]
+    for r in results:
+        baseline = '?' if r['baseline_gbps'] is None else f"{r['baseline_gbps']:g}G"
+        lines.append(f"{r['instance_type']:<18}{r['vcpu']:>6}{r['memory_gib']:>8g}G{baseline:>10}"
+                     f"{r['network_gbps']:>8g}G"
+                     f"{r['architecture']:>8}{r['gpus']:>6}{r['hourly_usd']:>10.4f}{r['hourly_usd'] * 730:>11,.2f}")
+    return '\n'.join(lines)
+
+
+def bench(catalog: InstanceCatalog, queries: int) -> dict:
+    """Microseconds per query, uncached and memoized."""
+    rng = np.random.default_rng(0)
+    regions = catalog.regions
+    keys = [dict(region=regions[rng.integers(len(regions))], arch=ARCHITECTURES[rng.integers(2)],
+                 min_vcpu=int(rng.choice([0, 2, 4, 8])), min_memory=float(rng.choice([0, 4, 8, 16, 32])),
+                 min_network=float(rng.choice([0, 10, 12.5]))) for _ in range(256)]
+    start = time.perf_counter()
+    for i in range(queries):
+        catalog._memo.clear()
+        catalog.cheapest(**keys[i % len(keys)])
+    uncached = (time.perf_counter() - start) / queries * 1e6
+    start = time.perf_counter()
+    for i in range(queries):
+        catalog.cheapest(**keys[i % len(keys)])
+    cached = (time.perf_counter() - start) / queries * 1e6
+    return {'queries': queries, 'uncached_us': round(uncached, 2), 'memoized_us': round(cached, 2)}
+
+
+def main():
+    """Main catalog entry point."""
+    parser = argparse.ArgumentParser(description='Query the offline EC2 instance-type catalog')
+    parser.add_argument('--catalog', default=str(DEFAULT_CATALOG), help='Catalog CSV')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    q = sub.add_parser('query', help='Instance types matching constraints, cheapest first')
+    q.add_argument('--region', default='us-east-1')
+    q.add_argument('--arch', choices=ARCHITECTURES)
+    q.add_argument('--min-vcpu', type=int, default=0)
+    q.add_argument('--min-memory', type=float, default=0.0, help='GiB')
+    q.add_argument('--min-network', type=float, default=0.0, help='Baseline Gbps')
+    q.add_argument('--burst-network', action='store_true',
+                   help='Compare --min-network with the "Up to" burst peak instead of the baseline')
+    q.add_argument('--min-gpus', type=int, default=0)
+    q.add_argument('--max-price', type=float, help='USD per hour')
+    q.add_argument('--family', help="Family, or prefix with '*' (e.g. 'm*')")
+    q.add_argument('--no-burstable', action='store_true', help='Exclude T-family types')
+    q.add_argument('--limit', type=int, default=10)
+    q.add_argument('--format', choices=['table', 'json'], default='table')
+
+    u = sub.add_parser('update', help='Merge prices from a Price List offer file or simple CSV')
+    u.add_argument('offer', help='Offer CSV (index.csv) or region,instance_type,hourly_usd CSV')
+    u.add_argument('--region', help='Region for files without a Region Code column')
+
+    b = sub.add_parser('bench', help='Measure query latency')
+    b.add_argument('--queries', type=int, default=100000)
+    args = parser.parse_args()
+
+    for path in (args.catalog, getattr(args, 'offer', None)):
+        if path and not Path(path).exists():
+            print(f"File not found: {path}", file=sys.stderr)
+            return 4
+    try:
+        catalog = InstanceCatalog.load(args.catalog)
+    except (ValueError, KeyError) as e:
+        print(f"Error: invalid catalog: {e}", file=sys.stderr)
+        return 4
+
+    if args.command == 'update':
+        try:
+            updates = parse_offer_file(args.offer, args.region)
+            if not updates:
+                print("No Linux on-demand prices found in the offer file", file=sys.stderr)
+                return 3
+            before = len(catalog.types)
+            catalog.merge(updates)
+        except (ValueError, KeyError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 4
+        catalog.save(args.catalog)
+        print(f"Updated {len(updates)} prices; {len(catalog.types) - before} new instance types; "
+              f"regions: {', '.join(catalog.regions)}")
+        return 0
+
+    if args.command == 'bench':
+        print(json.dumps(bench(catalog, args.queries), indent=2))
+        return 0
+
+    try:
+        results = catalog.query(args.region, args.arch, args.min_vcpu, args.min_memory, args.min_network,
+                                args.min_gpus, args.max_price, args.family,
+                                False if args.no_burstable else None, args.limit, args.burst_network)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 4
+    if not results:
+        print("No instance type matches", file=sys.stderr)
+        return 3
+    if args.format == 'json':
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_table(results, args.region))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Capacity-aware concurrent launcher for aws-ec2-deployment skill.
+Category: cloud
+
+Launches a requested number of instances across every (AZ, instance type)
+pool at once instead of retrying one RunInstances call serially:
+
+- the remaining count is split into chunks and spread across AZs, each
+  chunk sent to the AZ with the fewest instances so far and, within it, to
+  the instance type with the lowest recent-failure score;
+- up to `concurrency` requests are in flight; partial fulfilment is kept
+  and the shortfall re-queued;
+- InsufficientInstanceCapacity marks the pool in a decaying failure memory
+  (half-life 10 min by default) and blocks it for a full-jitter backoff, so
+  the next chunk goes elsewhere; throttling pauses every pool (the API rate
+  limit is per account and region) without marking any, a type not offered
+  in an AZ disables that pool for the launch, and any other error (read
+  timeout, connection error) backs off just that pool;
+- each chunk gets one ClientToken when it is created; after an error that
+  leaves the outcome unknown the same chunk is retried in the same pool
+  with the same token, so EC2 returns the original instances instead of
+  launching a second set;
+- instance ids launched before a crash are written to stderr, and kept in
+  the output whenever the launch is incomplete, so none are orphaned;
+- the memory can be persisted between runs (--state).
+
+The stub backend simulates per-pool capacity and API latency for tests and
+for rehearsing large scale-outs.
+
+Usage:
+    python launch_planner.py --count 500 --types m6i.large,m7i.large,m5.large \\
+        --subnets us-east-1a=subnet-aaa,us-east-1b=subnet-bbb,us-east-1c=subnet-ccc \\
+        --launch-template lt-0abc123 [--concurrency 16] [--chunk 50] [--state .launch-state.json]
+    python launch_planner.py --backend stub --count 500 --types m6i.large,m5.large \\
+        --subnets a=s1,b=s2,c=s3 --stub-capacity a:m6i.large=50,b:m6i.large=0 [--stub-default 200]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+
+class InsufficientCapacity(Exception):
+    """The pool (AZ, instance type) has no capacity right now."""
+
+
+class PoolUnavailable(Exception):
+    """The instance type is not offered in the AZ."""
+
+
+class Throttled(Exception):
+    """API rate limit; retry later without blaming the pool."""
+
+
+class LaunchError(Exception):
+    """Non-retryable launch failure (limits, permissions, bad parameters)."""
+
+
+class CapacityMemory:
+    """
+    Per-pool failure score with exponential decay.
+
+    Each capacity failure adds 1 to the pool's score; the score halves every
+    `half_life` seconds, so a pool that failed an hour ago is as good as new.
+    """
+
+    def __init__(self, half_life: float = 600.0, clock=time.time):
+        self.half_life = half_life
+        self.clock = clock
+        self.scores = {}
+        self.lock = threading.Lock()
+
+    def _decayed(self, key: tuple, now: float) -> float:
+        score, at = self.scores.get(key, (0.0, now))
+        return score * 0.5 ** ((now - at) / self.half_life)
+
+    def score(self, az: str, instance_type: str) -> float:
+        with self.lock:
+            return self._decayed((az, instance_type), self.clock())
+
+    def failure(self, az: str, instance_type: str, weight: float = 1.0):
+        now = self.clock()
+        with self.lock:
+            self.scores[(az, instance_type)] = (self._decayed((az, instance_type), now) + weight, now)
+
+    def success(self, az: str, instance_type: str):
+        now = self.clock()
+        with self.lock:
+            key = (az, instance_type)
+            if key in self.scores:
+                self.scores[key] = (self._decayed(key, now) / 2, now)
+
+    def save(self, path: str):
+        with self.lock:
+            data = {f"{az}|{t}": [s, at] for (az, t), (s, at) in self.scores.items()}
+        Path(path).write_text(json.dumps(data, indent=2))
+
+    def load(self, path: str):
+        if not Path(path).exists():
+            return
+        data = json.loads(Path(path).read_text())
+        with self.lock:
+            for key, (score, at) in data.items():
+                az, _, instance_type = key.partition('|')
+                self.scores[(az, instance_type)] = (score, at)
+
+
+def full_jitter(attempt: int, base: float, cap: float, rng: random.Random) -> float:
+    """AWS-style full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class Ec2Backend:
+    """RunInstances through boto3; maps EC2 error codes to launcher exceptions."""
+
+    CAPACITY_CODES = {'InsufficientInstanceCapacity', 'InsufficientHostCapacity', 'InsufficientCapacity'}
+    UNAVAILABLE_CODES = {'Unsupported', 'InvalidInstanceType'}
+    THROTTLE_CODES = {'RequestLimitExceeded', 'Throttling', 'ThrottlingException'}
+
+    def __init__(self, params: dict, region: str = None):
+        import boto3
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+        self.ClientError = ClientError
+        self.params = params
+        # The launcher does its own retries across pools
+        self.ec2 = boto3.client('ec2', region_name=region, config=Config(retries={'max_attempts': 1}))
+
+    def run(self, az: str, subnet: str, instance_type: str, count: int, client_token: str) -> list:
+        request = dict(self.params, SubnetId=subnet, InstanceType=instance_type, MinCount=1, MaxCount=count,
+                       ClientToken=client_token)
+        try:
+            response = self.ec2.run_instances(**request)
+        except self.ClientError as e:
+            code = e.response['Error']['Code']
+            message = e.response['Error'].get('Message', code)
+            if code in self.CAPACITY_CODES:
+                raise InsufficientCapacity(message)
+            if code in self.UNAVAILABLE_CODES:
+                raise PoolUnavailable(message)
+            if code in self.THROTTLE_CODES:
+                raise Throttled(message)
+            raise LaunchError(f"{code}: {message}")
+        return [i['InstanceId'] for i in response['Instances']]
+
+
+class StubBackend:
+    """
+    In-memory RunInstances: each pool has a capacity; a request gets
+    min(count, remaining) instances or InsufficientCapacity when empty.
+    A repeated ClientToken returns the instances of the first request.
+    """
+
+    def __init__(self, capacity: dict = None, default: int = 1000, latency: tuple = (0.05, 0.25),
+                 unavailable: set = (), throttle_rate: float = 0.0, seed: int = 0):
+        self.capacity = dict(capacity or {})
+        self.default = default
+        self.latency = latency
+        self.unavailable = set(unavailable)
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.tokens = {}
+
+    def run(self, az: str, subnet: str, instance_type: str, count: int, client_token: str) -> list:
+        with self.lock:
+            self.calls += 1
+            delay = self.rng.uniform(*self.latency)
+            throttled = self.rng.random() < self.throttle_rate
+        time.sleep(delay)
+        if throttled:
+            raise Throttled('Request limit exceeded.')
+        if (az, instance_type) in self.unavailable:
+            raise PoolUnavailable(f"{instance_type} is not supported in {az}")
+        with self.lock:
+            if client_token in self.tokens:
+                return list(self.tokens[client_token])
+            left = self.capacity.get((az, instance_type), self.default)
+            if left <= 0:
+                raise InsufficientCapacity(f"Insufficient capacity for {instance_type} in {az}")
+            granted = min(left, count)
+            self.capacity[(az, instance_type)] = left - granted
+            ids = self.tokens[client_token] = [f"i-{uuid.uuid4().hex[:17]}" for _ in range(granted)]
+        return list(ids)
+
+
+class Launcher:
+    """
+    Spread a launch over AZs and instance types with bounded concurrency.
+
+    Args:
+        backend: Object with run(az, subnet, instance_type, count, client_token) -> [instance ids]
+        subnets: {az: subnet_id}
+        instance_types: Compatible types, most preferred first
+        concurrency: Maximum requests in flight
+        chunk: Maximum instances per request
+        memory: CapacityMemory shared across launches
+        backoff_base / backoff_cap: Full-jitter backoff bounds (seconds)
+        max_failures: Give up after this many failed requests (capacity, throttling, errors)
+        deadline: Give up after this many seconds
+    """
+
+    def __init__(self, backend, subnets: dict, instance_types: list, concurrency: int = 16, chunk: int = 50,
+                 memory: CapacityMemory = None, backoff_base: float = 0.5, backoff_cap: float = 20.0,
+                 max_failures: int = 200, deadline: float = 600.0, seed: int = None):
+        if not subnets or not instance_types:
+            raise ValueError('Need at least one subnet and one instance type')
+        self.backend = backend
+        self.subnets = dict(subnets)
+        self.types = list(instance_types)
+        self.concurrency = concurrency
+        self.chunk = chunk
+        self.memory = memory or CapacityMemory()
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_failures = max_failures
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+
+    def _pick(self, placed: dict, blocked: dict, disabled: set, now: float):
+        """Least-filled AZ with a usable pool, then its best-scoring type."""
+        best = None
+        for az in self.subnets:
+            usable = [t for t in self.types if (az, t) not in disabled and blocked.get((az, t), 0) <= now]
+            if not usable:
+                continue
+            rank = {t: i for i, t in enumerate(self.types)}
+            instance_type = min(usable, key=lambda t: (round(self.memory.score(az, t), 2), rank[t]))
+            key = (placed.get(az, 0), round(self.memory.score(az, instance_type), 2))
+            if best is None or key < best[0]:
+                best = (key, az, instance_type)
+        return None if best is None else best[1:]
+
+    def launch(self, count: int) -> dict:
+        """
+        Launch `count` instances.
+
+        Returns:
+            Summary: launched instance ids per pool, failures, requests,
+            elapsed seconds and whether the full count was reached
+        """
+        start = time.monotonic()
+        launched = {}            # (az, type) -> [instance ids]
+        placed = {}              # az -> instances launched or in flight
+        blocked = {}             # (az, type) -> monotonic time it may be retried
+        attempts = {}            # (az, type) -> consecutive failures
+        disabled = set()
+        events = []
+        failures = 0
+        requests = 0
+        error = None
+        in_flight = {}
+        unresolved = {}          # (az, type) -> (count, client token) of a chunk to retry as-is
+        remaining = count
+        throttled_until = 0.0    # account-wide pause after a throttled request
+        throttles = 0            # consecutive throttled responses
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while remaining > 0 or in_flight:
+                now = time.monotonic()
+                pending = (remaining - sum(n for _, _, n, _ in in_flight.values())
+                           - sum(n for n, _ in unresolved.values()))
+                give_up = error or failures >= self.max_failures or now - start > self.deadline
+                while len(in_flight) < self.concurrency and not give_up and now >= throttled_until:
+                    due = next((key for key in unresolved if blocked.get(key, 0) <= now), None)
+                    if due is not None:
+                        # Same pool, count and token: EC2 answers with the first launch if it happened
+                        az, instance_type = due
+                        n, token = unresolved.pop(due)
+                    elif pending > 0:
+                        choice = self._pick(placed, blocked, disabled, now)
+                        if choice is None:
+                            break
+                        az, instance_type = choice
+                        healthy = sum(1 for a in self.subnets
+                                      if any((a, t) not in disabled for t in self.types)) or 1
+                        n = min(self.chunk, pending, math.ceil(pending / healthy))
+                        token = uuid.uuid4().hex
+                        placed[az] = placed.get(az, 0) + n
+                        pending -= n
+                    else:
+                        break
+                    future = pool.submit(self.backend.run, az, self.subnets[az], instance_type, n, token)
+                    in_flight[future] = (az, instance_type, n, token)
+                    requests += 1
+                    # Do not send a second chunk to a pool before hearing back
+                    blocked[(az, instance_type)] = float('inf')
+
+                if not in_flight:
+                    if give_up or (pending <= 0 and not unresolved):
+                        break
+                    waits = [t for key, t in blocked.items() if key not in disabled and t > now]
+                    if throttled_until > now:
+                        waits.append(throttled_until)
+                    if not waits:
+                        error = error or 'No usable pool: every AZ/type is unavailable'
+                        break
+                    time.sleep(max(0.0, min(waits) - now))
+                    continue
+
+                # Wake up when a backed-off pool becomes usable again
+                retry_at = [t for key, t in blocked.items() if now < t < float('inf') and key not in disabled]
+                if throttled_until > now:
+                    retry_at.append(throttled_until)
+                timeout = max(0.0, min(retry_at) - now) if (pending > 0 or unresolved) and retry_at else None
+                done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    az, instance_type, n, token = in_flight.pop(future)
+                    key = (az, instance_type)
+                    blocked[key] = 0
+                    try:
+                        ids = future.result()
+                    except InsufficientCapacity as e:
+                        ids = []
+                        failures += 1
+                        attempts[key] = attempts.get(key, 0) + 1
+                        self.memory.failure(az, instance_type)
+                        blocked[key] = time.monotonic() + full_jitter(
+                            attempts[key], self.backoff_base, self.backoff_cap, self.rng)
+                        events.append({'az': az, 'instance_type': instance_type, 'error': 'capacity',
+                                       'message': str(e)})
+                    except Throttled as e:
+                        # The rate limit is shared by every pool: pause them all
+                        ids = []
+                        failures += 1
+                        throttles += 1
+                        throttled_until = max(throttled_until, time.monotonic() + full_jitter(
+                            throttles, self.backoff_base, self.backoff_cap, self.rng))
+                        events.append({'az': az, 'instance_type': instance_type, 'error': 'throttled',
+                                       'message': str(e)})
+                    except PoolUnavailable as e:
+                        ids = []
+                        disabled.add(key)
+                        events.append({'az': az, 'instance_type': instance_type, 'error': 'unavailable',
+                                       'message': str(e)})
+                    except LaunchError as e:
+                        ids = []
+                        error = str(e)
+                    except Exception as e:
+                        # Timeouts, connection errors, bugs in a backend: the chunk may have
+                        # launched, so back off this pool and retry it with the same token
+                        failures += 1
+                        attempts[key] = attempts.get(key, 0) + 1
+                        blocked[key] = time.monotonic() + full_jitter(
+                            attempts[key], self.backoff_base, self.backoff_cap, self.rng)
+                        events.append({'az': az, 'instance_type': instance_type, 'error': 'error',
+                                       'message': f"{type(e).__name__}: {e}"})
+                        unresolved[key] = (n, token)
+                        continue
+                    else:
+                        attempts[key] = 0
+                        throttles = 0
+                        self.memory.success(az, instance_type)
+                        if len(ids) < n:
+                            # Partial fulfilment: the pool is close to empty
+                            self.memory.failure(az, instance_type, 0.5)
+                    launched.setdefault(key, []).extend(ids)
+                    placed[az] -= n - len(ids)
+                    remaining -= len(ids)
+            pool.shutdown(wait=True)
+        except BaseException:
+            ids = [i for pool_ids in launched.values() for i in pool_ids]
+            if ids:
+                print(f"Launch aborted with {len(ids)} instance(s) running: {' '.join(ids)}", file=sys.stderr)
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        total = sum(len(ids) for ids in launched.values())
+        if total < count and error is None:
+            error = (f"Gave up after {failures} failed requests" if failures >= self.max_failures
+                     else f"Deadline of {self.deadline:g}s reached")
+        return {
+            'requested': count,
+            'launched': total,
+            'complete': total >= count,
+            'elapsed_seconds': round(time.monotonic() - start, 3),
+            'requests': requests,
+            'failures': failures,
+            'error': error,
+            'by_pool': [{'az': az, 'instance_type': t, 'count': len(ids)}
+                        for (az, t), ids in sorted(launched.items()) if ids],
+            'instance_ids': [i for ids in launched.values() for i in ids],
+            # Chunks whose last attempt failed without a definite answer: they may be running
+            'unconfirmed': [{'az': az, 'instance_type': t, 'count': n, 'client_token': token}
+                            for (az, t), (n, token) in sorted(unresolved.items())],
+            'events': events,
+        }
+
+
+def parse_pairs(text: str) -> dict:
+    out = {}
+    for item in filter(None, (text or '').split(',')):
+        key, _, value = item.partition('=')
+        out[key.strip()] = value.strip()
+    return out
+
+
+def main():
+    """Main launcher entry point."""
+    parser = argparse.ArgumentParser(description='Launch EC2 capacity across AZs and instance types concurrently')
+    parser.add_argument('--count', type=int, required=True, help='Instances to launch')
+    parser.add_argument('--types', required=True, help='Comma-separated compatible instance types, preferred first')
+    parser.add_argument('--subnets', required=True, help='AZ=subnet pairs, comma-separated')
+    parser.add_argument('--backend', choices=['ec2', 'stub'], default='ec2')
+    parser.add_argument('--launch-template', help='Launch template id (ec2 backend)')
+    parser.add_argument('--image-id', help='AMI id when no launch template is used')
+    parser.add_argument('--region', help='AWS region (ec2 backend)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--chunk', type=int, default=50, help='Maximum instances per request')
+    parser.add_argument('--deadline', type=float, default=600.0, help='Give up after this many seconds')
+    parser.add_argument('--state', help='JSON file persisting the capacity failure memory')
+    parser.add_argument('--half-life', type=float, default=600.0, help='Failure memory half-life (seconds)')
+    parser.add_argument('--stub-capacity', help='AZ:TYPE=N pool capacities for the stub backend')
+    parser.add_argument('--stub-default', type=int, default=1000, help='Capacity of unlisted stub pools')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ids', action='store_true', help='Include instance ids in the output')
+    args = parser.parse_args()
+
+    subnets = parse_pairs(args.subnets)
+    types = [t.strip() for t in args.types.split(',') if t.strip()]
+    if args.backend == 'stub':
+        capacity = {}
+        for key, value in parse_pairs(args.stub_capacity).items():
+            az, _, instance_type = key.partition(':')
+            capacity[(az, instance_type)] = int(value)
+        backend = StubBackend(capacity, args.stub_default, seed=args.seed)
+    else:
+        if not args.launch_template and not args.image_id:
+            print("Error: --launch-template or --image-id is required", file=sys.stderr)
+            return 4
+        params = ({'LaunchTemplate': {'LaunchTemplateId': args.launch_template}} if args.launch_template
+                  else {'ImageId': args.image_id})
+        try:
+            backend = Ec2Backend(params, args.region)
+        except ImportError:
+            print("Error: boto3 is required for the ec2 backend", file=sys.stderr)
+            return 3
+
+    memory = CapacityMemory(args.half_life)
+    if args.state:
+        memory.load(args.state)
+    try:
+        launcher = Launcher(backend, subnets, types, args.concurrency, args.chunk, memory,
+                            deadline=args.deadline, seed=args.seed)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    result = launcher.launch(args.count)
+    if args.state:
+        memory.save(args.state)
+    # Keep the ids of a partial launch so they can be tagged or terminated
+    if not args.ids and result['complete']:
+        result.pop('instance_ids')
+    print(json.dumps(result, indent=2))
+    return 0 if result['complete'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Tests for scripts/launch_planner.py retries."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from launch_planner import Launcher, StubBackend  # noqa: E402
+
+
+class TimeoutAfterLaunch(StubBackend):
+    """Launches the instances, then loses the first `lost` responses."""
+
+    def __init__(self, lost: int, **kwargs):
+        super().__init__(latency=(0, 0), **kwargs)
+        self.lost = lost
+        self.requests = []
+
+    def run(self, az, subnet, instance_type, count, client_token):
+        self.requests.append((az, instance_type, count, client_token))
+        ids = super().run(az, subnet, instance_type, count, client_token)
+        if len(self.requests) <= self.lost:
+            raise TimeoutError('Read timeout on endpoint URL')
+        return ids
+
+
+def test_retry_after_lost_response_reuses_the_client_token():
+    backend = TimeoutAfterLaunch(lost=2, capacity={('a', 'm6i.large'): 100})
+    launcher = Launcher(backend, {'a': 'subnet-a'}, ['m6i.large'], chunk=10, backoff_base=0.001, seed=0)
+    result = launcher.launch(10)
+    assert result['complete'] and result['launched'] == 10
+    assert result['unconfirmed'] == []
+    assert len(backend.requests) == 3
+    assert len({request for request in backend.requests}) == 1
+    # Only the first request launched anything
+    assert backend.capacity[('a', 'm6i.large')] == 90
+
+
+def test_new_chunks_get_distinct_tokens():
+    backend = StubBackend(latency=(0, 0))
+    launcher = Launcher(backend, {'a': 'subnet-a', 'b': 'subnet-b'}, ['m6i.large'], chunk=5, seed=0)
+    result = launcher.launch(20)
+    assert result['launched'] == 20
+    assert len(backend.tokens) == result['requests'] > 1
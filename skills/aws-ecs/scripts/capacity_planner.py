@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+ECS capacity planner for aws-ecs skill.
+Category: cloud
+
+Bin-packs the tasks of many services onto each candidate container instance
+type and compares the resulting EC2 clusters with running the same tasks on
+Fargate. Every task is a demand vector (CPU units, memory MiB, ENIs for
+awsvpc tasks, one slot per static host port); instances are capacity
+vectors. Replicas of a service are identical, so each service is placed in
+one vectorized step per algorithm:
+
+    ffd   first-fit decreasing: fill open instances in launch order
+    bfd   best-fit decreasing: fill the fullest open instances first
+
+Services are placed largest first (by their share of the instance's CPU or
+memory). Constraints: awsvpc tasks need one ENI each (max_enis - 1 per
+instance, no ENI trunking); tasks with a static hostPort (bridge/host
+networking) cannot share an instance with another task using that port.
+Tasks run on X86_64 unless runtimePlatform.cpuArchitecture says ARM64 (the
+ECS default), so arm64 instances and Fargate arm64 are only priced for
+task definitions that declare it.
+
+Usage:
+    python capacity_planner.py --service api.json=40 --service worker.json=120
+                               [--services plan.json] [--catalog ../assets/instance-catalog.csv]
+                               [--headroom 10] [--memory-overhead 6] [--arch x86_64|arm64]
+                               [--top 10] [--format table|json]
+
+plan.json: [{"taskDefinition": "api.json" | {...}, "desiredCount": 40}, ...]
+Task definitions may be raw JSON or `aws ecs describe-task-definition` output.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_CATALOG = Path(__file__).parent.parent / 'assets' / 'instance-catalog.csv'
+HOURS_PER_MONTH = 730
+ALGORITHMS = ('ffd', 'bfd')
+
+# Valid Fargate task sizes: CPU units -> memory MiB options
+FARGATE_SIZES = {
+    256: [512, 1024, 2048],
+    512: list(range(1024, 4097, 1024)),
+    1024: list(range(2048, 8193, 1024)),
+    2048: list(range(4096, 16385, 1024)),
+    4096: list(range(8192, 30721, 1024)),
+    8192: list(range(16384, 61441, 4096)),
+    16384: list(range(32768, 122881, 8192)),
+}
+
+# USD per vCPU-hour and per GB-hour, us-east-1 Linux
+FARGATE_PRICE = {'x86_64': (0.04048, 0.004445), 'arm64': (0.03238, 0.00356)}
+
+
+class TaskShape:
+    """Resource demand of one task of a service."""
+
+    def __init__(self, family: str, cpu: int, memory: int, network_mode: str, host_ports: tuple, arch: str):
+        self.family = family
+        self.cpu = cpu
+        self.memory = memory
+        self.network_mode = network_mode
+        self.host_ports = host_ports
+        self.arch = arch
+
+
+def load_task_definition(source) -> TaskShape:
+    """
+    Task shape from a task definition file or dict.
+
+    Task-level cpu/memory win; otherwise container cpu and memory (hard
+    limit, else memoryReservation) are summed, as ECS reserves them.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, 'r') as f:
+            source = json.load(f)
+    td = source.get('taskDefinition', source)
+    containers = td.get('containerDefinitions', [])
+    cpu = int(td.get('cpu') or sum(int(c.get('cpu') or 0) for c in containers))
+    memory = int(td.get('memory') or sum(int(c.get('memory') or c.get('memoryReservation') or 0)
+                                         for c in containers))
+    if memory <= 0:
+        raise ValueError(f"Task definition {td.get('family', '?')} declares no memory")
+    mode = td.get('networkMode', 'bridge')
+    ports = set()
+    if mode != 'awsvpc':
+        for container in containers:
+            for mapping in container.get('portMappings', []):
+                # host networking binds containerPort; bridge without hostPort is dynamic
+                port = mapping.get('hostPort', mapping.get('containerPort') if mode == 'host' else 0)
+                if port:
+                    ports.add((int(port), mapping.get('protocol', 'tcp')))
+    # ECS runs tasks without a runtimePlatform on X86_64
+    arch = (td.get('runtimePlatform') or {}).get('cpuArchitecture', 'X86_64').lower()
+    arch = {'x86_64': 'x86_64', 'arm64': 'arm64'}.get(arch, 'x86_64')
+    return TaskShape(td.get('family', 'task'), cpu, memory, mode, tuple(sorted(ports)), arch)
+
+
+class Catalog:
+    """Candidate instance types held as parallel NumPy columns."""
+
+    def __init__(self, path: str):
+        with open(path, 'r', newline='') as f:
+            rows = list(csv.DictReader(line for line in f if not line.startswith('#')))
+        if not rows:
+            raise ValueError(f"Empty instance catalog: {path}")
+        self.types = np.array([r['instance_type'] for r in rows])
+        self.vcpu = np.array([float(r['vcpu']) for r in rows])
+        self.memory_gib = np.array([float(r['memory_gib']) for r in rows])
+        self.max_enis = np.array([int(r['max_enis']) for r in rows])
+        self.arch = np.array([r['architecture'] for r in rows])
+        self.price = np.array([float(r['hourly_usd']) for r in rows])
+
+
+class Workload:
+    """
+    Demand matrix for a set of services: one row per service, columns
+    cpu, memory, eni, then one column per distinct static host port.
+    """
+
+    def __init__(self, services: list):
+        self.names = []
+        self.counts = []
+        self.shapes = []
+        for shape, count in services:
+            if count > 0:
+                self.names.append(shape.family)
+                self.shapes.append(shape)
+                self.counts.append(int(count))
+        ports = sorted({p for s in self.shapes for p in s.host_ports})
+        self.ports = ports
+        self.demand = np.zeros((len(self.shapes), 3 + len(ports)))
+        for i, shape in enumerate(self.shapes):
+            self.demand[i, :3] = (shape.cpu, shape.memory, shape.network_mode == 'awsvpc')
+            for port in shape.host_ports:
+                self.demand[i, 3 + ports.index(port)] = 1
+        self.counts = np.array(self.counts, dtype=np.int64)
+        self.archs = {s.arch for s in self.shapes}
+
+    @property
+    def tasks(self) -> int:
+        return int(self.counts.sum())
+
+
+def capacity_vector(catalog: Catalog, i: int, n_ports: int, headroom: float, memory_overhead: float) -> np.ndarray:
+    usable = 1 - headroom / 100
+    cap = np.ones(3 + n_ports)
+    cap[0] = catalog.vcpu[i] * 1024 * usable
+    cap[1] = catalog.memory_gib[i] * 1024 * (1 - memory_overhead / 100) * usable
+    cap[2] = catalog.max_enis[i] - 1
+    return cap
+
+
+def fit_counts(free: np.ndarray, demand: np.ndarray, rowwise: bool = False) -> np.ndarray:
+    """How many copies of `demand` fit into each row of `free` (row i of `demand` if rowwise)."""
+    demand = np.asarray(demand) if rowwise else np.broadcast_to(demand, free.shape)
+    need = demand > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(need, free / np.where(need, demand, 1), np.inf)
+    fits = np.minimum(np.min(ratio, axis=1), np.iinfo(np.int64).max // 4)
+    return np.floor(fits + 1e-9).astype(np.int64)
+
+
+def lower_bound(demand: np.ndarray, counts: np.ndarray, cap: np.ndarray) -> int:
+    """Instances no packing can go below: total demand over capacity, per dimension."""
+    total = counts @ demand
+    with np.errstate(divide='ignore', invalid='ignore'):
+        need = np.where(total > 0, total / np.where(cap > 0, cap, 1) - 1e-9, 0)
+    return int(np.ceil(need.max())) if len(need) else 0
+
+
+def pack(demand: np.ndarray, counts: np.ndarray, cap: np.ndarray, algorithm: str = 'ffd'):
+    """
+    Pack services onto identical instances.
+
+    Instances with the same contents are tracked as one group (a run of
+    consecutive instances), so each service step works on a few hundred
+    groups rather than every instance in the cluster. A group stays open
+    only while it has room for the smallest remaining demand in every
+    dimension. The result is the same as placing instance by instance.
+
+    Args:
+        demand: (services x dims) per-task demand
+        counts: tasks per service
+        cap: (dims,) instance capacity
+        algorithm: 'ffd' or 'bfd'
+
+    Returns:
+        (placed, used): (instances x services) task counts and
+        (instances x dims) used capacity, or None if some task fits no instance
+    """
+    per_instance = fit_counts(np.broadcast_to(cap, demand.shape), demand, rowwise=True)
+    if (per_instance[counts > 0] == 0).any():
+        return None
+    # Each service step splits at most one group in three and opens at most two
+    limit = 4 * len(demand) + 1
+    start = np.zeros(limit, dtype=np.int64)
+    size = np.zeros(limit, dtype=np.int64)
+    free = np.zeros((limit, len(cap)))
+    placed = np.zeros((limit, len(demand)), dtype=np.int64)
+    groups = 0
+    active = np.zeros(0, dtype=np.int64)
+    opened = 0
+    scale = np.where(cap[:2] > 0, cap[:2], 1)
+    order = np.argsort(-np.max(demand[:, :2] / cap[:2], axis=1), kind='stable')
+    # Per dimension, the smallest demand among services not yet placed
+    remaining_min = np.minimum.accumulate(demand[order][::-1], axis=0)[::-1] - 1e-9
+    # NaN for dimensions a service does not use, skipped by fmin
+    divisor = np.where(demand > 0, demand, np.nan)
+    uses_any = (demand > 0).any(axis=1)
+    closed = np.zeros(limit, dtype=bool)
+
+    def add_group(first, n, free_row, placed_row):
+        nonlocal groups
+        start[groups], size[groups] = first, n
+        free[groups], placed[groups] = free_row, placed_row
+        groups += 1
+        return groups - 1
+
+    for k, s in enumerate(order):
+        need = int(counts[s])
+        d = demand[s]
+        new_groups = []
+        touched = active[:0]
+        if need and len(active):
+            if algorithm == 'bfd':
+                rows = active[np.lexsort((start[active], np.sum(free[active, :2] / scale, axis=1)))]
+            else:
+                rows = active[np.argsort(start[active], kind='stable')]
+            if uses_any[s]:
+                fit = np.floor(np.fmin.reduce(free[rows] / divisor[s], axis=1) + 1e-9).astype(np.int64)
+            else:
+                fit = np.full(len(rows), need, dtype=np.int64)
+            room = fit * size[rows]
+            before = np.cumsum(room) - room
+            take = np.minimum(np.maximum(need - before, 0), room)
+            touched = rows[take > 0]
+            whole = (take > 0) & (take == room)
+            free[rows[whole]] -= fit[whole, None] * d
+            placed[rows[whole], s] += fit[whole]
+            need -= int(take.sum())
+            for j in np.flatnonzero((take > 0) & (take < room)):
+                # Fill the first q instances of the run, then r tasks on the next one
+                g, f = rows[j], int(fit[j])
+                q, r = divmod(int(take[j]), f)
+                first, n, base_free, base_placed = start[g], size[g], free[g].copy(), placed[g].copy()
+                pieces = [(first, q, f), (first + q, 1 if r else 0, r), (first + q + (r > 0), n - q - (r > 0), 0)]
+                pieces = [p for p in pieces if p[1]]
+                for i, (piece_start, piece_size, tasks) in enumerate(pieces):
+                    row_placed = base_placed.copy()
+                    row_placed[s] += tasks
+                    row_free = base_free - tasks * d if tasks else base_free
+                    if i == 0:
+                        start[g], size[g], free[g], placed[g] = piece_start, piece_size, row_free, row_placed
+                    else:
+                        new_groups.append(add_group(piece_start, piece_size, row_free, row_placed))
+        if need > 0:
+            full, rest = divmod(need, int(per_instance[s]))
+            row_placed = np.zeros(len(demand), dtype=np.int64)
+            if full:
+                row_placed[s] = per_instance[s]
+                new_groups.append(add_group(opened, full, cap - per_instance[s] * d, row_placed))
+            if rest:
+                row_placed[s] = rest
+                new_groups.append(add_group(opened + full, 1, cap - rest * d, row_placed))
+            opened += full + (rest > 0)
+        if new_groups:
+            active = np.concatenate([active, new_groups])
+            touched = np.concatenate([touched, new_groups])
+        if k + 1 < len(order) and len(active):
+            if (remaining_min[k + 1] != remaining_min[k]).any():
+                active = active[np.all(free[active] >= remaining_min[k + 1], axis=1)]
+            elif len(touched):
+                # Only groups that just received tasks can have run out of room
+                full = touched[~np.all(free[touched] >= remaining_min[k + 1], axis=1)]
+                if len(full):
+                    closed[full] = True
+                    active = active[~closed[active]]
+
+    runs = np.argsort(start[:groups], kind='stable')
+    placed = np.repeat(placed[runs], size[runs], axis=0)
+    used = cap - np.repeat(free[runs], size[runs], axis=0)
+    return placed, used
+
+
+def fargate_size(cpu: int, memory: int) -> tuple:
+    """Smallest valid Fargate (cpu, memory) covering the request, or None."""
+    for size_cpu, options in FARGATE_SIZES.items():
+        if size_cpu < cpu:
+            continue
+        for size_memory in options:
+            if size_memory >= memory:
+                return size_cpu, size_memory
+    return None
+
+
+def fargate_option(workload: Workload, arch: str) -> dict:
+    vcpu_price, gb_price = FARGATE_PRICE[arch]
+    hourly = 0.0
+    sizes = {}
+    for shape, count in zip(workload.shapes, workload.counts):
+        size = fargate_size(shape.cpu, shape.memory)
+        if size is None:
+            return {'option': 'FARGATE', 'status': f"{shape.family} exceeds the largest Fargate size"}
+        sizes[shape.family] = f"{size[0]}/{size[1]}"
+        hourly += count * (size[0] / 1024 * vcpu_price + size[1] / 1024 * gb_price)
+    return {
+        'option': 'FARGATE' if arch == 'x86_64' else 'FARGATE (arm64)',
+        'status': 'ok',
+        'task_sizes': sizes,
+        'hourly_usd': round(hourly, 4),
+        'monthly_usd': round(hourly * HOURS_PER_MONTH, 2),
+    }
+
+
+def plan(workload: Workload, catalog: Catalog, headroom: float = 0.0, memory_overhead: float = 6.0,
+         arch: str = None, algorithms: tuple = ALGORITHMS) -> dict:
+    """
+    Pack the workload onto every compatible instance type.
+
+    Args:
+        workload: Services and desired counts
+        catalog: Candidate instance types
+        headroom: Percent of CPU and memory kept free on every instance
+        memory_overhead: Percent of instance memory not registered with ECS
+        arch: Architecture to plan for; must match the task definitions
+              (X86_64 unless runtimePlatform declares ARM64)
+        algorithms: Packing algorithms to try; the better result is kept
+
+    Returns:
+        Options sorted by hourly cost, Fargate included, with placements
+        for the cheapest EC2 option
+    """
+    if len(workload.archs) > 1:
+        raise ValueError("Services require different CPU architectures; plan them separately")
+    required = next(iter(workload.archs), None) or arch
+    if arch and required != arch:
+        raise ValueError(f"Task definitions run on {required}; "
+                         f"set runtimePlatform.cpuArchitecture to plan for {arch}")
+    options = []
+    best_placement = None
+    cpu_demand = float(np.dot(workload.counts, workload.demand[:, 0])) if workload.tasks else 0.0
+    mem_demand = float(np.dot(workload.counts, workload.demand[:, 1])) if workload.tasks else 0.0
+    eni_demand = float(np.dot(workload.counts, workload.demand[:, 2])) if workload.tasks else 0.0
+
+    for i, instance_type in enumerate(catalog.types):
+        if required and catalog.arch[i] != required:
+            continue
+        cap = capacity_vector(catalog, i, len(workload.ports), headroom, memory_overhead)
+        floor = lower_bound(workload.demand, workload.counts, cap)
+        results = []
+        for algorithm in algorithms:
+            packed = pack(workload.demand, workload.counts, cap, algorithm)
+            if packed is None:
+                break  # some task fits no instance of this type, whatever the algorithm
+            results.append((len(packed[0]), ALGORITHMS.index(algorithm), algorithm, packed))
+            if len(packed[0]) <= floor:
+                break  # optimal; a later algorithm could only tie
+        if not results:
+            options.append({'option': str(instance_type), 'status': 'task does not fit'})
+            continue
+        instances, _, algorithm, (placed, used) = min(results, key=lambda r: r[:2])
+        hourly = instances * float(catalog.price[i])
+        option = {
+            'option': str(instance_type),
+            'status': 'ok',
+            'algorithm': algorithm,
+            'instances': instances,
+            'cpu_utilization': round(100 * cpu_demand / (instances * catalog.vcpu[i] * 1024), 1),
+            'memory_utilization': round(100 * mem_demand / (instances * catalog.memory_gib[i] * 1024), 1),
+            'eni_utilization': round(100 * eni_demand / (instances * max(catalog.max_enis[i] - 1, 1)), 1),
+            'hourly_usd': round(hourly, 4),
+            'monthly_usd': round(hourly * HOURS_PER_MONTH, 2),
+        }
+        options.append(option)
+        if best_placement is None or hourly < best_placement[0]:
+            best_placement = (hourly, option['option'], placed)
+
+    options.append(fargate_option(workload, required or 'x86_64'))
+
+    ok = sorted((o for o in options if o['status'] == 'ok'), key=lambda o: o['hourly_usd'])
+    report = {
+        'services': len(workload.names),
+        'tasks': workload.tasks,
+        'demand': {'cpu_units': cpu_demand, 'memory_mib': mem_demand, 'enis': eni_demand},
+        'options': ok + [o for o in options if o['status'] != 'ok'],
+    }
+    if best_placement is not None:
+        report['placement'] = {'instance_type': best_placement[1],
+                               'layouts': layouts(best_placement[2], workload.names)}
+    return report
+
+
+def layouts(placed: np.ndarray, names: list) -> list:
+    """Distinct per-instance task mixes and how many instances use each."""
+    # pack() emits identical instances next to each other: count runs first
+    if len(placed):
+        starts = np.flatnonzero(np.r_[True, np.any(placed[1:] != placed[:-1], axis=1)])
+        sizes = np.diff(np.r_[starts, len(placed)])
+    else:
+        starts = sizes = np.zeros(0, dtype=np.int64)
+    counts = {}
+    for mix, size in zip(map(tuple, placed[starts].tolist()), sizes.tolist()):
+        counts[mix] = counts.get(mix, 0) + size
+    out = []
+    for mix, count in sorted(counts.items(), key=lambda m: (-m[1], m[0])):
+        out.append({'instances': count, 'tasks': {names[j]: n for j, n in enumerate(mix) if n}})
+    return out
+
+
+def format_table(report: dict, top: int) -> str:
+    d = report['demand']
+    lines = [
+        f"Services: {report['services']} | Tasks: {report['tasks']} | "
+        f"CPU: {d['cpu_units'] / 1024:,.1f} vCPU | Memory: {d['memory_mib'] / 1024:,.1f} GiB | "
+        f"ENIs: {d['enis']:,.0f}",
+        '',
+        f"{'Option':<18}{'Algo':<6}{'Instances':>10}{'CPU %':>8}{'Mem %':>8}{'ENI %':>8}"
+        f"{'$/hour':>10}{'$/month':>12}",
+    ]
+    ok = [o for o in report['options'] if o['status'] == 'ok']
+    shown = ok[:top]
+    shown += [o for o in ok[top:] if o['option'].startswith('FARGATE')]
+    for o in shown:
+        if o['option'].startswith('FARGATE'):
+            lines.append(f"{o['option']:<18}{'-':<6}{'-':>10}{'-':>8}{'-':>8}{'-':>8}"
+                         f"{o['hourly_usd']:>10.2f}{o['monthly_usd']:>12,.2f}")
+        else:
+            lines.append(f"{o['option']:<18}{o['algorithm']:<6}{o['instances']:>10}"
+                         f"{o['cpu_utilization']:>8.1f}{o['memory_utilization']:>8.1f}"
+                         f"{o['eni_utilization']:>8.1f}{o['hourly_usd']:>10.2f}{o['monthly_usd']:>12,.2f}")
+    skipped = [o for o in report['options'] if o['status'] != 'ok']
+    if skipped:
+        lines += ['', 'Not viable: ' + ', '.join(f"{o['option']} ({o['status']})" for o in skipped)]
+    if report.get('placement'):
+        placement = report['placement']
+        lines += ['', f"Cheapest EC2 layout ({placement['instance_type']}):"]
+        for layout in placement['layouts'][:5]:
+            mix = ', '.join(f"{n}x {name}" for name, n in layout['tasks'].items())
+            lines.append(f"  {layout['instances']:>6} instances: {mix}")
+    return '\n'.join(lines)
+
+
+def load_services(specs: list, plan_path: str = None) -> list:
+    """(TaskShape, count) pairs from --service FILE=COUNT args and a plan file."""
+    services = []
+    for spec in specs:
+        path, _, count = spec.partition('=')
+        services.append((load_task_definition(path), int(count or 1)))
+    if plan_path:
+        with open(plan_path, 'r') as f:
+            entries = json.load(f)
+        base = Path(plan_path).parent
+        for entry in entries.get('services', entries) if isinstance(entries, dict) else entries:
+            source = entry['taskDefinition']
+            if isinstance(source, str):
+                source = base / source
+            services.append((load_task_definition(source), int(entry.get('desiredCount', 1))))
+    return services
+
+
+def main():
+    """Main planner entry point."""
+    parser = argparse.ArgumentParser(description='Plan ECS cluster capacity and compare EC2 with Fargate')
+    parser.add_argument('--service', action='append', default=[], metavar='TASKDEF[=COUNT]',
+                        help='Task definition JSON and desired count, repeatable')
+    parser.add_argument('--services', help='Plan file listing task definitions and desired counts')
+    parser.add_argument('--catalog', default=str(DEFAULT_CATALOG), help='Instance catalog CSV')
+    parser.add_argument('--headroom', type=float, default=0.0, help='Percent of CPU/memory kept free')
+    parser.add_argument('--memory-overhead', type=float, default=6.0,
+                        help='Percent of instance memory not available to tasks')
+    parser.add_argument('--arch', choices=['x86_64', 'arm64'],
+                        help='Architecture to plan for (must match runtimePlatform; default X86_64)')
+    parser.add_argument('--algorithm', choices=ALGORITHMS, help='Use one packing algorithm only')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    if not args.service and not args.services:
+        parser.error('at least one --service or --services is required')
+    try:
+        workload = Workload(load_services(args.service, args.services))
+        catalog = Catalog(args.catalog)
+    except FileNotFoundError as e:
+        print(f"File not found: {e.filename}", file=sys.stderr)
+        return 4
+    except (ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    if workload.tasks == 0:
+        print("No tasks to place", file=sys.stderr)
+        return 3
+
+    try:
+        report = plan(workload, catalog, args.headroom, args.memory_overhead, args.arch,
+                      (args.algorithm,) if args.algorithm else ALGORITHMS)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Task definition linter for aws-ecs skill.
+Category: cloud
+
+Checks task-definition.json-style files for invalid or wasteful settings:
+
+    fargate-size        cpu/memory is not a valid Fargate combination
+    network-mode        Fargate tasks must use awsvpc
+    container-memory    container limits/reservations exceed the task memory
+    container-cpu       container cpu exceeds the task cpu
+    essential           no essential container
+    health-check        interval/timeout/retries/startPeriod non-numeric or out of range
+    host-port           awsvpc hostPort differs from containerPort
+    image-tag           image uses :latest or no tag
+    logging             container has no logConfiguration
+    oversized           a cheaper valid Fargate size fits the containers
+                        (or the measured usage, with --usage)
+
+Valid sizes come from a table precomputed at import: every Fargate
+(cpu, memory) pair sorted by price, with the next cheaper valid size of
+each. Directories are searched for JSON files that contain
+containerDefinitions and linted in parallel.
+
+Usage CSV (optional, from Container Insights): family,desired_count,cpu_p99,memory_p99
+with utilization in percent of the task size.
+
+Usage:
+    python task_def_lint.py PATH [PATH ...] [--usage usage.csv] [--arch x86_64|arm64]
+                            [--target-cpu 80] [--target-memory 85] [--jobs 4]
+                            [--strict] [--format table|json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from capacity_planner import FARGATE_PRICE, FARGATE_SIZES, HOURS_PER_MONTH
+
+
+SEVERITY_ORDER = {'error': 0, 'warning': 1, 'info': 2}
+SKIP_DIRS = {'.git', 'node_modules', '.venv', 'venv', '__pycache__', 'cdk.out', '.terraform'}
+
+# ECS limits for container health checks (seconds)
+HEALTH_CHECK_LIMITS = {
+    'interval': (5, 300),
+    'timeout': (2, 60),
+    'retries': (1, 10),
+    'startPeriod': (0, 300),
+}
+
+
+def hourly_price(cpu: int, memory: int, arch: str = 'x86_64') -> float:
+    vcpu_price, gb_price = FARGATE_PRICE[arch]
+    return cpu / 1024 * vcpu_price + memory / 1024 * gb_price
+
+
+def build_size_tables(arch: str) -> tuple:
+    """
+    Valid Fargate sizes sorted by price, and each size's next cheaper size.
+
+    Returns:
+        (sizes, next_cheaper): [(hourly, cpu, memory), ...] ascending, and
+        {(cpu, memory): (cpu, memory) or None}
+    """
+    sizes = sorted((hourly_price(cpu, mem, arch), cpu, mem)
+                   for cpu, options in FARGATE_SIZES.items() for mem in options)
+    next_cheaper = {}
+    for i, (_, cpu, mem) in enumerate(sizes):
+        next_cheaper[(cpu, mem)] = sizes[i - 1][1:] if i else None
+    return sizes, next_cheaper
+
+
+SIZE_TABLES = {arch: build_size_tables(arch) for arch in FARGATE_PRICE}
+VALID_SIZES = frozenset(key for key in SIZE_TABLES['x86_64'][1])
+
+
+def cheapest_fit(cpu: float, memory: float, arch: str = 'x86_64'):
+    """Cheapest valid Fargate (cpu, memory) with at least this much of both."""
+    for _, size_cpu, size_mem in SIZE_TABLES[arch][0]:
+        if size_cpu >= cpu and size_mem >= memory:
+            return size_cpu, size_mem
+    return None
+
+
+# Task-level cpu and memory may be given with units ("1 vCPU", "2 GB")
+UNIT_SCALE = {'vcpu': 1024, 'gb': 1024, 'gib': 1024, 'mb': 1, 'mib': 1}
+UNIT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([a-z]*)')
+
+
+def as_int(value):
+    """Parse CPU units or MiB, accepting the "0.25 vCPU" / "2 GB" forms ECS allows."""
+    match = UNIT_RE.fullmatch(str(value).strip().lower())
+    if not match or match.group(2) and match.group(2) not in UNIT_SCALE:
+        return None
+    result = float(match.group(1)) * UNIT_SCALE.get(match.group(2), 1)
+    return int(result) if result.is_integer() else None
+
+
+def as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def lint_task_definition(td: dict, usage: dict = None, arch: str = None,
+                         target_cpu: float = 80.0, target_memory: float = 85.0) -> list:
+    """
+    Lint one task definition.
+
+    Args:
+        td: Task definition (raw or describe-task-definition output)
+        usage: Optional {'desired_count', 'cpu_p99', 'memory_p99'} for this family
+        arch: Pricing architecture (default: runtimePlatform, else x86_64)
+        target_cpu: Maximum CPU % after rightsizing from usage
+        target_memory: Maximum memory % after rightsizing from usage
+
+    Returns:
+        list: Findings {'rule', 'severity', 'message', ...}
+    """
+    td = td.get('taskDefinition', td)
+    findings = []
+
+    def add(rule, severity, message, **extra):
+        findings.append(dict(rule=rule, severity=severity, message=message, **extra))
+
+    containers = td.get('containerDefinitions') or []
+    fargate = 'FARGATE' in (td.get('requiresCompatibilities') or [])
+    cpu, memory = as_int(td.get('cpu')), as_int(td.get('memory'))
+    platform_arch = (td.get('runtimePlatform') or {}).get('cpuArchitecture', '').lower()
+    arch = arch or ('arm64' if platform_arch == 'arm64' else 'x86_64')
+
+    if fargate:
+        if td.get('networkMode') != 'awsvpc':
+            add('network-mode', 'error', f"Fargate requires networkMode awsvpc, got {td.get('networkMode')!r}")
+        if cpu is None or memory is None:
+            add('fargate-size', 'error', 'Fargate task definitions need task-level cpu and memory')
+        elif (cpu, memory) not in VALID_SIZES:
+            fix = cheapest_fit(cpu, memory, arch)
+            hint = f"; nearest valid size is {fix[0]}/{fix[1]}" if fix else ''
+            add('fargate-size', 'error', f"cpu {cpu} / memory {memory} is not a valid Fargate size{hint}")
+
+    if not any(c.get('essential', True) for c in containers):
+        add('essential', 'error', 'No container is marked essential')
+
+    limits = [as_int(c.get('memory')) for c in containers]
+    reservations = [as_int(c.get('memoryReservation')) for c in containers]
+    # ECS reserves memoryReservation when set, else the hard limit
+    floor = sum(r or m or 0 for m, r in zip(limits, reservations))
+    # A container may grow to its hard limit, so size the task for that
+    ceiling = sum(max(m or 0, r or 0) for m, r in zip(limits, reservations))
+    for c, limit, reservation in zip(containers, limits, reservations):
+        name = c.get('name', '?')
+        if limit and reservation and reservation > limit:
+            add('container-memory', 'error', f"{name}: memoryReservation {reservation} exceeds memory {limit}",
+                container=name)
+        if memory is not None and limit and limit > memory:
+            add('container-memory', 'error', f"{name}: memory {limit} exceeds the task's {memory} MiB",
+                container=name)
+        if memory is None and not limit and not reservation:
+            add('container-memory', 'error', f"{name}: needs memory or memoryReservation without task memory",
+                container=name)
+    if memory is not None and floor > memory:
+        add('container-memory', 'error', f"Containers reserve {floor} MiB but the task has {memory} MiB")
+    container_cpu = sum(as_int(c.get('cpu')) or 0 for c in containers)
+    if cpu is not None and container_cpu > cpu:
+        add('container-cpu', 'error', f"Containers reserve {container_cpu} CPU units but the task has {cpu}")
+
+    for c in containers:
+        name = c.get('name', '?')
+        check = c.get('healthCheck')
+        if check:
+            values = {}
+            for key, (low, high) in HEALTH_CHECK_LIMITS.items():
+                value = check.get(key)
+                if value is None:
+                    continue
+                values[key] = as_number(value)
+                if values[key] is None:
+                    add('health-check', 'error', f"{name}: healthCheck {key} {value!r} is not a number",
+                        container=name)
+                elif not low <= values[key] <= high:
+                    add('health-check', 'error', f"{name}: healthCheck {key} {value} outside {low}-{high}",
+                        container=name)
+            interval, timeout = values.get('interval', 30), values.get('timeout', 5)
+            if interval is not None and timeout is not None and timeout >= interval:
+                add('health-check', 'warning', f"{name}: healthCheck timeout {timeout}s is not below "
+                    f"interval {interval}s", container=name)
+        image = c.get('image', '')
+        tail = image.rsplit('/', 1)[-1]
+        if '@sha256:' not in image and (':' not in tail or tail.endswith(':latest')):
+            add('image-tag', 'warning', f"{name}: image {image!r} is not pinned to a tag or digest",
+                container=name)
+        if not c.get('logConfiguration'):
+            add('logging', 'warning', f"{name}: no logConfiguration; output is lost", container=name)
+        if td.get('networkMode') == 'awsvpc':
+            for mapping in c.get('portMappings', []):
+                host = mapping.get('hostPort')
+                if host not in (None, mapping.get('containerPort')):
+                    add('host-port', 'error', f"{name}: awsvpc hostPort {host} must equal containerPort "
+                        f"{mapping.get('containerPort')}", container=name)
+
+    if fargate and (cpu, memory) in VALID_SIZES:
+        oversized(td, cpu, memory, container_cpu, ceiling, usage, arch, target_cpu, target_memory, add)
+    return findings
+
+
+def oversized(td: dict, cpu: int, memory: int, container_cpu: int, container_memory: int, usage: dict,
+              arch: str, target_cpu: float, target_memory: float, add):
+    """Flag a valid Fargate size when a cheaper valid size fits the need."""
+    count = 1
+    if usage and usage.get('desired_count') is not None:
+        count = usage['desired_count']
+    if usage and usage.get('cpu_p99') is not None and usage.get('memory_p99') is not None:
+        need_cpu = max(cpu * usage['cpu_p99'] / target_cpu, container_cpu)
+        need_mem = max(memory * usage['memory_p99'] / target_memory, container_memory)
+        basis = f"p99 usage {usage['cpu_p99']:.0f}% CPU / {usage['memory_p99']:.0f}% memory"
+    elif container_cpu and container_memory:
+        need_cpu, need_mem = container_cpu, container_memory
+        basis = f"containers reserve {container_cpu} CPU and may use {container_memory} MiB"
+    else:
+        return
+    fit = cheapest_fit(need_cpu, need_mem, arch)
+    if fit is None or fit == (cpu, memory):
+        return
+    current = hourly_price(cpu, memory, arch)
+    saving = current - hourly_price(*fit, arch)
+    if saving <= 0:
+        return
+    waste = saving * HOURS_PER_MONTH * count
+    step = SIZE_TABLES[arch][1][(cpu, memory)]
+    add('oversized', 'warning',
+        f"{cpu}/{memory} is oversized ({basis}); {fit[0]}/{fit[1]} fits, saving "
+        f"${waste:,.2f}/month for {count} task(s)",
+        recommended=f"{fit[0]}/{fit[1]}", next_cheaper=f"{step[0]}/{step[1]}" if step else None,
+        monthly_waste=round(waste, 2))
+
+
+def is_task_definition(data) -> bool:
+    return isinstance(data, dict) and 'containerDefinitions' in data.get('taskDefinition', data)
+
+
+def find_task_definitions(paths: list) -> list:
+    """JSON files under the given paths that look like task definitions."""
+    found = []
+    for root in paths:
+        root = Path(root)
+        if root.is_file():
+            found.append(str(root))
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for name in filenames:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    with open(path, 'rb') as f:
+                        if b'containerDefinitions' not in f.read(1 << 20):
+                            continue
+                except OSError:
+                    continue
+                found.append(path)
+    return sorted(found)
+
+
+def lint_file(path: str, usage: dict = None, arch: str = None,
+              target_cpu: float = 80.0, target_memory: float = 85.0) -> dict:
+    """Lint one file; returns {'path', 'family', 'findings'}."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return {'path': path, 'family': None,
+                'findings': [{'rule': 'parse', 'severity': 'error', 'message': str(e)}]}
+    if not is_task_definition(data):
+        return {'path': path, 'family': None, 'findings': [], 'skipped': True}
+    td = data.get('taskDefinition', data)
+    family = td.get('family')
+    findings = lint_task_definition(td, (usage or {}).get(family), arch, target_cpu, target_memory)
+    findings.sort(key=lambda f: SEVERITY_ORDER[f['severity']])
+    return {'path': path, 'family': family, 'findings': findings}
+
+
+def _lint_args(args: tuple) -> dict:
+    return lint_file(*args)
+
+
+def lint_paths(paths: list, usage: dict = None, arch: str = None, target_cpu: float = 80.0,
+               target_memory: float = 85.0, jobs: int = None) -> list:
+    """Lint every task definition under `paths`, in parallel for large sets."""
+    files = find_task_definitions(paths)
+    work = [(path, usage, arch, target_cpu, target_memory) for path in files]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(work) < 32:
+        results = [_lint_args(w) for w in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_lint_args, work, chunksize=max(1, len(work) // (jobs * 4))))
+    return [r for r in results if not r.get('skipped')]
+
+
+def load_usage(path: str) -> dict:
+    """Per-family desired count and p99 utilization from a CSV export."""
+    usage = {}
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(line for line in f if not line.startswith('#')):
+            usage[row['family']] = {
+                'desired_count': int(row['desired_count']) if row.get('desired_count') else None,
+                'cpu_p99': float(row['cpu_p99']) if row.get('cpu_p99') else None,
+                'memory_p99': float(row['memory_p99']) if row.get('memory_p99') else None,
+            }
+    return usage
+
+
+def summarize(results: list) -> dict:
+    counts = {severity: 0 for severity in SEVERITY_ORDER}
+    waste = 0.0
+    for result in results:
+        for finding in result['findings']:
+            counts[finding['severity']] += 1
+            waste += finding.get('monthly_waste', 0.0)
+    return {'files': len(results), **counts, 'monthly_waste': round(waste, 2)}
+
+
+def format_table(results: list, summary: dict) -> str:
+    lines = []
+    for result in results:
+        if not result['findings']:
+            continue
+        lines.append(f"{result['path']} ({result['family'] or '?'})")
+        for f in result['findings']:
+            lines.append(f"  {f['severity']:<8}{f['rule']:<18}{f['message']}")
+    oversized_rows = sorted(((f['monthly_waste'], r['family'], f['recommended'])
+                             for r in results for f in r['findings'] if f['rule'] == 'oversized'),
+                            reverse=True)
+    if oversized_rows:
+        lines += ['', f"{'Family':<32}{'Recommended':>12}{'Waste/mo':>14}"]
+        for waste, family, recommended in oversized_rows[:20]:
+            lines.append(f"{family or '?':<32}{recommended:>12}{'$' + format(waste, ',.2f'):>14}")
+    lines += ['', f"Task definitions: {summary['files']} | Errors: {summary['error']} | "
+              f"Warnings: {summary['warning']} | Estimated waste: ${summary['monthly_waste']:,.2f}/month"]
+    return '\n'.join(lines)
+
+
+def main():
+    """Main linter entry point."""
+    parser = argparse.ArgumentParser(description='Lint ECS task definitions and flag oversized Fargate tasks')
+    parser.add_argument('paths', nargs='+', help='Task definition files or directories to search')
+    parser.add_argument('--usage', help='CSV: family,desired_count,cpu_p99,memory_p99')
+    parser.add_argument('--arch', choices=sorted(FARGATE_PRICE), help='Pricing architecture override')
+    parser.add_argument('--target-cpu', type=float, default=80.0)
+    parser.add_argument('--target-memory', type=float, default=85.0)
+    parser.add_argument('--jobs', type=int, help='Parallel workers (default: CPU count)')
+    parser.add_argument('--strict', action='store_true', help='Exit 1 on warnings too')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    for path in args.paths + ([args.usage] if args.usage else []):
+        if not Path(path).exists():
+            print(f"File not found: {path}", file=sys.stderr)
+            return 4
+    try:
+        usage = load_usage(args.usage) if args.usage else None
+    except (KeyError, ValueError) as e:
+        print(f"Error: invalid usage file: {e}", file=sys.stderr)
+        return 4
+
+    results = lint_paths(args.paths, usage, args.arch, args.target_cpu, args.target_memory, args.jobs)
+    if not results:
+        print("No task definitions found", file=sys.stderr)
+        return 3
+    summary = summarize(results)
+
+    if args.format == 'json':
+        print(json.dumps({'summary': summary, 'results': results}, indent=2))
+    else:
+        print(format_table(results, summary))
+    return 1 if summary['error'] or (args.strict and summary['warning']) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
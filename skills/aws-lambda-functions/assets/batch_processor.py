@@ -0,0 +1,220 @@
+"""
+Concurrent batch processing for SQS, Kinesis and DynamoDB stream events.
+
+Copy next to the handler and wrap a per-record function:
+
+    from batch_processor import process_batch
+
+    def handle_record(record, payload):
+        ...                                   # raise to mark the record failed
+
+    def handler(event, context):
+        return process_batch(event, handle_record, context=context)
+
+Records are grouped by ordering key and groups run concurrently on a
+bounded thread pool (or asyncio tasks for `async def` record functions);
+records inside a group run in order:
+
+    SQS standard     no ordering, every message is its own group
+    SQS FIFO         MessageGroupId
+    Kinesis          partition key
+    DynamoDB         item keys
+
+When a record fails, the records after it in the same group are not
+started and are reported as failed too, so retries keep their order.
+Records not started before the invocation is about to time out are also
+reported. The return value is the partial-batch response; enable
+`ReportBatchItemFailures` on the event source mapping so only the
+reported records are retried.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Stop starting records when less than this much time is left
+TIMEOUT_MARGIN_MS = 2000
+
+
+def default_concurrency() -> int:
+    """
+    Worker count for I/O-bound record handlers.
+
+    Lambda allocates vCPUs in proportion to memory (1 vCPU at 1769 MB);
+    record handlers mostly wait on network calls, so several workers per
+    vCPU keep the allocation busy.
+    """
+    return max(4, min(64, (os.cpu_count() or 1) * 8))
+
+
+def event_source(record: dict) -> str:
+    return record.get('eventSource') or record.get('EventSource') or ''
+
+
+def item_identifier(record: dict) -> str:
+    """Identifier Lambda expects in batchItemFailures for this record."""
+    source = event_source(record)
+    if source == 'aws:sqs':
+        return record['messageId']
+    if source == 'aws:kinesis':
+        return record['kinesis']['sequenceNumber']
+    if source == 'aws:dynamodb':
+        return record['dynamodb']['SequenceNumber']
+    raise ValueError(f"Unsupported event source: {source!r}")
+
+
+def ordering_key(record: dict):
+    """Records sharing a key are processed in order; None means unordered."""
+    source = event_source(record)
+    if source == 'aws:sqs':
+        return record.get('attributes', {}).get('MessageGroupId')
+    if source == 'aws:kinesis':
+        return record['kinesis'].get('partitionKey')
+    if source == 'aws:dynamodb':
+        return json.dumps(record['dynamodb'].get('Keys', {}), sort_keys=True)
+    return None
+
+
+def _deserialize(value: dict):
+    """DynamoDB attribute value (stream image format) to a Python value."""
+    (kind, data), = value.items()
+    if kind in ('S', 'BOOL'):
+        return data
+    if kind == 'N':
+        return float(data) if any(c in data for c in '.eE') else int(data)
+    if kind == 'NULL':
+        return None
+    if kind == 'B':
+        return base64.b64decode(data)
+    if kind == 'M':
+        return {k: _deserialize(v) for k, v in data.items()}
+    if kind == 'L':
+        return [_deserialize(v) for v in data]
+    if kind == 'SS':
+        return set(data)
+    if kind == 'NS':
+        return {float(n) if any(c in n for c in '.eE') else int(n) for n in data}
+    if kind == 'BS':
+        return {base64.b64decode(b) for b in data}
+    raise ValueError(f"Unknown DynamoDB type: {kind}")
+
+
+def record_payload(record: dict):
+    """
+    Decoded payload: SQS body and Kinesis data (JSON-decoded when they are
+    JSON), or the DynamoDB NewImage (OldImage for REMOVE) as a dict.
+    """
+    source = event_source(record)
+    if source == 'aws:sqs':
+        raw = record['body']
+    elif source == 'aws:kinesis':
+        raw = base64.b64decode(record['kinesis']['data']).decode('utf-8', errors='replace')
+    elif source == 'aws:dynamodb':
+        image = record['dynamodb'].get('NewImage') or record['dynamodb'].get('OldImage') or {}
+        return {k: _deserialize(v) for k, v in image.items()}
+    else:
+        raise ValueError(f"Unsupported event source: {source!r}")
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def group_records(records: list) -> list:
+    """Split records into ordered groups, keeping arrival order inside each."""
+    groups = {}
+    unordered = []
+    for record in records:
+        key = ordering_key(record)
+        if key is None:
+            unordered.append([record])
+        else:
+            groups.setdefault(key, []).append(record)
+    return list(groups.values()) + unordered
+
+
+class _Deadline:
+    def __init__(self, context, margin_ms: int):
+        self.context = context
+        self.margin_ms = margin_ms
+
+    def near(self) -> bool:
+        if self.context is None or not hasattr(self.context, 'get_remaining_time_in_millis'):
+            return False
+        return self.context.get_remaining_time_in_millis() < self.margin_ms
+
+
+def _run_group(group: list, record_handler, deadline: _Deadline, errors: list) -> list:
+    """Process one group in order; returns identifiers of records to retry."""
+    for i, record in enumerate(group):
+        if deadline.near():
+            return [item_identifier(r) for r in group[i:]]
+        try:
+            record_handler(record, record_payload(record))
+        except Exception as e:
+            errors.append((item_identifier(record), e))
+            return [item_identifier(r) for r in group[i:]]
+    return []
+
+
+async def _run_group_async(group: list, record_handler, deadline: _Deadline, errors: list,
+                           semaphore: asyncio.Semaphore) -> list:
+    async with semaphore:
+        for i, record in enumerate(group):
+            if deadline.near():
+                return [item_identifier(r) for r in group[i:]]
+            try:
+                await record_handler(record, record_payload(record))
+            except Exception as e:
+                errors.append((item_identifier(record), e))
+                return [item_identifier(r) for r in group[i:]]
+    return []
+
+
+def process_batch(event: dict, record_handler, context=None, concurrency: int = None,
+                  timeout_margin_ms: int = TIMEOUT_MARGIN_MS, on_error=None) -> dict:
+    """
+    Process a batch event and return the partial batch response.
+
+    Args:
+        event: SQS, Kinesis or DynamoDB stream event
+        record_handler: fn(record, payload) or async fn(record, payload);
+            raising marks the record (and the rest of its group) failed
+        context: Lambda context, used to stop before the timeout
+        concurrency: parallel groups (default: default_concurrency())
+        timeout_margin_ms: stop starting records with less time left
+        on_error: optional fn(item_identifier, exception) for logging
+
+    Returns:
+        {'batchItemFailures': [{'itemIdentifier': ...}, ...]}
+    """
+    records = event.get('Records', [])
+    groups = group_records(records)
+    deadline = _Deadline(context, timeout_margin_ms)
+    concurrency = concurrency or default_concurrency()
+    errors = []
+
+    if asyncio.iscoroutinefunction(record_handler):
+        async def run_all():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(
+                _run_group_async(g, record_handler, deadline, errors, semaphore) for g in groups))
+        results = asyncio.run(run_all())
+    elif concurrency == 1 or len(groups) <= 1:
+        results = [_run_group(g, record_handler, deadline, errors) for g in groups]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(groups))) as pool:
+            results = list(pool.map(lambda g: _run_group(g, record_handler, deadline, errors), groups))
+
+    if on_error:
+        for identifier, exc in errors:
+            on_error(identifier, exc)
+
+    failed = {identifier for result in results for identifier in result}
+    # Report in batch order; for streams Lambda resumes from the lowest one
+    failures = [{'itemIdentifier': item_identifier(r)} for r in records if item_identifier(r) in failed]
+    return {'batchItemFailures': failures}
@@ -1,8 +1,183 @@
+"""
+AWS Lambda function template (Python), tuned for cold starts.
+
+- Only the standard library is imported at module load; boto3/botocore are
+  imported the first time a client is needed.
+- Clients are created once per execution environment and reused.
+- Configuration and secrets are cached with a TTL. Names listed in
+  PREFETCH_PARAMETERS / PREFETCH_SECRETS are fetched during init, which
+  runs with full CPU before the first request is billed.
+- Logging writes one JSON line per call with no logging framework; DEBUG
+  lines and event dumps are kept for a sampled share of invocations.
+- Every invocation logs whether it was cold and, if so, the init duration.
+
+Environment:
+    LOG_LEVEL              DEBUG | INFO | WARNING | ERROR (default INFO)
+    LOG_SAMPLE_RATE        share of invocations logged at DEBUG (default 0.01)
+    CONFIG_TTL_SECONDS     cache lifetime for parameters/secrets (default 300)
+    PREFETCH_PARAMETERS    comma-separated SSM parameter names
+    PREFETCH_SECRETS       comma-separated Secrets Manager secret IDs
+
+Handler: copy to main.py and configure main.handler
+"""
+
 import json
+import os
+import sys
+import time
+
+_INIT_START = time.perf_counter()
+
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+LOG_LEVEL = LOG_LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').upper(), 20)
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0.01'))
+CONFIG_TTL = float(os.environ.get('CONFIG_TTL_SECONDS', '300'))
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+MAX_EVENT_LOG_BYTES = 4096
+
+
+# --- Logging -----------------------------------------------------------------
+
+_log_context = {'function_name': FUNCTION_NAME}
+_log_level = LOG_LEVEL
+
+
+def log(level: str, message: str, **fields):
+    """Write one structured log line if level is enabled for this invocation."""
+    if LOG_LEVELS[level] < _log_level:
+        return
+    record = {'level': level, 'message': message}
+    record.update(_log_context)
+    record.update(fields)
+    sys.stdout.write(json.dumps(record, default=str) + '\n')
+
+
+# --- Clients -----------------------------------------------------------------
+
+_clients = {}
+
+
+def client(service: str):
+    """
+    Boto3 client reused across invocations.
+
+    boto3 is imported on first use so handlers that never call AWS do not
+    pay for it during init.
+    """
+    c = _clients.get(service)
+    if c is None:
+        import boto3
+        from botocore.config import Config
+        c = _clients[service] = boto3.client(service, config=Config(
+            connect_timeout=2,
+            read_timeout=5,
+            retries={'max_attempts': 3, 'mode': 'standard'},
+            tcp_keepalive=True,
+        ))
+    return c
+
+
+# --- Configuration and secrets ---------------------------------------------
+
+_config_cache = {}
+
+
+def _cached(key: tuple, fetch):
+    """
+    Return a cached value, refreshing it after CONFIG_TTL seconds.
+
+    If a refresh fails, the stale value keeps being served (and the refresh
+    is retried on the next call) so a throttled or briefly unavailable
+    SSM/Secrets Manager does not fail requests.
+    """
+    now = time.monotonic()
+    entry = _config_cache.get(key)
+    if entry and entry[1] > now:
+        return entry[0]
+    try:
+        value = fetch()
+    except Exception as e:
+        if entry is None:
+            raise
+        log('WARNING', 'Config refresh failed, serving cached value', key=key[1], error=str(e))
+        return entry[0]
+    _config_cache[key] = (value, now + CONFIG_TTL)
+    return value
+
+
+def get_parameter(name: str) -> str:
+    """SSM parameter value (decrypted), cached with TTL."""
+    return _cached(('ssm', name), lambda: client('ssm').get_parameter(
+        Name=name, WithDecryption=True)['Parameter']['Value'])
+
+
+def get_secret(secret_id: str):
+    """Secrets Manager secret (parsed if JSON), cached with TTL."""
+    def fetch():
+        value = client('secretsmanager').get_secret_value(SecretId=secret_id)['SecretString']
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return _cached(('secret', secret_id), fetch)
+
+
+def _prefetch():
+    for name in filter(None, os.environ.get('PREFETCH_PARAMETERS', '').split(',')):
+        get_parameter(name.strip())
+    for secret_id in filter(None, os.environ.get('PREFETCH_SECRETS', '').split(',')):
+        get_secret(secret_id.strip())
+
+
+# --- Business logic ----------------------------------------------------------
+
+def process_event(event: dict, context) -> dict:
+    """Replace with the function's work. Runs once per invocation."""
+    return {'message': 'Success'}
+
+
+# --- Handler -----------------------------------------------------------------
+
+_prefetch()
+_INIT_MS = (time.perf_counter() - _INIT_START) * 1000
+_cold = True
+
+
+def handler(event, context):
+    """
+    Lambda handler function.
+
+    Args:
+        event: Trigger event data
+        context: Runtime context (request_id, memory_limit, etc.)
+
+    Returns:
+        API Gateway proxy response
+    """
+    global _cold, _log_level
+    start = time.perf_counter()
+    cold, _cold = _cold, False
+    # os.urandom instead of random: importing random costs ~2 ms of init
+    sampled = int.from_bytes(os.urandom(2), 'big') < LOG_SAMPLE_RATE * 65536
+    _log_level = LOG_LEVELS['DEBUG'] if sampled else LOG_LEVEL
+    _log_context['request_id'] = getattr(context, 'aws_request_id', None)
+    _log_context['cold_start'] = cold
+
+    if _log_level <= LOG_LEVELS['DEBUG']:
+        log('DEBUG', 'Event', event=json.dumps(event, default=str)[:MAX_EVENT_LOG_BYTES])
+
+    try:
+        result = process_event(event, context)
+        response = {'statusCode': 200, 'body': json.dumps(result)}
+    except Exception as e:
+        log('ERROR', 'Unhandled error', error=str(e), error_type=type(e).__name__)
+        response = {'statusCode': 500, 'body': json.dumps({'error': 'Internal error'})}
+
+    timing = {'duration_ms': round((time.perf_counter() - start) * 1000, 3)}
+    if cold:
+        timing['init_ms'] = round(_INIT_MS, 3)
+    log('INFO', 'Invocation complete', status=response['statusCode'], **timing)
+    return response
+
 
-def lambda_handler(event, context):
-    """AWS Lambda function template"""
-    return {
-        'statusCode': 200,
-        'body': json.dumps({'message': 'Success'})
-    }
+lambda_handler = handler
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Local cold/warm start harness for aws-lambda-functions skill.
+Category: cloud
+
+Measures a Python handler the way the Lambda runtime exercises it:
+
+- cold: N fresh interpreters each import the handler module and invoke
+  it once, reporting module init time and first-invoke time, plus the
+  slowest imports (from `python -X importtime`) of one cold run;
+- warm: one interpreter invokes the handler M times, reporting per-invoke
+  latency next to a no-op baseline handler so the framework overhead of
+  logging, timing and error handling is visible.
+
+Usage:
+    python cold_start_harness.py HANDLER_FILE [--handler handler] [--event event.json]
+                                 [--cold 10] [--warm 1000] [--env KEY=VALUE ...]
+                                 [--format table|json]
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import redirect_stdout
+from pathlib import Path
+
+
+DEFAULT_EVENT = {
+    'httpMethod': 'GET',
+    'path': '/health',
+    'headers': {'accept': 'application/json'},
+    'queryStringParameters': None,
+    'body': None,
+}
+
+LAMBDA_ENV = {
+    'AWS_LAMBDA_FUNCTION_NAME': 'local-harness',
+    'AWS_LAMBDA_FUNCTION_MEMORY_SIZE': '1024',
+    'AWS_REGION': 'us-east-1',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+}
+
+# Run inside each fresh interpreter: import, invoke once, print timings as JSON
+COLD_CHILD = r'''
+import importlib.util, io, json, os, sys, time
+from contextlib import redirect_stdout
+# Lambda puts the task root first on sys.path; sibling modules import from there
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[1])))
+sys.stderr.write("--- handler init ---\n")
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("handler_module", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+with redirect_stdout(io.StringIO()):
+    spec.loader.exec_module(module)
+t1 = time.perf_counter()
+handler = getattr(module, sys.argv[2])
+event = json.loads(sys.argv[3])
+class Context:
+    function_name = "local-harness"
+    memory_limit_in_mb = 1024
+    aws_request_id = "00000000-0000-0000-0000-000000000000"
+    def get_remaining_time_in_millis(self):
+        return 30000
+with redirect_stdout(io.StringIO()):
+    handler(event, Context())
+t2 = time.perf_counter()
+print(json.dumps({"init_ms": (t1 - t0) * 1000, "first_invoke_ms": (t2 - t1) * 1000}))
+'''
+
+INIT_MARKER = '--- handler init ---'
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+class MockContext:
+    """Minimal stand-in for the Lambda context object."""
+
+    function_name = LAMBDA_ENV['AWS_LAMBDA_FUNCTION_NAME']
+    memory_limit_in_mb = int(LAMBDA_ENV['AWS_LAMBDA_FUNCTION_MEMORY_SIZE'])
+    invoked_function_arn = f"arn:aws:lambda:us-east-1:123456789012:function:{function_name}"
+
+    def __init__(self, timeout_ms: int = 30000):
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(values: list) -> dict:
+    return {
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'p99': round(percentile(values, 99), 3),
+        'max': round(max(values), 3),
+        'mean': round(statistics.fmean(values), 3),
+    }
+
+
+def cold_runs(path: str, handler: str, event: dict, runs: int, env: dict) -> dict:
+    """Import and invoke in `runs` fresh interpreters."""
+    init, first = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', COLD_CHILD, path, handler, json.dumps(event)],
+                             capture_output=True, text=True, env=env)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else 'cold run failed')
+        timing = json.loads(out.stdout.strip().splitlines()[-1])
+        init.append(timing['init_ms'])
+        first.append(timing['first_invoke_ms'])
+    return {'runs': runs, 'init_ms': summarize(init), 'first_invoke_ms': summarize(first)}
+
+
+def slowest_imports(path: str, handler: str, event: dict, env: dict, top: int = 10) -> list:
+    """Top-level imports with the largest cumulative time in one cold run."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', COLD_CHILD, path, handler, json.dumps(event)],
+                         capture_output=True, text=True, env=env)
+    # Skip interpreter start-up and the harness's own imports
+    stderr = out.stderr.split(INIT_MARKER, 1)[-1]
+    rows = []
+    for line in stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) <= 1:
+            rows.append({'module': m.group(4), 'cumulative_ms': round(int(m.group(2)) / 1000, 3)})
+    rows.sort(key=lambda r: -r['cumulative_ms'])
+    return rows[:top]
+
+
+def load_handler(path: str, name: str):
+    """Import the handler file in this process, with its directory on sys.path."""
+    root = str(Path(path).resolve().parent)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    spec = importlib.util.spec_from_file_location('handler_module', path)
+    module = importlib.util.module_from_spec(spec)
+    with redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return getattr(module, name)
+
+
+def warm_runs(path: str, handler_name: str, event: dict, runs: int) -> dict:
+    """Invoke one warm handler `runs` times next to a no-op baseline."""
+    handler = load_handler(path, handler_name)
+
+    def baseline(event, context):
+        return {'statusCode': 200, 'body': '{}'}
+
+    results = {}
+    sink = io.StringIO()
+    for label, fn in (('baseline', baseline), ('handler', handler)):
+        timings = []
+        with redirect_stdout(sink):
+            fn(event, MockContext())  # the handler's cold invoke is measured separately
+            for _ in range(runs):
+                context = MockContext()
+                start = time.perf_counter()
+                fn(event, context)
+                timings.append((time.perf_counter() - start) * 1e6)
+                sink.seek(0)
+                sink.truncate()
+        results[label] = summarize(timings)
+    overhead = round(results['handler']['p50'] - results['baseline']['p50'], 3)
+    return {'runs': runs, 'invoke_us': results['handler'], 'baseline_us': results['baseline'],
+            'overhead_p50_us': overhead}
+
+
+def format_table(report: dict) -> str:
+    cold, warm = report['cold'], report['warm']
+    lines = [f"Handler: {report['handler']}", ""]
+    lines.append(f"{'Measure':<26} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    for label, stats in (
+        (f"Init (ms, {cold['runs']} cold)", cold['init_ms']),
+        ('First invoke (ms)', cold['first_invoke_ms']),
+        (f"Warm invoke (us, {warm['runs']})", warm['invoke_us']),
+        ('No-op baseline (us)', warm['baseline_us']),
+    ):
+        lines.append(f"{label:<26} {stats['p50']:>10.3f} {stats['p95']:>10.3f} "
+                     f"{stats['p99']:>10.3f} {stats['max']:>10.3f}")
+    lines.append(f"\nPer-invoke overhead vs baseline (p50): {warm['overhead_p50_us']:.1f} us")
+    if report.get('imports'):
+        lines.append("\nSlowest imports during init")
+        for row in report['imports']:
+            lines.append(f"  {row['cumulative_ms']:>9.3f} ms  {row['module']}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main cold start harness entry point."""
+    parser = argparse.ArgumentParser(description='Measure Lambda handler init and per-invoke overhead locally')
+    parser.add_argument('handler_file', help='Python file containing the handler')
+    parser.add_argument('--handler', default='handler', help='Handler function name')
+    parser.add_argument('--event', help='JSON event file (default: API Gateway GET)')
+    parser.add_argument('--cold', type=int, default=10, help='Fresh-interpreter cold runs')
+    parser.add_argument('--warm', type=int, default=1000, help='Warm invocations')
+    parser.add_argument('--env', action='append', default=[], help='KEY=VALUE for the handler environment')
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
+    args = parser.parse_args()
+
+    if not Path(args.handler_file).is_file():
+        print(f"Error: handler file not found: {args.handler_file}", file=sys.stderr)
+        return 4
+    event = DEFAULT_EVENT
+    if args.event:
+        with open(args.event, 'r') as f:
+            event = json.load(f)
+
+    env = dict(os.environ)
+    env.update(LAMBDA_ENV)
+    for item in args.env:
+        key, _, value = item.partition('=')
+        env[key] = value
+    # Warm runs load the handler in this process
+    os.environ.update(env)
+
+    try:
+        report = {
+            'handler': f"{args.handler_file}:{args.handler}",
+            'cold': cold_runs(args.handler_file, args.handler, event, args.cold, env),
+            'warm': warm_runs(args.handler_file, args.handler, event, args.warm),
+            'imports': slowest_imports(args.handler_file, args.handler, event, env),
+        }
+    except (RuntimeError, AttributeError, ImportError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Batch event generator and load driver for aws-lambda-functions skill.
+Category: cloud
+
+Generates realistic SQS (standard and FIFO), Kinesis and DynamoDB stream
+events for local tests, and optionally drives a handler with them to
+measure batch throughput and partial-failure behaviour. Payloads carry a
+`fail` flag for a configurable share of records and a `sleep_ms` field so
+sample handlers can simulate I/O latency.
+
+Usage:
+    python event_generator.py sqs-fifo --records 100 --groups 10 > event.json
+    python event_generator.py kinesis --records 500 --groups 8 \\
+        --run handler.py --handler handler --iterations 20 [--fail-rate 0.01]
+"""
+
+import argparse
+import base64
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+
+SOURCES = ('sqs', 'sqs-fifo', 'kinesis', 'dynamodb')
+REGION = 'us-east-1'
+ACCOUNT = '123456789012'
+
+
+def payload(rng: random.Random, index: int, group: str, size: int, fail_rate: float, sleep_ms: float) -> dict:
+    body = {
+        'id': index,
+        'group': group,
+        'amount': round(rng.uniform(1, 500), 2),
+        'fail': rng.random() < fail_rate,
+        'sleep_ms': sleep_ms,
+    }
+    pad = size - len(json.dumps(body))
+    if pad > 0:
+        body['pad'] = 'x' * pad
+    return body
+
+
+def sqs_record(body: dict, group: str, index: int, fifo: bool) -> dict:
+    text = json.dumps(body)
+    now_ms = str(int(time.time() * 1000))
+    attributes = {
+        'ApproximateReceiveCount': '1',
+        'SentTimestamp': now_ms,
+        'SenderId': 'AIDAEXAMPLE',
+        'ApproximateFirstReceiveTimestamp': now_ms,
+    }
+    if fifo:
+        attributes.update({'MessageGroupId': group, 'MessageDeduplicationId': str(index),
+                           'SequenceNumber': str(10 ** 19 + index)})
+    queue = 'load-test.fifo' if fifo else 'load-test'
+    return {
+        'messageId': str(uuid.uuid4()),
+        'receiptHandle': base64.b64encode(uuid.uuid4().bytes).decode(),
+        'body': text,
+        'attributes': attributes,
+        'messageAttributes': {},
+        'md5OfBody': hashlib.md5(text.encode()).hexdigest(),
+        'eventSource': 'aws:sqs',
+        'eventSourceARN': f"arn:aws:sqs:{REGION}:{ACCOUNT}:{queue}",
+        'awsRegion': REGION,
+    }
+
+
+def kinesis_record(body: dict, group: str, index: int) -> dict:
+    sequence = str(49590338271490256608559692538361571095921575989136588898 + index)
+    return {
+        'kinesis': {
+            'kinesisSchemaVersion': '1.0',
+            'partitionKey': group,
+            'sequenceNumber': sequence,
+            'data': base64.b64encode(json.dumps(body).encode()).decode(),
+            'approximateArrivalTimestamp': time.time(),
+        },
+        'eventSource': 'aws:kinesis',
+        'eventVersion': '1.0',
+        'eventID': f"shardId-000000000000:{sequence}",
+        'eventName': 'aws:kinesis:record',
+        'invokeIdentityArn': f"arn:aws:iam::{ACCOUNT}:role/lambda-role",
+        'awsRegion': REGION,
+        'eventSourceARN': f"arn:aws:kinesis:{REGION}:{ACCOUNT}:stream/load-test",
+    }
+
+
+def dynamo_value(value):
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, float)):
+        return {'N': str(value)}
+    return {'S': str(value)}
+
+
+def dynamodb_record(body: dict, group: str, index: int) -> dict:
+    return {
+        'eventID': uuid.uuid4().hex,
+        'eventName': 'MODIFY' if index % 3 else 'INSERT',
+        'eventVersion': '1.1',
+        'eventSource': 'aws:dynamodb',
+        'awsRegion': REGION,
+        'dynamodb': {
+            'ApproximateCreationDateTime': int(time.time()),
+            'Keys': {'pk': {'S': group}},
+            'NewImage': {k: dynamo_value(v) for k, v in body.items()},
+            'SequenceNumber': str(10 ** 20 + index),
+            'SizeBytes': len(json.dumps(body)),
+            'StreamViewType': 'NEW_IMAGE',
+        },
+        'eventSourceARN': f"arn:aws:dynamodb:{REGION}:{ACCOUNT}:table/load-test/stream/"
+                          f"{datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000')}",
+    }
+
+
+def generate(source: str, records: int, groups: int, size: int = 256, fail_rate: float = 0.0,
+             sleep_ms: float = 0.0, seed: int = 0, offset: int = 0) -> dict:
+    """One batch event with `records` records spread over `groups` ordering keys."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(records):
+        index = offset + i
+        group = f"group-{rng.randrange(groups)}"
+        body = payload(rng, index, group, size, fail_rate, sleep_ms)
+        if source in ('sqs', 'sqs-fifo'):
+            out.append(sqs_record(body, group, index, source == 'sqs-fifo'))
+        elif source == 'kinesis':
+            out.append(kinesis_record(body, group, index))
+        else:
+            out.append(dynamodb_record(body, group, index))
+    return {'Records': out}
+
+
+class MockContext:
+    function_name = 'load-test'
+    memory_limit_in_mb = 1769
+
+    def __init__(self, timeout_ms: int):
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def run(path: str, handler_name: str, args) -> dict:
+    """Invoke the handler with fresh batches and report throughput."""
+    # Lambda puts the task root first on sys.path; sibling modules import from there
+    root = os.path.dirname(os.path.abspath(path))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    spec = importlib.util.spec_from_file_location('handler_module', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    handler = getattr(module, handler_name)
+
+    durations, failed, total = [], 0, 0
+    for i in range(args.iterations):
+        event = generate(args.source, args.records, args.groups, args.payload_bytes, args.fail_rate,
+                         args.sleep_ms, seed=args.seed + i, offset=i * args.records)
+        start = time.perf_counter()
+        response = handler(event, MockContext(args.timeout * 1000))
+        durations.append(time.perf_counter() - start)
+        failed += len((response or {}).get('batchItemFailures', []))
+        total += args.records
+    elapsed = sum(durations)
+    durations.sort()
+    return {
+        'batches': args.iterations,
+        'records': total,
+        'failed_records': failed,
+        'records_per_second': round(total / elapsed, 1) if elapsed else None,
+        'batch_ms_p50': round(durations[len(durations) // 2] * 1000, 2),
+        'batch_ms_max': round(durations[-1] * 1000, 2),
+    }
+
+
+def main():
+    """Main event generator entry point."""
+    parser = argparse.ArgumentParser(description='Generate SQS/Kinesis/DynamoDB batch events')
+    parser.add_argument('source', choices=SOURCES, help='Event source')
+    parser.add_argument('--records', type=int, default=10, help='Records per batch')
+    parser.add_argument('--groups', type=int, default=4, help='Message groups / partition keys / items')
+    parser.add_argument('--payload-bytes', type=int, default=256, help='Approximate payload size')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of records with fail=true')
+    parser.add_argument('--sleep-ms', type=float, default=0.0, help='sleep_ms field for simulated I/O')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--run', metavar='HANDLER_FILE', help='Drive this handler instead of printing')
+    parser.add_argument('--handler', default='handler', help='Handler function name')
+    parser.add_argument('--iterations', type=int, default=10, help='Batches to send with --run')
+    parser.add_argument('--timeout', type=int, default=30, help='Simulated function timeout (seconds)')
+    args = parser.parse_args()
+
+    if not args.run:
+        print(json.dumps(generate(args.source, args.records, args.groups, args.payload_bytes,
+                                  args.fail_rate, args.sleep_ms, args.seed), indent=2))
+        return 0
+    try:
+        report = run(args.run, args.handler, args)
+    except (OSError, AttributeError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
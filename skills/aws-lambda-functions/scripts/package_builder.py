@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Lean, deterministic Lambda package builder for aws-lambda-functions skill.
+Category: cloud
+
+Replaces `zip -r function.zip .` for Python functions:
+
+- follows the handler's imports (including imports inside functions) to
+  collect only the first-party modules it can reach, and the third-party
+  distributions (from a `pip install -t` directory) they depend on;
+- keeps every non-Python file under the source directory (config.json,
+  templates/, ...) except build files and patterns from --ignore or a
+  .lambdaignore file;
+- drops tests, caches, stale bytecode, type stubs, C sources and docs;
+- precompiles bytecode for the target runtime with hash-based .pyc files,
+  so /var/task (read-only) is not recompiled on every cold start;
+- optionally moves third-party code into a layer zip (shared between
+  several handlers built together);
+- writes byte-reproducible zips (sorted entries, fixed timestamps and
+  permissions) and a manifest with each zip's CodeSha256, so unchanged
+  packages can skip upload;
+- reports size per dependency.
+
+Usage:
+    pip install -r requirements.txt -t build/deps --platform manylinux2014_x86_64 \\
+        --python-version 3.12 --only-binary=:all:
+    python package_builder.py SRC_DIR --handler main.handler [--handler jobs.handler]
+                              [--deps build/deps] [--out dist] [--runtime python3.12]
+                              [--arch x86_64|arm64] [--layer] [--exclude boto3,botocore]
+                              [--ignore 'fixtures/*' ...]
+                              [--previous dist/package-manifest.json] [--format table|json]
+"""
+
+import argparse
+import ast
+import base64
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import py_compile
+import re
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+COMPRESS_LEVEL = 9
+DIRECT_UPLOAD_LIMIT = 50 * 1024 * 1024
+UNZIPPED_LIMIT = 250 * 1024 * 1024
+
+# Runtime-provided SDK for Python runtimes; exclude with --exclude to rely on it
+RUNTIME_SDK = ('boto3', 'botocore', 's3transfer', 'jmespath')
+
+JUNK_DIRS = {'__pycache__', 'tests', 'test', 'testing_data', 'docs', 'doc', 'examples',
+             'benchmarks', '.git', '.pytest_cache', '.mypy_cache', '.tox', '.venv', 'venv', 'node_modules'}
+JUNK_SUFFIXES = ('.pyc', '.pyo', '.pyi', '.c', '.h', '.cpp', '.pyx', '.pxd', '.md', '.rst',
+                 '.egg-info', '.whl', '.zip', '.DS_Store')
+DIST_INFO_KEEP = ('METADATA', 'entry_points.txt', 'top_level.txt')
+# Build and deployment files that sit next to the handler but are not read at run time
+DATA_IGNORE = ('requirements*.txt', 'Pipfile', 'Pipfile.lock', 'poetry.lock', 'pyproject.toml', 'setup.cfg',
+               'template.yaml', 'template.yml', 'samconfig.toml', 'serverless.yml', 'Dockerfile', 'Makefile')
+IGNORE_FILE = '.lambdaignore'
+ARCH_MARKERS = {'x86_64': ('x86_64', 'amd64'), 'arm64': ('aarch64', 'arm64')}
+
+
+def stdlib_modules() -> set:
+    names = set(getattr(sys, 'stdlib_module_names', ()))
+    names.update(sys.builtin_module_names)
+    return names
+
+
+def top_name(name: str) -> str:
+    """Import name for a top-level entry: pkg, mod.py, ext.cpython-312-x86_64-linux-gnu.so."""
+    return name.split('.')[0]
+
+
+def is_junk(relative: Path) -> bool:
+    if any(part in JUNK_DIRS for part in relative.parts[:-1]):
+        return True
+    name = relative.name
+    return name.endswith(JUNK_SUFFIXES) or name.startswith('.')
+
+
+def module_imports(path: Path, module: str, is_package: bool) -> set:
+    """Absolute module names imported anywhere in a file (top level or inside functions)."""
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (SyntaxError, ValueError):
+        return set()
+    package = module if is_package else module.rpartition('.')[0]
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.split('.') if package else []
+                base = base[:len(base) - (node.level - 1)] if node.level > 1 else base
+                target = '.'.join(base + ([node.module] if node.module else []))
+            else:
+                target = node.module or ''
+            if not target:
+                continue
+            found.add(target)
+            # `from pkg import name` may name a submodule
+            found.update(f"{target}.{alias.name}" for alias in node.names if alias.name != '*')
+    return found
+
+
+def resolve(root: Path, module: str):
+    """(file, is_package) for a dotted module under root, or None."""
+    base = root.joinpath(*module.split('.'))
+    init = base / '__init__.py'
+    if init.is_file():
+        return init, True
+    py = base.with_suffix('.py')
+    if py.is_file():
+        return py, False
+    if base.is_dir():
+        return None, True  # namespace package
+    return None
+
+
+class DependencyIndex:
+    """Maps top-level import names in a `pip install -t` directory to distributions."""
+
+    def __init__(self, deps: Path):
+        self.deps = deps
+        self.dist_of = {}
+        self.dist_info = {}
+        if not deps or not deps.is_dir():
+            return
+        for info in sorted(deps.glob('*.dist-info')):
+            dist = info.name[:-len('.dist-info')].rsplit('-', 1)[0]
+            self.dist_info[dist] = info
+            tops = set()
+            top_level = info / 'top_level.txt'
+            if top_level.is_file():
+                tops.update(line.strip() for line in top_level.read_text().splitlines() if line.strip())
+            record = info / 'RECORD'
+            if record.is_file():
+                for line in record.read_text().splitlines():
+                    first = line.split(',', 1)[0].split('/', 1)[0]
+                    if first and not first.endswith(('.dist-info', '.data')) and first not in ('..', '__pycache__'):
+                        tops.add(top_name(first))
+            for top in tops:
+                self.dist_of.setdefault(top, dist)
+        for entry in deps.iterdir():
+            if not entry.name.endswith(('.dist-info', '.data')):
+                self.dist_of.setdefault(top_name(entry.name), top_name(entry.name))
+
+    def files(self, dist: str) -> list:
+        """Files belonging to a distribution (its top-level packages/modules and dist-info)."""
+        out = []
+        for top, owner in sorted(self.dist_of.items()):
+            if owner != dist:
+                continue
+            for candidate in sorted(self.deps.glob(f"{top}*")):
+                if top_name(candidate.name) != top or candidate.name.endswith(('.dist-info', '.data')):
+                    continue
+                if candidate.is_dir():
+                    out.extend(p for p in sorted(candidate.rglob('*')) if p.is_file())
+                else:
+                    out.append(candidate)
+        info = self.dist_info.get(dist)
+        if info:
+            out.extend(info / name for name in DIST_INFO_KEEP if (info / name).is_file())
+        return out
+
+
+def closure(src: Path, handler_module: str, deps: DependencyIndex, excluded: set):
+    """
+    First-party files reachable from the handler and third-party distributions used.
+
+    Third-party distributions are included whole (minus junk) because
+    packages load submodules and data files dynamically; their own imports
+    are scanned to pull in the distributions they depend on.
+    """
+    stdlib = stdlib_modules()
+    first_party = {}
+    dists = set()
+    pending = [handler_module]
+    seen = set()
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        top = module.split('.')[0]
+        if top in stdlib or top in excluded:
+            continue
+        resolved = resolve(src, module)
+        if resolved:
+            path, is_package = resolved
+            # Parents of a submodule are imported first
+            parent = module.rpartition('.')[0]
+            if parent:
+                pending.append(parent)
+            if path is not None:
+                first_party[path] = module
+                pending.extend(module_imports(path, module, is_package))
+            continue
+        dist = deps.dist_of.get(top)
+        if dist and dist not in dists and top not in excluded:
+            dists.add(dist)
+            for file in deps.files(dist):
+                if file.suffix == '.py' and not is_junk(file.relative_to(deps.deps)):
+                    rel = file.relative_to(deps.deps).with_suffix('')
+                    name = '.'.join(rel.parts[:-1] if rel.name == '__init__' else rel.parts)
+                    for imported in module_imports(file, name, rel.name == '__init__'):
+                        imported_top = imported.split('.')[0]
+                        if imported_top not in stdlib and deps.dist_of.get(imported_top) not in dists:
+                            pending.append(imported_top)
+    return first_party, dists
+
+
+def ignore_patterns(src: Path, extra: list = ()) -> list:
+    """DATA_IGNORE plus --ignore patterns and the lines of src/.lambdaignore."""
+    patterns = list(DATA_IGNORE) + list(extra)
+    ignore_file = src / IGNORE_FILE
+    if ignore_file.is_file():
+        for line in ignore_file.read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                patterns.append(line)
+    return [p.strip('/') for p in patterns]
+
+
+def is_ignored(relative: Path, patterns: list) -> bool:
+    """A pattern matches the path, its name, or any directory above it (gitignore-like)."""
+    parts = relative.parts
+    for pattern in patterns:
+        for i in range(len(parts)):
+            if fnmatch.fnmatch('/'.join(parts[:i + 1]), pattern) or fnmatch.fnmatch(parts[i], pattern):
+                return True
+    return False
+
+
+def data_files(src: Path, patterns: list, skip: set = ()) -> list:
+    """
+    Every non-Python file under src that is not junk or ignored.
+
+    Handlers read files relative to themselves (config.json, templates/),
+    and those need not live in a package the import scan reaches. Unreached
+    .py files stay out; `skip` holds absolute directories (output, deps)
+    that happen to sit inside src.
+    """
+    out = []
+    for root, dirs, files in os.walk(src):
+        root = Path(root)
+        dirs[:] = sorted(d for d in dirs if d not in JUNK_DIRS and not d.startswith('.')
+                         and (root / d).resolve() not in skip
+                         and not is_ignored((root / d).relative_to(src), patterns))
+        for name in sorted(files):
+            path = root / name
+            relative = path.relative_to(src)
+            if path.suffix != '.py' and not is_junk(relative) and not is_ignored(relative, patterns):
+                out.append(path)
+    return out
+
+
+def compile_bytecode(source: bytes, arcname: str, tag: str):
+    """(pyc arcname, bytes): hash-based, so identical source gives identical bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = Path(tmp) / 'module.py'
+        src_path.write_bytes(source)
+        out = Path(tmp) / 'module.pyc'
+        try:
+            py_compile.compile(str(src_path), cfile=str(out), dfile=arcname, doraise=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        except py_compile.PyCompileError:
+            return None
+        parent, _, name = arcname.rpartition('/')
+        pyc_name = f"{name[:-3]}.{tag}.pyc"
+        return (f"{parent}/__pycache__/{pyc_name}" if parent else f"__pycache__/{pyc_name}"), out.read_bytes()
+
+
+def write_zip(path: Path, entries: dict) -> dict:
+    """Write entries {arcname: bytes} reproducibly; returns sha256 and sizes."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zf:
+        for arcname in sorted(entries):
+            info = zipfile.ZipInfo(arcname, date_time=ZIP_EPOCH)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            executable = arcname.endswith('.so') or '/bin/' in arcname
+            info.external_attr = (0o100755 if executable else 0o100644) << 16
+            zf.writestr(info, entries[arcname], compresslevel=COMPRESS_LEVEL)
+    data = buffer.getvalue()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    digest = hashlib.sha256(data).digest()
+    return {
+        'zip': str(path),
+        'sha256': digest.hex(),
+        'code_sha256': base64.b64encode(digest).decode(),
+        'zip_bytes': len(data),
+        'unzipped_bytes': sum(len(v) for v in entries.values()),
+        'files': len(entries),
+    }
+
+
+class PackageBuilder:
+    """
+    Build function (and optional layer) zips for one or more handlers.
+
+    Args:
+        src: source directory containing the handler modules
+        deps: directory populated by `pip install -t`
+        runtime: target runtime, e.g. python3.12 (decides the .pyc tag)
+        arch: x86_64 or arm64, checked against compiled extension modules
+        excluded: top-level names to leave out (e.g. runtime-provided boto3)
+        ignore: glob patterns of non-Python files under src to leave out,
+                in addition to DATA_IGNORE and src/.lambdaignore
+    """
+
+    def __init__(self, src: str, deps: str = None, runtime: str = 'python3.12', arch: str = 'x86_64',
+                 excluded: set = None, compile_pyc: bool = True, ignore: list = None):
+        self.src = Path(src)
+        self.deps = DependencyIndex(Path(deps) if deps else None)
+        self.ignore = ignore_patterns(self.src, ignore or ())
+        self.runtime = runtime
+        self.arch = arch
+        self.excluded = set(excluded or ())
+        m = re.fullmatch(r'python(\d+)\.(\d+)', runtime)
+        if not m:
+            raise ValueError(f"Unsupported runtime: {runtime}")
+        self.target = (int(m.group(1)), int(m.group(2)))
+        self.tag = f"cpython-{m.group(1)}{m.group(2)}"
+        self.compile_pyc = compile_pyc and self.target == sys.version_info[:2]
+        self.warnings = []
+        if compile_pyc and not self.compile_pyc:
+            self.warnings.append(f"Bytecode not precompiled: building with Python "
+                                 f"{sys.version_info[0]}.{sys.version_info[1]}, target is {runtime}")
+
+    def _add(self, entries: dict, arcname: str, data: bytes) -> None:
+        entries[arcname] = data
+        if self.compile_pyc and arcname.endswith('.py'):
+            compiled = compile_bytecode(data, arcname, self.tag)
+            if compiled:
+                entries[compiled[0]] = compiled[1]
+
+    def _check_arch(self, path: Path) -> None:
+        if path.suffix != '.so' and '.so.' not in path.name:
+            return
+        wrong = [arch for arch in ARCH_MARKERS if arch != self.arch]
+        if any(marker in path.name for arch in wrong for marker in ARCH_MARKERS[arch]):
+            self.warnings.append(f"{path.name} is built for another architecture (target {self.arch})")
+
+    def dependency_entries(self, dists: set, prefix: str = '') -> tuple:
+        """Zip entries for third-party distributions and per-distribution sizes."""
+        entries, sizes = {}, {}
+        root = self.deps.deps
+        for dist in sorted(dists):
+            before = sum(len(v) for v in entries.values())
+            for file in self.deps.files(dist):
+                rel = file.relative_to(root)
+                if is_junk(rel) and not rel.parts[0].endswith('.dist-info'):
+                    continue
+                self._check_arch(file)
+                self._add(entries, prefix + rel.as_posix(), file.read_bytes())
+            sizes[dist] = sum(len(v) for v in entries.values()) - before
+        return entries, sizes
+
+    def build(self, handlers: list, out: str, layer: bool = False, previous: dict = None) -> dict:
+        """
+        Build dist zips. With layer=True, third-party code used by any
+        handler goes into layer.zip (under python/) shared by all functions.
+        """
+        out = Path(out)
+        plans = {}
+        for handler in handlers:
+            module = handler.rpartition('.')[0] or handler
+            if not resolve(self.src, module) or resolve(self.src, module)[0] is None:
+                raise FileNotFoundError(f"Handler module not found in {self.src}: {module}")
+            plans[module] = closure(self.src, module, self.deps, self.excluded)
+
+        shared = set().union(*(d for _, d in plans.values())) if layer else set()
+        manifest = {'runtime': self.runtime, 'arch': self.arch, 'functions': {}, 'dependencies': {}}
+        skip = {out.resolve()}
+        if self.deps.deps:
+            skip.add(self.deps.deps.resolve())
+        data = data_files(self.src, self.ignore, skip)
+
+        if shared:
+            entries, sizes = self.dependency_entries(shared, prefix='python/')
+            manifest['layer'] = write_zip(out / 'layer.zip', entries)
+            manifest['dependencies'].update({d: {'bytes': b, 'in': 'layer'} for d, b in sizes.items()})
+
+        for module, (first_party, dists) in plans.items():
+            entries = {}
+            for path in sorted(first_party):
+                self._add(entries, path.relative_to(self.src).as_posix(), path.read_bytes())
+            for path in data:
+                entries[path.relative_to(self.src).as_posix()] = path.read_bytes()
+            first_party_bytes = sum(len(v) for v in entries.values())
+            dep_entries, sizes = self.dependency_entries(dists - shared)
+            entries.update(dep_entries)
+            for dist, size in sizes.items():
+                manifest['dependencies'].setdefault(dist, {'bytes': size, 'in': []})
+                if isinstance(manifest['dependencies'][dist]['in'], list):
+                    manifest['dependencies'][dist]['in'].append(module)
+            info = write_zip(out / f"{module.replace('.', '-')}.zip", entries)
+            info['first_party_bytes'] = first_party_bytes
+            info['modules'] = sorted(first_party.values())
+            manifest['functions'][module] = info
+
+        for name, info in list(manifest['functions'].items()) + [('layer', manifest.get('layer'))]:
+            if not info:
+                continue
+            if info['zip_bytes'] > DIRECT_UPLOAD_LIMIT:
+                self.warnings.append(f"{name}: zip exceeds 50 MB direct upload limit (upload via S3)")
+            if info['unzipped_bytes'] > UNZIPPED_LIMIT:
+                self.warnings.append(f"{name}: unzipped size exceeds the 250 MB limit")
+            old = (previous or {}).get('functions', {}).get(name) if name != 'layer' else (previous or {}).get('layer')
+            info['changed'] = not old or old.get('sha256') != info['sha256']
+
+        manifest['warnings'] = self.warnings
+        with open(out / 'package-manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        return manifest
+
+
+def human(n: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def format_table(manifest: dict) -> str:
+    lines = [f"Runtime: {manifest['runtime']} ({manifest['arch']})", ""]
+    lines.append(f"{'Package':<28} {'Files':>6} {'Unzipped':>10} {'Zip':>10}  {'Changed':<7} CodeSha256")
+    rows = list(manifest['functions'].items())
+    if manifest.get('layer'):
+        rows.append(('layer', manifest['layer']))
+    for name, info in rows:
+        lines.append(f"{name:<28} {info['files']:>6} {human(info['unzipped_bytes']):>10} "
+                     f"{human(info['zip_bytes']):>10}  {'yes' if info['changed'] else 'no':<7} {info['code_sha256']}")
+    if manifest['dependencies']:
+        lines.append("")
+        lines.append(f"{'Dependency':<28} {'Unzipped':>10}  Location")
+        for dist, info in sorted(manifest['dependencies'].items(), key=lambda d: -d[1]['bytes']):
+            where = info['in'] if isinstance(info['in'], str) else ', '.join(info['in'])
+            lines.append(f"{dist:<28} {human(info['bytes']):>10}  {where}")
+    for warning in manifest['warnings']:
+        lines.append(f"Warning: {warning}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main package builder entry point."""
+    parser = argparse.ArgumentParser(description='Build lean, reproducible Lambda packages')
+    parser.add_argument('src', help='Source directory')
+    parser.add_argument('--handler', action='append', required=True, help='Handler, e.g. main.handler (repeatable)')
+    parser.add_argument('--deps', help='Directory populated with pip install -t')
+    parser.add_argument('--out', default='dist', help='Output directory')
+    parser.add_argument('--runtime', default='python3.12', help='Target runtime')
+    parser.add_argument('--arch', choices=sorted(ARCH_MARKERS), default='x86_64', help='Target architecture')
+    parser.add_argument('--layer', action='store_true', help='Put third-party dependencies in layer.zip')
+    parser.add_argument('--exclude', default='', help='Comma-separated top-level packages to leave out')
+    parser.add_argument('--exclude-sdk', action='store_true', help=f"Leave out {', '.join(RUNTIME_SDK)}")
+    parser.add_argument('--ignore', action='append', default=[],
+                        help=f"Glob of data files under src to leave out (repeatable; see also {IGNORE_FILE})")
+    parser.add_argument('--no-compile', action='store_true', help='Do not precompile bytecode')
+    parser.add_argument('--previous', help='Previous package-manifest.json to detect unchanged zips')
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
+    args = parser.parse_args()
+
+    excluded = {name.strip() for name in args.exclude.split(',') if name.strip()}
+    if args.exclude_sdk:
+        excluded.update(RUNTIME_SDK)
+    previous = None
+    if args.previous and os.path.exists(args.previous):
+        with open(args.previous, 'r') as f:
+            previous = json.load(f)
+
+    try:
+        builder = PackageBuilder(args.src, args.deps, args.runtime, args.arch, excluded, not args.no_compile,
+                                 args.ignore)
+        manifest = builder.build(args.handler, args.out, args.layer, previous)
+    except (ValueError, FileNotFoundError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if args.format == 'json':
+        print(json.dumps(manifest, indent=2))
+    else:
+        print(format_table(manifest))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""
+Local memory power-tuning harness for aws-lambda-functions skill.
+Category: cloud
+
+Runs a Python handler once per memory tier with the CPU share Lambda
+allocates to that tier (memory / 1769 MB vCPUs, up to 6) and reports the
+duration distribution, peak memory and cost of each tier, then picks the
+cost-optimal and latency-optimal memory sizes.
+
+CPU limits are applied in one of three ways (--limit):
+
+    cgroup     cgroup v2 cpu.max and memory.max on a child cgroup
+               (needs a writable, delegated cgroup; see --cgroup-root)
+    throttle   the harness stops and resumes the worker whenever it has
+               used its CPU quota in the current 100 ms period, the same
+               accounting the kernel's CFS bandwidth control uses (Linux)
+    model      one unthrottled run; each invocation's CPU time is scaled
+               by the tier's vCPU share and its wait time kept as is.
+               One run per function instead of one per tier, for CI
+
+auto picks cgroup, then throttle, then model. Tiers with more vCPUs than
+the host has cores are capped at the host's speed. Results are relative to
+the host's per-core speed; compare tiers, not absolute numbers.
+
+Usage:
+    python power_tuning.py HANDLER_FILE [--handler handler] [--event event.json ...]
+                           [--invocations 50] [--tiers 128,256,512,1024,1769,3008]
+                           [--arch x86_64|arm64] [--limit auto|cgroup|throttle|model]
+                           [--max-p95-ms 200] [--current 1024 --max-overspend 20]
+                           [--format table|json]
+"""
+
+import argparse
+import json
+import math
+import os
+import selectors
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_TIERS = [128, 256, 512, 1024, 1536, 1769, 2048, 3008, 4096, 5120, 6144, 8192, 10240]
+MB_PER_VCPU = 1769
+MAX_VCPU = 6
+
+# USD, us-east-1, first pricing tier
+PRICE_GB_SECOND = {'x86_64': 0.0000166667, 'arm64': 0.0000133334}
+PRICE_REQUEST = 0.0000002
+
+CFS_PERIOD_S = 0.1
+
+DEFAULT_EVENT = {
+    'httpMethod': 'GET',
+    'path': '/health',
+    'headers': {'accept': 'application/json'},
+    'queryStringParameters': None,
+    'body': None,
+}
+
+LAMBDA_ENV = {
+    'AWS_LAMBDA_FUNCTION_NAME': 'power-tuning',
+    'AWS_REGION': 'us-east-1',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+}
+
+# Runs inside each worker: load the handler, then invoke it once per line on
+# stdin and answer with one JSON line. Handler output goes to /dev/null so it
+# cannot corrupt the protocol.
+WORKER = r'''
+import importlib.util, json, os, resource, sys, time
+proto = os.fdopen(os.dup(1), "w", buffering=1)
+devnull = os.open(os.devnull, os.O_WRONLY)
+os.dup2(devnull, 1)
+sys.stdout = open(os.devnull, "w")
+path, name, events_path, memory = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+# Lambda puts the task root first on sys.path; sibling modules import from there
+sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+with open(events_path) as f:
+    events = json.load(f)
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1048576 if sys.platform == "darwin" else 1024)
+class Context:
+    function_name = "power-tuning"
+    memory_limit_in_mb = memory
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:power-tuning"
+    def __init__(self, i):
+        self.aws_request_id = "00000000-0000-0000-0000-%012d" % i
+        self._deadline = time.monotonic() + 900
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("handler_module", path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+handler = getattr(module, name)
+proto.write(json.dumps({"init_ms": (time.perf_counter() - t0) * 1000, "rss_mb": rss_mb()}) + "\n")
+for line in sys.stdin:
+    i = int(line)
+    error = None
+    w0, c0 = time.perf_counter(), time.process_time()
+    try:
+        handler(events[i % len(events)], Context(i))
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+    proto.write(json.dumps({"ms": (time.perf_counter() - w0) * 1000,
+                            "cpu_ms": (time.process_time() - c0) * 1000,
+                            "rss_mb": rss_mb(), "error": error}) + "\n")
+'''
+
+
+def tier_vcpu(memory_mb: int) -> float:
+    """vCPUs Lambda allocates to a memory size (proportional, 1 at 1769 MB)."""
+    return min(MAX_VCPU, memory_mb / MB_PER_VCPU)
+
+
+def invocation_cost(duration_ms: float, memory_mb: int, arch: str = 'x86_64',
+                    price_gb_second: float = None, price_request: float = PRICE_REQUEST) -> float:
+    """Cost of one invocation; Lambda bills duration rounded up to 1 ms."""
+    rate = price_gb_second if price_gb_second is not None else PRICE_GB_SECOND[arch]
+    return math.ceil(duration_ms) / 1000 * memory_mb / 1024 * rate + price_request
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+# --- CPU/memory limiters -----------------------------------------------------
+
+def cgroup_root_usable(root: str) -> bool:
+    path = Path(root)
+    try:
+        controllers = (path / 'cgroup.controllers').read_text().split()
+    except OSError:
+        return False
+    return 'cpu' in controllers and 'memory' in controllers and os.access(path, os.W_OK)
+
+
+class CgroupLimiter:
+    """Child cgroup v2 with cpu.max and memory.max for each tier."""
+
+    name = 'cgroup'
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        if not cgroup_root_usable(root):
+            raise RuntimeError(f"cgroup v2 with cpu and memory controllers is not writable at {root}; "
+                               "use --cgroup-root or --limit throttle")
+        try:
+            (self.root / 'cgroup.subtree_control').write_text('+cpu +memory')
+        except OSError:
+            pass  # already enabled, or delegated that way
+        self.group = None
+
+    def preexec(self, memory_mb: int):
+        self.group = self.root / f"power-tuning-{os.getpid()}-{memory_mb}"
+        self.group.mkdir(exist_ok=True)
+        quota = int(tier_vcpu(memory_mb) * CFS_PERIOD_S * 1_000_000)
+        (self.group / 'cpu.max').write_text(f"{quota} {int(CFS_PERIOD_S * 1_000_000)}")
+        (self.group / 'memory.max').write_text(str(memory_mb * 1024 * 1024))
+        swap = self.group / 'memory.swap.max'
+        if swap.exists():
+            swap.write_text('0')
+        procs = self.group / 'cgroup.procs'
+        return lambda: procs.write_text(str(os.getpid()))
+
+    def attach(self, pid: int, memory_mb: int):
+        pass
+
+    def oom_killed(self) -> bool:
+        try:
+            for line in (self.group / 'memory.events').read_text().splitlines():
+                key, _, value = line.partition(' ')
+                if key == 'oom_kill' and int(value) > 0:
+                    return True
+        except OSError:
+            pass
+        return False
+
+    def detach(self):
+        if self.group is not None:
+            try:
+                self.group.rmdir()
+            except OSError:
+                pass
+            self.group = None
+
+
+def process_cpu_ns(pid: int) -> int:
+    """CPU time of all threads of a process, from /proc/<pid>/task/*/schedstat."""
+    total = 0
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return 0
+    for tid in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/schedstat") as f:
+                total += int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class ThrottleLimiter:
+    """
+    CFS-style bandwidth control from user space: within every period the
+    worker may use quota = vCPU x period of CPU time; once it has, it is
+    stopped (SIGSTOP) until the next period starts.
+    """
+
+    name = 'throttle'
+
+    def __init__(self):
+        if not Path('/proc/self/task').is_dir() or not hasattr(signal, 'SIGSTOP'):
+            raise RuntimeError("throttle needs Linux /proc schedstat; use --limit model")
+        self.thread = None
+        self.done = threading.Event()
+
+    def preexec(self, memory_mb: int):
+        return None
+
+    def attach(self, pid: int, memory_mb: int):
+        vcpu = tier_vcpu(memory_mb)
+        if vcpu >= (os.cpu_count() or 1):
+            return  # cannot emulate more CPU than the host has
+        quota_ns = vcpu * CFS_PERIOD_S * 1e9
+        poll = max(0.0002, min(0.001, vcpu * CFS_PERIOD_S / 20))
+        self.done.clear()
+        self.thread = threading.Thread(target=self._run, args=(pid, quota_ns, poll), daemon=True)
+        self.thread.start()
+
+    def _run(self, pid: int, quota_ns: float, poll: float):
+        while not self.done.is_set():
+            period_end = time.monotonic() + CFS_PERIOD_S
+            start = process_cpu_ns(pid)
+            stopped = False
+            while time.monotonic() < period_end and not self.done.is_set():
+                time.sleep(poll)
+                if not stopped and process_cpu_ns(pid) - start >= quota_ns:
+                    try:
+                        os.kill(pid, signal.SIGSTOP)
+                    except ProcessLookupError:
+                        return
+                    stopped = True
+                    time.sleep(max(0.0, period_end - time.monotonic()))
+            if stopped:
+                try:
+                    os.kill(pid, signal.SIGCONT)
+                except ProcessLookupError:
+                    return
+
+    def oom_killed(self) -> bool:
+        return False
+
+    def detach(self):
+        self.done.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+class NoLimiter:
+    name = 'model'
+
+    def preexec(self, memory_mb: int):
+        return None
+
+    def attach(self, pid: int, memory_mb: int):
+        pass
+
+    def oom_killed(self) -> bool:
+        return False
+
+    def detach(self):
+        pass
+
+
+def make_limiter(kind: str, cgroup_root: str):
+    if kind == 'cgroup':
+        return CgroupLimiter(cgroup_root)
+    if kind == 'throttle':
+        return ThrottleLimiter()
+    if kind == 'model':
+        return NoLimiter()
+    if cgroup_root_usable(cgroup_root):
+        try:
+            return CgroupLimiter(cgroup_root)
+        except RuntimeError:
+            pass
+    try:
+        return ThrottleLimiter()
+    except RuntimeError:
+        return NoLimiter()
+
+
+# --- Measurement -------------------------------------------------------------
+
+def run_worker(path: str, handler: str, events_path: str, memory_mb: int, invocations: int,
+               warmup: int, limiter, env: dict, timeout: float) -> dict:
+    """Start one worker at a memory tier and collect per-invocation samples."""
+    env = dict(env, AWS_LAMBDA_FUNCTION_MEMORY_SIZE=str(memory_mb))
+    stderr = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        [sys.executable, '-c', WORKER, path, handler, events_path, str(memory_mb)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr, env=env,
+        preexec_fn=limiter.preexec(memory_mb), text=True, bufsize=1)
+    try:
+        limiter.attach(proc.pid, memory_mb)
+        selector = selectors.DefaultSelector()
+        selector.register(proc.stdout, selectors.EVENT_READ)
+
+        def read_reply():
+            if not selector.select(timeout):
+                return {'status': 'timeout'}
+            line = proc.stdout.readline()
+            if not line:
+                return {'status': 'oom' if limiter.oom_killed() else 'crashed'}
+            return json.loads(line)
+
+        reply = read_reply()
+        result = {'memory_mb': memory_mb, 'samples': [], 'cpu_samples': [], 'errors': 0,
+                  'status': reply.get('status', 'ok'), 'init_ms': reply.get('init_ms'),
+                  'max_memory_mb': reply.get('rss_mb', 0.0)}
+        for i in range(warmup + invocations):
+            if result['status'] != 'ok':
+                break
+            proc.stdin.write(f"{i}\n")
+            proc.stdin.flush()
+            reply = read_reply()
+            if 'status' in reply:
+                result['status'] = reply['status']
+                break
+            result['max_memory_mb'] = max(result['max_memory_mb'], reply['rss_mb'])
+            if i < warmup:
+                continue
+            result['samples'].append(reply['ms'])
+            result['cpu_samples'].append(reply['cpu_ms'])
+            result['errors'] += reply['error'] is not None
+            if reply['error'] and 'first_error' not in result:
+                result['first_error'] = reply['error']
+        if result['status'] == 'crashed':
+            stderr.seek(0)
+            lines = stderr.read().decode(errors='replace').strip().splitlines()
+            result['first_error'] = lines[-1] if lines else 'worker exited'
+        return result
+    finally:
+        if proc.poll() is None:
+            proc.kill()  # SIGKILL also ends a throttled (stopped) worker
+        proc.wait()
+        limiter.detach()
+        stderr.close()
+
+
+def model_samples(wall_ms: list, cpu_ms: list, memory_mb: int) -> list:
+    """
+    Durations at a tier from unthrottled samples: CPU work runs at
+    min(parallelism, vCPU) cores, time spent waiting is unchanged.
+    """
+    host = os.cpu_count() or 1
+    vcpu = tier_vcpu(memory_mb)
+    out = []
+    for wall, cpu in zip(wall_ms, cpu_ms):
+        parallel = max(1.0, cpu / wall) if wall > 0 else 1.0
+        if vcpu >= min(parallel, host):
+            out.append(wall)  # the tier is at least as fast as the host run
+            continue
+        waiting = max(0.0, wall - cpu / parallel)
+        out.append(waiting + cpu / vcpu)
+    return out
+
+
+def summarize_tier(result: dict, arch: str, price_gb_second: float = None) -> dict:
+    samples = result['samples']
+    row = {
+        'memory_mb': result['memory_mb'],
+        'vcpu': round(tier_vcpu(result['memory_mb']), 2),
+        'status': result['status'],
+        'invocations': len(samples),
+        'errors': result['errors'],
+        'init_ms': round(result['init_ms'], 2) if result.get('init_ms') is not None else None,
+        'max_memory_mb': round(result['max_memory_mb'], 1),
+    }
+    if result.get('first_error'):
+        row['first_error'] = result['first_error']
+    if row['status'] == 'ok' and result['max_memory_mb'] > result['memory_mb']:
+        row['status'] = 'oom'
+    if not samples:
+        return row
+    costs = [invocation_cost(ms, result['memory_mb'], arch, price_gb_second) for ms in samples]
+    row.update({
+        'p50_ms': round(percentile(samples, 50), 2),
+        'p95_ms': round(percentile(samples, 95), 2),
+        'p99_ms': round(percentile(samples, 99), 2),
+        'mean_ms': round(statistics.fmean(samples), 2),
+        'cost_per_million': round(statistics.fmean(costs) * 1_000_000, 4),
+    })
+    return row
+
+
+def recommend(rows: list, max_p95_ms: float = None, latency_tolerance: float = 0.05) -> dict:
+    """
+    Pick tiers from summarized rows.
+
+    cost: cheapest tier (meeting max_p95_ms when given)
+    latency: cheapest tier whose p95 is within latency_tolerance of the
+        best p95, since extra vCPUs stop helping once the handler cannot
+        use them
+    balanced: lowest cost x p95 product
+    """
+    usable = [r for r in rows if r['status'] == 'ok' and r.get('invocations') and not r['errors']]
+    if not usable:
+        return {}
+    by_cost = sorted(usable, key=lambda r: (r['cost_per_million'], r['p95_ms']))
+    picks = {}
+    eligible = [r for r in by_cost if max_p95_ms is None or r['p95_ms'] <= max_p95_ms]
+    picks['cost'] = eligible[0]['memory_mb'] if eligible else None
+    best = min(r['p95_ms'] for r in usable)
+    fast = [r for r in by_cost if r['p95_ms'] <= best * (1 + latency_tolerance)]
+    picks['latency'] = fast[0]['memory_mb']
+    picks['balanced'] = min(usable, key=lambda r: r['cost_per_million'] * r['p95_ms'])['memory_mb']
+    return picks
+
+
+def tune(path: str, handler: str, events: list, tiers: list, invocations: int = 50, warmup: int = 3,
+         limit: str = 'auto', cgroup_root: str = '/sys/fs/cgroup', arch: str = 'x86_64',
+         price_gb_second: float = None, max_p95_ms: float = None, env: dict = None,
+         timeout: float = 900.0) -> dict:
+    """
+    Measure a handler across memory tiers.
+
+    Args:
+        path: Python file containing the handler
+        handler: Handler function name
+        events: Sample events, invoked round-robin
+        tiers: Memory sizes in MB
+        invocations: Measured invocations per tier (after warmup)
+        limit: auto, cgroup, throttle or model
+        arch: x86_64 or arm64 (pricing)
+        max_p95_ms: Latency SLO for the cost-optimal pick
+
+    Returns:
+        Report with per-tier rows and recommendations
+    """
+    limiter = make_limiter(limit, cgroup_root)
+    env = dict(os.environ if env is None else env, **LAMBDA_ENV)
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(events, f)
+        events_path = f.name
+    try:
+        results = []
+        if limiter.name == 'model':
+            base = run_worker(path, handler, events_path, max(tiers), invocations, warmup,
+                              limiter, env, timeout)
+            for memory in tiers:
+                result = dict(base, memory_mb=memory,
+                              samples=model_samples(base['samples'], base['cpu_samples'], memory))
+                if base.get('init_ms') is not None:
+                    result['init_ms'] = model_samples([base['init_ms']], [base['init_ms']], memory)[0]
+                results.append(result)
+        else:
+            for memory in tiers:
+                results.append(run_worker(path, handler, events_path, memory, invocations, warmup,
+                                          limiter, env, timeout))
+    finally:
+        os.unlink(events_path)
+
+    rows = [summarize_tier(r, arch, price_gb_second) for r in results]
+    return {
+        'handler': f"{path}:{handler}",
+        'limit': limiter.name,
+        'host_cpus': os.cpu_count(),
+        'arch': arch,
+        'tiers': rows,
+        'recommended': recommend(rows, max_p95_ms),
+    }
+
+
+def check_current(report: dict, current: int, max_overspend: float) -> list:
+    """Problems with the configured memory size, for CI gating."""
+    rows = {r['memory_mb']: r for r in report['tiers']}
+    row = rows.get(current)
+    if row is None:
+        return [f"current memory {current} MB was not measured"]
+    if row['status'] != 'ok':
+        return [f"current memory {current} MB: {row['status']}"]
+    best = report['recommended'].get('cost')
+    if best is None:
+        return []
+    best_cost = rows[best]['cost_per_million']
+    overspend = (row['cost_per_million'] / best_cost - 1) * 100 if best_cost else 0.0
+    if overspend > max_overspend:
+        return [f"current memory {current} MB costs {overspend:.0f}% more than {best} MB"]
+    return []
+
+
+def format_table(report: dict) -> str:
+    lines = [f"Handler: {report['handler']}  (limit: {report['limit']}, host CPUs: {report['host_cpus']}, "
+             f"{report['arch']})", ""]
+    lines.append(f"{'Memory':>7} {'vCPU':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Init ms':>8} "
+                 f"{'Max MB':>7} {'$/1M inv':>9}  Status")
+    for r in report['tiers']:
+        if 'p50_ms' in r:
+            timing = f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+            cost = f"{r['cost_per_million']:>9.4f}"
+        else:
+            timing, cost = f"{'-':>9} {'-':>9} {'-':>9}", f"{'-':>9}"
+        init = f"{r['init_ms']:>8.1f}" if r.get('init_ms') is not None else f"{'-':>8}"
+        status = r['status'] if not r['errors'] else f"{r['status']} ({r['errors']} errors)"
+        lines.append(f"{r['memory_mb']:>7} {r['vcpu']:>5.2f} {timing} {init} {r['max_memory_mb']:>7.0f} "
+                     f"{cost}  {status}")
+    picks = report['recommended']
+    if picks:
+        lines.append("")
+        for label, key in (('Cost-optimal', 'cost'), ('Latency-optimal', 'latency'), ('Balanced', 'balanced')):
+            lines.append(f"{label + ':':<17} {picks[key]} MB" if picks[key] else f"{label + ':':<17} none")
+    else:
+        lines.append("\nNo tier completed without errors")
+    for problem in report.get('problems', []):
+        lines.append(f"FAIL: {problem}")
+    return '\n'.join(lines)
+
+
+def load_events(paths: list) -> list:
+    """Events from JSON files (object or list of objects) or JSON Lines files."""
+    events = []
+    for path in paths:
+        text = Path(path).read_text()
+        if path.endswith('.jsonl'):
+            events.extend(json.loads(line) for line in text.splitlines() if line.strip())
+            continue
+        data = json.loads(text)
+        events.extend(data if isinstance(data, list) else [data])
+    return events
+
+
+def main():
+    """Main power tuning entry point."""
+    parser = argparse.ArgumentParser(description='Find the cost- and latency-optimal Lambda memory size locally')
+    parser.add_argument('handler_file', help='Python file containing the handler')
+    parser.add_argument('--handler', default='handler', help='Handler function name')
+    parser.add_argument('--event', action='append', default=[],
+                        help='Event JSON/JSONL file, repeatable (default: API Gateway GET)')
+    parser.add_argument('--invocations', type=int, default=50, help='Measured invocations per tier')
+    parser.add_argument('--warmup', type=int, default=3, help='Unmeasured invocations per tier')
+    parser.add_argument('--tiers', help='Comma-separated memory sizes in MB')
+    parser.add_argument('--arch', choices=sorted(PRICE_GB_SECOND), default='x86_64', help='Pricing architecture')
+    parser.add_argument('--price-gb-second', type=float, help='Override the GB-second price')
+    parser.add_argument('--limit', choices=['auto', 'cgroup', 'throttle', 'model'], default='auto',
+                        help='How tiers are emulated')
+    parser.add_argument('--cgroup-root', default='/sys/fs/cgroup', help='Writable cgroup v2 directory')
+    parser.add_argument('--max-p95-ms', type=float, help='Latency SLO for the cost-optimal pick')
+    parser.add_argument('--timeout', type=float, default=900, help='Per-invocation timeout (seconds)')
+    parser.add_argument('--current', type=int, help='Configured memory size to check')
+    parser.add_argument('--max-overspend', type=float, default=20.0,
+                        help='With --current: fail if it costs this %% more than the cost-optimal tier')
+    parser.add_argument('--env', action='append', default=[], help='KEY=VALUE for the handler environment')
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
+    args = parser.parse_args()
+
+    if not Path(args.handler_file).is_file():
+        print(f"Error: handler file not found: {args.handler_file}", file=sys.stderr)
+        return 4
+    try:
+        events = load_events(args.event) if args.event else [DEFAULT_EVENT]
+        tiers = sorted({int(t) for t in args.tiers.split(',')}) if args.tiers else list(DEFAULT_TIERS)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    if not events or any(not 128 <= t <= 10240 for t in tiers):
+        print("Error: need at least one event and tiers between 128 and 10240 MB", file=sys.stderr)
+        return 4
+    if args.current and args.current not in tiers:
+        tiers = sorted(tiers + [args.current])
+
+    env = dict(os.environ)
+    for item in args.env:
+        key, _, value = item.partition('=')
+        env[key] = value
+
+    try:
+        report = tune(args.handler_file, args.handler, events, tiers, args.invocations, args.warmup,
+                      args.limit, args.cgroup_root, args.arch, args.price_gb_second, args.max_p95_ms,
+                      env, args.timeout)
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.current:
+        report['problems'] = check_current(report, args.current, args.max_overspend)
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+    return 1 if report.get('problems') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Tests for assets/batch_processor.py partial batch responses."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'assets'))
+
+from batch_processor import process_batch  # noqa: E402
+
+
+def sqs_record(message_id: str, body: str, group: str = None) -> dict:
+    record = {'eventSource': 'aws:sqs', 'messageId': message_id, 'body': body, 'attributes': {}}
+    if group:
+        record['attributes']['MessageGroupId'] = group
+    return record
+
+
+def test_empty_batch_reports_no_failures():
+    calls = []
+    assert process_batch({'Records': []}, lambda r, p: calls.append(p), concurrency=4) == \
+        {'batchItemFailures': []}
+    assert process_batch({}, lambda r, p: calls.append(p)) == {'batchItemFailures': []}
+
+    async def handler(record, payload):
+        calls.append(payload)
+    assert process_batch({'Records': []}, handler) == {'batchItemFailures': []}
+    assert calls == []
+
+
+def test_failed_records_are_reported_in_batch_order():
+    def handler(record, payload):
+        if payload == 'bad':
+            raise ValueError(payload)
+
+    records = [sqs_record('1', 'ok'), sqs_record('2', 'bad'), sqs_record('3', 'ok'), sqs_record('4', 'bad')]
+    result = process_batch({'Records': records}, handler, concurrency=4)
+    assert result == {'batchItemFailures': [{'itemIdentifier': '2'}, {'itemIdentifier': '4'}]}
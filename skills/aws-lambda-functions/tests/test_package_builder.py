@@ -0,0 +1,92 @@
+"""Tests for scripts/package_builder.py: build a package, unzip it and import the handler."""
+
+import json
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from package_builder import PackageBuilder  # noqa: E402
+
+RUNTIME = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+
+MAIN = '''
+import json
+from pathlib import Path
+
+from app.render import render
+
+ROOT = Path(__file__).parent
+CONFIG = json.loads((ROOT / 'config.json').read_text())
+
+
+def handler(event, context):
+    template = (ROOT / 'templates' / 'page.html').read_text()
+    return {'statusCode': 200, 'body': render(template, CONFIG['greeting'])}
+'''
+
+RENDER = '''
+from pathlib import Path
+
+SUFFIX = (Path(__file__).parent / 'suffix.txt').read_text().strip()
+
+
+def render(template, greeting):
+    return template.replace('{greeting}', greeting) + SUFFIX
+'''
+
+
+def make_source(root: Path) -> Path:
+    src = root / 'src'
+    (src / 'app').mkdir(parents=True)
+    (src / 'templates').mkdir()
+    (src / 'fixtures').mkdir()
+    (src / 'main.py').write_text(MAIN)
+    (src / 'config.json').write_text(json.dumps({'greeting': 'hello'}))
+    (src / 'templates' / 'page.html').write_text('<p>{greeting}</p>')
+    (src / 'app' / '__init__.py').write_text('')
+    (src / 'app' / 'render.py').write_text(RENDER)
+    (src / 'app' / 'suffix.txt').write_text('!\n')
+    (src / 'unused.py').write_text('raise RuntimeError("never imported")\n')
+    (src / 'requirements.txt').write_text('requests\n')
+    (src / 'fixtures' / 'event.json').write_text('{}')
+    (src / 'notes.txt').write_text('scratch')
+    (src / '.lambdaignore').write_text('# local only\nnotes.txt\n')
+    return src
+
+
+def build(tmp_path: Path, **kwargs) -> tuple:
+    src = make_source(tmp_path)
+    out = tmp_path / 'dist'
+    manifest = PackageBuilder(str(src), runtime=RUNTIME, **kwargs).build(['main.handler'], str(out))
+    with zipfile.ZipFile(out / 'main.zip') as zf:
+        names = set(zf.namelist())
+        zf.extractall(tmp_path / 'task')
+    return manifest, names
+
+
+def test_handler_runs_from_unzipped_artifact(tmp_path):
+    build(tmp_path, ignore=['fixtures/'])
+    out = subprocess.run(
+        [sys.executable, '-c', 'import json, main; print(json.dumps(main.handler({}, None)))'],
+        cwd=tmp_path / 'task', capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert json.loads(out.stdout) == {'statusCode': 200, 'body': '<p>hello</p>!'}
+
+
+def test_data_files_are_kept_and_ignored_files_left_out(tmp_path):
+    _, names = build(tmp_path, ignore=['fixtures/'])
+    assert {'config.json', 'templates/page.html', 'app/suffix.txt', 'main.py', 'app/render.py'} <= names
+    assert 'unused.py' not in names
+    assert 'requirements.txt' not in names
+    assert 'notes.txt' not in names
+    assert '.lambdaignore' not in names
+    assert not any(name.startswith('fixtures/') for name in names)
+
+
+def test_build_is_reproducible(tmp_path):
+    first, _ = build(tmp_path / 'a')
+    second, _ = build(tmp_path / 'b')
+    assert first['functions']['main']['sha256'] == second['functions']['main']['sha256']
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+RDS parameter formula evaluator and fleet planner for aws-rds-setup skill.
+Category: cloud
+
+Parses RDS parameter formulas such as
+
+    {DBInstanceClassMemory*3/4}
+    LEAST({DBInstanceClassMemory/9531392},5000)
+    GREATEST({log(DBInstanceClassMemory/805306368)*45},{log(DBInstanceClassMemory/8187281408)*1000})
+
+into closures over NumPy arrays, once per distinct formula, and evaluates
+them for every instance class or every database of a fleet in one pass.
+Semantics follow RDS: division truncates to an integer, log() is base 2,
+functions GREATEST, LEAST, SUM, MOD and IF(condition, then, else), and the
+final value is truncated to an integer.
+
+Variables: DBInstanceClassMemory (bytes), DBInstanceVCPU, AllocatedStorage
+(bytes) and EndPointPort.
+
+Fleet plan: each database gets the template for its engine, evaluated for
+its class; the result is diffed against its current parameters (which may
+be formulas too) and memory-sized parameters are checked against the
+instance memory.
+
+Usage:
+    python param_planner.py evaluate "{DBInstanceClassMemory*3/4}" [--classes "db.r6g.*"]
+    python param_planner.py plan FLEET.json|FLEET.csv [--template ../assets/parameter-templates.json]
+                            [--current DIR] [--format table|json|cli]
+
+FLEET: `aws rds describe-db-instances` output, a JSON list, or a CSV with
+identifier,engine,instance_class,allocated_storage[,parameter_group]. JSON
+entries may carry "current": {parameter: value}. DIR holds one
+`aws rds describe-db-parameters` JSON per parameter group, named <group>.json.
+"""
+
+import argparse
+import csv
+import fnmatch
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+
+ASSETS = Path(__file__).parent.parent / 'assets'
+DEFAULT_CLASSES = ASSETS / 'db-instance-classes.csv'
+DEFAULT_TEMPLATE = ASSETS / 'parameter-templates.json'
+VARIABLES = ('DBInstanceClassMemory', 'DBInstanceVCPU', 'AllocatedStorage', 'EndPointPort')
+GIB = 1 << 30
+
+# Bytes per unit of memory-sized parameters
+PARAMETER_UNITS = {
+    'shared_buffers': 8192,
+    'effective_cache_size': 8192,
+    'wal_buffers': 8192,
+    'temp_buffers': 8192,
+    'work_mem': 1024,
+    'maintenance_work_mem': 1024,
+    'innodb_buffer_pool_size': 1,
+    'innodb_log_buffer_size': 1,
+    'key_buffer_size': 1,
+}
+
+TOKEN_RE = re.compile(r'\s*(?:(\d+(?:\.\d+)?)|([A-Za-z_][A-Za-z0-9_]*)|(<=|>=|==|!=|<>|[-+*/(),{}<>=]))')
+
+
+class FormulaError(ValueError):
+    """Invalid or unsupported parameter formula."""
+
+
+def tokenize(text: str) -> list:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise FormulaError(f"Unexpected character at {pos} in {text!r}")
+        number, name, op = m.groups()
+        if number is not None:
+            tokens.append(('num', float(number)))
+        elif name is not None:
+            tokens.append(('name', name))
+        else:
+            tokens.append(('op', op))
+        pos = m.end()
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser producing tuples: ('num', v), ('var', n), ('bin', op, a, b), ..."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, op: str = None):
+        token = self.peek()
+        if op is not None and token != ('op', op):
+            raise FormulaError(f"Expected {op!r} in {self.text!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.comparison()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Unexpected {self.peek()[1]!r} in {self.text!r}")
+        return node
+
+    def comparison(self):
+        node = self.expr()
+        kind, value = self.peek()
+        if kind == 'op' and value in ('<', '>', '<=', '>=', '=', '==', '!=', '<>'):
+            self.take()
+            node = ('cmp', {'=': '==', '<>': '!='}.get(value, value), node, self.expr())
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            node = ('bin', self.take()[1], node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in (('op', '*'), ('op', '/')):
+            node = ('bin', self.take()[1], node, self.factor())
+        return node
+
+    def factor(self):
+        kind, value = self.peek()
+        if kind == 'num':
+            self.take()
+            return ('num', value)
+        if (kind, value) == ('op', '-'):
+            self.take()
+            return ('neg', self.factor())
+        if (kind, value) in (('op', '('), ('op', '{')):
+            self.take()
+            node = self.comparison()
+            self.take(')' if value == '(' else '}')
+            return node
+        if kind == 'name':
+            self.take()
+            if self.peek() == ('op', '('):
+                self.take()
+                args = [self.comparison()]
+                while self.peek() == ('op', ','):
+                    self.take()
+                    args.append(self.comparison())
+                self.take(')')
+                return ('call', value.upper(), args)
+            if value not in VARIABLES:
+                raise FormulaError(f"Unknown variable {value!r} in {self.text!r}")
+            return ('var', value)
+        raise FormulaError(f"Unexpected end of {self.text!r}")
+
+
+def _truncating_divide(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.trunc(a / b)
+    if not np.all(np.isfinite(out)):
+        raise FormulaError('Division by zero')
+    return out
+
+
+BINARY = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': _truncating_divide}
+COMPARE = {'<': np.less, '>': np.greater, '<=': np.less_equal, '>=': np.greater_equal,
+           '==': np.equal, '!=': np.not_equal}
+FUNCTIONS = {
+    'GREATEST': lambda *a: np.maximum.reduce(np.broadcast_arrays(*a)),
+    'LEAST': lambda *a: np.minimum.reduce(np.broadcast_arrays(*a)),
+    'SUM': lambda *a: np.add.reduce(np.broadcast_arrays(*a)),
+    'LOG': lambda a: np.log2(np.maximum(a, 1e-300)),
+    'MOD': lambda a, b: np.fmod(a, b),
+    'IF': lambda c, a, b: np.where(c != 0, a, b),
+}
+ARITY = {'LOG': 1, 'MOD': 2, 'IF': 3}
+
+
+def build(node):
+    """Turn a parse tree into a closure env -> ndarray."""
+    kind = node[0]
+    if kind == 'num':
+        value = node[1]
+        return lambda env: value
+    if kind == 'var':
+        name = node[1]
+        return lambda env: env[name]
+    if kind == 'neg':
+        inner = build(node[1])
+        return lambda env: -inner(env)
+    if kind in ('bin', 'cmp'):
+        fn = BINARY[node[1]] if kind == 'bin' else COMPARE[node[1]]
+        left, right = build(node[2]), build(node[3])
+        if kind == 'cmp':
+            return lambda env: fn(left(env), right(env)).astype(np.float64)
+        return lambda env: fn(left(env), right(env))
+    if kind == 'call':
+        name, args = node[1], node[2]
+        if name not in FUNCTIONS:
+            raise FormulaError(f"Unknown function {name}")
+        if name in ARITY and len(args) != ARITY[name]:
+            raise FormulaError(f"{name} takes {ARITY[name]} argument(s)")
+        fn = FUNCTIONS[name]
+        parts = [build(a) for a in args]
+        return lambda env: fn(*(p(env) for p in parts))
+    raise FormulaError(f"Bad node {kind}")
+
+
+def is_formula(value) -> bool:
+    return isinstance(value, str) and ('{' in value or re.match(r'\s*[A-Za-z]+\s*\(', value) is not None)
+
+
+@lru_cache(maxsize=None)
+def compile_formula(text: str):
+    """Compiled closure for a formula string; cached, so each text is parsed once."""
+    return build(Parser(text).parse())
+
+
+def evaluate(value, env: dict, size: int) -> np.ndarray:
+    """
+    Value of a parameter for `size` databases.
+
+    Formulas return int64 arrays; numeric literals a broadcast int64 array;
+    anything else (on/off, strings) an object array of the literal.
+    """
+    if is_formula(value):
+        out = np.broadcast_to(compile_formula(value)(env), (size,))
+        return np.trunc(out).astype(np.int64)
+    text = str(value)
+    if re.fullmatch(r'-?\d+', text.strip()):
+        return np.full(size, int(text), dtype=np.int64)
+    return np.full(size, text, dtype=object)
+
+
+class ClassCatalog:
+    """DB instance classes with vCPU count and DBInstanceClassMemory."""
+
+    def __init__(self, path: str = None):
+        with open(path or DEFAULT_CLASSES, 'r', newline='') as f:
+            rows = list(csv.DictReader(line for line in f if not line.startswith('#')))
+        if not rows:
+            raise ValueError(f"Empty class catalog: {path}")
+        self.classes = [r['instance_class'] for r in rows]
+        self.vcpu = np.array([float(r['vcpu']) for r in rows])
+        self.memory = np.array([float(r['class_memory_bytes']) if r.get('class_memory_bytes')
+                                else float(r['memory_gib']) * GIB for r in rows])
+        self.index = {c: i for i, c in enumerate(self.classes)}
+
+    def rows(self, classes: list) -> np.ndarray:
+        missing = sorted({c for c in classes if c not in self.index})
+        if missing:
+            raise KeyError(f"Unknown instance class(es): {', '.join(missing)}")
+        return np.array([self.index[c] for c in classes], dtype=np.int64)
+
+
+def environment(catalog: ClassCatalog, classes: list, storage_gib=None, ports=None) -> dict:
+    rows = catalog.rows(classes)
+    n = len(rows)
+    return {
+        'DBInstanceClassMemory': catalog.memory[rows],
+        'DBInstanceVCPU': catalog.vcpu[rows],
+        'AllocatedStorage': np.asarray(storage_gib if storage_gib is not None else np.zeros(n), float) * GIB,
+        'EndPointPort': np.asarray(ports if ports is not None else np.zeros(n), float),
+    }
+
+
+def load_fleet(path: str) -> list:
+    """Databases as dicts: identifier, engine, instance_class, allocated_storage, port, parameter_group, current."""
+    if path.endswith('.csv'):
+        with open(path, 'r', newline='') as f:
+            rows = list(csv.DictReader(line for line in f if not line.startswith('#')))
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        rows = data.get('DBInstances', data) if isinstance(data, dict) else data
+    fleet = []
+    for r in rows:
+        groups = r.get('DBParameterGroups') or [{}]
+        fleet.append({
+            'identifier': r.get('identifier') or r.get('DBInstanceIdentifier'),
+            'engine': r.get('engine') or r.get('Engine'),
+            'instance_class': r.get('instance_class') or r.get('DBInstanceClass'),
+            'allocated_storage': float(r.get('allocated_storage') or r.get('AllocatedStorage') or 0),
+            'port': float(r.get('port') or (r.get('Endpoint') or {}).get('Port') or 0),
+            'parameter_group': r.get('parameter_group') or groups[0].get('DBParameterGroupName'),
+            'current': dict(r.get('current') or {}),
+        })
+    return fleet
+
+
+def load_current_dir(directory: str) -> dict:
+    """{group name: {parameter: value}} from describe-db-parameters JSON files."""
+    groups = {}
+    for path in Path(directory).glob('*.json'):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        groups[path.stem] = {p['ParameterName']: p['ParameterValue']
+                             for p in data.get('Parameters', []) if 'ParameterValue' in p}
+    return groups
+
+
+def template_for(engine: str, templates: dict):
+    """Longest template key contained in the engine name (aurora-mysql before mysql)."""
+    matches = [key for key in templates if key in (engine or '')]
+    return max(matches, key=len) if matches else None
+
+
+def plan(fleet: list, templates: dict, catalog: ClassCatalog, current_groups: dict = None) -> dict:
+    """
+    Evaluate templates for every database and diff against current values.
+
+    Databases are grouped by template; each template formula and each
+    distinct current formula is evaluated once over the group's vector.
+
+    Returns:
+        {'databases': [...], 'classes': {template: {class: {param: value}}},
+         'warnings': [...], 'unmatched': [...]}
+    """
+    current_groups = current_groups or {}
+    for db in fleet:
+        db['current'] = {**current_groups.get(db['parameter_group'], {}), **db['current']}
+    by_template = {}
+    unmatched = []
+    for db in fleet:
+        key = template_for(db['engine'], templates)
+        if key is None:
+            unmatched.append(db['identifier'])
+        else:
+            by_template.setdefault(key, []).append(db)
+
+    results, warnings, classes = [], [], {}
+    for key, dbs in by_template.items():
+        env = environment(catalog, [d['instance_class'] for d in dbs],
+                          [d['allocated_storage'] for d in dbs], [d['port'] for d in dbs])
+        n = len(dbs)
+        memory = env['DBInstanceClassMemory']
+        changes = [[] for _ in range(n)]
+        planned_by_param = {}
+        for param, formula in templates[key].items():
+            planned = evaluate(formula, env, n)
+            planned_by_param[param] = planned
+            warnings += check_memory(param, planned, memory, dbs, 'planned')
+            # Group databases by their current value so each distinct formula is evaluated once
+            distinct = {}
+            for i, db in enumerate(dbs):
+                value = db['current'].get(param)
+                if value is not None:
+                    distinct.setdefault(str(value), []).append(i)
+            missing = [i for i, db in enumerate(dbs) if db['current'].get(param) is None]
+            for value, idx in distinct.items():
+                idx = np.array(idx)
+                sub_env = {k: v[idx] for k, v in env.items()}
+                try:
+                    current = evaluate(value, sub_env, len(idx))
+                except FormulaError:
+                    current = np.full(len(idx), value, dtype=object)
+                warnings += check_memory(param, current, memory[idx], [dbs[i] for i in idx], 'current')
+                differs = current != planned[idx] if current.dtype == planned.dtype else \
+                    np.array([str(c) != str(p) for c, p in zip(current, planned[idx])])
+                for j in np.flatnonzero(differs):
+                    i = idx[j]
+                    changes[i].append({'parameter': param, 'current': as_value(current[j]),
+                                       'current_setting': value, 'planned': as_value(planned[i]),
+                                       'planned_setting': formula})
+            for i in missing:
+                if dbs[i]['current']:
+                    changes[i].append({'parameter': param, 'current': None, 'current_setting': None,
+                                       'planned': as_value(planned[i]), 'planned_setting': formula})
+
+        per_class = classes.setdefault(key, {})
+        for i, db in enumerate(dbs):
+            per_class.setdefault(db['instance_class'],
+                                 {p: as_value(v[i]) for p, v in planned_by_param.items()})
+            results.append({'identifier': db['identifier'], 'engine': db['engine'], 'template': key,
+                            'instance_class': db['instance_class'], 'parameter_group': db['parameter_group'],
+                            'changes': changes[i]})
+    return {'databases': results, 'classes': classes, 'warnings': warnings, 'unmatched': unmatched}
+
+
+def check_memory(param: str, values: np.ndarray, memory: np.ndarray, dbs: list, label: str) -> list:
+    """Warnings for memory-sized parameters larger than the instance memory (usually a unit mistake)."""
+    unit = PARAMETER_UNITS.get(param)
+    if not unit or values.dtype != np.int64:
+        return []
+    return [f"{dbs[i]['identifier']}: {label} {param}={values[i]} ({values[i] * unit / GIB:.1f} GiB) "
+            f"exceeds instance memory ({memory[i] / GIB:.1f} GiB)"
+            for i in np.flatnonzero(values * float(unit) > memory)]
+
+
+def as_value(v):
+    return int(v) if isinstance(v, (np.integer, int)) else str(v)
+
+
+def human(param: str, value) -> str:
+    unit = PARAMETER_UNITS.get(param)
+    if unit and isinstance(value, int):
+        return f"{value} ({value * unit / GIB:.2f} GiB)"
+    return str(value)
+
+
+def format_table(report: dict) -> str:
+    lines = []
+    changed = [d for d in report['databases'] if d['changes']]
+    for db in changed:
+        lines.append(f"{db['identifier']} ({db['engine']}, {db['instance_class']}, "
+                     f"group {db['parameter_group'] or '-'})")
+        for c in db['changes']:
+            lines.append(f"  {c['parameter']:<28}{human(c['parameter'], c['current']):>28} -> "
+                         f"{human(c['parameter'], c['planned'])}")
+    for warning in report['warnings']:
+        lines.append(f"WARNING: {warning}")
+    if report['unmatched']:
+        lines.append(f"No template for: {', '.join(report['unmatched'])}")
+    lines.append(f"\nDatabases: {len(report['databases'])} | With changes: {len(changed)} | "
+                 f"Changes: {sum(len(d['changes']) for d in changed)} | Warnings: {len(report['warnings'])}")
+    return '\n'.join(lines)
+
+
+def format_cli(report: dict) -> str:
+    """modify-db-parameter-group commands applying template formulas to groups with drift."""
+    groups = {}
+    for db in report['databases']:
+        if db['parameter_group']:
+            for c in db['changes']:
+                groups.setdefault(db['parameter_group'], {})[c['parameter']] = c['planned_setting']
+    lines = []
+    for group, params in sorted(groups.items()):
+        items = list(params.items())
+        for start in range(0, len(items), 20):  # API limit: 20 parameters per call
+            lines.append(f"aws rds modify-db-parameter-group --db-parameter-group-name {group} \\")
+            specs = [f"\"ParameterName={p},ParameterValue='{v}',ApplyMethod=pending-reboot\""
+                     for p, v in items[start:start + 20]]
+            lines.append('  --parameters ' + ' \\\n    '.join(specs))
+    return '\n'.join(lines) if lines else '# No parameter changes'
+
+
+def main():
+    """Main planner entry point."""
+    parser = argparse.ArgumentParser(description='Evaluate RDS parameter formulas and plan fleet parameter groups')
+    parser.add_argument('--classes-file', default=str(DEFAULT_CLASSES), help='DB instance class catalog CSV')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    e = sub.add_parser('evaluate', help='Evaluate formulas for instance classes')
+    e.add_argument('formulas', nargs='+', help='Parameter formulas')
+    e.add_argument('--classes', default='*', help="Class glob, e.g. 'db.r6g.*'")
+    e.add_argument('--storage', type=float, default=100, help='AllocatedStorage in GiB')
+    e.add_argument('--format', choices=['table', 'json'], default='table')
+
+    p = sub.add_parser('plan', help='Plan parameters for a fleet and diff against current values')
+    p.add_argument('fleet', help='Fleet JSON/CSV or describe-db-instances output')
+    p.add_argument('--template', default=str(DEFAULT_TEMPLATE), help='Parameter templates JSON')
+    p.add_argument('--current', help='Directory of describe-db-parameters JSON files')
+    p.add_argument('--format', choices=['table', 'json', 'cli'], default='table')
+    args = parser.parse_args()
+
+    try:
+        catalog = ClassCatalog(args.classes_file)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if args.command == 'evaluate':
+        classes = [c for c in catalog.classes if fnmatch.fnmatch(c, args.classes)]
+        if not classes:
+            print(f"No instance class matches {args.classes}", file=sys.stderr)
+            return 3
+        env = environment(catalog, classes, np.full(len(classes), args.storage))
+        try:
+            values = {f: evaluate(f, env, len(classes)) for f in args.formulas}
+        except FormulaError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 4
+        if args.format == 'json':
+            print(json.dumps({c: {f: as_value(v[i]) for f, v in values.items()}
+                              for i, c in enumerate(classes)}, indent=2))
+        else:
+            for f in args.formulas:
+                print(f"{f}")
+                for i, c in enumerate(classes):
+                    print(f"  {c:<20}{as_value(values[f][i]):>24}")
+        return 0
+
+    for path in (args.fleet, args.template):
+        if not Path(path).exists():
+            print(f"File not found: {path}", file=sys.stderr)
+            return 4
+    try:
+        with open(args.template, 'r') as f:
+            templates = json.load(f)
+        for formulas in templates.values():
+            for value in formulas.values():
+                if is_formula(value):
+                    compile_formula(value)
+        fleet = load_fleet(args.fleet)
+        current = load_current_dir(args.current) if args.current else None
+        report = plan(fleet, templates, catalog, current)
+    except (FormulaError, KeyError, ValueError) as e:
+        print(f"Error: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 4
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    elif args.format == 'cli':
+        print(format_cli(report))
+    else:
+        print(format_table(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+Slow query log digest for aws-rds-setup skill.
+Category: cloud
+
+Groups the statements of downloaded RDS log files into fingerprints
+(literals replaced by ?, IN-lists and multi-row VALUES collapsed) and ranks
+them by total time, count or tail latency, in the spirit of pt-query-digest.
+
+Supported logs (plain or .gz, detected from the first lines):
+    mysql-slow      MySQL/MariaDB/Aurora MySQL slow query log
+    mysql-general   MySQL general log (counts only, no durations)
+    postgres        PostgreSQL log with log_min_duration_statement or log_statement
+
+Files are streamed line by line; every fingerprint keeps fixed-size
+counters and a log-bucketed latency sketch, and the table of fingerprints
+is bounded, so memory does not grow with the log size. Files, and byte
+ranges of large uncompressed files, are processed on a process pool and
+the partial digests merged.
+
+Usage:
+    aws rds download-db-log-file-portion --db-instance-identifier DB \\
+        --log-file-name slowquery/mysql-slowquery.log --starting-token 0 --output text > slow.log
+    python query_digest.py slow.log [LOG|DIR ...] [--sort total|count|p99|max] [--top 20]
+                           [--workers N] [--threshold-ms 1000] [--format table|json]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+# Uncompressed files larger than this are split into ranges for the pool
+CHUNK_BYTES = 64 * 1024 * 1024
+SAMPLE_CHARS = 1000
+
+# --- log formats --------------------------------------------------------------
+
+MYSQL_QUERY_TIME_RE = re.compile(rb'# Query_time: ([\d.]+)(?:.*?Rows_examined: (\d+))?')
+MYSQL_USER_RE = re.compile(rb'# User@Host: (\S+?)\[')
+MYSQL_SCHEMA_RE = re.compile(rb'Schema: (\S+)')
+MYSQL_HEADER_RE = re.compile(rb'^(?:\S+, Version: |Tcp port: |Time\s+Id\s+Command)')
+MYSQL_GENERAL_RE = re.compile(rb'^(?:\d{4}-\d\d-\d\dT\S+|\d{6}\s+\d{1,2}:\d\d:\d\d)?\s+(\d+)\s+'
+                              rb'(Query|Execute|Connect|Quit|Init DB|Prepare|Close stmt|Field List)\t?(.*)')
+PG_LINE_RE = re.compile(rb'^(.*?)(LOG|ERROR|STATEMENT|DETAIL|HINT|CONTEXT|WARNING|FATAL|PANIC|NOTICE|INFO):  (.*)')
+PG_DURATION_RE = re.compile(r'^duration: ([\d.]+) ms\s+(statement|execute [^:]*|bind [^:]*|parse [^:]*): ', re.S)
+PG_STATEMENT_RE = re.compile(r'^(?:statement|execute [^:]*): ', re.S)
+PG_USER_DB_RE = re.compile(r'(\w+)@(\w+)')
+
+
+def is_record_start(line: bytes, fmt: str) -> bool:
+    """True if a record of this format begins at `line` (used to align file ranges)."""
+    if fmt == 'mysql-slow':
+        return line.startswith((b'# Time:', b'# User@Host:'))
+    if fmt == 'mysql-general':
+        return MYSQL_GENERAL_RE.match(line) is not None
+    return not line.startswith((b'\t', b' ')) and PG_LINE_RE.match(line) is not None
+
+
+def sniff_format(path: str, max_lines: int = 200) -> str:
+    """Detect the log format from the first lines of a file."""
+    with open_binary(path) as f:
+        for i, line in enumerate(f):
+            if i >= max_lines:
+                break
+            if line.startswith((b'# Query_time:', b'# User@Host:', b'# Time:')):
+                return 'mysql-slow'
+            if PG_LINE_RE.match(line):
+                return 'postgres'
+            if MYSQL_GENERAL_RE.match(line):
+                return 'mysql-general'
+    raise ValueError(f"Unrecognized log format: {path}")
+
+
+def open_binary(path: str):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def read_lines(path: str, fmt: str, start: int = 0, end: int = None):
+    """
+    Yield the lines of the records that begin inside [start, end).
+
+    A range starts at the first record boundary at or after `start` and runs
+    past `end` to the end of the record in progress, so adjacent ranges
+    cover every record exactly once.
+    """
+    with open_binary(path) as f:
+        pos = 0
+        if start:
+            f.seek(start - 1)
+            pos = start - 1 + len(f.readline())
+            for line in f:
+                if is_record_start(line, fmt):
+                    break
+                pos += len(line)
+            else:
+                return
+            if end is not None and pos >= end:
+                return
+            yield line
+            pos += len(line)
+        for line in f:
+            if end is not None and pos >= end and is_record_start(line, fmt):
+                return
+            yield line
+            pos += len(line)
+
+
+def parse_mysql_slow(lines):
+    """Yield (query, duration_ms, rows_examined, user, db) from a MySQL slow log."""
+    meta, query, db = {}, [], None
+    for line in lines:
+        if line.startswith(b'#'):
+            if query:
+                if 'ms' in meta:
+                    yield b''.join(query).decode('utf-8', 'replace'), meta['ms'], meta.get('rows'), meta.get('user'), db
+                query, meta = [], {}
+            m = MYSQL_QUERY_TIME_RE.match(line)
+            if m:
+                meta['ms'] = float(m.group(1)) * 1000
+                if m.group(2) is not None:
+                    meta['rows'] = int(m.group(2))
+                continue
+            m = MYSQL_USER_RE.match(line)
+            if m:
+                meta['user'] = m.group(1).decode('utf-8', 'replace')
+            m = MYSQL_SCHEMA_RE.search(line)
+            if m:
+                db = m.group(1).decode('utf-8', 'replace')
+            continue
+        if not query:
+            if line.startswith(b'SET timestamp=') or MYSQL_HEADER_RE.match(line):
+                continue
+            if line[:4].lower() == b'use ':
+                db = line[4:].strip().rstrip(b';').strip(b'`').decode('utf-8', 'replace')
+                continue
+        query.append(line)
+    if query and 'ms' in meta:
+        yield b''.join(query).decode('utf-8', 'replace'), meta['ms'], meta.get('rows'), meta.get('user'), db
+
+
+def parse_mysql_general(lines):
+    """Yield (query, None, None, None, None) for Query/Execute commands of a general log."""
+    query = None
+    for line in lines:
+        m = MYSQL_GENERAL_RE.match(line)
+        if m:
+            if query:
+                yield b''.join(query).decode('utf-8', 'replace'), None, None, None, None
+            query = [m.group(3)] if m.group(2) in (b'Query', b'Execute') else None
+        elif query is not None and not MYSQL_HEADER_RE.match(line):
+            query.append(b'\n' + line)
+    if query:
+        yield b''.join(query).decode('utf-8', 'replace'), None, None, None, None
+
+
+def parse_postgres(lines):
+    """Yield (query, duration_ms or None, None, user, db) from PostgreSQL LOG messages."""
+    prefix, level, message = None, None, None
+
+    def finish():
+        if level != b'LOG':
+            return None
+        text = b''.join(message).decode('utf-8', 'replace')
+        m = PG_DURATION_RE.match(text)
+        if m:
+            if not m.group(2).startswith(('statement', 'execute')):
+                return None
+            ms, body = float(m.group(1)), text[m.end():]
+        else:
+            m = PG_STATEMENT_RE.match(text)
+            if not m:
+                return None
+            ms, body = None, text[m.end():]
+        who = PG_USER_DB_RE.search(prefix.decode('utf-8', 'replace'))
+        return body, ms, None, who.group(1) if who else None, who.group(2) if who else None
+
+    for line in lines:
+        if line.startswith((b'\t', b' ')) and message is not None:
+            message.append(b'\n' + line.lstrip(b'\t'))
+            continue
+        m = PG_LINE_RE.match(line)
+        if not m:
+            continue
+        if message is not None:
+            record = finish()
+            if record:
+                yield record
+        prefix, level, message = m.group(1), m.group(2), [m.group(3)]
+    if message is not None:
+        record = finish()
+        if record:
+            yield record
+
+
+PARSERS = {'mysql-slow': parse_mysql_slow, 'mysql-general': parse_mysql_general, 'postgres': parse_postgres}
+
+# --- fingerprints -------------------------------------------------------------
+
+COMMENT_RE = re.compile(r'/\*(?!\+).*?\*/|--[^\n]*', re.S)
+MYSQL_COMMENT_RE = re.compile(r'#[^\n]*')
+DOLLAR_RE = re.compile(r'\$([A-Za-z_]\w*)?\$.*?\$\1\$', re.S)
+LITERAL_RE = {
+    'mysql': re.compile(r"""(?:\b[xXbBnN])?'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|"""
+                        r"""(?<![\w.$])(?:0x[0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+)(?!\w)""", re.S),
+    'postgres': re.compile(r"""(?:\b(?:[eEbBxX]|[uU]&))?'(?:[^'\\]|\\.|'')*'|\$\d+|"""
+                           r"""(?<![\w.$])(?:0x[0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+)(?!\w)""", re.S),
+}
+SIGNED_RE = re.compile(r'([=<>,(]\s*)[-+]\s*\?')
+IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+ARRAY_LIST_RE = re.compile(r'\barray\s*\[\s*\?(?:\s*,\s*\?)*\s*\]')
+VALUES_RE = re.compile(r'\bvalues?\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*')
+SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(query: str, dialect: str = 'mysql') -> str:
+    """
+    Normalize a statement into its fingerprint.
+
+    Comments are removed (optimizer hints kept), strings, numbers and bind
+    parameters become ?, `IN (?, ?, ...)`, `ARRAY[?, ...]` and multi-row
+    `VALUES (...), (...)` collapse to a single `?+` form, and whitespace and
+    case are normalized.
+
+    >>> fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'")
+    'select * from t where id in(?+) and name = ?'
+    """
+    q = COMMENT_RE.sub(' ', query)
+    if dialect == 'mysql':
+        q = MYSQL_COMMENT_RE.sub(' ', q)
+    else:
+        q = DOLLAR_RE.sub('?', q)
+    q = LITERAL_RE[dialect].sub('?', q)
+    q = SPACE_RE.sub(' ', q).strip().rstrip(';').strip().lower()
+    q = SIGNED_RE.sub(r'\1?', q)
+    q = IN_LIST_RE.sub('in(?+)', q)
+    q = ARRAY_LIST_RE.sub('array[?+]', q)
+    return VALUES_RE.sub(r'values(?+)', q)
+
+
+def fingerprint_id(fp: str) -> str:
+    return hashlib.md5(fp.encode('utf-8')).hexdigest()[:16].upper()
+
+# --- sketches -----------------------------------------------------------------
+
+
+class LatencySketch:
+    """
+    Log-bucketed quantile sketch (DDSketch style) with bounded bins.
+
+    Quantiles are returned within `relative_accuracy` of the true value.
+    When more than `max_bins` buckets exist the lowest ones are collapsed,
+    which keeps memory fixed and only affects the low percentiles.
+    """
+
+    __slots__ = ('gamma', 'log_gamma', 'max_bins', 'bins', 'zero_count', 'count')
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 512):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: 'LatencySketch'):
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        ordered = sorted(self.bins)
+        excess = len(ordered) - self.max_bins + 1
+        folded = sum(self.bins.pop(index) for index in ordered[:excess])
+        target = ordered[excess]
+        self.bins[target] = self.bins.get(target, 0) + folded
+
+    def quantile(self, q: float):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+class QueryStats:
+    """Counters for one fingerprint."""
+
+    __slots__ = ('count', 'timed', 'total_ms', 'max_ms', 'rows_examined', 'sketch', 'sample', 'users', 'databases')
+
+    def __init__(self, sample: str):
+        self.count = 0
+        self.timed = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows_examined = 0
+        self.sketch = LatencySketch()
+        self.sample = sample[:SAMPLE_CHARS]
+        self.users = set()
+        self.databases = set()
+
+    def merge(self, other: 'QueryStats'):
+        self.count += other.count
+        self.timed += other.timed
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.rows_examined += other.rows_examined
+        self.sketch.merge(other.sketch)
+        self.users |= other.users
+        self.databases |= other.databases
+
+
+class QueryDigest:
+    """
+    Mergeable table of fingerprints bounded to `capacity` entries.
+
+    The table may grow to twice the capacity and is then pruned back to the
+    fingerprints with the most total time (then count); evicted queries are
+    still counted in the totals.
+    """
+
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        self.stats = {}
+        self.queries = 0
+        self.total_ms = 0.0
+        self.evicted_queries = 0
+        self.evicted_ms = 0.0
+        self.formats = set()
+
+    def add(self, fp: str, query: str, ms, rows, user, db):
+        entry = self.stats.get(fp)
+        if entry is None:
+            entry = self.stats[fp] = QueryStats(query)
+            if len(self.stats) > 2 * self.capacity:
+                self._prune()
+                entry = self.stats.setdefault(fp, entry)
+        entry.count += 1
+        self.queries += 1
+        if ms is not None:
+            entry.timed += 1
+            entry.total_ms += ms
+            self.total_ms += ms
+            if ms > entry.max_ms:
+                entry.max_ms = ms
+            entry.sketch.add(ms)
+        if rows:
+            entry.rows_examined += rows
+        if user and len(entry.users) < 8:
+            entry.users.add(user)
+        if db and len(entry.databases) < 8:
+            entry.databases.add(db)
+
+    def merge(self, other: 'QueryDigest'):
+        for fp, stats in other.stats.items():
+            entry = self.stats.get(fp)
+            if entry is None:
+                self.stats[fp] = stats
+            else:
+                entry.merge(stats)
+        self.queries += other.queries
+        self.total_ms += other.total_ms
+        self.evicted_queries += other.evicted_queries
+        self.evicted_ms += other.evicted_ms
+        self.formats |= other.formats
+        if len(self.stats) > self.capacity:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.stats.items(), key=lambda kv: (kv[1].total_ms, kv[1].count), reverse=True)
+        for _, stats in ranked[self.capacity:]:
+            self.evicted_queries += stats.count
+            self.evicted_ms += stats.total_ms
+        self.stats = dict(ranked[:self.capacity])
+
+
+def digest_range(path: str, fmt: str, start: int = 0, end: int = None, capacity: int = 2000) -> QueryDigest:
+    """
+    Stream one file (or a byte range of it) into a QueryDigest.
+
+    Args:
+        path: Log file path (.gz supported; ranges only for plain files)
+        fmt: Log format, see PARSERS
+        start: First byte of the range
+        end: End of the range (None for end of file)
+        capacity: Maximum fingerprints kept
+
+    Returns:
+        QueryDigest: Mergeable digest of the range
+    """
+    digest = QueryDigest(capacity)
+    digest.formats.add(fmt)
+    dialect = 'postgres' if fmt == 'postgres' else 'mysql'
+    # Prepared statements repeat verbatim, so a small cache skips most normalizing
+    cache = {}
+    for query, ms, rows, user, db in PARSERS[fmt](read_lines(path, fmt, start, end)):
+        fp = cache.get(query)
+        if fp is None:
+            fp = fingerprint(query, dialect)
+            if len(cache) > 4096:
+                cache.clear()
+            cache[query] = fp
+        digest.add(fp, query, ms, rows, user, db)
+    return digest
+
+
+def plan_tasks(paths: list, chunk_bytes: int = CHUNK_BYTES) -> list:
+    """(path, format, start, end) work items; large plain files are split into ranges."""
+    tasks = []
+    for path in paths:
+        fmt = sniff_format(path)
+        size = os.path.getsize(path)
+        if path.endswith('.gz') or size <= chunk_bytes:
+            tasks.append((path, fmt, 0, None))
+            continue
+        for start in range(0, size, chunk_bytes):
+            tasks.append((path, fmt, start, min(start + chunk_bytes, size)))
+    return tasks
+
+
+def analyze(paths: list, capacity: int = 2000, workers: int = None, chunk_bytes: int = CHUNK_BYTES) -> QueryDigest:
+    """
+    Digest many log files in parallel and merge the results.
+
+    Args:
+        paths: Log file paths
+        capacity: Maximum fingerprints kept
+        workers: Process pool size (default: CPU count)
+        chunk_bytes: Range size for splitting large plain files
+
+    Returns:
+        QueryDigest: Merged digest across all files
+    """
+    tasks = plan_tasks(paths, chunk_bytes)
+    total = QueryDigest(capacity)
+    if len(tasks) == 1 or workers == 1:
+        for path, fmt, start, end in tasks:
+            total.merge(digest_range(path, fmt, start, end, capacity))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(digest_range, path, fmt, start, end, capacity) for path, fmt, start, end in tasks]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+SORT_KEYS = {
+    'total': lambda s: (s.total_ms, s.count),
+    'count': lambda s: (s.count, s.total_ms),
+    'p99': lambda s: (s.sketch.quantile(0.99) or 0, s.count),
+    'max': lambda s: (s.max_ms, s.count),
+}
+
+
+def build_report(digest: QueryDigest, top: int = 20, sort: str = 'total') -> dict:
+    """
+    Rank fingerprints into a JSON-serialisable report.
+
+    Args:
+        digest: Merged QueryDigest
+        top: Number of fingerprints to report
+        sort: Ranking key, see SORT_KEYS
+
+    Returns:
+        dict: Totals and ranked fingerprints
+    """
+    ranked = sorted(digest.stats.items(), key=lambda kv: SORT_KEYS[sort](kv[1]), reverse=True)[:top]
+    queries = []
+    for rank, (fp, s) in enumerate(ranked, start=1):
+        queries.append({
+            'rank': rank,
+            'id': fingerprint_id(fp),
+            'count': s.count,
+            'total_ms': round(s.total_ms, 3),
+            'time_share': round(s.total_ms / digest.total_ms, 4) if digest.total_ms else None,
+            'avg_ms': round(s.total_ms / s.timed, 3) if s.timed else None,
+            'p95_ms': s.sketch.quantile(0.95),
+            'p99_ms': s.sketch.quantile(0.99),
+            'max_ms': round(s.max_ms, 3) if s.timed else None,
+            'rows_examined_avg': round(s.rows_examined / s.timed) if s.rows_examined and s.timed else None,
+            'users': sorted(s.users),
+            'databases': sorted(s.databases),
+            'fingerprint': fp,
+            'sample': s.sample.strip(),
+        })
+    return {
+        'formats': sorted(digest.formats),
+        'queries': digest.queries,
+        'total_ms': round(digest.total_ms, 3),
+        'fingerprints': len(digest.stats),
+        'evicted_queries': digest.evicted_queries,
+        'evicted_ms': round(digest.evicted_ms, 3),
+        'sort': sort,
+        'top': queries,
+    }
+
+
+def format_table(report: dict, width: int = 100) -> str:
+    """Render a report as a plain-text table."""
+    lines = [
+        f"Queries: {report['queries']} | Total time: {report['total_ms'] / 1000:.1f}s | "
+        f"Fingerprints: {report['fingerprints']} | Formats: {', '.join(report['formats'])}",
+    ]
+    if report['evicted_queries']:
+        lines.append(f"Evicted (below capacity cut-off): {report['evicted_queries']} queries, "
+                     f"{report['evicted_ms'] / 1000:.1f}s")
+    lines += ['', f"{'Rank':<5}{'Id':<18}{'Count':>9}{'Total s':>10}{'Time':>7}{'Avg ms':>10}"
+                  f"{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>10}"]
+
+    def cell(value, fmt='>10.1f'):
+        return format(value, fmt) if value is not None else f"{'-':>10}"
+
+    for q in report['top']:
+        share = f"{q['time_share']:>7.1%}" if q['time_share'] is not None else f"{'-':>7}"
+        lines.append(f"{q['rank']:<5}{q['id']:<18}{q['count']:>9}{q['total_ms'] / 1000:>10.1f}{share}"
+                     f"{cell(q['avg_ms'])}{cell(q['p95_ms'])}{cell(q['p99_ms'])}{cell(q['max_ms'])}")
+        text = q['fingerprint'] if len(q['fingerprint']) <= width else q['fingerprint'][:width - 3] + '...'
+        lines.append(f"     {text}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main digest entry point."""
+    parser = argparse.ArgumentParser(description='Fingerprint and rank queries in RDS slow/general logs')
+    parser.add_argument('paths', nargs='+', help='Log files or directories')
+    parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total', help='Ranking key')
+    parser.add_argument('--top', type=int, default=20, help='Fingerprints to report')
+    parser.add_argument('--capacity', type=int, default=2000, help='Maximum fingerprints kept')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel worker processes')
+    parser.add_argument('--threshold-ms', type=float, help='Exit 1 if any fingerprint p99 reaches this')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(str(p) for p in sorted(Path(path).rglob('*')) if p.is_file())
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            print(f"Log file not found: {path}", file=sys.stderr)
+            return 4
+
+    if not files:
+        print("No log files to analyze", file=sys.stderr)
+        return 3
+
+    try:
+        digest = analyze(files, args.capacity, args.workers)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    report = build_report(digest, args.top, args.sort)
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+
+    if args.threshold_ms is not None:
+        # Every fingerprint counts, not just the ones in the report
+        if any((s.sketch.quantile(0.99) or 0) >= args.threshold_ms for s in digest.stats.values()):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
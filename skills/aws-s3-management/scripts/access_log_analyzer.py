@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Streaming S3 server access log analyzer for aws-s3-management skill.
+Category: cloud
+
+Finds hot key prefixes and SlowDown throttling in S3 server access logs
+without loading them into a data warehouse. Every log file is streamed
+line by line and summarised into fixed-memory sketches, so files can be
+processed on a process pool and the partial results merged.
+
+Peak request rates are counted exactly: requests per (prefix, class) are
+tallied for each second in a short rolling window, and when a second
+leaves the window its counts are folded into a per-prefix maximum. Only
+those per-prefix peaks go into a bounded top-K table. Peaks of files that
+cover overlapping time (logs from different S3 hosts) are added when the
+summaries are merged, which can overstate but never understate the peak.
+
+Usage:
+    python access_log_analyzer.py LOG [LOG ...] [--depth 3] [--top 20]
+                                  [--workers N] [--format table|json]
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+
+# Tokens are either a [bracketed time], a "quoted string" or a bare word
+TOKEN_RE = re.compile(r'\[[^\]]*\]|"(?:[^"\\]|\\.)*"|\S+')
+
+TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+
+# Field positions in the access log record
+F_TIME = 2
+F_OPERATION = 6
+F_KEY = 7
+F_STATUS = 9
+F_ERROR_CODE = 10
+F_TOTAL_TIME = 13
+MIN_FIELDS = 14
+
+# Per-prefix request rate limits documented for S3 partitions
+RATE_LIMITS = {'read': 5500, 'write': 3500}
+
+WRITE_OPERATIONS = ('PUT', 'POST', 'DELETE', 'COPY')
+
+# Seconds a per-second tally stays open for slightly out-of-order records
+LATE_SECONDS = 5
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitter sketch with a fixed number of counters.
+
+    An item that is not tracked starts from `error`, the largest count
+    evicted so far, so a tracked count never undercounts and overcounts by
+    at most `error`. Counters are allowed to grow to twice the capacity and
+    are then pruned back to the largest `capacity` entries, which keeps the
+    per-record cost amortised O(1).
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.counters = {}
+        self.error = 0
+
+    def add(self, item, count: int = 1):
+        counters = self.counters
+        if item in counters:
+            counters[item] += count
+        else:
+            counters[item] = self.error + count
+            if len(counters) > 2 * self.capacity:
+                self._prune()
+
+    def merge(self, other: 'SpaceSaving'):
+        # An item missing from one sketch may have been evicted there with up to its error
+        merged = {item: count + other.counters.get(item, other.error) for item, count in self.counters.items()}
+        for item, count in other.counters.items():
+            if item not in merged:
+                merged[item] = count + self.error
+        self.counters = merged
+        self.error += other.error
+        if len(self.counters) > self.capacity:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.counters.items(), key=lambda kv: kv[1], reverse=True)
+        if len(ranked) > self.capacity:
+            self.error = max(self.error, ranked[self.capacity][1])
+        self.counters = dict(ranked[:self.capacity])
+
+    def top(self, n: int) -> list:
+        return sorted(self.counters.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+class PeakTracker:
+    """
+    Largest value seen per item, for a bounded number of items.
+
+    Holds up to twice the capacity and is then pruned back to the largest
+    `capacity` peaks; `error` is the largest peak dropped, so any item not
+    listed peaked at no more than `error`. Kept peaks are exact.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.peaks = {}
+        self.error = 0
+
+    def add(self, item, value: int):
+        peaks = self.peaks
+        if value > peaks.get(item, 0):
+            if item not in peaks and value <= self.error and len(peaks) >= self.capacity:
+                return
+            peaks[item] = value
+            if len(peaks) > 2 * self.capacity:
+                self._prune()
+
+    def merge(self, other: 'PeakTracker', overlapping: bool = False):
+        """Combine peaks: added when the two streams overlap in time, else the larger one."""
+        if overlapping:
+            merged = {item: value + other.peaks.get(item, other.error) for item, value in self.peaks.items()}
+            for item, value in other.peaks.items():
+                if item not in merged:
+                    merged[item] = value + self.error
+            self.peaks = merged
+            self.error += other.error
+        else:
+            for item, value in other.peaks.items():
+                if value > self.peaks.get(item, 0):
+                    self.peaks[item] = value
+            self.error = max(self.error, other.error)
+        if len(self.peaks) > self.capacity:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.peaks.items(), key=lambda kv: kv[1], reverse=True)
+        if len(ranked) > self.capacity:
+            self.error = max(self.error, ranked[self.capacity][1])
+        self.peaks = dict(ranked[:self.capacity])
+
+
+class LatencySketch:
+    """
+    Log-bucketed quantile sketch (DDSketch style) with bounded bins.
+
+    Quantiles are returned within `relative_accuracy` of the true value.
+    When more than `max_bins` buckets exist the lowest ones are collapsed,
+    which keeps memory fixed and only affects the low percentiles.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: 'LatencySketch'):
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        ordered = sorted(self.bins)
+        excess = len(ordered) - self.max_bins + 1
+        folded = sum(self.bins.pop(index) for index in ordered[:excess])
+        target = ordered[excess]
+        self.bins[target] = self.bins.get(target, 0) + folded
+
+    def quantile(self, q: float):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+class LogSummary:
+    """Mergeable per-file (or global) summary of an access log stream."""
+
+    def __init__(self, depth: int, capacity: int):
+        self.depth = depth
+        self.lines = 0
+        self.malformed = 0
+        self.requests = 0
+        self.slowdowns = 0
+        self.first_ts = None
+        self.last_ts = None
+        # Totals per (depth, prefix)
+        self.prefixes = SpaceSaving(capacity)
+        # Peak requests in one second per (depth, prefix, class)
+        self.peak_rates = PeakTracker(capacity * 4)
+        # 503 SlowDown responses per (depth, prefix)
+        self.slowdown_prefixes = SpaceSaving(capacity)
+        self.latency = {'read': LatencySketch(), 'write': LatencySketch()}
+
+    def merge(self, other: 'LogSummary'):
+        overlapping = (self.first_ts is not None and other.first_ts is not None
+                       and other.first_ts <= self.last_ts and self.first_ts <= other.last_ts)
+        self.lines += other.lines
+        self.malformed += other.malformed
+        self.requests += other.requests
+        self.slowdowns += other.slowdowns
+        if other.first_ts is not None:
+            if self.first_ts is None or other.first_ts < self.first_ts:
+                self.first_ts = other.first_ts
+            if self.last_ts is None or other.last_ts > self.last_ts:
+                self.last_ts = other.last_ts
+        self.prefixes.merge(other.prefixes)
+        self.peak_rates.merge(other.peak_rates, overlapping)
+        self.slowdown_prefixes.merge(other.slowdown_prefixes)
+        for op_class, sketch in other.latency.items():
+            self.latency[op_class].merge(sketch)
+
+
+def parse_line(line: str):
+    """
+    Split one access log record into fields.
+
+    Args:
+        line: Raw log line
+
+    Returns:
+        list: Field values with quotes/brackets stripped, or None if malformed
+    """
+    fields = TOKEN_RE.findall(line)
+    if len(fields) < MIN_FIELDS:
+        return None
+    return [f[1:-1] if f[:1] in ('"', '[') else f for f in fields]
+
+
+def operation_class(operation: str) -> str:
+    """Map an operation such as REST.PUT.OBJECT to 'read' or 'write'."""
+    parts = operation.split('.')
+    verb = parts[1] if len(parts) > 1 else operation
+    return 'write' if verb in WRITE_OPERATIONS else 'read'
+
+
+def key_prefixes(key: str, depth: int) -> list:
+    """Return the key prefixes at depths 1..depth (directory components only)."""
+    parts = key.split('/')[:-1]
+    return ['/'.join(parts[:d]) + '/' for d in range(1, min(depth, len(parts)) + 1)]
+
+
+def open_log(path: str):
+    """Open a plain or gzip-compressed log file for text streaming."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def analyze_file(path: str, depth: int = 3, capacity: int = 256) -> LogSummary:
+    """
+    Stream one access log file into a LogSummary.
+
+    Args:
+        path: Log file path (.gz supported)
+        depth: Maximum prefix depth to aggregate
+        capacity: Counters per heavy hitter sketch
+
+    Returns:
+        LogSummary: Mergeable summary of the file
+    """
+    summary = LogSummary(depth, capacity)
+    epoch_cache = {}
+    # second -> {(depth, prefix, class): requests}, for the seconds still open
+    window = {}
+    newest = None
+
+    def close(seconds):
+        for sec in seconds:
+            for key, count in window.pop(sec).items():
+                summary.peak_rates.add(key, count)
+
+    with open_log(path) as f:
+        for line in f:
+            summary.lines += 1
+            fields = parse_line(line)
+            if fields is None:
+                summary.malformed += 1
+                continue
+
+            stamp = fields[F_TIME]
+            second = epoch_cache.get(stamp)
+            if second is None:
+                try:
+                    second = int(datetime.strptime(stamp, TIME_FORMAT).timestamp())
+                except ValueError:
+                    summary.malformed += 1
+                    continue
+                if len(epoch_cache) > 4096:
+                    epoch_cache.clear()
+                epoch_cache[stamp] = second
+
+            summary.requests += 1
+            if newest is None or second > newest:
+                newest = second
+                close([sec for sec in window if sec <= newest - LATE_SECONDS])
+            tally = window.get(second)
+            if tally is None:
+                tally = window[second] = {}
+            if summary.first_ts is None or second < summary.first_ts:
+                summary.first_ts = second
+            if summary.last_ts is None or second > summary.last_ts:
+                summary.last_ts = second
+
+            op_class = operation_class(fields[F_OPERATION])
+            key = fields[F_KEY]
+            prefixes = key_prefixes(key, depth) if key != '-' else []
+            slowdown = fields[F_STATUS] == '503' and fields[F_ERROR_CODE] == 'SlowDown'
+            if slowdown:
+                summary.slowdowns += 1
+
+            for d, prefix in enumerate(prefixes, start=1):
+                summary.prefixes.add((d, prefix))
+                rate_key = (d, prefix, op_class)
+                tally[rate_key] = tally.get(rate_key, 0) + 1
+                if slowdown:
+                    summary.slowdown_prefixes.add((d, prefix))
+
+            total_time = fields[F_TOTAL_TIME]
+            if total_time != '-':
+                try:
+                    summary.latency[op_class].add(float(total_time))
+                except ValueError:
+                    pass
+
+    close(list(window))
+    return summary
+
+
+def analyze(paths: list, depth: int = 3, capacity: int = 256, workers: int = None) -> LogSummary:
+    """
+    Analyze many log files in parallel and merge the results.
+
+    Args:
+        paths: Log file paths
+        depth: Maximum prefix depth to aggregate
+        capacity: Counters per heavy hitter sketch
+        workers: Process pool size (default: CPU count)
+
+    Returns:
+        LogSummary: Merged summary across all files
+    """
+    total = LogSummary(depth, capacity)
+    if len(paths) == 1 or workers == 1:
+        for path in paths:
+            total.merge(analyze_file(path, depth, capacity))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_file, path, depth, capacity) for path in paths]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def build_report(summary: LogSummary, top: int = 20) -> dict:
+    """
+    Turn a merged summary into a JSON-serialisable report.
+
+    Args:
+        summary: Merged LogSummary
+        top: Number of entries per ranking
+
+    Returns:
+        dict: Report with hot prefixes, peak rates, throttling and latency
+    """
+    peak_rates = [
+        {
+            'depth': d,
+            'prefix': prefix,
+            'class': op_class,
+            'peak_rps': count,
+            'limit_rps': RATE_LIMITS[op_class],
+            'utilization': round(count / RATE_LIMITS[op_class], 4),
+        }
+        for (d, prefix, op_class), count in summary.peak_rates.peaks.items()
+    ]
+    peak_rates.sort(key=lambda r: r['utilization'], reverse=True)
+
+    duration = 0
+    if summary.first_ts is not None:
+        duration = summary.last_ts - summary.first_ts + 1
+
+    latency = {}
+    for op_class, sketch in summary.latency.items():
+        latency[op_class] = {
+            'count': sketch.count,
+            'p50_ms': sketch.quantile(0.50),
+            'p95_ms': sketch.quantile(0.95),
+            'p99_ms': sketch.quantile(0.99),
+        }
+
+    return {
+        'lines': summary.lines,
+        'malformed': summary.malformed,
+        'requests': summary.requests,
+        'duration_seconds': duration,
+        'slowdown_count': summary.slowdowns,
+        'hot_prefixes': [
+            {'depth': d, 'prefix': prefix, 'requests': count}
+            for (d, prefix), count in summary.prefixes.top(top)
+        ],
+        'peak_rates': peak_rates[:top],
+        'slowdown_prefixes': [
+            {'depth': d, 'prefix': prefix, 'slowdowns': count}
+            for (d, prefix), count in summary.slowdown_prefixes.top(top)
+        ],
+        'latency': latency,
+        'sketch_error': {
+            'hot_prefixes': summary.prefixes.error,
+            'peak_rates': summary.peak_rates.error,
+            'slowdown_prefixes': summary.slowdown_prefixes.error,
+        },
+    }
+
+
+def format_table(report: dict) -> str:
+    """Render a report as plain-text tables."""
+    lines = [
+        f"Requests: {report['requests']} ({report['malformed']} malformed lines) "
+        f"over {report['duration_seconds']}s",
+        f"503 SlowDown: {report['slowdown_count']}",
+        '',
+        'Peak request rate per prefix',
+        f"{'Depth':<6}{'Class':<7}{'Peak/s':>8}{'Limit/s':>9}{'Util':>8}  Prefix",
+    ]
+    for r in report['peak_rates']:
+        lines.append(
+            f"{r['depth']:<6}{r['class']:<7}{r['peak_rps']:>8}{r['limit_rps']:>9}"
+            f"{r['utilization']:>8.1%}  {r['prefix']}"
+        )
+
+    lines += ['', 'SlowDown by prefix', f"{'Depth':<6}{'Count':>8}  Prefix"]
+    for r in report['slowdown_prefixes']:
+        lines.append(f"{r['depth']:<6}{r['slowdowns']:>8}  {r['prefix']}")
+
+    lines += ['', 'Latency (total_time)', f"{'Class':<7}{'Count':>10}{'p50':>10}{'p95':>10}{'p99':>10}"]
+    for op_class, stats in report['latency'].items():
+        cells = [f"{stats[k]:>10.1f}" if stats[k] is not None else f"{'-':>10}"
+                 for k in ('p50_ms', 'p95_ms', 'p99_ms')]
+        lines.append(f"{op_class:<7}{stats['count']:>10}" + ''.join(cells))
+
+    errors = report['sketch_error']
+    lines += ['', f"Sketch error (counts may be high by at most): hot prefixes {errors['hot_prefixes']}, "
+                  f"SlowDown {errors['slowdown_prefixes']}; unlisted prefixes peaked at most "
+                  f"{errors['peak_rates']}/s"]
+
+    return '\n'.join(lines)
+
+
+def main():
+    """Main analyzer entry point."""
+    parser = argparse.ArgumentParser(description='Find hot prefixes and throttling in S3 access logs')
+    parser.add_argument('paths', nargs='+', help='Access log files or directories')
+    parser.add_argument('--depth', type=int, default=3, help='Maximum prefix depth')
+    parser.add_argument('--top', type=int, default=20, help='Entries per ranking')
+    parser.add_argument('--capacity', type=int, default=256, help='Counters per sketch')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel worker processes')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(str(p) for p in sorted(Path(path).rglob('*')) if p.is_file())
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            print(f"Log file not found: {path}", file=sys.stderr)
+            return 1
+
+    if not files:
+        print("No log files to analyze", file=sys.stderr)
+        return 1
+
+    summary = analyze(files, args.depth, args.capacity, args.workers)
+    report = build_report(summary, args.top)
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
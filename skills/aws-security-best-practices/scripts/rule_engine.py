@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Security checklist rule engine for aws-security-best-practices skill.
+Category: cloud
+
+Evaluates the declarative rules in assets/security-rules.yaml against
+inventory snapshots and reports failing resources per checklist item.
+
+- Rules are compiled once into closures and indexed by resource type, so
+  every resource is visited once and only meets the rules for its type.
+  `related` conditions use per-partition hash indexes built on first use.
+- The inventory is partitioned by (account, region); partitions are
+  evaluated on a process pool. Global resources (region "global") are
+  visible to every partition of their account.
+- With --state, results are stored per resource and rule; a re-run only
+  evaluates resources whose configuration changed, rules whose definition
+  changed, and rules whose related resources changed. Rules that compare
+  against the current time (within_days) are evaluated on every run.
+- Checklist items whose rules matched no resource are reported as
+  `no data`, not as passing.
+
+Inventory: AWS Config snapshots (`configurationItems`, .json or .json.gz,
+e.g. from the delivery bucket of an aggregator), `select-resource-config`
+output (`Results`), or JSON lists of configuration items. Types that AWS
+Config does not record (AWS::IAM::AccountSummary from get-account-summary,
+AWS::IAM::CredentialReportEntry from the credential report) can be added
+as items with the same shape.
+
+Usage:
+    python rule_engine.py INVENTORY [INVENTORY|DIR ...] [--rules ../assets/security-rules.yaml]
+                          [--state audit-state.json] [--workers N] [--severity medium]
+                          [--fail-on high] [--format table|json]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+
+ASSETS = Path(__file__).parent.parent / 'assets'
+DEFAULT_RULES = ASSETS / 'security-rules.yaml'
+DEFAULT_CHECKLIST = ASSETS / 'security-checklist.yaml'
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+COMPARISONS = ('equals', 'not_equals', 'in', 'not_in', 'matches', 'contains',
+               'gt', 'gte', 'lt', 'lte', 'exists', 'within_days')
+QUANTIFIERS = ('any', 'all', 'none')
+# Operators whose result changes with the clock, so cached results go stale
+TIME_OPERATORS = ('within_days',)
+PASS, FAIL, NOT_APPLICABLE = 'PASS', 'FAIL', 'N/A'
+STATE_VERSION = 1
+
+
+class RuleError(ValueError):
+    """Invalid rule definition."""
+
+
+# --- paths and values -----------------------------------------------------------
+
+def compile_path(path: str) -> tuple:
+    """'a.b[*].c' -> ('a', 'b', '*', 'c'); numeric [n] indexes are kept as ints."""
+    segments = []
+    for part in str(path).split('.'):
+        m = re.fullmatch(r'([^\[\]]*)((?:\[(?:\*|\d+)\])*)', part)
+        if not m:
+            raise RuleError(f"Invalid path: {path}")
+        if m.group(1):
+            segments.append(m.group(1))
+        for index in re.findall(r'\[(\*|\d+)\]', m.group(2)):
+            segments.append('*' if index == '*' else int(index))
+    return tuple(segments)
+
+
+def resolve(obj, segments: tuple) -> list:
+    """All values at a path; lists are traversed implicitly, missing keys yield nothing."""
+    values = [obj]
+    for seg in segments:
+        out = []
+        for v in values:
+            if seg == '*':
+                if isinstance(v, list):
+                    out.extend(v)
+                elif isinstance(v, dict):
+                    out.extend(v.values())
+            elif isinstance(seg, int):
+                if isinstance(v, list) and -len(v) <= seg < len(v):
+                    out.append(v[seg])
+            elif isinstance(v, dict):
+                if seg in v:
+                    out.append(v[seg])
+            elif isinstance(v, list):
+                out.extend(x[seg] for x in v if isinstance(x, dict) and seg in x)
+        values = out
+    return [v for v in values if v is not None]
+
+
+def _eq(value, expected) -> bool:
+    if isinstance(expected, bool) and isinstance(value, str):
+        return value.lower() == str(expected).lower()
+    if isinstance(expected, (int, float)) and not isinstance(expected, bool) and isinstance(value, str):
+        try:
+            return float(value) == expected
+        except ValueError:
+            return False
+    return value == expected
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _age_days(value):
+    try:
+        dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - dt).total_seconds() / 86400
+
+
+def _compare(op: str, expected):
+    """Predicate over the list of values found at a path."""
+    if op == 'exists':
+        want = bool(expected)
+        return lambda values: (len(values) > 0) == want
+    if op == 'contains':
+        return lambda values: any(_eq(v, expected) for v in _flatten(values))
+    if op == 'not_equals':
+        return lambda values: not any(_eq(v, expected) for v in values)
+    if op == 'not_in':
+        return lambda values: not any(_eq(v, e) for v in values for e in expected)
+    if op == 'equals':
+        test = lambda v: _eq(v, expected)  # noqa: E731
+    elif op == 'in':
+        test = lambda v: any(_eq(v, e) for e in expected)  # noqa: E731
+    elif op == 'matches':
+        pattern = re.compile(expected)
+        test = lambda v: isinstance(v, str) and pattern.search(v) is not None  # noqa: E731
+    elif op == 'within_days':
+        test = lambda v: (_age_days(v) is not None and _age_days(v) <= expected)  # noqa: E731
+    else:
+        limit = float(expected)
+        check = {'gt': limit.__lt__, 'gte': limit.__le__, 'lt': limit.__gt__, 'lte': limit.__ge__}[op]
+        test = lambda v: _num(v) is not None and check(_num(v))  # noqa: E731
+    # Positive comparisons need at least one value and must hold for all of them
+    return lambda values: bool(values) and all(test(v) for v in values)
+
+
+def _uses_clock(spec) -> bool:
+    """Whether a rule spec uses a time-based operator anywhere."""
+    if isinstance(spec, dict):
+        return any(k in TIME_OPERATORS or _uses_clock(v) for k, v in spec.items())
+    if isinstance(spec, list):
+        return any(_uses_clock(v) for v in spec)
+    return False
+
+
+def _flatten(values):
+    for v in values:
+        if isinstance(v, list):
+            yield from v
+        else:
+            yield v
+
+
+# --- compilation ----------------------------------------------------------------
+
+def compile_condition(spec, related_types: set):
+    """
+    Compile a condition into fn(obj, ctx) -> bool.
+
+    `related_types` collects the resource types a condition looks up, so
+    incremental runs know which other resources a result depends on.
+    """
+    if not isinstance(spec, dict) or not spec:
+        raise RuleError(f"Condition must be a non-empty mapping: {spec!r}")
+    if 'all' in spec and 'path' not in spec and 'related' not in spec:
+        parts = [compile_condition(c, related_types) for c in spec['all']]
+        return lambda obj, ctx: all(p(obj, ctx) for p in parts)
+    if 'any' in spec and 'path' not in spec and 'related' not in spec:
+        parts = [compile_condition(c, related_types) for c in spec['any']]
+        return lambda obj, ctx: any(p(obj, ctx) for p in parts)
+    if 'not' in spec:
+        inner = compile_condition(spec['not'], related_types)
+        return lambda obj, ctx: not inner(obj, ctx)
+
+    if 'path' in spec:
+        segments = compile_path(spec['path'])
+        source = lambda obj, ctx: resolve(obj, segments)  # noqa: E731
+    elif 'related' in spec:
+        rel = spec['related']
+        if not isinstance(rel, dict) or 'type' not in rel or len(rel.get('join') or {}) != 1:
+            raise RuleError(f"related needs 'type' and one 'join' pair: {rel!r}")
+        (their, ours), = rel['join'].items()
+        rtype, their_path, our_path = rel['type'], compile_path(their), compile_path(ours)
+        related_types.add(rtype)
+        source = lambda obj, ctx: ctx.related(rtype, their_path, resolve(obj, our_path))  # noqa: E731
+    else:
+        raise RuleError(f"Condition needs path, related, all, any or not: {spec!r}")
+
+    checks = []
+    for op in QUANTIFIERS:
+        if op in spec:
+            inner = compile_condition(spec[op], related_types)
+            if op == 'any':
+                checks.append(lambda vals, ctx, f=inner: any(f(v, ctx) for v in _flatten(vals)))
+            elif op == 'all':
+                checks.append(lambda vals, ctx, f=inner: all(f(v, ctx) for v in _flatten(vals)))
+            else:
+                checks.append(lambda vals, ctx, f=inner: not any(f(v, ctx) for v in _flatten(vals)))
+    for op in COMPARISONS:
+        if op in spec:
+            pred = _compare(op, spec[op])
+            checks.append(lambda vals, ctx, p=pred: p(vals))
+    unknown = set(spec) - {'path', 'related', *QUANTIFIERS, *COMPARISONS}
+    if unknown or not checks:
+        raise RuleError(f"Unknown or missing operator in {spec!r}")
+    return lambda obj, ctx: all(c(vals, ctx) for vals in [source(obj, ctx)] for c in checks)
+
+
+class Rule:
+    """A compiled rule."""
+
+    def __init__(self, spec: dict):
+        for key in ('id', 'resource', 'assert'):
+            if key not in spec:
+                raise RuleError(f"Rule {spec.get('id', '?')} is missing '{key}'")
+        self.id = spec['id']
+        self.resource = spec['resource']
+        self.title = spec.get('title', self.id)
+        self.severity = spec.get('severity', 'medium')
+        if self.severity not in SEVERITIES:
+            raise RuleError(f"Rule {self.id}: unknown severity {self.severity}")
+        self.checklist = spec.get('checklist')
+        self.remediation = spec.get('remediation')
+        self.related_types = set()
+        self.where = compile_condition(spec['where'], self.related_types) if spec.get('where') else None
+        self.check = compile_condition(spec['assert'], self.related_types)
+        self.related_types = tuple(sorted(self.related_types))
+        self.uses_clock = _uses_clock(spec.get('where')) or _uses_clock(spec['assert'])
+        self.digest = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def evaluate(self, item: dict, ctx) -> str:
+        if self.where is not None and not self.where(item, ctx):
+            return NOT_APPLICABLE
+        return PASS if self.check(item, ctx) else FAIL
+
+
+class RuleSet:
+    """Rules indexed by resource type."""
+
+    def __init__(self, doc: dict, min_severity: str = 'low'):
+        rules = [Rule(spec) for spec in doc.get('rules') or []]
+        ids = [r.id for r in rules]
+        duplicates = sorted({i for i in ids if ids.count(i) > 1})
+        if duplicates:
+            raise RuleError(f"Duplicate rule id(s): {', '.join(duplicates)}")
+        floor = SEVERITIES.index(min_severity)
+        self.rules = [r for r in rules if SEVERITIES.index(r.severity) >= floor]
+        self.by_type = {}
+        for r in self.rules:
+            self.by_type.setdefault(r.resource, []).append(r)
+
+
+_RULESET_CACHE = {}
+
+
+def ruleset_for(doc: dict, min_severity: str) -> RuleSet:
+    """Compile once per worker process."""
+    key = (json.dumps(doc, sort_keys=True, default=str), min_severity)
+    if key not in _RULESET_CACHE:
+        _RULESET_CACHE[key] = RuleSet(doc, min_severity)
+    return _RULESET_CACHE[key]
+
+
+# --- inventory ------------------------------------------------------------------
+
+def _decode(value):
+    if isinstance(value, str) and value[:1] in ('{', '['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def normalize_item(item: dict, account: str = None, region: str = None) -> dict:
+    """Config items with configuration / supplementaryConfiguration decoded from JSON strings."""
+    item = dict(item)
+    item['configuration'] = _decode(item.get('configuration')) or {}
+    supplementary = _decode(item.get('supplementaryConfiguration')) or {}
+    item['supplementaryConfiguration'] = {k: _decode(v) for k, v in supplementary.items()}
+    item.setdefault('awsAccountId', item.get('accountId') or account or 'unknown')
+    item.setdefault('awsRegion', region or 'global')
+    item.setdefault('resourceId', item.get('resourceName') or item.get('ARN') or '?')
+    return item
+
+
+def load_inventory(paths: list) -> list:
+    """Configuration items from snapshot files and directories."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(str(p) for p in sorted(Path(path).rglob('*'))
+                         if p.is_file() and p.name.endswith(('.json', '.json.gz')))
+        else:
+            files.append(path)
+    items = []
+    for path in files:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt') as f:
+            doc = json.load(f)
+        if isinstance(doc, dict):
+            account, region = doc.get('accountId'), doc.get('region')
+            raw = doc.get('configurationItems') or doc.get('resources') or doc.get('Results') or []
+        else:
+            account, region, raw = None, None, doc
+        for entry in raw:
+            entry = _decode(entry)
+            if isinstance(entry, dict) and 'resourceType' in entry:
+                items.append(normalize_item(entry, account, region))
+    return items
+
+
+def item_key(item: dict) -> str:
+    return f"{item['resourceType']}|{item['resourceId']}"
+
+
+def item_hash(item: dict) -> str:
+    """Change detector: Config state id when present, else a hash of the content."""
+    if item.get('configurationStateId') and item.get('configurationItemCaptureTime'):
+        return f"{item['configurationStateId']}@{item['configurationItemCaptureTime']}"
+    body = {k: item.get(k) for k in ('configuration', 'supplementaryConfiguration', 'tags', 'ARN')}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+class PartitionContext:
+    """Lookups of related resources within one account/region (plus the account's global resources)."""
+
+    def __init__(self, items: list):
+        self.by_type = {}
+        for item in items:
+            self.by_type.setdefault(item['resourceType'], []).append(item)
+        self.indexes = {}
+        self.digests = {}
+
+    def related(self, rtype: str, path: tuple, values: list) -> list:
+        index = self.indexes.get((rtype, path))
+        if index is None:
+            index = {}
+            for item in self.by_type.get(rtype, ()):
+                for v in resolve(item, path):
+                    if isinstance(v, (str, int, float, bool)):
+                        index.setdefault(v, []).append(item)
+            self.indexes[(rtype, path)] = index
+        out = []
+        for v in values:
+            if isinstance(v, (str, int, float, bool)):
+                out.extend(index.get(v, ()))
+        return out
+
+    def type_digest(self, rtype: str) -> str:
+        digest = self.digests.get(rtype)
+        if digest is None:
+            hashes = sorted(f"{item_key(i)}={item_hash(i)}" for i in self.by_type.get(rtype, ()))
+            digest = self.digests[rtype] = hashlib.sha256('\n'.join(hashes).encode()).hexdigest()[:16]
+        return digest
+
+
+def evaluate_partition(rules_doc: dict, min_severity: str, items: list, context: list, previous: dict):
+    """
+    Evaluate one account/region.
+
+    Args:
+        rules_doc: Parsed rules file (compiled once per process)
+        min_severity: Lowest severity evaluated
+        items: Configuration items of the partition
+        context: Extra items visible to related lookups (account's global resources)
+        previous: Prior state of the partition {resource key: {'hash', 'results'}}
+
+    Returns:
+        tuple: (findings, new partition state, {'evaluated', 'reused', 'resources'}, pass/fail counts per rule)
+    """
+    ruleset = ruleset_for(rules_doc, min_severity)
+    ctx = PartitionContext(items + context)
+    findings, state = [], {}
+    stats = {'evaluated': 0, 'reused': 0, 'resources': 0}
+    counts = {}
+    for item in items:
+        rules = ruleset.by_type.get(item['resourceType'])
+        if not rules:
+            continue
+        stats['resources'] += 1
+        key, h = item_key(item), item_hash(item)
+        prior = previous.get(key)
+        prior_results = prior['results'] if prior and prior['hash'] == h else {}
+        results = {}
+        for rule in rules:
+            deps = ','.join(ctx.type_digest(t) for t in rule.related_types)
+            cached = prior_results.get(rule.id)
+            if cached and cached[1] == rule.digest and cached[2] == deps and not rule.uses_clock:
+                status = cached[0]
+                stats['reused'] += 1
+            else:
+                status = rule.evaluate(item, ctx)
+                stats['evaluated'] += 1
+            results[rule.id] = [status, rule.digest, deps]
+            tally = counts.setdefault(rule.id, [0, 0])
+            if status == PASS:
+                tally[0] += 1
+            elif status == FAIL:
+                tally[1] += 1
+                findings.append({
+                    'rule': rule.id, 'severity': rule.severity, 'title': rule.title,
+                    'checklist': rule.checklist, 'account': item['awsAccountId'],
+                    'region': item['awsRegion'], 'resource_type': item['resourceType'],
+                    'resource_id': item['resourceId'], 'remediation': rule.remediation,
+                })
+        state[key] = {'hash': h, 'results': results}
+    return findings, state, stats, counts
+
+
+def partition(items: list) -> dict:
+    """{(account, region): items}"""
+    parts = {}
+    for item in items:
+        parts.setdefault((item['awsAccountId'], item['awsRegion']), []).append(item)
+    return parts
+
+
+def run(items: list, rules_doc: dict, state: dict = None, workers: int = None, min_severity: str = 'low') -> dict:
+    """
+    Evaluate all partitions, in parallel when there is more than one.
+
+    Returns:
+        dict: {'findings', 'state', 'stats', 'counts'}
+    """
+    ruleset_for(rules_doc, min_severity)  # validate before fanning out
+    parts = partition(items)
+    globals_by_account = {}
+    for (account, region), part in parts.items():
+        if region == 'global':
+            globals_by_account[account] = part
+    previous = (state or {}).get('partitions', {})
+    jobs = []
+    for (account, region), part in sorted(parts.items()):
+        context = globals_by_account.get(account, []) if region != 'global' else []
+        jobs.append(((account, region), (rules_doc, min_severity, part, context,
+                                         previous.get(f"{account}|{region}", {}))))
+
+    results = []
+    if len(jobs) == 1 or workers == 1:
+        results = [(key, evaluate_partition(*args)) for key, args in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(key, pool.submit(evaluate_partition, *args)) for key, args in jobs]
+            results = [(key, f.result()) for key, f in futures]
+
+    findings, new_state = [], {}
+    stats = {'partitions': len(jobs), 'evaluated': 0, 'reused': 0, 'resources': 0}
+    counts = {}
+    for (account, region), (part_findings, part_state, part_stats, part_counts) in results:
+        findings.extend(part_findings)
+        new_state[f"{account}|{region}"] = part_state
+        for k, v in part_stats.items():
+            stats[k] += v
+        for rule_id, (passed, failed) in part_counts.items():
+            tally = counts.setdefault(rule_id, [0, 0])
+            tally[0] += passed
+            tally[1] += failed
+    return {'findings': findings, 'state': {'version': STATE_VERSION, 'partitions': new_state},
+            'stats': stats, 'counts': counts}
+
+
+def checklist_coverage(checklist_path, rules_doc: dict, counts: dict) -> list:
+    """
+    Checklist items with their rules and results; items without rules are
+    manual, items whose rules matched no resource have no data.
+    """
+    if not checklist_path or not Path(checklist_path).exists():
+        return []
+    with open(checklist_path, 'r') as f:
+        checklist = yaml.safe_load(f) or {}
+    by_item = {}
+    for spec in rules_doc.get('rules') or []:
+        if spec.get('checklist'):
+            by_item.setdefault(spec['checklist'], []).append(spec['id'])
+    coverage = []
+    for section, entries in checklist.items():
+        for entry in entries or []:
+            ref = f"{section}/{entry}"
+            rules = by_item.get(ref, [])
+            passed = sum(counts.get(r, [0, 0])[0] for r in rules)
+            failed = sum(counts.get(r, [0, 0])[1] for r in rules)
+            if not rules:
+                status = 'manual'
+            elif failed:
+                status = 'fail'
+            elif passed:
+                status = 'pass'
+            else:
+                status = 'no data'
+            coverage.append({'item': ref, 'rules': rules, 'passed': passed, 'failed': failed,
+                             'status': status})
+    return coverage
+
+
+def format_table(report: dict) -> str:
+    stats = report['stats']
+    lines = [f"Resources: {stats['resources']} in {stats['partitions']} account/region partitions | "
+             f"Evaluated: {stats['evaluated']} | Reused: {stats['reused']} | Findings: {len(report['findings'])}",
+             '', f"{'Status':<8}{'Pass':>7}{'Fail':>7}  Checklist item"]
+    for c in report['coverage']:
+        lines.append(f"{c['status']:<8}{c['passed']:>7}{c['failed']:>7}  {c['item']}")
+    if report['findings']:
+        lines += ['', f"{'Severity':<10}{'Rule':<24}{'Account':<14}{'Region':<16}Resource"]
+        for f in report['findings']:
+            lines.append(f"{f['severity']:<10}{f['rule']:<24}{f['account']:<14}{f['region']:<16}"
+                         f"{f['resource_type']} {f['resource_id']}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main rule engine entry point."""
+    parser = argparse.ArgumentParser(description='Evaluate security checklist rules against inventory snapshots')
+    parser.add_argument('paths', nargs='+', help='Inventory snapshot files or directories')
+    parser.add_argument('--rules', default=str(DEFAULT_RULES), help='Rules YAML')
+    parser.add_argument('--checklist', default=str(DEFAULT_CHECKLIST), help='Checklist YAML for coverage')
+    parser.add_argument('--state', help='State file for incremental re-runs')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel worker processes')
+    parser.add_argument('--severity', choices=SEVERITIES, default='low', help='Lowest severity to evaluate')
+    parser.add_argument('--fail-on', choices=SEVERITIES, default='high', help='Exit 1 on findings at or above')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    try:
+        with open(args.rules, 'r') as f:
+            rules_doc = yaml.safe_load(f) or {}
+        items = load_inventory(args.paths)
+        state = None
+        if args.state and os.path.exists(args.state):
+            with open(args.state, 'r') as f:
+                state = json.load(f)
+            if state.get('version') != STATE_VERSION:
+                state = None
+        result = run(items, rules_doc, state, args.workers, args.severity)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+    if not items:
+        print("No configuration items found", file=sys.stderr)
+        return 3
+
+    if args.state:
+        tmp = f"{args.state}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(result['state'], f)
+        os.replace(tmp, args.state)
+
+    findings = sorted(result['findings'], key=lambda f: (-SEVERITIES.index(f['severity']), f['rule'],
+                                                         f['account'], f['region'], f['resource_id']))
+    report = {
+        'stats': result['stats'],
+        'coverage': checklist_coverage(args.checklist, rules_doc, result['counts']),
+        'rules': {rule_id: {'passed': p, 'failed': fl} for rule_id, (p, fl) in sorted(result['counts'].items())},
+        'findings': findings,
+    }
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+
+    floor = SEVERITIES.index(args.fail_on)
+    return 1 if any(SEVERITIES.index(f['severity']) >= floor for f in findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Secret scanner for aws-security-best-practices skill.
+Category: cloud
+
+Finds AWS access keys, secret access keys, private keys, credentials in
+connection strings and high-entropy secret assignments in source trees,
+buildspecs, task definitions and user data scripts.
+
+- All patterns are matched in one pass per buffer: every rule declares the
+  literal anchors it cannot match without (AKIA, -----BEGIN, ://, secret,
+  ...), the anchors are located with C-level substring search over the
+  memory-mapped file (case-folded once for keyword anchors), and the full
+  regexes only run on the lines that contain an anchor.
+- Binary files (NUL in the first 8 KiB) and files over --max-size are skipped.
+- Files are scanned on a process pool in size-balanced batches.
+- Results are cached by git blob id (sha1 of "blob <size>\\0" + content),
+  so unchanged files are skipped by stat, renamed or re-checked-out files
+  by content, and staged blobs without reading them at all.
+
+Modes:
+    PATH ...     Scan files/directories (git-tracked and untracked, not
+                 ignored, files when inside a repository)
+    --staged     Scan the content staged for commit (pre-commit)
+    --hook       Claude Code hook: reads the hook event on stdin, scans the
+                 written file (PostToolUse Write/Edit) or the staged content
+                 before `git commit` (PreToolUse Bash); exit 2 reports findings.
+                 The hook runs before the command, so files the command will
+                 add first (`git add ... && git commit`, `commit -a`,
+                 `commit PATH`) are scanned in the working tree as well
+
+Usage:
+    python secret_scanner.py [PATH ...] [--staged] [--workers N] [--cache FILE]
+                             [--max-size MB] [--exclude GLOB] [--format table|json]
+    python secret_scanner.py --hook < event.json
+"""
+
+import argparse
+import fnmatch
+import shlex
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+# Values that are references or placeholders rather than secrets
+PLACEHOLDER_RE = re.compile(
+    rb'^(?:\$\{|\$\(|\$[A-Za-z_]|\{\{|<|%\(|\*+$|x{4,}|\.\.\.|changeme|example|your[_-]|dummy|sample|'
+    rb'placeholder|redacted|arn:|resolve:|ssm:|secretsmanager:|!ref|!sub|!getatt|[a-z+]+://)', re.IGNORECASE)
+DIGIT_RE = re.compile(rb'[0-9]')
+
+# (id, title, severity, anchors, case-fold anchors, regex, value group, min entropy)
+RULES = (
+    ('aws-access-key-id', 'AWS access key ID', 'critical',
+     (b'AKIA', b'ASIA', b'ABIA', b'ACCA'), False,
+     rb'(?<![A-Z0-9])((?:AKIA|ASIA|ABIA|ACCA)[A-Z2-7]{16})(?![A-Z0-9])', 1, 0.0),
+    ('aws-secret-access-key', 'AWS secret access key', 'critical',
+     (b'secret',), True,
+     rb'(?i:aws_?secret_?access_?key|secret_?access_?key)["\']?\s*[:=]\s*["\']?'
+     rb'([A-Za-z0-9/+]{40})(?![A-Za-z0-9/+=])', 1, 4.0),
+    ('private-key', 'Private key', 'critical',
+     (b'-----BEGIN',), False,
+     rb'(-----BEGIN (?:RSA |EC |DSA |OPENSSH |ENCRYPTED |PGP )?PRIVATE KEY(?: BLOCK)?-----)', 1, 0.0),
+    ('connection-string', 'Password in connection string', 'high',
+     (b'://',), False,
+     rb'(?i:\b(?:postgres(?:ql)?|mysql|mariadb|mongodb(?:\+srv)?|rediss?|amqps?|mssql|sqlserver))'
+     rb'://[^\s:/@\'"]+:([^\s@\'"/]{3,})@', 1, 0.0),
+    ('github-token', 'GitHub token', 'high',
+     (b'ghp_', b'gho_', b'ghs_', b'github_pat_'), False,
+     rb'\b(gh[pos]_[A-Za-z0-9]{36}|github_pat_[A-Za-z0-9_]{82})\b', 1, 0.0),
+    ('generic-secret', 'High-entropy secret assignment', 'medium',
+     (b'passw', b'secret', b'token', b'apikey', b'api_key'), True,
+     rb'(?i:passw(?:or)?d|secret|token|api_?key)[\w.-]{0,24}["\']?\s*[:=]\s*["\']?'
+     rb'([^\s"\'`,;:)]{16,})', 1, 3.5),
+)
+
+RULES_DIGEST = hashlib.sha256(repr(RULES).encode()).hexdigest()[:16]
+ALLOW_MARKER = b'secret-scan:allow'
+CHUNK_SIZE = 32 * 1024 * 1024
+MAX_LINE = 4096
+BATCH_BYTES = 16 * 1024 * 1024
+BATCH_FILES = 512
+CACHE_VERSION = 1
+
+
+class Scanner:
+    """Compiled rules grouped by anchor."""
+
+    def __init__(self, rules=RULES):
+        self.rules = []
+        self.raw_anchors = {}
+        self.folded_anchors = {}
+        for index, (rule_id, title, severity, anchors, fold, pattern, group, entropy) in enumerate(rules):
+            self.rules.append((rule_id, title, severity, re.compile(pattern), group, entropy))
+            target = self.folded_anchors if fold else self.raw_anchors
+            for anchor in anchors:
+                target.setdefault(anchor.lower() if fold else anchor, []).append(index)
+
+    def candidates(self, buf: bytes) -> dict:
+        """{line start offset: set of rule indexes} for lines containing an anchor."""
+        lines = {}
+        for haystack, anchors in ((buf, self.raw_anchors), (None, self.folded_anchors)):
+            if not anchors:
+                continue
+            if haystack is None:
+                haystack = buf.lower()
+            for anchor, rule_indexes in anchors.items():
+                pos = haystack.find(anchor)
+                while pos != -1:
+                    newline = buf.rfind(b'\n', max(0, pos - MAX_LINE), pos)
+                    # Very long (minified) lines are cut into a window around the anchor
+                    start = newline + 1 if newline != -1 or pos < MAX_LINE else pos - MAX_LINE // 2
+                    lines.setdefault(start, set()).update(rule_indexes)
+                    pos = haystack.find(anchor, pos + len(anchor))
+        return lines
+
+    def scan(self, buf: bytes, line_offset: int = 0) -> list:
+        """Findings in a buffer of whole lines: [rule, line, column, redacted value]."""
+        candidates = self.candidates(buf)
+        if not candidates:
+            return []
+        findings = []
+        line_no, counted = line_offset + 1, 0
+        for start in sorted(candidates):
+            end = buf.find(b'\n', start, start + MAX_LINE)
+            line = buf[start:end if end != -1 else start + MAX_LINE]
+            if ALLOW_MARKER in line:
+                continue
+            line_no += buf.count(b'\n', counted, start)
+            counted = start
+            column = 1 if start == 0 or buf[start - 1] == 10 else start - buf.rfind(b'\n', 0, start)
+            seen = set()
+            for index in sorted(candidates[start]):
+                rule_id, _, _, regex, group, min_entropy = self.rules[index]
+                for m in regex.finditer(line):
+                    value = m.group(group)
+                    if value in seen or not is_secret(value, min_entropy):
+                        continue
+                    seen.add(value)
+                    findings.append([rule_id, line_no, column + m.start(group), redact(value)])
+        return findings
+
+
+def entropy(value: bytes) -> float:
+    """Shannon entropy in bits per character."""
+    counts = {}
+    for b in value:
+        counts[b] = counts.get(b, 0) + 1
+    n = len(value)
+    return -sum(c / n * math.log2(c / n) for c in counts.values())
+
+
+def is_secret(value: bytes, min_entropy: float) -> bool:
+    if b'EXAMPLE' in value or PLACEHOLDER_RE.match(value):
+        return False
+    if min_entropy <= 0:
+        return True
+    # Identifiers and dotted references (process.env.DB_PASSWORD) carry no digits
+    return DIGIT_RE.search(value) is not None and entropy(value) >= min_entropy
+
+
+def redact(value: bytes) -> str:
+    text = value.decode('utf-8', 'replace')
+    if text.startswith('-----'):
+        return text
+    keep = 4 if len(text) > 8 else 1
+    return text[:keep] + '*' * min(len(text) - keep, 12)
+
+
+def blob_id(size: int) -> 'hashlib._Hash':
+    """sha1 primed with the git blob header, so ids match `git hash-object`."""
+    return hashlib.sha1(b'blob %d\0' % size)
+
+
+# --- workers --------------------------------------------------------------------
+
+_SCANNER = None
+_KNOWN = frozenset()
+
+
+def _init_worker(known: frozenset):
+    global _SCANNER, _KNOWN
+    _SCANNER = Scanner()
+    _KNOWN = known
+
+
+def _scanner() -> Scanner:
+    global _SCANNER
+    if _SCANNER is None:
+        _SCANNER = Scanner()
+    return _SCANNER
+
+
+def scan_file(path: str, known=None):
+    """
+    Hash and scan one file through a memory map.
+
+    Returns:
+        tuple: (blob id, findings or None when the id is already known, or 'binary')
+    """
+    known = _KNOWN if known is None else known
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return blob_id(0).hexdigest(), []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if b'\0' in mm[:8192]:
+                return None, 'binary'
+            h = blob_id(size)
+            h.update(mm)
+            sha = h.hexdigest()
+            if sha in known:
+                return sha, None
+            findings, start, lines = [], 0, 0
+            while start < size:
+                end = size if size - start <= CHUNK_SIZE else mm.rfind(b'\n', start, start + CHUNK_SIZE) + 1
+                if end <= start:
+                    end = min(size, start + CHUNK_SIZE)
+                chunk = mm[start:end]
+                findings.extend(_scanner().scan(chunk, lines))
+                lines += chunk.count(b'\n')
+                start = end
+    return sha, findings
+
+
+def scan_blob(content: bytes):
+    if b'\0' in content[:8192]:
+        return 'binary'
+    return _scanner().scan(content)
+
+
+def scan_batch(paths: list) -> list:
+    results = []
+    for path in paths:
+        try:
+            results.append((path,) + scan_file(path))
+        except OSError as e:
+            results.append((path, None, f"error: {e}"))
+    return results
+
+
+def scan_blob_batch(blobs: list) -> list:
+    return [(sha, scan_blob(content)) for sha, content in blobs]
+
+
+def batches(items: list, size_of) -> list:
+    """Split work into batches of roughly BATCH_BYTES or BATCH_FILES."""
+    out, current, current_bytes = [], [], 0
+    for item in items:
+        current.append(item)
+        current_bytes += size_of(item)
+        if current_bytes >= BATCH_BYTES or len(current) >= BATCH_FILES:
+            out.append(current)
+            current, current_bytes = [], 0
+    if current:
+        out.append(current)
+    return out
+
+
+# --- git and cache --------------------------------------------------------------
+
+def git(args: list, cwd: str, input_bytes: bytes = None) -> bytes:
+    result = subprocess.run(['git'] + args, cwd=cwd, input=input_bytes,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed in {cwd}")
+    return result.stdout
+
+
+def git_root(cwd: str):
+    try:
+        top = git(['rev-parse', '--show-toplevel'], cwd).decode().strip()
+        git_dir = git(['rev-parse', '--absolute-git-dir'], cwd).decode().strip()
+        return top, git_dir
+    except (RuntimeError, OSError):
+        return None, None
+
+
+def load_cache(path) -> dict:
+    empty = {'version': CACHE_VERSION, 'rules': RULES_DIGEST, 'files': {}, 'results': {}}
+    # Only a regular file can hold a cache (--cache /dev/null disables it)
+    if not path or not os.path.isfile(path):
+        return empty
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION or cache.get('rules') != RULES_DIGEST:
+        return empty
+    return cache
+
+
+def save_cache(path, cache: dict, live: set):
+    """Write the cache, keeping only results still referenced by a file or staged blob."""
+    if not path:
+        return
+    # Replace the file a symlink points to, and never a device, FIFO or directory
+    path = os.path.realpath(path)
+    if os.path.exists(path) and not os.path.isfile(path):
+        return
+    cache['results'] = {sha: v for sha, v in cache['results'].items() if sha in live}
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+# --- scan modes -----------------------------------------------------------------
+
+def list_files(paths: list, root: str, in_git: bool, excludes: list) -> list:
+    """Relative paths (to root) of the files to scan."""
+    files = []
+    for path in paths:
+        absolute = os.path.abspath(path)
+        if os.path.isfile(absolute):
+            files.append(os.path.relpath(absolute, root))
+        elif in_git:
+            out = git(['ls-files', '-z', '-co', '--exclude-standard', '--', absolute], root)
+            files.extend(p for p in out.decode('utf-8', 'surrogateescape').split('\0') if p)
+        elif os.path.isdir(absolute):
+            for dirpath, dirnames, filenames in os.walk(absolute):
+                dirnames[:] = [d for d in dirnames if d != '.git']
+                files.extend(os.path.relpath(os.path.join(dirpath, n), root) for n in filenames)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    if excludes:
+        files = [f for f in files if not any(fnmatch.fnmatch(f, g) for g in excludes)]
+    return sorted(set(files))
+
+
+def scan_tree(paths: list, root: str, in_git: bool, cache: dict, args) -> tuple:
+    """Scan files on disk; returns (findings, stats, live blob ids)."""
+    stats = {'files': 0, 'bytes': 0, 'cached': 0, 'scanned': 0, 'skipped': 0}
+    max_size = int(args.max_size * 1024 * 1024)
+    file_index = cache['files']
+    results = cache['results']
+    todo, live, shas = [], set(), {}
+    for rel in list_files(paths, root, in_git, args.exclude):
+        try:
+            st = os.stat(os.path.join(root, rel))
+        except OSError:
+            continue  # listed by git but deleted in the worktree
+        if not os.path.isfile(os.path.join(root, rel)):
+            continue
+        stats['files'] += 1
+        if st.st_size > max_size:
+            stats['skipped'] += 1
+            continue
+        entry = file_index.get(rel)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns and entry[2] in results:
+            stats['cached'] += 1
+            shas[rel] = entry[2]
+            live.add(entry[2])
+            continue
+        todo.append((rel, st.st_size, st.st_mtime_ns))
+
+    known = frozenset(results)
+    sizes = {rel: size for rel, size, _ in todo}
+    stamps = {rel: (size, mtime) for rel, size, mtime in todo}
+    work = batches([os.path.join(root, rel) for rel, _, _ in todo],
+                   lambda p: sizes[os.path.relpath(p, root)])
+    if len(work) > 1 and args.workers != 1:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(known,)) as pool:
+            outputs = [r for batch in pool.map(scan_batch, work) for r in batch]
+    else:
+        _init_worker(known)
+        outputs = [r for batch in work for r in scan_batch(batch)]
+
+    for path, sha, findings in outputs:
+        rel = os.path.relpath(path, root)
+        if isinstance(findings, str):
+            stats['skipped'] += 1
+            file_index.pop(rel, None)
+            continue
+        if findings is None:
+            stats['cached'] += 1
+        else:
+            stats['scanned'] += 1
+            stats['bytes'] += sizes[rel]
+            results[sha] = findings
+        file_index[rel] = [stamps[rel][0], stamps[rel][1], sha]
+        shas[rel] = sha
+        live.add(sha)
+    for rel in [r for r in file_index if r not in shas and not os.path.exists(os.path.join(root, r))]:
+        del file_index[rel]
+    return collect(shas, results), stats, live
+
+
+def scan_staged(root: str, cache: dict, args) -> tuple:
+    """Scan the index content of files staged for commit; cached blobs are not read."""
+    stats = {'files': 0, 'bytes': 0, 'cached': 0, 'scanned': 0, 'skipped': 0}
+    names = git(['diff', '--cached', '--name-only', '-z', '--diff-filter=ACMR'], root)
+    staged = {n for n in names.decode('utf-8', 'surrogateescape').split('\0') if n}
+    if args.exclude:
+        staged = {n for n in staged if not any(fnmatch.fnmatch(n, g) for g in args.exclude)}
+    shas = {}
+    for entry in git(['ls-files', '-s', '-z'], root).decode('utf-8', 'surrogateescape').split('\0'):
+        if '\t' in entry:
+            meta, name = entry.split('\t', 1)
+            if name in staged:
+                shas[name] = meta.split()[1]
+    stats['files'] = len(shas)
+    results = cache['results']
+    missing = sorted({sha for sha in shas.values() if sha not in results})
+    stats['cached'] = sum(1 for sha in shas.values() if sha in results)
+
+    max_size = int(args.max_size * 1024 * 1024)
+    blobs = []
+    if missing:
+        out = git(['cat-file', '--batch'], root, ('\n'.join(missing) + '\n').encode())
+        pos = 0
+        while pos < len(out):
+            header_end = out.index(b'\n', pos)
+            sha, _, size = out[pos:header_end].decode().split()
+            size = int(size)
+            content = out[header_end + 1:header_end + 1 + size]
+            pos = header_end + 1 + size + 1
+            if size > max_size:
+                stats['skipped'] += 1
+                continue
+            blobs.append((sha, content))
+    work = batches(blobs, lambda b: len(b[1]))
+    if len(work) > 1 and args.workers != 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            outputs = [r for batch in pool.map(scan_blob_batch, work) for r in batch]
+    else:
+        outputs = [r for batch in work for r in scan_blob_batch(batch)]
+    for sha, findings in outputs:
+        if findings == 'binary':
+            stats['skipped'] += 1
+            findings = []
+        else:
+            stats['scanned'] += 1
+        results[sha] = findings
+    stats['bytes'] = sum(len(c) for _, c in blobs)
+    shas = {name: sha for name, sha in shas.items() if sha in results}
+    return collect(shas, results), stats, set(shas.values())
+
+
+def collect(shas: dict, results: dict) -> list:
+    severity = {rule[0]: rule[2] for rule in RULES}
+    title = {rule[0]: rule[1] for rule in RULES}
+    findings = []
+    for path, sha in sorted(shas.items()):
+        for rule_id, line, column, value in results.get(sha) or []:
+            findings.append({'path': path, 'line': line, 'column': column, 'rule': rule_id,
+                             'severity': severity.get(rule_id, 'medium'), 'title': title.get(rule_id, rule_id),
+                             'match': value})
+    return findings
+
+
+def run(args, cwd: str) -> tuple:
+    root, git_dir = git_root(cwd)
+    in_git = root is not None
+    cache_path = args.cache or (os.path.join(git_dir, 'secret-scan-cache.json') if in_git else None)
+    cache = load_cache(cache_path)
+    if args.staged:
+        if not in_git:
+            raise ValueError("--staged needs a git repository")
+        findings, stats, live = scan_staged(root, cache, args)
+    else:
+        findings, stats, live = scan_tree(args.paths or ['.'], root or cwd, in_git, cache, args)
+    save_cache(cache_path, cache, live | {entry[2] for entry in cache['files'].values()})
+    floor = SEVERITIES.index(args.severity)
+    findings = [f for f in findings if SEVERITIES.index(f['severity']) >= floor]
+    return findings, stats
+
+
+def format_table(findings: list) -> str:
+    lines = []
+    for f in findings:
+        lines.append(f"{f['path']}:{f['line']}:{f['column']}  {f['severity']:<9}{f['rule']:<22}{f['match']}")
+    return '\n'.join(lines)
+
+
+# Options of `git commit` that take a value as the next argument
+COMMIT_VALUE_OPTIONS = {'-m', '-F', '-C', '-c', '-t', '--message', '--file', '--author', '--date',
+                        '--template', '--reuse-message', '--reedit-message', '--fixup', '--squash',
+                        '--cleanup', '--trailer', '--pathspec-from-file'}
+COMMIT_SHORT_VALUE = 'mFCct'
+
+
+def git_commit_plan(command: str):
+    """
+    What a shell command will commit, or None if it does not run `git commit`.
+
+    Returns:
+        dict: {'cwd': directory from -C or None, 'paths': pathspecs taken from
+        the working tree (`git add` before the commit, `commit PATH`),
+        'all': whether tracked changes are committed too (-a/--all, add -u/-A)}
+    """
+    plan = {'cwd': None, 'paths': [], 'all': False}
+    committed = False
+    for segment in re.split(r'&&|\|\||[;|\n]', command):
+        try:
+            words = shlex.split(segment)
+        except ValueError:
+            words = segment.split()
+        while words and '=' in words[0] and not words[0].startswith('-'):
+            words = words[1:]  # VAR=value prefix
+        if not words or os.path.basename(words[0]) != 'git':
+            continue
+        i = 1
+        while i < len(words) and words[i].startswith('-'):
+            if words[i] in ('-C', '-c', '--git-dir', '--work-tree') and i + 1 < len(words):
+                if words[i] == '-C':
+                    plan['cwd'] = words[i + 1]
+                i += 1
+            i += 1
+        if i >= len(words):
+            continue
+        sub, rest = words[i], words[i + 1:]
+        if sub == 'add' and not committed:
+            specs = [w for w in rest if not w.startswith('-')]
+            if specs:
+                plan['paths'].extend(specs)
+            elif any(w in ('-A', '--all', '-u', '--update') for w in rest):
+                plan['paths'].append('.')
+        elif sub == 'commit':
+            committed = True
+            j = 0
+            while j < len(rest):
+                w = rest[j]
+                if w == '--':
+                    plan['paths'].extend(rest[j + 1:])
+                    break
+                if w in ('-a', '--all', '-i', '--include', '-o', '--only'):
+                    plan['all'] = plan['all'] or w in ('-a', '--all')
+                elif w in COMMIT_VALUE_OPTIONS:
+                    j += 1
+                elif w.startswith('--'):
+                    pass
+                elif w.startswith('-'):
+                    # Short option cluster: -am "msg", -qa
+                    for c in w[1:]:
+                        if c == 'a':
+                            plan['all'] = True
+                        if c in COMMIT_SHORT_VALUE:
+                            if c == w[-1]:
+                                j += 1
+                            break
+                else:
+                    plan['paths'].append(w)
+                j += 1
+    return plan if committed else None
+
+
+def pending_files(root: str, cwd: str, plan: dict) -> list:
+    """Absolute paths of working-tree files the commit will pick up beyond the index."""
+    names = set()
+    if plan['all']:
+        try:
+            out = git(['diff', '--name-only', '-z', '--diff-filter=ACMR', 'HEAD'], root)
+        except RuntimeError:
+            out = git(['ls-files', '-z'], root)  # no commit yet
+        names.update(os.path.join(root, n) for n in out.decode('utf-8', 'surrogateescape').split('\0') if n)
+    if plan['paths']:
+        specs = [os.path.join(cwd, p) for p in plan['paths']]
+        try:
+            changed = git(['diff', '--name-only', '-z', '--diff-filter=ACMR', 'HEAD', '--'] + specs, root)
+        except RuntimeError:
+            changed = git(['ls-files', '-z', '--'] + specs, root)
+        untracked = git(['ls-files', '-z', '-o', '--exclude-standard', '--'] + specs, root)
+        for out in (changed, untracked):
+            names.update(os.path.join(root, n) for n in out.decode('utf-8', 'surrogateescape').split('\0') if n)
+    return sorted(n for n in names if os.path.isfile(n))
+
+
+def run_hook(args) -> int:
+    """Claude Code hook entry: exit 2 feeds the findings back to the model."""
+    try:
+        event = json.load(sys.stdin)
+    except ValueError:
+        return 0
+    if not isinstance(event, dict):
+        return 0
+    tool = event.get('tool_name', '')
+    tool_input = event.get('tool_input') or {}
+    if not isinstance(tool_input, dict):
+        return 0
+    cwd = event.get('cwd') or os.getcwd()
+    committing = tool == 'Bash'
+    try:
+        if committing:
+            plan = git_commit_plan(tool_input.get('command', ''))
+            if plan is None:
+                return 0
+            if plan['cwd']:
+                cwd = os.path.join(cwd, plan['cwd'])
+            args.staged, args.paths = True, []
+            findings, _ = run(args, cwd)
+            # The hook runs before the command: also scan what it will stage
+            root, _ = git_root(cwd)
+            files = pending_files(root, cwd, plan) if root and (plan['all'] or plan['paths']) else []
+            if files:
+                args.staged, args.paths = False, files
+                seen = {(f['path'], f['line'], f['rule']) for f in findings}
+                findings += [f for f in run(args, cwd)[0] if (f['path'], f['line'], f['rule']) not in seen]
+        elif tool_input.get('file_path'):
+            args.staged, args.paths = False, [tool_input['file_path']]
+            findings, _ = run(args, cwd)
+        else:
+            return 0
+    except (OSError, ValueError, RuntimeError):
+        return 0
+    if not findings:
+        return 0
+    action = 'Commit blocked' if committing else 'Secrets written'
+    print(f"{action}: {len(findings)} possible secret(s). Move them to Secrets Manager or "
+          f"SSM Parameter Store, or mark intended test data with '{ALLOW_MARKER.decode()}'.", file=sys.stderr)
+    print(format_table(findings), file=sys.stderr)
+    return 2
+
+
+def main():
+    """Main secret scanner entry point."""
+    parser = argparse.ArgumentParser(description='Scan files or staged changes for secrets')
+    parser.add_argument('paths', nargs='*', help='Files or directories (default: current directory)')
+    parser.add_argument('--staged', action='store_true', help='Scan content staged for commit')
+    parser.add_argument('--hook', action='store_true', help='Run as a Claude Code hook (event on stdin)')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel worker processes')
+    parser.add_argument('--cache', help='Cache file (default: .git/secret-scan-cache.json)')
+    parser.add_argument('--max-size', type=float, default=32, help='Skip files larger than MB')
+    parser.add_argument('--exclude', action='append', default=[], help='Glob of paths to skip (repeatable)')
+    parser.add_argument('--severity', choices=SEVERITIES, default='low', help='Lowest severity reported')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    if args.hook:
+        return run_hook(args)
+
+    started = time.time()
+    try:
+        findings, stats = run(args, os.getcwd())
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 4
+
+    if args.format == 'json':
+        print(json.dumps({'stats': stats, 'findings': findings}, indent=2))
+    elif findings:
+        print(format_table(findings))
+    print(f"Scanned {stats['scanned']} of {stats['files']} files ({stats['bytes'] / 1e6:.1f} MB), "
+          f"{stats['cached']} cached, {stats['skipped']} skipped in {time.time() - started:.2f}s; "
+          f"{len(findings)} finding(s)", file=sys.stderr)
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())